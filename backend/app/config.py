@@ -189,6 +189,21 @@ class Settings(BaseSettings):
         default="",
         validation_alias=AliasChoices("REDIS_NAMESPACE"),
     )
+    # Redis キャッシュ値のシリアライザ: json / orjson / msgpack
+    # ライブラリ未インストール時は json にフォールバック（読み出しは全形式に対応）
+    cache_codec: str = Field(
+        default="orjson",
+        validation_alias=AliasChoices("CACHE_CODEC"),
+    )
+    # 圧縮: none / zstd（zstandard が必要）。CACHE_COMPRESS_MIN_BYTES 以上の値のみ圧縮
+    cache_compression: str = Field(
+        default="none",
+        validation_alias=AliasChoices("CACHE_COMPRESSION"),
+    )
+    cache_compress_min_bytes: int = Field(
+        default=1024,
+        validation_alias=AliasChoices("CACHE_COMPRESS_MIN_BYTES"),
+    )
 
     # ===== LLM 実モデル設定 =====
     # 機能別設定では stable alias を使い、ここで実際の版付き model ID を管理する。
@@ -357,6 +372,119 @@ class Settings(BaseSettings):
     openai_embedding_model: str = "text-embedding-3-small"
     # 環境変数: EMBEDDING_MAX_INPUT_CHARS
     embedding_max_input_chars: int = 8000
+    # 埋め込みキャッシュ（model + 送信テキストの hash）。再クロール時に未変更チャンクの再埋め込みを省く。
+    embedding_cache_enabled: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("EMBEDDING_CACHE_ENABLED"),
+    )
+    # 空なら backend/data/embedding_cache.sqlite3
+    embedding_cache_path: str = Field(
+        default="",
+        validation_alias=AliasChoices("EMBEDDING_CACHE_PATH"),
+    )
+    embedding_cache_max_mb: int = Field(
+        default=512,
+        validation_alias=AliasChoices("EMBEDDING_CACHE_MAX_MB"),
+    )
+    # REDIS_URL 設定時のみ有効な共有キャッシュ層の TTL（秒）
+    embedding_cache_redis_ttl_seconds: int = Field(
+        default=60 * 60 * 24 * 30,
+        validation_alias=AliasChoices("EMBEDDING_CACHE_REDIS_TTL_SECONDS"),
+    )
+    # 検索クエリ埋め込みのプロセス内 LRU 件数と Redis TTL（秒）。キーは (model, 正規化クエリ)。
+    query_embedding_cache_size: int = Field(
+        default=2048,
+        validation_alias=AliasChoices("QUERY_EMBEDDING_CACHE_SIZE"),
+    )
+    query_embedding_cache_redis_ttl_seconds: int = Field(
+        default=60 * 60 * 24 * 7,
+        validation_alias=AliasChoices("QUERY_EMBEDDING_CACHE_REDIS_TTL_SECONDS"),
+    )
+    # プロセス全体で同時に送信する埋め込み API リクエスト数（並行する取り込み間で共有）
+    embedding_max_concurrency: int = Field(
+        default=4,
+        validation_alias=AliasChoices("EMBEDDING_MAX_CONCURRENCY"),
+    )
+    # プロセス共有の埋め込み API レート制限（トークン推定値 / 分、リクエスト / 分）。0 で無効。
+    # 推定は日本語前提（2.5 token/文字）で多めに出るため、組織の実 TPM 上限をそのまま設定してよい。
+    embedding_tpm_limit: int = Field(
+        default=1_000_000,
+        validation_alias=AliasChoices("EMBEDDING_TPM_LIMIT"),
+    )
+    embedding_rpm_limit: int = Field(
+        default=3000,
+        validation_alias=AliasChoices("EMBEDDING_RPM_LIMIT"),
+    )
+
+    # クエリ拡張 / HyDE 結果キャッシュ（プロセス内 LRU + REDIS_URL 設定時は Redis 共有）
+    # TTL 経過後も STALE 秒間は古い結果を即返し、裏で LLM を再実行して更新する
+    rag_query_cache_max_entries: int = Field(
+        default=2000,
+        validation_alias=AliasChoices("RAG_QUERY_CACHE_MAX_ENTRIES"),
+    )
+    rag_query_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600,
+        validation_alias=AliasChoices("RAG_QUERY_CACHE_TTL_SECONDS"),
+    )
+    rag_query_cache_stale_seconds: int = Field(
+        default=7 * 24 * 3600,
+        validation_alias=AliasChoices("RAG_QUERY_CACHE_STALE_SECONDS"),
+    )
+
+    # RAG コンテキストキャッシュ miss 時の重複計算抑止（プロセス内は常に有効）
+    # 有効時は Redis の短期リースでワーカー間も 1 回だけ検索し、他は結果を待つ
+    rag_context_lock_enabled: bool = Field(
+        default=True,
+        validation_alias=AliasChoices("RAG_CONTEXT_LOCK_ENABLED"),
+    )
+    rag_context_lock_lease_seconds: int = Field(
+        default=30,
+        validation_alias=AliasChoices("RAG_CONTEXT_LOCK_LEASE_SECONDS"),
+    )
+    # 待機上限を超えたらリース保持者を待たずに自前で検索する
+    rag_context_lock_wait_seconds: float = Field(
+        default=20.0,
+        validation_alias=AliasChoices("RAG_CONTEXT_LOCK_WAIT_SECONDS"),
+    )
+
+    # 意味的キャッシュ（opt-in、REDIS_URL 必須）: ES 本文の完全一致で miss した時、
+    # 同じ企業・検索条件で埋め込みのコサイン類似度が閾値以上の過去クエリの結果を再利用
+    rag_semantic_cache_enabled: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("RAG_SEMANTIC_CACHE_ENABLED"),
+    )
+    rag_semantic_cache_threshold: float = Field(
+        default=0.97,
+        validation_alias=AliasChoices("RAG_SEMANTIC_CACHE_THRESHOLD"),
+    )
+    # 企業 × 検索条件ごとに保持する直近クエリ数
+    rag_semantic_cache_max_entries: int = Field(
+        default=64,
+        validation_alias=AliasChoices("RAG_SEMANTIC_CACHE_MAX_ENTRIES"),
+    )
+    # 検索レイテンシ予算（秒、0 で無効）: ES 添削 / 志望動機の検索に締切を渡し、
+    # 残り時間が段階ごとの p95 に満たない任意段階（拡張 / HyDE・BM25・リランク）を省略する
+    rag_retrieval_budget_seconds: float = Field(
+        default=0.0,
+        validation_alias=AliasChoices("RAG_RETRIEVAL_BUDGET_SECONDS"),
+    )
+    # p95 算出に必要な観測数。未満の段階は組み込みの既定値を使う
+    rag_retrieval_budget_min_samples: int = Field(
+        default=20,
+        validation_alias=AliasChoices("RAG_RETRIEVAL_BUDGET_MIN_SAMPLES"),
+    )
+    # 投機実行: 初回 semantic 検索と同時に拡張 / HyDE / BM25 を開始する（プロファイルの
+    # speculative フラグが真の場合のみ）。短絡時はキャンセルするため LLM コストと p95 のトレードオフ
+    rag_speculative_retrieval_enabled: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("RAG_SPECULATIVE_RETRIEVAL_ENABLED"),
+    )
+    # リクエスト単位の検索トレース（app/rag/trace.py）を OpenTelemetry span としても出力する。
+    # opentelemetry-api と tracer provider の設定が別途必要
+    rag_trace_otel_enabled: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("RAG_TRACE_OTEL_ENABLED"),
+    )
 
     # ===== RAG 検索チューニング設定 =====
     # ハイブリッド検索の重み（semantic + keyword = 1.0 を推奨）
@@ -385,6 +513,51 @@ class Settings(BaseSettings):
         default="",
         validation_alias=AliasChoices("RERANKER_TUNED_MODEL_PATH"),
     )
+    # 再ランク推論ワーカー: 複数リクエストのペアをこの時間窓で集めて 1 バッチで推論する
+    reranker_batch_window_ms: float = Field(
+        default=4.0,
+        validation_alias=AliasChoices("RERANKER_BATCH_WINDOW_MS"),
+    )
+    reranker_max_batch_pairs: int = Field(
+        default=128,
+        validation_alias=AliasChoices("RERANKER_MAX_BATCH_PAIRS"),
+    )
+    # 再ランク推論バックエンド: torch（既定）/ onnx（fp32）/ onnx-int8（動的量子化）
+    # ONNX は scripts/export_reranker_onnx.py の出力（RERANKER_ONNX_DIR/<model>、既定 data/reranker_onnx）を使い、無ければ torch にフォールバック
+    reranker_backend: str = Field(
+        default="torch",
+        validation_alias=AliasChoices("RERANKER_BACKEND"),
+    )
+    reranker_onnx_dir: str = Field(
+        default="",
+        validation_alias=AliasChoices("RERANKER_ONNX_DIR"),
+    )
+    reranker_onnx_threads: int = Field(
+        default=0,
+        validation_alias=AliasChoices("RERANKER_ONNX_THREADS"),
+    )
+    # 再ランクカスケード: 軽量モデルで全候補を採点し、上位 N 件のみ base モデルで再採点する
+    reranker_cascade_enabled: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("RERANKER_CASCADE_ENABLED"),
+    )
+    reranker_cascade_prefilter_model: str = Field(
+        default="hotchpotch/japanese-reranker-xsmall-v2",
+        validation_alias=AliasChoices("RERANKER_CASCADE_PREFILTER_MODEL"),
+    )
+    reranker_cascade_top_n: int = Field(
+        default=8,
+        validation_alias=AliasChoices("RERANKER_CASCADE_TOP_N"),
+    )
+    # 再ランクスコアのプロセス内 LRU 件数と Redis TTL（秒）。キーは (model, query hash, 本文 hash)。0 で LRU 無効
+    reranker_score_cache_size: int = Field(
+        default=8192,
+        validation_alias=AliasChoices("RERANKER_SCORE_CACHE_SIZE"),
+    )
+    reranker_score_cache_redis_ttl_seconds: int = Field(
+        default=60 * 60 * 24,
+        validation_alias=AliasChoices("RERANKER_SCORE_CACHE_REDIS_TTL_SECONDS"),
+    )
     # D-2 / P2-1: 志望動機ドラフトで RAG グラウンディングを有効化するフラグ
     # false にすると従来動作 (has_rag=False, grounding_mode="none") に戻る
     motivation_rag_grounding: bool = Field(
@@ -430,6 +603,75 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("CONTEXTUAL_RETRIEVAL_DUAL_WRITE"),
         description="P2-2: 通常collectionに加えてcontextual shadow collectionへdual-writeする。",
     )
+    # Chroma 呼び出し専用スレッドプールのワーカー数（イベントループを塞がないよう全 Chroma I/O をここで実行）
+    rag_chroma_io_workers: int = Field(
+        default=8,
+        validation_alias=AliasChoices("RAG_CHROMA_IO_WORKERS"),
+    )
+    # 段階型 ingest パイプラインのステージ間キュー長（chunk → classify → embed → store）
+    rag_ingest_queue_size: int = Field(
+        default=8,
+        validation_alias=AliasChoices("RAG_INGEST_QUEUE_SIZE"),
+    )
+    # 企業サイトクロールで同時に処理する URL 数の上限（ingest パイプラインの classify ワーカー数も兼ねる）
+    crawl_max_concurrency: int = Field(
+        default=4,
+        validation_alias=AliasChoices("CRAWL_MAX_CONCURRENCY"),
+    )
+    # ホスト単位のリクエスト間隔（req/s, トークンバケット）。0 以下で無制限
+    crawl_per_host_rps: float = Field(
+        default=1.0,
+        validation_alias=AliasChoices("CRAWL_PER_HOST_RPS"),
+    )
+    # ホスト単位で連続して投げてよいリクエスト数（バケット容量）
+    crawl_per_host_burst: int = Field(
+        default=1,
+        validation_alias=AliasChoices("CRAWL_PER_HOST_BURST"),
+    )
+    # バックグラウンド取込ジョブ（crawl / PDF）を処理するワーカー数（0 でこのプロセスでは処理しない）
+    ingest_job_workers: int = Field(
+        default=2,
+        validation_alias=AliasChoices("INGEST_JOB_WORKERS"),
+    )
+    # 取込ジョブの最大試行回数（再試行は ingest_session_id を固定して冪等に上書き）
+    ingest_job_max_attempts: int = Field(
+        default=3,
+        validation_alias=AliasChoices("INGEST_JOB_MAX_ATTEMPTS"),
+    )
+    # ジョブ状態・PDF 本体を Redis に保持する秒数
+    ingest_job_ttl_seconds: int = Field(
+        default=86400,
+        validation_alias=AliasChoices("INGEST_JOB_TTL_SECONDS"),
+    )
+    # 処理中ジョブのリース秒数。ワーカーが heartbeat で延長し、期限切れ（クラッシュ等）は再投入する
+    ingest_job_lease_seconds: int = Field(
+        default=120,
+        validation_alias=AliasChoices("INGEST_JOB_LEASE_SECONDS"),
+    )
+    # 企業単位のインメモリ埋め込み行列で exact 検索する（Chroma は system of record のまま）。
+    rag_vector_matrix_enabled: bool = Field(
+        default=False,
+        validation_alias=AliasChoices("RAG_VECTOR_MATRIX_ENABLED"),
+    )
+    # float32 / float16（float16 はメモリ半分、検索時に float32 へ展開）
+    rag_vector_matrix_dtype: str = Field(
+        default="float32",
+        validation_alias=AliasChoices("RAG_VECTOR_MATRIX_DTYPE"),
+    )
+    rag_vector_matrix_max_mb: int = Field(
+        default=256,
+        validation_alias=AliasChoices("RAG_VECTOR_MATRIX_MAX_MB"),
+    )
+    # これを超えるチャンク数の企業は Chroma の HNSW 検索にフォールバック
+    rag_vector_matrix_max_chunks: int = Field(
+        default=20000,
+        validation_alias=AliasChoices("RAG_VECTOR_MATRIX_MAX_CHUNKS"),
+    )
+    # 他ワーカーでの更新を拾うための最大保持秒数
+    rag_vector_matrix_ttl_seconds: int = Field(
+        default=300,
+        validation_alias=AliasChoices("RAG_VECTOR_MATRIX_TTL_SECONDS"),
+    )
     # MMRの多様性係数（0=多様性重視、1=関連性重視）
     rag_mmr_lambda: float = 0.5
     # 取得候補数（kの最小値、n_results*3と比較して大きい方を使用）
@@ -13,6 +13,10 @@ from app.security.payload_limits import JsonPayloadSizeLimitMiddleware
 from app.security.trusted_host import HealthcheckTrustedHostMiddleware
 from app.observability.sentry_setup import init_sentry
 from app.rag.metrics_exporter import start_metrics_exporter_once
+from app.services.company_info.ingest_jobs import (
+    start_ingest_job_workers,
+    stop_ingest_job_workers,
+)
 from app.utils.secure_logger import get_logger
 from app.utils.llm_usage_cost import (
     reset_request_llm_call_budget,
@@ -102,6 +106,12 @@ async def startup_event():
     logger.info(f"[Security] CORS allowed origins: {settings.cors_origins}")
     logger.info(f"[Security] Frontend URL: {settings.frontend_url}")
     logger.info("[Reranker] lazy load enabled")
+    start_ingest_job_workers()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_ingest_job_workers()
 
 
 # Include routers
@@ -3,14 +3,89 @@
 The vector store owns Chroma collections; this module owns rebuilding the
 keyword index from those collections so retrieval code does not import the
 vector-store facade directly.
+
+Two refresh modes are provided:
+
+- ``update_bm25_index`` rebuilds a company's index from every Chroma record
+  (used after whole-company writes and as a self-healing fallback).
+- ``refresh_bm25_sources`` / ``remove_bm25_sources`` apply a delta for the
+  given ``source_url`` values only, so re-ingesting one page costs about the
+  size of that page rather than the size of the corpus.
 """
 
 from __future__ import annotations
 
+import threading
+from typing import Iterable
+
 from app.utils.secure_logger import get_logger
 
 logger = get_logger(__name__)
 
+# Serialize writers per tenant/company; background refreshes run in threads.
+_company_locks: dict[tuple[str, str], threading.RLock] = {}
+_company_locks_guard = threading.Lock()
+
+
+def _company_lock(company_id: str, tenant_key: str) -> threading.RLock:
+    key = (tenant_key, company_id)
+    with _company_locks_guard:
+        lock = _company_locks.get(key)
+        if lock is None:
+            lock = threading.RLock()
+            _company_locks[key] = lock
+        return lock
+
+
+def _fetch_chroma_documents(company_id: str, tenant_key: str, *extra_where: dict) -> list[dict]:
+    """Read deduplicated BM25 input documents from every configured collection."""
+    from app.rag import vector_store
+
+    read_backends = vector_store.get_configured_backends()
+    documents: list[dict] = []
+    where = vector_store._company_where(company_id, tenant_key, *extra_where)
+
+    for backend in read_backends:
+        for name in vector_store._collection_names_for_backend(backend):
+            collection = vector_store._get_collection(name)
+            results = collection.get(
+                where=where,
+                include=["documents", "metadatas"],
+            )
+
+            docs = results.get("documents") or []
+            metas = results.get("metadatas") or []
+            ids = results.get("ids") or []
+
+            for doc, meta, doc_id in zip(docs, metas, ids):
+                if not doc:
+                    continue
+                documents.append({
+                    "id": doc_id,
+                    "text": doc,
+                    "metadata": meta or {},
+                })
+
+    deduped: dict[tuple, dict] = {}
+    for doc in documents:
+        key = vector_store._context_dedupe_key(
+            {"text": doc.get("text"), "metadata": doc.get("metadata")}
+        )
+        if key not in deduped:
+            deduped[key] = doc
+    return list(deduped.values())
+
+
+def _persist(index, company_id: str, tenant_key: str) -> None:
+    from app.utils.bm25_store import BM25Index, clear_index_cache, publish_index
+
+    if index.documents:
+        index.save()
+        publish_index(index)
+    else:
+        BM25Index.delete(company_id, tenant_key=tenant_key)
+        clear_index_cache(company_id, tenant_key=tenant_key)
+
 
 def update_bm25_index(company_id: str, tenant_key: str) -> bool:
     """Rebuild a company's BM25 index from ChromaDB data."""
@@ -19,65 +94,125 @@ def update_bm25_index(company_id: str, tenant_key: str) -> bool:
         from app.utils.bm25_store import (
             BM25Index,
             clear_index_cache,
-            get_or_create_index,
+            load_index_for_update,
+            publish_index,
         )
     except Exception as e:
         logger.warning("bm25s not configured, skipping BM25 update: %s", e)
         return False
 
     try:
-        from app.rag import vector_store
-
-        read_backends = vector_store.get_configured_backends()
-        documents: list[dict] = []
-        where = vector_store._company_where(company_id, tenant_key)
-
-        for backend in read_backends:
-            for name in vector_store._collection_names_for_backend(backend):
-                collection = vector_store._get_collection(name)
-                results = collection.get(
-                    where=where,
-                    include=["documents", "metadatas"],
-                )
-
-                docs = results.get("documents") or []
-                metas = results.get("metadatas") or []
-                ids = results.get("ids") or []
-
-                for doc, meta, doc_id in zip(docs, metas, ids):
-                    if not doc:
-                        continue
-                    documents.append({
-                        "id": doc_id,
-                        "text": doc,
-                        "metadata": meta or {},
-                    })
-
-        if not documents:
-            BM25Index.delete(company_id, tenant_key=tenant_key)
-            clear_index_cache(company_id, tenant_key=tenant_key)
-            logger.debug("BM25 index deleted for company_id: %s...", company_id[:8])
-            return False
-
-        deduped: dict[tuple, dict] = {}
-        for doc in documents:
-            key = vector_store._context_dedupe_key(
-                {"text": doc.get("text"), "metadata": doc.get("metadata")}
-            )
-            if key not in deduped:
-                deduped[key] = doc
+        with _company_lock(company_id, tenant_key):
+            documents = _fetch_chroma_documents(company_id, tenant_key)
 
-        index = get_or_create_index(company_id, tenant_key=tenant_key)
-        index.clear()
-        index.add_documents(list(deduped.values()))
-        index.save()
-        clear_index_cache(company_id, tenant_key=tenant_key)
+            if not documents:
+                BM25Index.delete(company_id, tenant_key=tenant_key)
+                clear_index_cache(company_id, tenant_key=tenant_key)
+                logger.debug("BM25 index deleted for company_id: %s...", company_id[:8])
+                return False
+
+            # Unchanged chunks keep their tokens from the previous index.
+            previous = load_index_for_update(company_id, tenant_key=tenant_key)
+            index = BM25Index(company_id, tenant_key=tenant_key)
+            index.add_documents(documents, token_cache=previous.tokens_by_text())
+            index.save()
+            publish_index(index)
         logger.info(
             "BM25 index updated for company_id: %s... (%d docs)",
             company_id[:8],
-            len(deduped),
+            len(index.documents),
         )
         return True
     except Exception as e:
         logger.error("update_bm25_index error: %s", e, exc_info=True)
         return False
+
+
+def refresh_bm25_sources(company_id: str, tenant_key: str, source_urls: Iterable[str]) -> bool:
+    """Re-read only ``source_urls`` from ChromaDB and patch them into the index."""
+
+    urls = [url for url in dict.fromkeys(source_urls) if url]
+    if not urls:
+        return False
+
+    try:
+        from app.utils.bm25_store import BM25Index, load_index_for_update
+    except Exception as e:
+        logger.warning("bm25s not configured, skipping BM25 update: %s", e)
+        return False
+
+    try:
+        with _company_lock(company_id, tenant_key):
+            if not BM25Index.exists(company_id, tenant_key=tenant_key):
+                # No baseline to patch (first ingest or lost file): rebuild.
+                return update_bm25_index(company_id, tenant_key)
+
+            index = load_index_for_update(company_id, tenant_key=tenant_key)
+            added = removed = 0
+            for url in urls:
+                docs = _fetch_chroma_documents(company_id, tenant_key, {"source_url": url})
+                url_added, url_removed = index.replace_source(url, docs)
+                added += url_added
+                removed += url_removed
+            _persist(index, company_id, tenant_key)
+        logger.info(
+            "BM25 index patched for company_id: %s... (+%d/-%d docs, %d sources)",
+            company_id[:8],
+            added,
+            removed,
+            len(urls),
+        )
+        return True
+    except Exception as e:
+        logger.error("refresh_bm25_sources error: %s", e, exc_info=True)
+        return False
+
+
+def remove_bm25_documents(
+    company_id: str,
+    tenant_key: str,
+    *,
+    metadata_field: str,
+    values: Iterable[str],
+) -> int:
+    """Drop documents whose ``metadata_field`` matches ``values`` without a Chroma read."""
+
+    value_list = [value for value in dict.fromkeys(values) if value]
+    if not value_list:
+        return 0
+
+    try:
+        from app.utils.bm25_store import BM25Index, load_index_for_update
+    except Exception as e:
+        logger.warning("bm25s not configured, skipping BM25 update: %s", e)
+        return 0
+
+    try:
+        with _company_lock(company_id, tenant_key):
+            if not BM25Index.exists(company_id, tenant_key=tenant_key):
+                return 0
+            index = load_index_for_update(company_id, tenant_key=tenant_key)
+            removed = index.remove_documents(metadata_field=metadata_field, values=value_list)
+            if removed:
+                _persist(index, company_id, tenant_key)
+        logger.info(
+            "BM25 documents removed for company_id: %s... (%d docs by %s)",
+            company_id[:8],
+            len(removed),
+            metadata_field,
+        )
+        return len(removed)
+    except Exception as e:
+        logger.error("remove_bm25_documents error: %s", e, exc_info=True)
+        return 0
+
+
+def remove_bm25_sources(company_id: str, tenant_key: str, source_urls: Iterable[str]) -> int:
+    """Drop every document of ``source_urls`` from the index."""
+
+    return remove_bm25_documents(
+        company_id,
+        tenant_key,
+        metadata_field="source_url",
+        values=source_urls,
+    )
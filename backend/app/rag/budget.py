@@ -0,0 +1,80 @@
+"""
+Latency budget for company RAG retrieval.
+
+Callers that stream to a user (ES review, motivation) pass a
+``RetrievalBudget`` down to ``dense_hybrid_search``. Before each optional
+stage (expansion / HyDE, multi-query search, BM25, rerank) the pipeline checks
+the remaining time against that stage's p95 from ``rag_retrieval_duration``
+and skips or cuts the stage short when it would not fit. The first-pass
+semantic search and fusion always run.
+
+Stages given up are recorded on the budget (and in
+``rag_retrieval_degraded_total``) so the response can report them; degraded
+results are not written to the context cache.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config import settings
+from app.rag.telemetry import rag_retrieval_degraded, stage_duration_quantile
+from app.rag.trace import record_decision
+
+# p95 fallbacks (seconds) until a stage has RAG_RETRIEVAL_BUDGET_MIN_SAMPLES observations.
+DEFAULT_STAGE_P95_SECONDS: dict[str, float] = {
+    "semantic": 0.4,
+    "expansion": 2.5,
+    "query_embedding": 0.4,
+    "bm25": 0.3,
+    "rerank": 0.8,
+}
+
+
+def stage_p95(stage: str) -> float:
+    """Historical p95 duration of ``stage``, or its built-in default."""
+    observed = stage_duration_quantile(
+        stage, 0.95, min_samples=settings.rag_retrieval_budget_min_samples
+    )
+    if observed is not None:
+        return observed
+    return DEFAULT_STAGE_P95_SECONDS.get(stage, 0.0)
+
+
+@dataclass
+class RetrievalBudget:
+    """Deadline (``time.monotonic()``) plus the stages degraded to meet it."""
+
+    deadline: float
+    degraded: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_timeout(cls, seconds: float) -> "RetrievalBudget":
+        return cls(deadline=time.monotonic() + max(0.0, seconds))
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def allows(self, *stages: str) -> bool:
+        """Whether the p95 of ``stages`` run back to back fits in the remaining time."""
+        return self.remaining() >= sum(stage_p95(stage) for stage in stages)
+
+    def timeout(self, *reserve: str) -> float:
+        """Seconds a stage may run while leaving the p95 of ``reserve`` stages."""
+        return max(0.0, self.remaining() - sum(stage_p95(stage) for stage in reserve))
+
+    def degrade(self, stage: str) -> None:
+        if stage not in self.degraded:
+            self.degraded.append(stage)
+            rag_retrieval_degraded.labels(stage=stage).inc()
+            record_decision(f"degraded:{stage}")
+
+
+def retrieval_budget_from_settings() -> Optional[RetrievalBudget]:
+    """Budget starting now from ``RAG_RETRIEVAL_BUDGET_SECONDS`` (None when disabled)."""
+    seconds = settings.rag_retrieval_budget_seconds
+    if seconds <= 0:
+        return None
+    return RetrievalBudget.from_timeout(seconds)
@@ -0,0 +1,136 @@
+"""
+Chroma I/O offload pool.
+
+ChromaDB's client API is blocking (SQLite + HNSW). Async code must not call it
+on the event loop, so every Chroma call from a coroutine goes through
+``run_chroma_io`` (or the ``aquery`` / ``aget`` / ``aadd`` / ``aupsert`` /
+``adelete`` wrappers), which run it on a dedicated bounded thread pool
+(``RAG_CHROMA_IO_WORKERS``). Independent calls, such as the
+base and contextual collection queries of one retrieval, can then be awaited
+together with ``asyncio.gather``.
+
+The pool is separate from the default executor so Chroma traffic cannot starve
+``asyncio.to_thread`` users and vice versa. Saturation is exported as
+``rag_chroma_pool_active`` / ``rag_chroma_pool_waiting`` and the queue wait as
+``rag_chroma_pool_wait_seconds``.
+
+Synchronous helpers that already run on a worker thread (BM25 refresh) keep
+calling Chroma directly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config import settings
+from app.rag.telemetry import (
+    rag_chroma_pool_active,
+    rag_chroma_pool_wait,
+    rag_chroma_pool_waiting,
+)
+
+T = TypeVar("T")
+
+
+class ChromaIOPool:
+    """Bounded thread pool that tracks queued and running Chroma calls."""
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, int(max_workers))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="chroma-io",
+        )
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting = 0
+
+    def _publish(self) -> None:
+        rag_chroma_pool_active.set(self._active)
+        rag_chroma_pool_waiting.set(self._waiting)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"workers": self.max_workers, "active": self._active, "waiting": self._waiting}
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` on the pool in a copy of the caller's context."""
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        submitted = time.perf_counter()
+        state = {"started": False, "abandoned": False}
+        with self._lock:
+            self._waiting += 1
+            self._publish()
+
+        def _invoke() -> Any:
+            with self._lock:
+                if state["abandoned"]:
+                    return None
+                state["started"] = True
+                self._waiting -= 1
+                self._active += 1
+                self._publish()
+            rag_chroma_pool_wait.observe(time.perf_counter() - submitted)
+            try:
+                return call()
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._publish()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _invoke)
+        except asyncio.CancelledError:
+            # The caller gave up: a call still queued is skipped when its worker picks it up.
+            with self._lock:
+                if not state["started"] and not state["abandoned"]:
+                    state["abandoned"] = True
+                    self._waiting -= 1
+                    self._publish()
+            raise
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[ChromaIOPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_chroma_io_pool() -> ChromaIOPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ChromaIOPool(settings.rag_chroma_io_workers)
+        return _pool
+
+
+async def run_chroma_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking Chroma call (or a sync helper making several) off the event loop."""
+    return await get_chroma_io_pool().run(func, *args, **kwargs)
+
+
+async def aquery(collection: Any, **kwargs: Any) -> dict:
+    return await run_chroma_io(collection.query, **kwargs)
+
+
+async def aget(collection: Any, **kwargs: Any) -> dict:
+    return await run_chroma_io(collection.get, **kwargs)
+
+
+async def aadd(collection: Any, **kwargs: Any) -> None:
+    await run_chroma_io(collection.add, **kwargs)
+
+
+async def aupsert(collection: Any, **kwargs: Any) -> None:
+    await run_chroma_io(collection.upsert, **kwargs)
+
+
+async def adelete(collection: Any, **kwargs: Any) -> None:
+    await run_chroma_io(collection.delete, **kwargs)
@@ -0,0 +1,192 @@
+"""NumPy-backed result fusion for hybrid search.
+
+Array implementations of the ranking steps in ``hybrid_search``: Reciprocal
+Rank Fusion, max-normalized weighted semantic/keyword fusion and Maximal
+Marginal Relevance. Each function returns the same result dicts (and the
+same ordering, including tie-breaks) as the original per-item loops.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+def _first_index(ids: list[str]) -> tuple[dict[str, int], np.ndarray]:
+    """Map ids to dense slots in first-seen order; returns (slots, slot per id)."""
+    slots: dict[str, int] = {}
+    positions = np.empty(len(ids), dtype=np.intp)
+    for i, doc_id in enumerate(ids):
+        positions[i] = slots.setdefault(doc_id, len(slots))
+    return slots, positions
+
+
+def normalize_max(scores: np.ndarray) -> np.ndarray:
+    """Divide by the maximum score; all zeros when the maximum is not positive."""
+    if scores.size == 0:
+        return scores.astype(np.float64)
+    max_score = float(scores.max())
+    if max_score <= 0:
+        return np.zeros_like(scores, dtype=np.float64)
+    return scores / max_score
+
+
+def rrf_fuse(results_by_query: list[list[dict]], k: int = 60) -> list[dict]:
+    """Reciprocal Rank Fusion; the first occurrence of an id supplies its dict."""
+    ids: list[str] = []
+    ranks: list[int] = []
+    first_items: dict[str, dict] = {}
+    for results in results_by_query:
+        for rank, item in enumerate(results):
+            doc_id = item.get("id")
+            if not doc_id:
+                continue
+            ids.append(doc_id)
+            ranks.append(rank)
+            first_items.setdefault(doc_id, item)
+    if not ids:
+        return []
+
+    slots, positions = _first_index(ids)
+    scores = np.zeros(len(slots), dtype=np.float64)
+    # Unbuffered add keeps the per-id summation order of the original loop.
+    np.add.at(scores, positions, 1.0 / (k + np.asarray(ranks, dtype=np.float64) + 1))
+
+    ordered_ids = list(slots)
+    merged: list[dict] = []
+    for slot in np.argsort(-scores, kind="stable"):
+        doc_id = ordered_ids[slot]
+        item = dict(first_items[doc_id])
+        item["rrf_score"] = float(scores[slot])
+        merged.append(item)
+    return merged
+
+
+def _semantic_score(item: dict) -> float:
+    score = item.get("rrf_score")
+    if score is None:
+        distance = item.get("distance")
+        if isinstance(distance, (int, float)):
+            score = 1 / (distance + 1e-6)
+        else:
+            score = 0.0
+    return float(score)
+
+
+def weighted_fuse(
+    semantic_results: list[dict],
+    keyword_results: list[dict],
+    semantic_weight: float,
+    keyword_weight: float,
+) -> list[dict]:
+    """Max-normalize semantic and BM25 scores and blend them with fixed weights."""
+    semantic_scores: dict[str, float] = {}
+    for item in semantic_results:
+        item_id = item.get("id")
+        if item_id:
+            semantic_scores[item_id] = _semantic_score(item)
+    keyword_scores: dict[str, float] = {}
+    for item in keyword_results:
+        item_id = item.get("id")
+        if item_id:
+            keyword_scores[item_id] = float(item.get("bm25_score", 0.0))
+
+    items: list[dict] = []
+    seen: set[str] = set()
+    for item in semantic_results + keyword_results:
+        item_id = item.get("id")
+        if not item_id or item_id in seen:
+            continue
+        seen.add(item_id)
+        items.append(item)
+    if not items:
+        return []
+
+    semantic_slots = {doc_id: i for i, doc_id in enumerate(semantic_scores)}
+    keyword_slots = {doc_id: i for i, doc_id in enumerate(keyword_scores)}
+    semantic_norm = np.append(
+        normalize_max(np.fromiter(semantic_scores.values(), dtype=np.float64, count=len(semantic_scores))),
+        0.0,
+    )
+    keyword_norm = np.append(
+        normalize_max(np.fromiter(keyword_scores.values(), dtype=np.float64, count=len(keyword_scores))),
+        0.0,
+    )
+    # Missing ids point at the trailing 0.0 slot.
+    semantic_idx = np.fromiter(
+        (semantic_slots.get(item["id"], -1) for item in items), dtype=np.intp, count=len(items)
+    )
+    keyword_idx = np.fromiter(
+        (keyword_slots.get(item["id"], -1) for item in items), dtype=np.intp, count=len(items)
+    )
+    item_semantic = semantic_norm[semantic_idx]
+    item_keyword = keyword_norm[keyword_idx]
+    hybrid = semantic_weight * item_semantic + keyword_weight * item_keyword
+
+    merged: list[dict] = []
+    for i in np.argsort(-hybrid, kind="stable"):
+        enriched = dict(items[i])
+        enriched["semantic_score"] = float(item_semantic[i])
+        enriched["keyword_score"] = float(item_keyword[i])
+        enriched["hybrid_score"] = float(hybrid[i])
+        merged.append(enriched)
+    return merged
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit = np.where(norms > 0, matrix / norms, 0.0)
+    return unit
+
+
+def mmr_select(
+    query_embedding: Sequence[float],
+    candidate_embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float,
+) -> list[int]:
+    """Indices picked by Maximal Marginal Relevance (cosine similarity).
+
+    Keeps a running max-similarity-to-selected vector, so each step costs one
+    matrix-vector product instead of a scan over every selected item.
+    """
+    n = len(candidate_embeddings)
+    if n == 0 or k <= 0:
+        return []
+    candidates = _unit_rows(np.asarray(candidate_embeddings, dtype=np.float64))
+    query = _unit_rows(np.asarray(query_embedding, dtype=np.float64)[None, :])[0]
+    relevance = lambda_mult * (candidates @ query)
+    redundancy_weight = 1 - lambda_mult
+
+    max_sim_to_selected: Optional[np.ndarray] = None
+    available = np.ones(n, dtype=bool)
+    selected: list[int] = []
+    while len(selected) < min(k, n):
+        if max_sim_to_selected is None:
+            scores = relevance.copy()
+        else:
+            scores = relevance - redundancy_weight * max_sim_to_selected
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        sims = candidates @ candidates[best]
+        max_sim_to_selected = (
+            sims if max_sim_to_selected is None else np.maximum(max_sim_to_selected, sims)
+        )
+    return selected
+
+
+def apply_mmr(
+    candidates: list[dict],
+    query_embedding: Sequence[float],
+    k: int,
+    lambda_mult: float,
+) -> list[dict]:
+    """Reorder ``candidates`` (each carrying an ``embedding``) by MMR."""
+    if not candidates or k <= 0:
+        return []
+    matrix = np.asarray([item["embedding"] for item in candidates], dtype=np.float64)
+    return [candidates[i] for i in mmr_select(query_embedding, matrix, k, lambda_mult)]
@@ -7,10 +7,9 @@ Uses multi-query + HyDE + RRF + MMR + optional cross-encoder rerank.
 
 import asyncio
 import hashlib
-import math
 import re
-import time
 from collections import Counter
+from functools import lru_cache
 from typing import Optional
 
 from app.config import settings
@@ -37,17 +36,28 @@ from app.utils.content_types import (
 from app.utils.embeddings import (
     EmbeddingBackend,
     generate_embedding,
+    generate_query_embeddings,
     resolve_embedding_backend,
 )
 from app.utils.bm25_store import get_or_create_index
 from app.utils.japanese_tokenizer import tokenize_with_domain_expansion
+from app.utils.tiered_cache import TieredCache
+from app.rag.budget import RetrievalBudget
+from app.rag.fusion import (
+    apply_mmr,
+    rrf_fuse,
+    weighted_fuse,
+)
 from app.rag.telemetry import (
     rag_expansion_cache_hits,
+    rag_expansion_cache_requests,
     rag_retrieval_requests,
     rag_rerank_invocations,
+    rag_speculative_tasks,
     record_stage_duration,
 )
 from app.rag.security import is_rag_chunk_quarantined, sanitize_rag_context
+from app.rag.trace import record_cache, record_candidates, record_decision, trace_span
 
 logger = get_logger(__name__)
 
@@ -157,6 +167,7 @@ def infer_retrieval_profile(query: str, base_fetch_k: int = DEFAULT_FETCH_K) ->
             "rerank_threshold": 0.65,
             "mmr_lambda": 0.42,
             "use_hyde": True,
+            "speculative": True,
         }
 
     # Fact/date style queries benefit from stronger keyword bias.
@@ -171,6 +182,7 @@ def infer_retrieval_profile(query: str, base_fetch_k: int = DEFAULT_FETCH_K) ->
             "rerank_threshold": 0.8,
             "mmr_lambda": 0.64,
             "use_hyde": False,
+            "speculative": False,
         }
 
     if has_culture_intent:
@@ -184,6 +196,7 @@ def infer_retrieval_profile(query: str, base_fetch_k: int = DEFAULT_FETCH_K) ->
             "rerank_threshold": 0.62,
             "mmr_lambda": 0.45,
             "use_hyde": True,
+            "speculative": True,
         }
 
     if has_business_intent:
@@ -197,6 +210,7 @@ def infer_retrieval_profile(query: str, base_fetch_k: int = DEFAULT_FETCH_K) ->
             "rerank_threshold": 0.68,
             "mmr_lambda": 0.5,
             "use_hyde": True,
+            "speculative": False,
         }
 
     if q_len <= 8:
@@ -210,6 +224,7 @@ def infer_retrieval_profile(query: str, base_fetch_k: int = DEFAULT_FETCH_K) ->
             "rerank_threshold": 0.75,
             "mmr_lambda": 0.58,
             "use_hyde": False,
+            "speculative": False,
         }
 
     return {
@@ -222,75 +237,49 @@ def infer_retrieval_profile(query: str, base_fetch_k: int = DEFAULT_FETCH_K) ->
         "rerank_threshold": settings.rag_rerank_threshold,
         "mmr_lambda": settings.rag_mmr_lambda,
         "use_hyde": True,
+        "speculative": False,
     }
 
-# ---- Query expansion in-memory cache ----
-# Maps query hash → (timestamp, expanded_queries)
-_expansion_cache: dict[str, tuple[float, list[str]]] = {}
-_EXPANSION_CACHE_TTL = 7 * 24 * 3600  # 7 days
-_EXPANSION_CACHE_MAX = 500  # Max entries before eviction
-
+# ---- Query expansion / HyDE caches ----
+# In-process LRU + Redis (when configured) with stale-while-revalidate, so a
+# hot query is answered from cache while the LLM refresh runs in background.
 
-def _expansion_cache_key(query: str) -> str:
-    return hashlib.sha256(query.strip().lower().encode()).hexdigest()[:16]
 
+def _query_cache_observer(cache_type: str):
+    def observe(tier: str, result: str) -> None:
+        rag_expansion_cache_requests.labels(
+            cache_type=cache_type, tier=tier, result=result
+        ).inc()
+        if result != "miss":
+            rag_expansion_cache_hits.labels(cache_type=cache_type).inc()
+        record_cache(cache_type, result != "miss")
 
-def _get_cached_expansion(query: str) -> Optional[list[str]]:
-    key = _expansion_cache_key(query)
-    entry = _expansion_cache.get(key)
-    if entry is None:
-        return None
-    ts, queries = entry
-    if time.time() - ts > _EXPANSION_CACHE_TTL:
-        _expansion_cache.pop(key, None)
-        return None
-    rag_expansion_cache_hits.labels(cache_type="expansion").inc()
-    return queries
-
-
-def _set_cached_expansion(query: str, queries: list[str]) -> None:
-    # Simple eviction: clear oldest half when full
-    if len(_expansion_cache) >= _EXPANSION_CACHE_MAX:
-        sorted_keys = sorted(
-            _expansion_cache, key=lambda k: _expansion_cache[k][0]
-        )
-        for k in sorted_keys[: _EXPANSION_CACHE_MAX // 2]:
-            _expansion_cache.pop(k, None)
-    key = _expansion_cache_key(query)
-    _expansion_cache[key] = (time.time(), queries)
+    return observe
 
 
-# ---- HyDE in-memory cache ----
-# Maps query hash → (timestamp, passage)
-_hyde_cache: dict[str, tuple[float, str]] = {}
-_HYDE_CACHE_TTL = 7 * 24 * 3600  # 7 days
-_HYDE_CACHE_MAX = 500
+def _build_query_cache(cache_type: str) -> TieredCache:
+    return TieredCache(
+        f"rag-{cache_type}",
+        max_entries=settings.rag_query_cache_max_entries,
+        ttl_seconds=settings.rag_query_cache_ttl_seconds,
+        stale_seconds=settings.rag_query_cache_stale_seconds,
+        redis_url=settings.redis_url,
+        on_lookup=_query_cache_observer(cache_type),
+    )
 
 
-def _hyde_cache_key(query: str) -> str:
-    return hashlib.sha256(query.strip().lower().encode()).hexdigest()[:16]
+@lru_cache()
+def get_expansion_cache() -> TieredCache:
+    return _build_query_cache("expansion")
 
 
-def _get_cached_hyde(query: str) -> Optional[str]:
-    key = _hyde_cache_key(query)
-    entry = _hyde_cache.get(key)
-    if entry is None:
-        return None
-    ts, passage = entry
-    if time.time() - ts > _HYDE_CACHE_TTL:
-        _hyde_cache.pop(key, None)
-        return None
-    rag_expansion_cache_hits.labels(cache_type="hyde").inc()
-    return passage
+@lru_cache()
+def get_hyde_cache() -> TieredCache:
+    return _build_query_cache("hyde")
 
 
-def _set_cached_hyde(query: str, passage: str) -> None:
-    if len(_hyde_cache) >= _HYDE_CACHE_MAX:
-        sorted_keys = sorted(_hyde_cache, key=lambda k: _hyde_cache[k][0])
-        for k in sorted_keys[: _HYDE_CACHE_MAX // 2]:
-            _hyde_cache.pop(k, None)
-    key = _hyde_cache_key(query)
-    _hyde_cache[key] = (time.time(), passage)
+def _query_cache_key(query: str) -> str:
+    return hashlib.sha256(query.strip().lower().encode()).hexdigest()[:16]
 
 
 def adaptive_rrf_k(num_queries: int, base_k: int = 30) -> int:
@@ -303,27 +292,7 @@ def adaptive_rrf_k(num_queries: int, base_k: int = 30) -> int:
 
 def rrf_merge_results(results_by_query: list[list[dict]], k: int = 60) -> list[dict]:
     """Merge multiple result lists using Reciprocal Rank Fusion."""
-    scores: dict[str, float] = {}
-    best_items: dict[str, dict] = {}
-
-    for results in results_by_query:
-        for rank, item in enumerate(results):
-            doc_id = item.get("id")
-            if not doc_id:
-                continue
-            rrf_score = 1 / (k + rank + 1)
-            scores[doc_id] = scores.get(doc_id, 0) + rrf_score
-            if doc_id not in best_items:
-                best_items[doc_id] = item
-
-    merged = []
-    for doc_id, score in scores.items():
-        item = dict(best_items[doc_id])
-        item["rrf_score"] = score
-        merged.append(item)
-
-    merged.sort(key=lambda x: x.get("rrf_score", 0), reverse=True)
-    return merged
+    return rrf_fuse(results_by_query, k=k)
 
 
 def _dedupe_queries(queries: list[str], max_total: int) -> list[str]:
@@ -431,6 +400,25 @@ def _select_weak_search_llm_rescue(
     return "expansion"
 
 
+def _claim_speculative(tasks: dict[str, asyncio.Task], stage: str) -> Optional[asyncio.Task]:
+    """Take over a speculative task whose result the pipeline will use."""
+    task = tasks.pop(stage, None)
+    if task is not None:
+        rag_speculative_tasks.labels(stage=stage, result="used").inc()
+        record_decision(f"speculative_used:{stage}")
+    return task
+
+
+def _discard_speculative(tasks: dict[str, asyncio.Task]) -> None:
+    """Cancel every unclaimed speculative task and count it as wasted."""
+    for stage, task in tasks.items():
+        if not task.cancel() and not task.cancelled():
+            task.exception()  # already finished; retrieve so a failure is not logged as unhandled
+        rag_speculative_tasks.labels(stage=stage, result="wasted").inc()
+        record_decision(f"speculative_wasted:{stage}")
+    tasks.clear()
+
+
 def _should_rerank(results: list[dict], threshold: float) -> bool:
     """Decide whether cross-encoder reranking is worthwhile.
 
@@ -486,13 +474,16 @@ async def _rerank_with_cross_encoder(
     query: str,
     results: list[dict],
     top_k: int = DEFAULT_RERANK_CANDIDATES,
+    cascade_top_n: Optional[int] = None,
 ) -> list[dict]:
     """Load the reranker only when reranking is actually needed."""
     from app.utils.reranker import rerank_with_cross_encoder
 
     rag_rerank_invocations.labels(model="default").inc()
     with record_stage_duration("rerank"):
-        return await rerank_with_cross_encoder(query, results, top_k=top_k)
+        return await rerank_with_cross_encoder(
+            query, results, top_k=top_k, cascade_top_n=cascade_top_n
+        )
 
 
 def _clean_excerpt_text(text: str) -> str:
@@ -534,15 +525,6 @@ def _build_source_excerpt(result: dict, max_len: int = 150) -> str:
     return _truncate_on_sentence_boundary(merged, max_len)
 
 
-def _normalize_scores(score_map: dict[str, float]) -> dict[str, float]:
-    if not score_map:
-        return {}
-    max_score = max(score_map.values()) or 0.0
-    if max_score <= 0:
-        return {k: 0.0 for k in score_map}
-    return {k: v / max_score for k, v in score_map.items()}
-
-
 def _extract_secondary_types(metadata: dict) -> list[str]:
     secondary = metadata.get("secondary_content_types") or []
     if isinstance(secondary, str):
@@ -655,7 +637,7 @@ def _keyword_search(
     tenant_key: str,
 ) -> list[dict]:
     index = get_or_create_index(company_id, tenant_key=tenant_key)
-    if not index.documents:
+    if index.doc_count == 0:
         try:
             from app.rag.bm25_refresh import update_bm25_index
 
@@ -663,10 +645,12 @@ def _keyword_search(
             index = get_or_create_index(company_id, tenant_key=tenant_key)
         except Exception:
             pass
-    if not index.documents:
+    if index.doc_count == 0:
         return []
-    results = index.search(query, k=k)
+    with trace_span("bm25_search"):
+        results = index.search(query, k=k)
     if not results:
+        record_candidates("bm25", 0)
         return []
 
     allowed_types: set[str] = set()
@@ -689,6 +673,7 @@ def _keyword_search(
                 "bm25_score": score,
             }
         )
+    record_candidates("bm25", len(output))
     return output
 
 
@@ -698,64 +683,13 @@ def _merge_semantic_and_keyword(
     semantic_weight: float,
     keyword_weight: float,
 ) -> list[dict]:
-    semantic_scores = {}
-    for item in semantic_results:
-        item_id = item.get("id")
-        if not item_id:
-            continue
-        score = item.get("rrf_score")
-        if score is None:
-            distance = item.get("distance")
-            if isinstance(distance, (int, float)):
-                score = 1 / (distance + 1e-6)
-            else:
-                score = 0.0
-        semantic_scores[item_id] = float(score)
-
-    keyword_scores = {}
-    for item in keyword_results:
-        item_id = item.get("id")
-        if not item_id:
-            continue
-        keyword_scores[item_id] = float(item.get("bm25_score", 0.0))
-
-    semantic_norm = _normalize_scores(semantic_scores)
-    keyword_norm = _normalize_scores(keyword_scores)
+    return weighted_fuse(
+        semantic_results,
+        keyword_results,
+        semantic_weight=semantic_weight,
+        keyword_weight=keyword_weight,
+    )
 
-    merged: list[dict] = []
-    seen: set[str] = set()
-    for item in semantic_results + keyword_results:
-        item_id = item.get("id")
-        if not item_id or item_id in seen:
-            continue
-        seen.add(item_id)
-        semantic_score = semantic_norm.get(item_id, 0.0)
-        keyword_score = keyword_norm.get(item_id, 0.0)
-        hybrid_score = semantic_weight * semantic_score + keyword_weight * keyword_score
-        enriched = dict(item)
-        enriched["semantic_score"] = semantic_score
-        enriched["keyword_score"] = keyword_score
-        enriched["hybrid_score"] = hybrid_score
-        merged.append(enriched)
-
-    merged.sort(key=lambda x: x.get("hybrid_score", 0), reverse=True)
-    return merged
-
-
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = 0.0
-    norm_a = 0.0
-    norm_b = 0.0
-    for x, y in zip(a, b):
-        dot += x * y
-        norm_a += x * x
-        norm_b += y * y
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (math.sqrt(norm_a) * math.sqrt(norm_b))
 
 
 def _embeddings_compatible(
@@ -783,34 +717,7 @@ def _apply_mmr(
         return []
     if not _embeddings_compatible(query_embedding, candidates):
         return candidates[:k]
-
-    selected: list[dict] = []
-    remaining = candidates.copy()
-
-    while remaining and len(selected) < k:
-        best_idx = None
-        best_score = -1e9
-        for idx, item in enumerate(remaining):
-            emb = item.get("embedding")
-            if not isinstance(emb, list):
-                continue
-            sim_to_query = _cosine_similarity(query_embedding, emb)
-            sim_to_selected = 0.0
-            if selected:
-                sim_to_selected = max(
-                    _cosine_similarity(emb, sel.get("embedding", []))
-                    for sel in selected
-                )
-            score = lambda_mult * sim_to_query - (1 - lambda_mult) * sim_to_selected
-            if score > best_score:
-                best_score = score
-                best_idx = idx
-
-        if best_idx is None:
-            break
-        selected.append(remaining.pop(best_idx))
-
-    return selected
+    return apply_mmr(candidates, query_embedding, k, lambda_mult)
 
 
 def _resolve_dense_backend(
@@ -827,11 +734,19 @@ async def expand_queries_with_llm(
     max_queries: int = DEFAULT_MAX_QUERIES,
     keywords: Optional[list[str]] = None,
 ) -> list[str]:
-    """Generate query variations to improve recall.  Uses in-memory cache."""
-    cached = _get_cached_expansion(query)
-    if cached is not None:
-        return cached[:max_queries]
+    """Generate query variations to improve recall.  Uses the tiered query cache."""
+    result = await get_expansion_cache().get_or_compute(
+        _query_cache_key(query),
+        lambda: _expand_queries_uncached(query, max_queries, keywords),
+    )
+    return (result or [])[:max_queries]
 
+
+async def _expand_queries_uncached(
+    query: str,
+    max_queries: int,
+    keywords: Optional[list[str]],
+) -> list[str]:
     outbound_query = prepare_outbound_text(
         query,
         purpose="query_expansion",
@@ -884,18 +799,19 @@ async def expand_queries_with_llm(
             q = q.strip()
             if q and q not in clean:
                 clean.append(q)
-    result = clean[:max_queries]
-    if result:
-        _set_cached_expansion(query, result)
-    return result
+    return clean[:max_queries]
 
 
 async def generate_hypothetical_document(query: str) -> str:
-    """Generate a hypothetical passage (HyDE) to improve recall.  Uses in-memory cache."""
-    cached = _get_cached_hyde(query)
-    if cached is not None:
-        return cached
+    """Generate a hypothetical passage (HyDE) to improve recall.  Uses the tiered query cache."""
+    passage = await get_hyde_cache().get_or_compute(
+        _query_cache_key(query),
+        lambda: _generate_hypothetical_document_uncached(query),
+    )
+    return passage or ""
+
 
+async def _generate_hypothetical_document_uncached(query: str) -> str:
     system_prompt = HYDE_SYSTEM_PROMPT
 
     outbound_query = prepare_outbound_text(
@@ -925,8 +841,6 @@ async def generate_hypothetical_document(query: str) -> str:
         passage = passage.strip()
         if len(passage) > 1200:
             passage = passage[:1200]
-        if passage:
-            _set_cached_hyde(query, passage)
         return passage
     return ""
 
@@ -957,6 +871,56 @@ async def semantic_search(
     )
 
 
+async def semantic_search_many(
+    company_id: str,
+    queries: list[str],
+    query_embeddings: list[Optional[list[float]]],
+    n_results: int = 10,
+    content_types: Optional[list[str]] = None,
+    backends: Optional[list[EmbeddingBackend]] = None,
+    include_embeddings: bool = False,
+    *,
+    tenant_key: str,
+) -> list[list[dict]]:
+    """Run semantic search for several queries.
+
+    Uses one matrix multiply over the in-memory company matrix when it is
+    enabled, otherwise one ``semantic_search`` per query.
+    """
+    from app.rag.vector_store import search_company_context_multi
+
+    if all(emb is not None for emb in query_embeddings):
+        batched = await search_company_context_multi(
+            company_id=company_id,
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            content_types=content_types,
+            backends=backends,
+            include_embeddings=include_embeddings,
+            tenant_key=tenant_key,
+        )
+        if batched is not None:
+            return batched
+
+    search_results = await asyncio.gather(
+        *(
+            semantic_search(
+                company_id=company_id,
+                query=q,
+                n_results=n_results,
+                content_types=content_types,
+                backends=backends,
+                include_embeddings=include_embeddings,
+                precomputed_query_embedding=q_embedding,
+                tenant_key=tenant_key,
+            )
+            for q, q_embedding in zip(queries, query_embeddings)
+        ),
+        return_exceptions=True,
+    )
+    return [r if isinstance(r, list) else [] for r in search_results]
+
+
 async def dense_hybrid_search(
     company_id: str,
     query: str,
@@ -980,6 +944,9 @@ async def dense_hybrid_search(
     short_circuit: bool = True,
     *,
     tenant_key: str,
+    rerank_cascade_top_n: Optional[int] = None,
+    budget: Optional[RetrievalBudget] = None,
+    speculative: Optional[bool] = None,
 ) -> list[dict]:
     """
     Dense-only hybrid search pipeline (BM25-free).
@@ -987,15 +954,26 @@ async def dense_hybrid_search(
     Steps:
     1) Multi-query expansion
     2) HyDE (optional)
-    3) Semantic search per query
+    3) Semantic search per query (variants embedded in one batched call)
     4) RRF merge
     5) MMR (optional)
-    6) Cross-encoder rerank (optional)
+    6) Cross-encoder rerank (optional; ``rerank_cascade_top_n`` overrides the
+       RERANKER_CASCADE_* prefilter cascade, 0 disables it)
+
+    With ``speculative`` (default: the inferred profile's flag, gated by
+    RAG_SPECULATIVE_RETRIEVAL_ENABLED), expansion / HyDE / BM25 start together
+    with the first-pass search; they are cancelled if it short-circuits and
+    reused otherwise.
+
+    With ``budget``, optional stages (expansion / HyDE, multi-query search,
+    BM25, rerank) are skipped or cut short when their p95 no longer fits
+    before the deadline; they are listed in ``budget.degraded``.
     """
     query = (query or "").strip()
     if not query:
         return []
     profile = "default"
+    speculative_tasks: dict[str, asyncio.Task] = {}
 
     try:
         semantic_weight = (
@@ -1024,12 +1002,53 @@ async def dense_hybrid_search(
 
         inferred = infer_retrieval_profile(query, base_fetch_k=fetch_k or DEFAULT_FETCH_K)
         profile = str(inferred.get("profile") or "default")
+        if speculative is None:
+            speculative = bool(inferred.get("speculative"))
+        speculative = speculative and settings.rag_speculative_retrieval_enabled
 
         base_backend = _resolve_dense_backend(backends)
         if base_backend is None:
             rag_retrieval_requests.labels(profile=profile, status="no_backend").inc()
             return []
         search_backends = [base_backend]
+
+        # クエリ拡張: 10文字以上1200文字以下の場合のみ実行
+        effective_expand = (
+            expand_queries
+            and max_queries > 0
+            and len(query) >= EXPANSION_MIN_QUERY_CHARS
+            and len(query) <= EXPANSION_MAX_QUERY_CHARS
+        )
+        effective_hyde = use_hyde and len(query) <= HYDE_MAX_QUERY_CHARS
+        keyword_seeds = _extract_keywords(query)
+        bm25_k = max(fetch_k or DEFAULT_FETCH_K, n_results * 3)
+        use_keyword_search = use_bm25 and keyword_weight > 0
+
+        if speculative:
+            # Both LLM strategies start now; the weak-search rescue keeps at most one.
+            if effective_expand and (
+                budget is None or budget.allows("expansion", "query_embedding", "semantic")
+            ):
+                speculative_tasks["expansion"] = asyncio.create_task(
+                    expand_queries_with_llm(query, max_queries=max_queries, keywords=keyword_seeds)
+                )
+            if effective_hyde and (
+                budget is None or budget.allows("expansion", "query_embedding", "semantic")
+            ):
+                speculative_tasks["hyde"] = asyncio.create_task(
+                    generate_hypothetical_document(query)
+                )
+            if use_keyword_search and (budget is None or budget.allows("bm25")):
+                speculative_tasks["bm25"] = asyncio.create_task(
+                    asyncio.to_thread(
+                        _keyword_search,
+                        company_id=company_id,
+                        query=query,
+                        k=bm25_k,
+                        content_types=content_types,
+                        tenant_key=tenant_key,
+                    )
+                )
         query_embedding = (
             await generate_embedding(query, backend=base_backend)
             if use_mmr else None
@@ -1049,7 +1068,10 @@ async def dense_hybrid_search(
                 tenant_key=tenant_key,
             )
 
+        record_candidates("first_pass", len(initial_results))
         if not initial_results:
+            _discard_speculative(speculative_tasks)
+            record_decision("empty_first_pass")
             rag_retrieval_requests.labels(profile=profile, status="empty").inc()
             return []
 
@@ -1064,6 +1086,8 @@ async def dense_hybrid_search(
             )
 
         if short_circuit and _should_short_circuit_search(initial_results, n_results):
+            _discard_speculative(speculative_tasks)
+            record_decision("short_circuit")
             if use_mmr:
                 if query_embedding:
                     with record_stage_duration("mmr"):
@@ -1077,14 +1101,6 @@ async def dense_hybrid_search(
             rag_retrieval_requests.labels(profile=profile, status="ok").inc()
             return initial_results[:n_results]
 
-        # クエリ拡張: 10文字以上1200文字以下の場合のみ実行
-        effective_expand = (
-            expand_queries
-            and max_queries > 0
-            and len(query) >= EXPANSION_MIN_QUERY_CHARS
-            and len(query) <= EXPANSION_MAX_QUERY_CHARS
-        )
-        effective_hyde = use_hyde and len(query) <= HYDE_MAX_QUERY_CHARS
         rescue_strategy = _select_weak_search_llm_rescue(
             query,
             initial_results,
@@ -1094,33 +1110,57 @@ async def dense_hybrid_search(
         )
         effective_expand = effective_expand and rescue_strategy == "expansion"
         effective_hyde = effective_hyde and rescue_strategy == "hyde"
+        record_decision(f"rescue:{rescue_strategy}")
         if settings.debug and rescue_strategy != "none":
             logger.info("[RAG] weak initial search rescue strategy=%s", rescue_strategy)
+        if (
+            (effective_expand or effective_hyde)
+            and budget is not None
+            and not budget.allows("expansion", "query_embedding", "semantic")
+        ):
+            budget.degrade("expansion")
+            effective_expand = effective_hyde = False
 
         queries = [query]
-        keyword_seeds = _extract_keywords(query)
 
         expand_coro = (
-            expand_queries_with_llm(query, max_queries=max_queries, keywords=keyword_seeds)
+            _claim_speculative(speculative_tasks, "expansion")
+            or expand_queries_with_llm(query, max_queries=max_queries, keywords=keyword_seeds)
             if effective_expand else None
         )
         hyde_coro = (
-            generate_hypothetical_document(query)
+            _claim_speculative(speculative_tasks, "hyde")
+            or generate_hypothetical_document(query)
             if effective_hyde else None
         )
+        bm25_task = _claim_speculative(speculative_tasks, "bm25")
+        _discard_speculative(speculative_tasks)
 
-        with record_stage_duration("expansion"):
+        async def run_expansion() -> tuple[list[str], Optional[str]]:
             if expand_coro and hyde_coro:
                 expanded, hyde_doc = await asyncio.gather(expand_coro, hyde_coro)
-            elif expand_coro:
-                expanded = await expand_coro
-                hyde_doc = None
-            elif hyde_coro:
-                expanded = []
-                hyde_doc = await hyde_coro
-            else:
-                expanded = []
-                hyde_doc = None
+                return expanded, hyde_doc
+            if expand_coro:
+                return await expand_coro, None
+            if hyde_coro:
+                return [], await hyde_coro
+            return [], None
+
+        with record_stage_duration("expansion"):
+            try:
+                expanded, hyde_doc = await asyncio.wait_for(
+                    run_expansion(),
+                    timeout=(
+                        budget.timeout("query_embedding", "semantic")
+                        if budget is not None
+                        else None
+                    ),
+                )
+            except asyncio.TimeoutError:
+                if budget is None:
+                    raise
+                budget.degrade("expansion")
+                expanded, hyde_doc = [], None
 
         # Trim expanded if HyDE is enabled (reserve slot)
         if effective_hyde and len(expanded) > 2:
@@ -1132,47 +1172,52 @@ async def dense_hybrid_search(
             queries.append(hyde_doc)
 
         queries = _dedupe_queries(queries, max_total_queries)
+        record_candidates("query_variants", len(queries))
 
         fetch_k = max(fetch_k or DEFAULT_FETCH_K, n_results * 3)
-        bm25_k = max(fetch_k or DEFAULT_FETCH_K, n_results * 3)
 
         # Start BM25 search in parallel with the enhanced semantic search only when needed.
-        bm25_task = None
-        if use_bm25 and keyword_weight > 0:
-            bm25_task = asyncio.create_task(
-                asyncio.to_thread(
-                    _keyword_search,
-                    company_id=company_id,
-                    query=query,
-                    k=bm25_k,
-                    content_types=content_types,
-                    tenant_key=tenant_key,
+        if bm25_task is None and use_keyword_search:
+            if budget is not None and not budget.allows("bm25"):
+                budget.degrade("bm25")
+            else:
+                bm25_task = asyncio.create_task(
+                    asyncio.to_thread(
+                        _keyword_search,
+                        company_id=company_id,
+                        query=query,
+                        k=bm25_k,
+                        content_types=content_types,
+                        tenant_key=tenant_key,
+                    )
                 )
-            )
 
         results_by_query: list[list[dict]] = []
         if initial_results:
             results_by_query.append(initial_results)
 
         extra_queries = queries[1:]
+        if extra_queries and budget is not None and not budget.allows("query_embedding", "semantic"):
+            budget.degrade("multi_query")
+            extra_queries = []
         if extra_queries:
-            search_tasks = [
-                semantic_search(
+            # One batched embeddings call for every expansion / HyDE variant.
+            with record_stage_duration("query_embedding"):
+                extra_embeddings = await generate_query_embeddings(
+                    extra_queries, backend=base_backend
+                )
+            with record_stage_duration("semantic"):
+                search_results = await semantic_search_many(
                     company_id=company_id,
-                    query=q,
+                    queries=extra_queries,
+                    query_embeddings=extra_embeddings,
                     n_results=fetch_k,
                     content_types=content_types,
                     backends=search_backends,
                     include_embeddings=use_mmr,
                     tenant_key=tenant_key,
                 )
-                for q in extra_queries
-            ]
-            with record_stage_duration("semantic"):
-                search_results = await asyncio.gather(*search_tasks, return_exceptions=True)
-            results_by_query.extend(
-                r for r in search_results if isinstance(r, list) and r
-            )
+            results_by_query.extend(r for r in search_results if r)
 
         if not results_by_query:
             if bm25_task:
@@ -1183,6 +1228,7 @@ async def dense_hybrid_search(
         rrf_k = adaptive_rrf_k(len(results_by_query))
         with record_stage_duration("fusion"):
             merged = rrf_merge_results(results_by_query, k=rrf_k)
+        record_candidates("fused", len(merged))
 
         if use_mmr:
             if query_embedding:
@@ -1196,9 +1242,15 @@ async def dense_hybrid_search(
         if bm25_task:
             try:
                 with record_stage_duration("bm25"):
-                    keyword_results = await bm25_task
+                    keyword_results = await asyncio.wait_for(
+                        bm25_task,
+                        timeout=budget.timeout() if budget is not None else None,
+                    )
             except Exception as e:
-                logger.warning(f"[RAG/BM25] BM25検索エラー: {e}")
+                if budget is not None and isinstance(e, asyncio.TimeoutError):
+                    budget.degrade("bm25")
+                else:
+                    logger.warning(f"[RAG/BM25] BM25検索エラー: {e}")
                 keyword_results = None
             if keyword_results:
                 merged = _merge_semantic_and_keyword(
@@ -1219,10 +1271,18 @@ async def dense_hybrid_search(
             )
 
         if rerank and _should_rerank(merged, rerank_threshold):
-            merged = await _rerank_with_cross_encoder(
-                query, merged, top_k=DEFAULT_RERANK_CANDIDATES
-            )
+            if budget is not None and not budget.allows("rerank"):
+                budget.degrade("rerank")
+            else:
+                record_decision("rerank")
+                merged = await _rerank_with_cross_encoder(
+                    query,
+                    merged,
+                    top_k=DEFAULT_RERANK_CANDIDATES,
+                    cascade_top_n=rerank_cascade_top_n,
+                )
         elif rerank:
+            record_decision("rerank_skipped")
             if settings.debug:
                 logger.info("[RAG再ランキング] 上位スコアが高いためスキップ")
 
@@ -1231,6 +1291,8 @@ async def dense_hybrid_search(
     except Exception:
         rag_retrieval_requests.labels(profile=profile, status="error").inc()
         raise
+    finally:
+        _discard_speculative(speculative_tasks)
 
 
 async def hybrid_search(
@@ -0,0 +1,408 @@
+"""
+Staged streaming ingest for company RAG.
+
+``store_full_text_content`` used to run every step for one document before the
+next document could start. ``CompanyIngestPipeline`` splits the work into
+stages joined by bounded ``asyncio.Queue``s (``RAG_INGEST_QUEUE_SIZE``):
+
+    chunk → classify → embed → store
+
+Callers fetch and extract documents themselves (the crawl does so under
+``CrawlScheduler``) and ``submit`` them, so fetching the next page overlaps
+with embedding the previous one. The classify stage (which may call an LLM)
+runs ``CRAWL_MAX_CONCURRENCY`` workers so one slow document does not hold up
+the rest; the others run one worker each. The embed stage drains whatever documents
+are already queued and embeds them together, filling batches across documents
+up to ``OPENAI_BATCH_TOKEN_LIMIT``. The BM25 refresh, matrix and cache
+invalidation run once when the pipeline closes, for every stored source URL.
+
+A pipeline opened with ``async with`` becomes the active pipeline for its
+company in the current context; ``store_full_text_content`` joins it when
+present and otherwise opens a one-document pipeline. With ``session_seed``
+(the ingest job id) every source gets a stable ``ingest_session_id``, so a
+retried job replaces its own partial writes instead of adding a second copy.
+With ``contextual_only`` (honoured only while ``CONTEXTUAL_RETRIEVAL_ENABLED``
+makes search read the contextual collection) sources skip the base collection
+and are embedded once, as contextual text only.
+``run_staged`` is the generic 1:1 variant used by the reference-ES import.
+
+Per-stage timings and item counts go to ``rag_ingest_stage_duration_seconds``
+and ``rag_ingest_stage_items_total``; the crawl also records ``fetch`` and
+``extract``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Sequence
+
+from app.config import settings
+from app.rag import vector_store
+from app.rag.telemetry import record_ingest_stage
+from app.utils.embeddings import (
+    ESTIMATED_TOKENS_PER_CHAR_JP,
+    OPENAI_BATCH_TOKEN_LIMIT,
+    EmbeddingBackend,
+)
+from app.utils.secure_logger import get_logger
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+_active_pipeline_var: contextvars.ContextVar[Optional["CompanyIngestPipeline"]] = contextvars.ContextVar(
+    "company_ingest_pipeline",
+    default=None,
+)
+
+
+@dataclass
+class IngestDocument:
+    """One source URL to store, with validated source metadata."""
+
+    company_id: str
+    company_name: str
+    raw_text: str
+    source_url: str
+    tenant_key: str
+    backend: EmbeddingBackend
+    raw_format: str = "text"
+    content_type: Optional[str] = None
+    content_channel: Optional[str] = None
+    source_metadata: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _Item:
+    document: IngestDocument
+    future: asyncio.Future
+    chunks: list[dict] = field(default_factory=list)
+    dominant_content_type: Optional[str] = None
+    secondary_content_types: list[str] = field(default_factory=list)
+    records: Any = None
+    embeddings: Optional[list] = None
+    contextual_embeddings: Optional[list] = None
+
+    def finish(self, success: bool) -> None:
+        if self.future.done():
+            return
+        self.future.set_result(
+            {
+                "success": success,
+                "dominant_content_type": self.dominant_content_type if success else None,
+                "secondary_content_types": self.secondary_content_types if success else [],
+            }
+        )
+
+    def estimated_tokens(self) -> int:
+        records = self.records
+        documents = [] if records.contextual_only else list(records.documents)
+        if records.contextual_only or settings.contextual_retrieval_dual_write:
+            documents.extend(records.contextual_documents)
+        max_len = settings.embedding_max_input_chars
+        return sum(
+            int(min(len(doc), max_len) * ESTIMATED_TOKENS_PER_CHAR_JP)
+            for doc in documents
+        )
+
+
+def get_active_ingest_pipeline(company_id: str, tenant_key: str) -> Optional["CompanyIngestPipeline"]:
+    pipeline = _active_pipeline_var.get()
+    if pipeline is None or pipeline.closed:
+        return None
+    if pipeline.company_id != company_id or pipeline.tenant_key != tenant_key:
+        return None
+    return pipeline
+
+
+class CompanyIngestPipeline:
+    """Stream documents of one company through chunk / classify / embed / store."""
+
+    def __init__(
+        self,
+        *,
+        company_id: str,
+        tenant_key: str,
+        queue_size: Optional[int] = None,
+        token_limit: int = OPENAI_BATCH_TOKEN_LIMIT,
+        session_seed: Optional[str] = None,
+        contextual_only: bool = False,
+        classify_workers: Optional[int] = None,
+    ):
+        self.company_id = company_id
+        self.session_seed = session_seed
+        if contextual_only and not settings.contextual_retrieval_enabled:
+            logger.warning("contextual_only ignored: contextual retrieval is not enabled")
+        self.contextual_only = contextual_only and settings.contextual_retrieval_enabled
+        self.tenant_key = tenant_key
+        self.token_limit = token_limit
+        self.classify_workers = max(
+            1, settings.crawl_max_concurrency if classify_workers is None else classify_workers
+        )
+        size = max(1, settings.rag_ingest_queue_size if queue_size is None else queue_size)
+        self._chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._classify_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._embed_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._store_queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._tasks: list[asyncio.Task] = []
+        self._token: Optional[contextvars.Token] = None
+        self.stored_source_urls: list[str] = []
+        self.embed_batches: list[int] = []
+        self.closed = False
+
+    async def __aenter__(self) -> "CompanyIngestPipeline":
+        self._tasks = [
+            asyncio.create_task(self._run_stage("chunk", self._chunk_queue, self._classify_queue, self._chunk)),
+            asyncio.create_task(self._run_classify()),
+            asyncio.create_task(self._run_embed()),
+            asyncio.create_task(self._run_stage("store", self._store_queue, None, self._store)),
+        ]
+        self._token = _active_pipeline_var.set(self)
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        self.closed = True
+        if self._token is not None:
+            _active_pipeline_var.reset(self._token)
+            self._token = None
+        try:
+            await self._chunk_queue.put(_DONE)
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            for task in self._tasks:
+                if not task.done():
+                    task.cancel()
+        await self._finalize()
+
+    async def submit(self, document: IngestDocument) -> dict:
+        """Queue ``document`` (waits while the chunk queue is full) and return its store result."""
+        if self.closed:
+            raise RuntimeError("ingest pipeline is closed")
+        item = _Item(document=document, future=asyncio.get_running_loop().create_future())
+        await self._chunk_queue.put(item)
+        return await item.future
+
+    async def _run_stage(
+        self,
+        stage: str,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        handler: Callable[[_Item], Awaitable[bool]],
+        *,
+        forward_done: bool = True,
+    ) -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                if not forward_done:
+                    # Hand the sentinel on to the sibling workers of this stage.
+                    await inbox.put(_DONE)
+                elif outbox is not None:
+                    await outbox.put(_DONE)
+                return
+            try:
+                with record_ingest_stage(stage):
+                    keep_going = await handler(item)
+            except Exception as e:
+                logger.error("ingest %s stage error: %s", stage, e, exc_info=True)
+                keep_going = False
+            if not keep_going:
+                item.finish(False)
+            elif outbox is not None:
+                await outbox.put(item)
+
+    async def _run_classify(self) -> None:
+        """Run the classify workers; ``_DONE`` goes downstream once all of them exit."""
+        await asyncio.gather(
+            *(
+                self._run_stage(
+                    "classify",
+                    self._classify_queue,
+                    self._embed_queue,
+                    self._classify,
+                    forward_done=False,
+                )
+                for _ in range(self.classify_workers)
+            )
+        )
+        await self._embed_queue.put(_DONE)
+
+    async def _chunk(self, item: _Item) -> bool:
+        document = item.document
+        effective_type = document.content_type or document.content_channel or "corporate_site"
+        chunks = await asyncio.to_thread(
+            vector_store._chunk_full_text,
+            document.raw_text,
+            raw_format=document.raw_format,
+            effective_type=effective_type,
+        )
+        if not chunks:
+            logger.warning("No chunks generated (company_id: %s...)", document.company_id[:8])
+            return False
+
+        # Add content_type and timestamp to each chunk's metadata
+        now = datetime.utcnow().isoformat()
+        for chunk in chunks:
+            if "metadata" not in chunk or chunk["metadata"] is None:
+                chunk["metadata"] = {}
+            chunk["metadata"]["source_url"] = document.source_url
+            chunk["metadata"]["content_type"] = document.content_type
+            chunk["metadata"]["fetched_at"] = now
+            chunk["metadata"].update(document.source_metadata)
+        item.chunks = chunks
+        return True
+
+    async def _classify(self, item: _Item) -> bool:
+        document = item.document
+        # Classify chunks (rule + LLM fallback)
+        classified = await vector_store.classify_chunks(
+            item.chunks,
+            source_channel=document.content_channel,
+            fallback_type=document.content_type,
+        )
+        item.dominant_content_type, item.secondary_content_types = (
+            vector_store._annotate_classified_chunks(classified, document.content_type)
+        )
+        item.records = vector_store._prepare_source_records(
+            document.company_id,
+            document.company_name,
+            classified,
+            document.source_url,
+            document.backend,
+            document.tenant_key,
+            ingest_session_id=(
+                vector_store.make_replayable_ingest_session_id(self.session_seed, document.source_url)
+                if self.session_seed
+                else None
+            ),
+            contextual_only=self.contextual_only,
+        )
+        return item.records is not None
+
+    async def _run_embed(self) -> None:
+        finished = False
+        while not finished:
+            first = await self._embed_queue.get()
+            if first is _DONE:
+                break
+            batch = [first]
+            tokens = first.estimated_tokens()
+            # Fill the batch with documents that are already waiting (across documents).
+            while tokens < self.token_limit and not self._embed_queue.empty():
+                item = self._embed_queue.get_nowait()
+                if item is _DONE:
+                    finished = True
+                    break
+                if batch[0].document.backend != item.document.backend:
+                    await self._embed_batch([item])
+                    continue
+                batch.append(item)
+                tokens += item.estimated_tokens()
+            await self._embed_batch(batch)
+        await self._store_queue.put(_DONE)
+
+    async def _embed_batch(self, batch: list[_Item]) -> None:
+        chunk_count = sum(len(item.records.documents) for item in batch)
+        try:
+            with record_ingest_stage("embed", chunk_count):
+                results = await vector_store._embed_source_records(
+                    [item.records for item in batch],
+                    batch[0].document.backend,
+                )
+        except Exception as e:
+            logger.error("ingest embed stage error: %s", e, exc_info=True)
+            for item in batch:
+                item.finish(False)
+            return
+        self.embed_batches.append(len(batch))
+        for item, (embeddings, contextual_embeddings) in zip(batch, results):
+            item.embeddings = embeddings
+            item.contextual_embeddings = contextual_embeddings
+            await self._store_queue.put(item)
+
+    async def _store(self, item: _Item) -> bool:
+        document = item.document
+        success = await vector_store._write_source_records(
+            item.records,
+            item.embeddings,
+            item.contextual_embeddings,
+            company_id=document.company_id,
+            backend=document.backend,
+            tenant_key=document.tenant_key,
+        )
+        if success:
+            self.stored_source_urls.append(document.source_url)
+            item.finish(True)
+        return success
+
+    async def _finalize(self) -> None:
+        if not self.stored_source_urls:
+            return
+        source_urls = list(dict.fromkeys(self.stored_source_urls))
+        vector_store.schedule_bm25_update(self.company_id, tenant_key=self.tenant_key, source_urls=source_urls)
+        vector_store.invalidate_company_matrix(self.company_id, self.tenant_key)
+        cache = vector_store.get_rag_cache()
+        if cache:
+            await cache.invalidate_company(self.company_id, tenant_key=self.tenant_key)
+
+
+async def run_staged(
+    items: Sequence[Any],
+    stages: Sequence[tuple[str, Callable[[Any], Awaitable[Any]]]],
+    *,
+    queue_size: Optional[int] = None,
+    count: Callable[[Any], int] = lambda _item: 1,
+) -> list[Any]:
+    """
+    Push ``items`` through 1:1 async ``stages`` with a bounded queue between each.
+
+    Stage ``n`` of item ``i + 1`` overlaps with stage ``n + 1`` of item ``i``.
+    ``count`` gives the metric item count of an input (e.g. records per group).
+    Returns the final outputs in input order; the first stage error is raised
+    after the pipeline has drained.
+    """
+    size = max(1, settings.rag_ingest_queue_size if queue_size is None else queue_size)
+    queues = [asyncio.Queue(maxsize=size) for _ in stages]
+    results: list[Any] = [None] * len(items)
+    errors: list[BaseException] = []
+
+    async def feed() -> None:
+        for index, item in enumerate(items):
+            await queues[0].put((index, item))
+        await queues[0].put(_DONE)
+
+    sizes = [count(item) for item in items]
+
+    async def worker(position: int, stage: str, handler: Callable[[Any], Awaitable[Any]]) -> None:
+        inbox = queues[position]
+        outbox = queues[position + 1] if position + 1 < len(queues) else None
+        while True:
+            entry = await inbox.get()
+            if entry is _DONE:
+                if outbox is not None:
+                    await outbox.put(_DONE)
+                return
+            index, value = entry
+            if errors:
+                continue
+            try:
+                with record_ingest_stage(stage, sizes[index]):
+                    value = await handler(value)
+            except Exception as e:
+                errors.append(e)
+                continue
+            if outbox is None:
+                results[index] = value
+            else:
+                await outbox.put((index, value))
+
+    await asyncio.gather(
+        feed(),
+        *(worker(position, stage, handler) for position, (stage, handler) in enumerate(stages)),
+    )
+    if errors:
+        raise errors[0]
+    return results
@@ -3,11 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional
 
+from app.rag.chroma_io import aupsert, run_chroma_io
+from app.rag.ingest_pipeline import run_staged
 from app.rag.ids import collection_name_for_backend, make_source_hash
 from app.utils.embeddings import EmbeddingBackend, generate_embeddings_batch, resolve_embedding_backend
 from app.rag.vector_store import _get_collection
 
 REFERENCE_ES_COLLECTION_PREFIX = "reference_es"
+REFERENCE_ES_INGEST_GROUP_SIZE = 64
 
 
 @dataclass(frozen=True)
@@ -46,12 +49,12 @@ async def ingest_reference_es(
     *,
     backend: Optional[EmbeddingBackend] = None,
 ) -> int:
+    """Embed and upsert reference ES records in groups (embed of group n+1 overlaps upsert of n)."""
     backend = backend or resolve_embedding_backend()
     if backend is None or not records:
         return 0
-    texts = [record.text for record in records]
-    embeddings = await generate_embeddings_batch(texts, backend=backend)
-    collection = _get_collection(
+    collection = await run_chroma_io(
+        _get_collection,
         reference_collection_name(backend),
         metadata={
             "description": "Anonymized internal reference ES examples",
@@ -59,34 +62,52 @@ async def ingest_reference_es(
             "embedding_model": backend.model,
         },
     )
-    ids: list[str] = []
-    docs: list[str] = []
-    vectors: list[list[float]] = []
-    metadatas: list[dict] = []
-    for record, embedding in zip(records, embeddings):
-        if embedding is None:
-            continue
-        source_hash = make_source_hash(f"{record.source_version}:{record.es_id}:{record.text}")
-        ids.append(f"reference_es_{record.es_id}_{source_hash}")
-        docs.append(record.text)
-        vectors.append(embedding)
-        metadatas.append(
-            {
-                "question_type": record.question_type,
-                "industry": record.industry or "",
-                "es_id": record.es_id,
-                "chunk_index": 0,
-                "char_max": record.char_max or 0,
-                "source_hash": source_hash,
-                "anonymized": True,
-                "anonymization_level": record.anonymization_level,
-                "source_provenance": record.source_provenance,
-                "usage_consent": record.usage_consent,
-                "ingest_session_id": record.ingest_session_id,
-                "source_version": record.source_version,
-            }
-        )
-    if not ids:
-        return 0
-    collection.upsert(ids=ids, documents=docs, embeddings=vectors, metadatas=metadatas)
-    return len(ids)
+
+    async def embed_group(group: list[ReferenceEsRecord]) -> tuple[list[ReferenceEsRecord], list]:
+        embeddings = await generate_embeddings_batch([record.text for record in group], backend=backend)
+        return group, embeddings
+
+    async def upsert_group(embedded: tuple[list[ReferenceEsRecord], list]) -> int:
+        group, embeddings = embedded
+        ids: list[str] = []
+        docs: list[str] = []
+        vectors: list[list[float]] = []
+        metadatas: list[dict] = []
+        for record, embedding in zip(group, embeddings):
+            if embedding is None:
+                continue
+            source_hash = make_source_hash(f"{record.source_version}:{record.es_id}:{record.text}")
+            ids.append(f"reference_es_{record.es_id}_{source_hash}")
+            docs.append(record.text)
+            vectors.append(embedding)
+            metadatas.append(
+                {
+                    "question_type": record.question_type,
+                    "industry": record.industry or "",
+                    "es_id": record.es_id,
+                    "chunk_index": 0,
+                    "char_max": record.char_max or 0,
+                    "source_hash": source_hash,
+                    "anonymized": True,
+                    "anonymization_level": record.anonymization_level,
+                    "source_provenance": record.source_provenance,
+                    "usage_consent": record.usage_consent,
+                    "ingest_session_id": record.ingest_session_id,
+                    "source_version": record.source_version,
+                }
+            )
+        if not ids:
+            return 0
+        await aupsert(collection, ids=ids, documents=docs, embeddings=vectors, metadatas=metadatas)
+        return len(ids)
+
+    groups = [
+        records[start : start + REFERENCE_ES_INGEST_GROUP_SIZE]
+        for start in range(0, len(records), REFERENCE_ES_INGEST_GROUP_SIZE)
+    ]
+    inserted = await run_staged(
+        groups,
+        [("embed", embed_group), ("store", upsert_group)],
+        count=len,
+    )
+    return sum(inserted)
@@ -5,11 +5,20 @@ already import retrieval helpers from there. New hybrid retrieval behavior
 belongs here so storage concerns do not keep accumulating in the Chroma facade.
 """
 
-from typing import Optional
+import copy
+from typing import Any, Awaitable, Callable, Optional
 
 from app.config import settings
-from app.utils.embeddings import EmbeddingBackend
+from app.rag.budget import RetrievalBudget
+from app.rag.semantic_cache import get_semantic_context_index
+from app.rag.telemetry import rag_semantic_cache_requests
+from app.rag.trace import record_cache
+from app.utils.embeddings import EmbeddingBackend, generate_embedding
 from app.utils.cache import build_cache_key, get_rag_cache
+from app.utils.single_flight import SingleFlight, redis_single_flight
+
+# Concurrent misses for the same context cache key run retrieval only once.
+_context_flight: SingleFlight[dict] = SingleFlight("rag_context")
 
 
 async def hybrid_search_company_context(
@@ -54,6 +63,7 @@ async def hybrid_search_company_context_enhanced(
     short_circuit: bool = True,
     *,
     tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
 ) -> list[dict]:
     """Run enhanced dense/hybrid retrieval with expansion, MMR, and reranking."""
     from app.rag.hybrid_search import (
@@ -105,6 +115,135 @@ async def hybrid_search_company_context_enhanced(
         use_bm25=effective_bm25,
         short_circuit=short_circuit,
         tenant_key=tenant_key,
+        budget=budget,
+        speculative=profile.get("speculative"),
+    )
+
+
+async def _get_or_build_context(
+    company_id: str,
+    cache_key: str,
+    *,
+    tenant_key: str,
+    is_valid: Callable[[Any], bool],
+    build: Callable[[], Awaitable[dict]],
+    semantic_query: str = "",
+    semantic_scope: str = "",
+    budget: Optional[RetrievalBudget] = None,
+) -> dict:
+    """
+    Cached context payload, building it at most once per key on a miss.
+
+    In-process callers are coalesced by ``_context_flight``; with Redis enabled
+    a short lease extends this across workers (others wait for the cache).
+    With ``RAG_SEMANTIC_CACHE_ENABLED`` an exact miss falls back to the context
+    of the most similar prior ``semantic_query`` in ``semantic_scope``.
+    Payloads built with stages degraded by ``budget`` are returned but not
+    cached.
+    """
+    cache = get_rag_cache()
+
+    async def read_cached(key: str = cache_key) -> Optional[dict]:
+        if not cache:
+            return None
+        cached = await cache.get_context(company_id, key, tenant_key=tenant_key)
+        return cached if is_valid(cached) else None
+
+    cached = await read_cached()
+    if cache:
+        record_cache("context", cached is not None)
+    if cached is not None:
+        return cached
+
+    semantic_index = (
+        get_semantic_context_index()
+        if settings.rag_semantic_cache_enabled and semantic_query and semantic_scope
+        else None
+    )
+    query_embedding: Optional[list[float]] = None
+    if semantic_index is not None:
+        query_embedding = await generate_embedding(semantic_query)
+        if query_embedding is not None:
+            similar_key = await semantic_index.lookup(
+                company_id, semantic_scope, query_embedding, tenant_key=tenant_key
+            )
+            if similar_key:
+                cached = await read_cached(similar_key)
+                rag_semantic_cache_requests.labels(
+                    result="hit" if cached is not None else "expired"
+                ).inc()
+                record_cache("semantic_context", cached is not None)
+                if cached is not None:
+                    return cached
+
+    async def compute() -> dict:
+        payload = await build()
+        if cache and not (budget is not None and budget.degraded):
+            await cache.set_context(company_id, cache_key, payload, tenant_key=tenant_key)
+            if semantic_index is not None and query_embedding is not None:
+                await semantic_index.remember(
+                    company_id,
+                    semantic_scope,
+                    cache_key,
+                    query_embedding,
+                    tenant_key=tenant_key,
+                )
+        return payload
+
+    async def coalesced() -> dict:
+        if cache and cache.enabled() and settings.rag_context_lock_enabled:
+            return await redis_single_flight(
+                cache,
+                cache.context_lock_key(company_id, cache_key, tenant_key),
+                compute,
+                read_cached=read_cached,
+                name="rag_context",
+                lease_seconds=settings.rag_context_lock_lease_seconds,
+                wait_seconds=settings.rag_context_lock_wait_seconds,
+            )
+        return await compute()
+
+    payload = await _context_flight.do(cache_key, coalesced)
+    # Followers share the leader's payload; hand each caller its own copy.
+    return copy.deepcopy(payload)
+
+
+def _semantic_scope(
+    prefix: str, max_context_length: int, search_options: Optional[dict]
+) -> str:
+    """Everything in the exact cache key except the query text."""
+    from app.rag import vector_store as store
+
+    return build_cache_key(
+        prefix, str(max_context_length), store._search_options_signature(search_options)
+    )
+
+
+async def _search_review_context(
+    company_id: str,
+    es_content: str,
+    search_options: Optional[dict],
+    *,
+    tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
+) -> list[dict]:
+    from app.rag import vector_store as store
+
+    options = search_options or {}
+    return await store.hybrid_search_company_context_enhanced(
+        company_id=company_id,
+        query=es_content,
+        n_results=15,
+        content_types=None,
+        expand_queries=options.get("expand_queries", settings.rag_use_query_expansion),
+        rerank=options.get("rerank", settings.rag_use_rerank),
+        use_bm25=options.get("use_bm25"),
+        profile_overrides=options.get("profile_overrides"),
+        content_type_boosts=options.get("content_type_boosts"),
+        priority_source_urls=options.get("priority_source_urls"),
+        short_circuit=options.get("short_circuit", True),
+        tenant_key=tenant_key,
+        budget=budget,
     )
 
 
@@ -115,6 +254,7 @@ async def get_enhanced_context_for_review(
     search_options: Optional[dict] = None,
     *,
     tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
 ) -> str:
     """Get enhanced formatted context for ES review."""
     from app.rag import vector_store as store
@@ -123,7 +263,6 @@ async def get_enhanced_context_for_review(
     if max_context_length is None:
         max_context_length = store.get_dynamic_context_length(es_content)
 
-    cache = get_rag_cache()
     cache_key = build_cache_key(
         "enhanced_context",
         company_id,
@@ -132,53 +271,35 @@ async def get_enhanced_context_for_review(
         str(max_context_length),
         store._search_options_signature(search_options),
     )
-    if cache:
-        cached = await cache.get_context(company_id, cache_key, tenant_key=tenant_key)
-        if isinstance(cached, dict) and isinstance(cached.get("context"), str):
-            return cached["context"]
-
-    results = await store.hybrid_search_company_context_enhanced(
-        company_id=company_id,
-        query=es_content,
-        n_results=15,
-        content_types=None,
-        expand_queries=(search_options or {}).get(
-            "expand_queries", settings.rag_use_query_expansion
-        ),
-        rerank=(search_options or {}).get("rerank", settings.rag_use_rerank),
-        use_bm25=(search_options or {}).get("use_bm25"),
-        profile_overrides=(search_options or {}).get("profile_overrides"),
-        content_type_boosts=(search_options or {}).get("content_type_boosts"),
-        priority_source_urls=(search_options or {}).get("priority_source_urls"),
-        short_circuit=(search_options or {}).get("short_circuit", True),
-        tenant_key=tenant_key,
-    )
 
-    if not results:
-        context = await store.get_company_context_for_review(
-            company_id=company_id,
-            es_content=es_content,
-            max_context_length=max_context_length,
-            tenant_key=tenant_key,
+    async def build() -> dict:
+        results = await _search_review_context(
+            company_id, es_content, search_options, tenant_key=tenant_key, budget=budget
         )
-        if cache:
-            await cache.set_context(
-                company_id,
-                cache_key,
-                {"context": context},
+        if not results:
+            context = await store.get_company_context_for_review(
+                company_id=company_id,
+                es_content=es_content,
+                max_context_length=max_context_length,
                 tenant_key=tenant_key,
             )
-        return context
+            return {"context": context}
+        return {"context": get_context_for_review_hybrid(results, max_context_length)}
 
-    context = get_context_for_review_hybrid(results, max_context_length)
-    if cache:
-        await cache.set_context(
-            company_id,
-            cache_key,
-            {"context": context},
-            tenant_key=tenant_key,
-        )
-    return context
+    payload = await _get_or_build_context(
+        company_id,
+        cache_key,
+        tenant_key=tenant_key,
+        is_valid=lambda cached: isinstance(cached, dict)
+        and isinstance(cached.get("context"), str),
+        build=build,
+        semantic_query=es_content,
+        semantic_scope=_semantic_scope(
+            "enhanced_context", max_context_length, search_options
+        ),
+        budget=budget,
+    )
+    return payload["context"]
 
 
 async def get_enhanced_context_for_review_with_sources(
@@ -188,6 +309,7 @@ async def get_enhanced_context_for_review_with_sources(
     search_options: Optional[dict] = None,
     *,
     tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
 ) -> tuple[str, list[dict]]:
     """Get enhanced formatted context and source metadata for ES review."""
     from app.rag import vector_store as store
@@ -196,7 +318,6 @@ async def get_enhanced_context_for_review_with_sources(
     if max_context_length is None:
         max_context_length = store.get_dynamic_context_length(es_content)
 
-    cache = get_rag_cache()
     cache_key = build_cache_key(
         "enhanced_context_sources",
         company_id,
@@ -205,56 +326,36 @@ async def get_enhanced_context_for_review_with_sources(
         str(max_context_length),
         store._search_options_signature(search_options),
     )
-    if cache:
-        cached = await cache.get_context(company_id, cache_key, tenant_key=tenant_key)
-        if (
-            isinstance(cached, dict)
-            and isinstance(cached.get("context"), str)
-            and isinstance(cached.get("sources"), list)
-        ):
-            return cached["context"], cached["sources"]
-
-    results = await store.hybrid_search_company_context_enhanced(
-        company_id=company_id,
-        query=es_content,
-        n_results=15,
-        content_types=None,
-        expand_queries=(search_options or {}).get(
-            "expand_queries", settings.rag_use_query_expansion
-        ),
-        rerank=(search_options or {}).get("rerank", settings.rag_use_rerank),
-        use_bm25=(search_options or {}).get("use_bm25"),
-        profile_overrides=(search_options or {}).get("profile_overrides"),
-        content_type_boosts=(search_options or {}).get("content_type_boosts"),
-        priority_source_urls=(search_options or {}).get("priority_source_urls"),
-        short_circuit=(search_options or {}).get("short_circuit", True),
-        tenant_key=tenant_key,
-    )
 
-    if not results:
-        context = await store.get_company_context_for_review(
-            company_id=company_id,
-            es_content=es_content,
-            max_context_length=max_context_length,
-            tenant_key=tenant_key,
+    async def build() -> dict:
+        results = await _search_review_context(
+            company_id, es_content, search_options, tenant_key=tenant_key, budget=budget
         )
-        if cache:
-            await cache.set_context(
-                company_id,
-                cache_key,
-                {"context": context, "sources": []},
+        if not results:
+            context = await store.get_company_context_for_review(
+                company_id=company_id,
+                es_content=es_content,
+                max_context_length=max_context_length,
                 tenant_key=tenant_key,
             )
-        return context, []
+            return {"context": context, "sources": []}
+        context, sources = get_context_and_sources_for_review_hybrid(
+            results, max_context_length
+        )
+        return {"context": context, "sources": sources}
 
-    context, sources = get_context_and_sources_for_review_hybrid(
-        results, max_context_length
+    payload = await _get_or_build_context(
+        company_id,
+        cache_key,
+        tenant_key=tenant_key,
+        is_valid=lambda cached: isinstance(cached, dict)
+        and isinstance(cached.get("context"), str)
+        and isinstance(cached.get("sources"), list),
+        build=build,
+        semantic_query=es_content,
+        semantic_scope=_semantic_scope(
+            "enhanced_context_sources", max_context_length, search_options
+        ),
+        budget=budget,
     )
-    if cache:
-        await cache.set_context(
-            company_id,
-            cache_key,
-            {"context": context, "sources": sources},
-            tenant_key=tenant_key,
-        )
-    return context, sources
+    return payload["context"], payload["sources"]
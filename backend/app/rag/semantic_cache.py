@@ -0,0 +1,145 @@
+"""
+Semantic (near-duplicate) lookup for the RAG context cache.
+
+The exact context cache is keyed by the full ES text, so a one-character edit
+misses it. This index remembers the query embedding of each cached context
+per tenant/company/search scope and, on an exact miss, returns the cache key
+of the most similar prior query when cosine similarity reaches the threshold.
+
+The index lives in Redis next to the context entries under the same company
+generation, so ``RAGCache.invalidate_company`` drops it together with the
+contexts.
+Updates are read-modify-write and may lose an entry under concurrent writers;
+that only costs a future semantic hit, never correctness.
+"""
+
+from __future__ import annotations
+
+import base64
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from app.config import settings
+from app.rag.telemetry import rag_semantic_cache_requests, rag_semantic_cache_similarity
+from app.utils.cache import RAGCache, get_rag_cache
+
+
+def _encode(vector: np.ndarray) -> str:
+    return base64.b64encode(vector.astype(np.float32).tobytes()).decode("ascii")
+
+
+def _decode(payload: str) -> Optional[np.ndarray]:
+    try:
+        return np.frombuffer(base64.b64decode(payload), dtype=np.float32)
+    except (ValueError, TypeError):
+        return None
+
+
+def _normalize(embedding: list[float]) -> Optional[np.ndarray]:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(vector))
+    if vector.ndim != 1 or norm == 0.0:
+        return None
+    return vector / norm
+
+
+class SemanticContextIndex:
+    """
+    Per-scope index of (context cache key, unit query embedding).
+
+    Args:
+        cache: RAG context cache providing the Redis connection
+        threshold: Minimum cosine similarity for a semantic hit
+        max_entries: Most recent queries kept per scope
+        ttl: Index TTL in seconds (matches the context TTL)
+    """
+
+    def __init__(
+        self,
+        cache: RAGCache,
+        *,
+        threshold: float,
+        max_entries: int,
+        ttl: int = 43200,
+    ):
+        self._cache = cache
+        self.threshold = threshold
+        self._max_entries = max(1, max_entries)
+        self._ttl = ttl
+
+    async def _entries(self, company_id: str, scope: str, tenant_key: str) -> list[dict]:
+        entries = await self._cache.get_semantic_index(company_id, scope, tenant_key)
+        return entries if isinstance(entries, list) else []
+
+    async def lookup(
+        self,
+        company_id: str,
+        scope: str,
+        embedding: list[float],
+        *,
+        tenant_key: str,
+    ) -> Optional[str]:
+        """Cache key of the closest prior query at or above the threshold."""
+        query = _normalize(embedding)
+        if query is None:
+            return None
+        keys: list[str] = []
+        vectors: list[np.ndarray] = []
+        for entry in await self._entries(company_id, scope, tenant_key):
+            if not isinstance(entry, dict) or not isinstance(entry.get("e"), str):
+                continue
+            vector = _decode(entry["e"])
+            if vector is not None and vector.shape == query.shape:
+                keys.append(str(entry.get("k") or ""))
+                vectors.append(vector)
+        if not vectors:
+            rag_semantic_cache_requests.labels(result="empty").inc()
+            return None
+
+        similarities = np.stack(vectors) @ query
+        best = int(np.argmax(similarities))
+        rag_semantic_cache_similarity.observe(float(similarities[best]))
+        if similarities[best] < self.threshold:
+            rag_semantic_cache_requests.labels(result="below_threshold").inc()
+            return None
+        return keys[best]
+
+    async def remember(
+        self,
+        company_id: str,
+        scope: str,
+        cache_key: str,
+        embedding: list[float],
+        *,
+        tenant_key: str,
+    ) -> None:
+        vector = _normalize(embedding)
+        if vector is None:
+            return
+        entries = [
+            entry
+            for entry in await self._entries(company_id, scope, tenant_key)
+            if isinstance(entry, dict) and entry.get("k") != cache_key
+        ]
+        entries.insert(0, {"k": cache_key, "e": _encode(vector)})
+        await self._cache.set_semantic_index(
+            company_id,
+            scope,
+            entries[: self._max_entries],
+            tenant_key=tenant_key,
+            ttl=self._ttl,
+        )
+
+
+@lru_cache()
+def get_semantic_context_index() -> Optional[SemanticContextIndex]:
+    cache = get_rag_cache()
+    if cache is None:
+        return None
+    return SemanticContextIndex(
+        cache,
+        threshold=settings.rag_semantic_cache_threshold,
+        max_entries=settings.rag_semantic_cache_max_entries,
+    )
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import math
 import time
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Iterator, Optional
+
+from app.rag.trace import trace_span
 
 try:
     from prometheus_client import Counter as _counter_factory
+    from prometheus_client import Gauge as _gauge_factory
     from prometheus_client import Histogram as _histogram_factory
 except Exception:  # pragma: no cover - exporter dependency may be absent before install
     class _NoopMetric:
@@ -21,12 +25,18 @@ except Exception:  # pragma: no cover - exporter dependency may be absent before
         def observe(self, *_args: object, **_kwargs: object) -> None:
             return None
 
+        def set(self, *_args: object, **_kwargs: object) -> None:
+            return None
+
     def _counter_factory(*_args: object, **_kwargs: object) -> _NoopMetric:
         return _NoopMetric()
 
     def _histogram_factory(*_args: object, **_kwargs: object) -> _NoopMetric:
         return _NoopMetric()
 
+    def _gauge_factory(*_args: object, **_kwargs: object) -> _NoopMetric:
+        return _NoopMetric()
+
 rag_retrieval_requests = _counter_factory(
     "rag_retrieval_requests_total",
     "RAG retrieval requests",
@@ -37,11 +47,66 @@ rag_retrieval_duration = _histogram_factory(
     "RAG retrieval stage duration",
     ["stage"],
 )
+rag_retrieval_degraded = _counter_factory(
+    "rag_retrieval_degraded_total",
+    "Optional retrieval stages skipped or cut short by the latency budget",
+    ["stage"],
+)
+rag_speculative_tasks = _counter_factory(
+    "rag_speculative_tasks_total",
+    "Speculative expansion / HyDE / BM25 tasks started with the first-pass search",
+    ["stage", "result"],
+)
 rag_expansion_cache_hits = _counter_factory(
     "rag_expansion_cache_hits_total",
     "RAG expansion cache hits",
     ["cache_type"],
 )
+rag_expansion_cache_requests = _counter_factory(
+    "rag_expansion_cache_requests_total",
+    "Query expansion / HyDE cache lookups by tier and result",
+    ["cache_type", "tier", "result"],
+)
+rag_singleflight_requests = _counter_factory(
+    "rag_singleflight_requests_total",
+    "Single-flight coalescing outcomes for concurrent cache misses",
+    ["name", "scope", "role"],
+)
+rag_semantic_cache_requests = _counter_factory(
+    "rag_semantic_cache_requests_total",
+    "Semantic (near-duplicate) RAG context cache lookups",
+    ["result"],
+)
+rag_semantic_cache_similarity = _histogram_factory(
+    "rag_semantic_cache_similarity",
+    "Best cosine similarity between a query and the semantic cache index",
+    buckets=(0.5, 0.8, 0.9, 0.93, 0.95, 0.96, 0.97, 0.98, 0.99, 0.995, 1.0),
+)
+rag_embedding_cache_requests = _counter_factory(
+    "rag_embedding_cache_requests_total",
+    "Embedding cache lookups by tier and result",
+    ["tier", "result", "variant"],
+)
+rag_embedding_api_requests = _counter_factory(
+    "rag_embedding_api_requests_total",
+    "Document embedding API requests by outcome (ok / split / retry / failed)",
+    ["result"],
+)
+rag_embedding_rate_limit_wait = _histogram_factory(
+    "rag_embedding_rate_limit_wait_seconds",
+    "Time embedding requests waited for the process-wide TPM/RPM limiter",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+rag_rerank_cache_requests = _counter_factory(
+    "rag_rerank_cache_requests_total",
+    "Reranker score cache lookups by tier and result",
+    ["tier", "result", "model"],
+)
+rag_rerank_cascade_pairs = _counter_factory(
+    "rag_rerank_cascade_pairs_total",
+    "Pairs scored by each reranker cascade stage",
+    ["stage"],
+)
 rag_rerank_invocations = _counter_factory(
     "rag_rerank_invocations_total",
     "RAG reranker invocations",
@@ -52,6 +117,40 @@ rag_rerank_duration = _histogram_factory(
     "RAG reranker duration",
     ["model"],
 )
+rag_rerank_queue_depth = _gauge_factory(
+    "rag_rerank_queue_depth",
+    "Rerank requests waiting for the inference worker",
+)
+rag_chroma_pool_active = _gauge_factory(
+    "rag_chroma_pool_active",
+    "Chroma calls running on the Chroma I/O pool",
+)
+rag_chroma_pool_waiting = _gauge_factory(
+    "rag_chroma_pool_waiting",
+    "Chroma calls queued for a free Chroma I/O pool worker",
+)
+rag_chroma_pool_wait = _histogram_factory(
+    "rag_chroma_pool_wait_seconds",
+    "Time Chroma calls spent queued before a pool worker picked them up",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+rag_ingest_stage_duration = _histogram_factory(
+    "rag_ingest_stage_duration_seconds",
+    "Time spent per item in each staged ingest pipeline stage",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+rag_ingest_stage_items = _counter_factory(
+    "rag_ingest_stage_items_total",
+    "Items (documents, or chunks for embed) completed by each ingest pipeline stage",
+    ["stage"],
+)
+rag_rerank_batch_size = _histogram_factory(
+    "rag_rerank_batch_size",
+    "Query-passage pairs per reranker inference batch",
+    ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
 rag_bm25_resync = _counter_factory(
     "rag_bm25_resync_total",
     "RAG BM25 resyncs",
@@ -78,6 +177,57 @@ rag_tenant_key_filter_miss = _counter_factory(
 def record_stage_duration(stage: str) -> Iterator[None]:
     started = time.perf_counter()
     try:
-        yield
+        with trace_span(stage):
+            yield
     finally:
         rag_retrieval_duration.labels(stage=stage).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def record_ingest_stage(stage: str, items: int = 1) -> Iterator[None]:
+    """Time one unit of ingest ``stage`` work; throughput is ``rate(rag_ingest_stage_items_total)``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        rag_ingest_stage_duration.labels(stage=stage).observe(time.perf_counter() - started)
+        rag_ingest_stage_items.labels(stage=stage).inc(items)
+
+
+def stage_duration_quantile(
+    stage: str, quantile: float = 0.95, *, min_samples: int = 1
+) -> Optional[float]:
+    """
+    Quantile of ``rag_retrieval_duration`` for ``stage`` in this process.
+
+    Interpolates linearly inside the histogram bucket holding the quantile.
+    Returns None without the exporter or with fewer than ``min_samples``
+    observations.
+    """
+    collect = getattr(rag_retrieval_duration, "collect", None)
+    if collect is None:
+        return None
+    buckets: list[tuple[float, float]] = []
+    for family in collect():
+        for sample in family.samples:
+            if sample.name.endswith("_bucket") and sample.labels.get("stage") == stage:
+                buckets.append((float(sample.labels["le"]), float(sample.value)))
+    if not buckets:
+        return None
+    buckets.sort()
+    total = buckets[-1][1]
+    if total < max(1, min_samples):
+        return None
+
+    target = quantile * total
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= target:
+            if math.isinf(upper_bound):
+                return lower_bound
+            if count == lower_count:
+                return upper_bound
+            fraction = (target - lower_count) / (count - lower_count)
+            return lower_bound + (upper_bound - lower_bound) * fraction
+        lower_bound, lower_count = upper_bound, count
+    return lower_bound
@@ -0,0 +1,153 @@
+"""
+Per-request retrieval trace for company RAG.
+
+``record_stage_duration`` only feeds aggregate histograms. A request that opts
+in with ``start_retrieval_trace()`` (ES review does) additionally collects, in
+a context variable next to the LLM cost summary, its own stage timings,
+candidate counts, cache hits and pipeline decisions from ``dense_hybrid_search``,
+``search_company_context_by_type`` and ``_keyword_search``. The summary is
+returned by ``consume_retrieval_trace()`` and attached to ``internal_telemetry``.
+
+With ``RAG_TRACE_OTEL_ENABLED`` and ``opentelemetry-api`` installed, every traced
+span is also emitted as an OpenTelemetry span (``rag.<name>``) on the globally
+configured tracer provider.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+
+from app.config import settings
+
+try:
+    from opentelemetry import trace as _otel_trace
+except Exception:  # pragma: no cover - optional dependency
+    _otel_trace = None
+
+MAX_DECISIONS = 50
+
+_retrieval_trace_var: contextvars.ContextVar[Optional["RetrievalTrace"]] = contextvars.ContextVar(
+    "retrieval_trace",
+    default=None,
+)
+
+
+@dataclass
+class RetrievalTrace:
+    """Mutable per-request accumulator (shared by tasks and threads copied from the request)."""
+
+    spans: dict[str, dict[str, float]] = field(default_factory=dict)
+    candidates: dict[str, int] = field(default_factory=dict)
+    cache: dict[str, dict[str, int]] = field(default_factory=dict)
+    decisions: list[str] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_span(self, name: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            span = self.spans.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            span["count"] += 1
+            span["total_ms"] += ms
+            span["max_ms"] = max(span["max_ms"], ms)
+
+    def add_candidates(self, name: str, count: int) -> None:
+        with self._lock:
+            self.candidates[name] = self.candidates.get(name, 0) + int(count)
+
+    def add_cache(self, name: str, hit: bool) -> None:
+        with self._lock:
+            entry = self.cache.setdefault(name, {"hit": 0, "miss": 0})
+            entry["hit" if hit else "miss"] += 1
+
+    def add_decision(self, decision: str) -> None:
+        with self._lock:
+            if len(self.decisions) < MAX_DECISIONS:
+                self.decisions.append(decision)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "stages": {
+                    name: {
+                        "count": int(span["count"]),
+                        "total_ms": round(span["total_ms"], 1),
+                        "max_ms": round(span["max_ms"], 1),
+                    }
+                    for name, span in self.spans.items()
+                },
+                "candidates": dict(self.candidates),
+                "cache": {name: dict(entry) for name, entry in self.cache.items()},
+                "decisions": list(self.decisions),
+            }
+
+
+def start_retrieval_trace() -> RetrievalTrace:
+    """Begin collecting a trace for the current request."""
+    trace = RetrievalTrace()
+    _retrieval_trace_var.set(trace)
+    return trace
+
+
+def reset_retrieval_trace() -> None:
+    _retrieval_trace_var.set(None)
+
+
+def get_retrieval_trace() -> Optional[RetrievalTrace]:
+    return _retrieval_trace_var.get()
+
+
+def consume_retrieval_trace() -> Optional[dict[str, Any]]:
+    """Summary of the current trace (None when nothing was traced); stops tracing."""
+    trace = _retrieval_trace_var.get()
+    _retrieval_trace_var.set(None)
+    if trace is None:
+        return None
+    summary = trace.summary()
+    if not any(summary.values()):
+        return None
+    return summary
+
+
+def _otel_span(name: str, attributes: dict[str, Any]):
+    if _otel_trace is None or not settings.rag_trace_otel_enabled:
+        return nullcontext()
+    tracer = _otel_trace.get_tracer("app.rag")
+    return tracer.start_as_current_span(f"rag.{name}", attributes=attributes)
+
+
+@contextmanager
+def trace_span(name: str, **attributes: Any) -> Iterator[None]:
+    """Time ``name`` into the request trace (and an OpenTelemetry span when enabled)."""
+    trace = _retrieval_trace_var.get()
+    with _otel_span(name, attributes):
+        if trace is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            trace.add_span(name, time.perf_counter() - started)
+
+
+def record_candidates(name: str, count: int) -> None:
+    trace = _retrieval_trace_var.get()
+    if trace is not None:
+        trace.add_candidates(name, count)
+
+
+def record_cache(name: str, hit: bool) -> None:
+    trace = _retrieval_trace_var.get()
+    if trace is not None:
+        trace.add_cache(name, hit)
+
+
+def record_decision(decision: str) -> None:
+    trace = _retrieval_trace_var.get()
+    if trace is not None:
+        trace.add_decision(decision)
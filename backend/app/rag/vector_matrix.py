@@ -0,0 +1,303 @@
+"""Company-scoped in-memory vector matrix for exact semantic search.
+
+Per-company corpora are small (hundreds to a few thousand chunks), so an
+exact scan over a contiguous NumPy matrix is cheaper than a metadata-filtered
+HNSW query over the shared Chroma collections, and it answers every query
+variant of one retrieval with a single matrix multiply.
+
+Chroma stays the system of record: matrices are loaded lazily from it, kept
+in a size-bounded LRU keyed by tenant/company/model, and dropped by the same
+ingest/delete paths that invalidate ``RAGCache`` (plus a TTL so updates made
+by other worker processes are picked up).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.config import settings
+from app.rag.chroma_io import run_chroma_io
+from app.rag.security import is_rag_chunk_quarantined
+from app.utils.embeddings import EmbeddingBackend
+from app.utils.secure_logger import get_logger
+
+logger = get_logger(__name__)
+
+MatrixKey = tuple[str, str, str]
+
+
+@dataclass
+class CompanyVectorMatrix:
+    """Embeddings of one company's chunks across the backend's collections."""
+
+    company_id: str
+    tenant_key: str
+    model: str
+    vectors: np.ndarray
+    sq_norms: np.ndarray
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    collections: list[str]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.vectors.nbytes + self.sq_norms.nbytes)
+
+    def row_mask(self, content_types: Optional[set[str]]) -> Optional[np.ndarray]:
+        if not content_types:
+            return None
+        from app.rag.vector_store import _matches_type_filter
+
+        return np.fromiter(
+            (_matches_type_filter(meta, content_types) for meta in self.metadatas),
+            dtype=bool,
+            count=self.size,
+        )
+
+    def search(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        k: int,
+        *,
+        row_mask: Optional[np.ndarray] = None,
+    ) -> list[list[tuple[int, float]]]:
+        """Exact top-``k`` rows per query by squared L2 distance (Chroma's default space)."""
+        if not query_embeddings or k <= 0 or self.size == 0:
+            return [[] for _ in query_embeddings]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.vectors.shape[1]:
+            raise ValueError(
+                f"query dimension {queries.shape[-1]} does not match matrix {self.vectors.shape[1]}"
+            )
+        vectors = self.vectors if self.vectors.dtype == np.float32 else self.vectors.astype(np.float32)
+
+        distances = queries @ vectors.T
+        distances *= -2.0
+        distances += self.sq_norms[None, :]
+        distances += np.einsum("ij,ij->i", queries, queries)[:, None]
+        np.maximum(distances, 0.0, out=distances)
+        if row_mask is not None:
+            distances[:, ~row_mask] = np.inf
+
+        kk = min(k, self.size)
+        if kk < self.size:
+            top = np.argpartition(distances, kk - 1, axis=1)[:, :kk]
+        else:
+            top = np.broadcast_to(np.arange(self.size), (len(queries), self.size))
+        hits: list[list[tuple[int, float]]] = []
+        for row, candidates in enumerate(top):
+            row_distances = distances[row, candidates]
+            order = np.argsort(row_distances, kind="stable")
+            hits.append([
+                (int(candidates[i]), float(row_distances[i]))
+                for i in order
+                if np.isfinite(row_distances[i])
+            ])
+        return hits
+
+
+class VectorMatrixCache:
+    """Size-bounded LRU of company matrices with per-company generations."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self._max_bytes = max(0, max_bytes)
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[MatrixKey, CompanyVectorMatrix] = OrderedDict()
+        self._unavailable: dict[MatrixKey, float] = {}
+        self._generations: dict[tuple[str, str], int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _fresh(self, loaded_at: float) -> bool:
+        return self._ttl_seconds <= 0 or time.monotonic() - loaded_at < self._ttl_seconds
+
+    def generation(self, company_id: str, tenant_key: str) -> int:
+        with self._lock:
+            return self._generations.get((tenant_key, company_id), 0)
+
+    def get(self, key: MatrixKey) -> Optional[CompanyVectorMatrix]:
+        with self._lock:
+            matrix = self._entries.get(key)
+            if matrix is None:
+                return None
+            if not self._fresh(matrix.loaded_at):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return matrix
+
+    def is_unavailable(self, key: MatrixKey) -> bool:
+        with self._lock:
+            marked_at = self._unavailable.get(key)
+            if marked_at is None:
+                return False
+            if not self._fresh(marked_at):
+                del self._unavailable[key]
+                return False
+            return True
+
+    def mark_unavailable(self, key: MatrixKey) -> None:
+        with self._lock:
+            self._unavailable[key] = time.monotonic()
+
+    def put(self, matrix: CompanyVectorMatrix, generation: int) -> bool:
+        """Install ``matrix`` unless its company was invalidated while loading."""
+        key = (matrix.tenant_key, matrix.company_id, matrix.model)
+        with self._lock:
+            if self._generations.get((matrix.tenant_key, matrix.company_id), 0) != generation:
+                return False
+            if matrix.nbytes > self._max_bytes:
+                return False
+            self._drop(key)
+            self._entries[key] = matrix
+            self._bytes += matrix.nbytes
+            while self._bytes > self._max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+            return True
+
+    def _drop(self, key: MatrixKey) -> None:
+        matrix = self._entries.pop(key, None)
+        if matrix is not None:
+            self._bytes -= matrix.nbytes
+
+    def invalidate(self, company_id: str, tenant_key: str) -> None:
+        with self._lock:
+            company_key = (tenant_key, company_id)
+            self._generations[company_key] = self._generations.get(company_key, 0) + 1
+            for key in [k for k in self._entries if k[:2] == company_key]:
+                self._drop(key)
+            for key in [k for k in self._unavailable if k[:2] == company_key]:
+                del self._unavailable[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._unavailable.clear()
+            self._bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+
+_cache: Optional[VectorMatrixCache] = None
+_cache_guard = threading.Lock()
+
+
+def get_vector_matrix_cache() -> VectorMatrixCache:
+    global _cache
+    with _cache_guard:
+        if _cache is None:
+            _cache = VectorMatrixCache(
+                settings.rag_vector_matrix_max_mb * 1024 * 1024,
+                settings.rag_vector_matrix_ttl_seconds,
+            )
+        return _cache
+
+
+def invalidate_company_matrix(company_id: str, tenant_key: str) -> None:
+    """Drop cached matrices for a company; call wherever ``RAGCache`` is invalidated."""
+    get_vector_matrix_cache().invalidate(company_id, tenant_key)
+
+
+def _matrix_dtype() -> np.dtype:
+    return np.dtype(np.float16 if settings.rag_vector_matrix_dtype == "float16" else np.float32)
+
+
+def load_company_matrix(
+    company_id: str,
+    tenant_key: str,
+    backend: EmbeddingBackend,
+    *,
+    max_chunks: Optional[int] = None,
+) -> Optional[CompanyVectorMatrix]:
+    """Read a company's embeddings from Chroma into one contiguous matrix.
+
+    Returns None when the company has no chunks or exceeds ``max_chunks``.
+    """
+    from app.rag import vector_store
+
+    limit = settings.rag_vector_matrix_max_chunks if max_chunks is None else max_chunks
+    where = vector_store._company_where(company_id, tenant_key)
+    rows: list[Sequence[float]] = []
+    ids: list[str] = []
+    documents: list[str] = []
+    metadatas: list[dict] = []
+    collections: list[str] = []
+
+    for name in vector_store._collection_names_for_backend(backend):
+        collection = vector_store._get_collection(name)
+        results = collection.get(where=where, include=["embeddings", "documents", "metadatas"])
+        embeddings = results.get("embeddings")
+        if embeddings is None:
+            continue
+        docs = results.get("documents") or []
+        metas = results.get("metadatas") or []
+        for doc_id, doc, meta, emb in zip(results.get("ids") or [], docs, metas, embeddings):
+            meta = meta or {}
+            if emb is None or is_rag_chunk_quarantined(meta):
+                continue
+            rows.append(emb)
+            ids.append(doc_id)
+            documents.append(doc)
+            metadatas.append(meta)
+            collections.append(name)
+            if len(rows) > limit:
+                return None
+
+    if not rows:
+        return None
+    vectors = np.ascontiguousarray(np.asarray(rows, dtype=np.float32))
+    sq_norms = np.einsum("ij,ij->i", vectors, vectors).astype(np.float32)
+    return CompanyVectorMatrix(
+        company_id=company_id,
+        tenant_key=tenant_key,
+        model=backend.model,
+        vectors=vectors.astype(_matrix_dtype(), copy=False),
+        sq_norms=sq_norms,
+        ids=ids,
+        documents=documents,
+        metadatas=metadatas,
+        collections=collections,
+    )
+
+
+async def get_company_matrix(
+    company_id: str,
+    tenant_key: str,
+    backend: EmbeddingBackend,
+) -> Optional[CompanyVectorMatrix]:
+    """Cached matrix for a company, or None when the engine should not be used."""
+    if not settings.rag_vector_matrix_enabled:
+        return None
+    cache = get_vector_matrix_cache()
+    key = (tenant_key, company_id, backend.model)
+    matrix = cache.get(key)
+    if matrix is not None:
+        return matrix
+    if cache.is_unavailable(key):
+        return None
+
+    generation = cache.generation(company_id, tenant_key)
+    try:
+        matrix = await run_chroma_io(load_company_matrix, company_id, tenant_key, backend)
+    except Exception as e:
+        logger.warning("[RAG/matrix] 行列ロード失敗、Chroma 検索にフォールバック: %s", e)
+        return None
+    if matrix is None:
+        cache.mark_unavailable(key)
+        return None
+    cache.put(matrix, generation)
+    return matrix
@@ -10,12 +10,13 @@ Supports:
 - Content type filtering for retrieval
 """
 
+import asyncio
+
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
-from datetime import datetime
+from typing import Callable, Optional
 from urllib.parse import urlparse
 from uuid import uuid4
 
@@ -30,12 +31,17 @@ from app.utils.embeddings import (
     get_configured_backends,
 )
 from app.utils.content_types import CONTENT_TYPES, content_type_label, normalize_content_type
-from app.utils.content_classifier import classify_chunks
+# Re-exported: the ingest pipeline classifies through this module so tests can patch one place.
+from app.utils.content_classifier import classify_chunks as classify_chunks
 from app.utils.cache import get_rag_cache
 from app.utils.text_chunker import get_chunk_settings
+from app.rag.budget import RetrievalBudget
+from app.rag.chroma_io import aadd, adelete, aget, aquery, run_chroma_io
 from app.rag.ids import collection_name_for_backend, make_source_document_id, make_source_hash
 from app.rag.document_summarizer import MetadataDocumentSummarizer
 from app.rag.security import assess_rag_injection_risk, is_rag_chunk_quarantined, sanitize_rag_context
+from app.rag.trace import record_candidates, trace_span
+from app.rag.vector_matrix import get_company_matrix, invalidate_company_matrix
 from app.rag.vector_store_deletion import (
     extract_ids_to_delete_for_source as _extract_ids_to_delete_for_source,
 )
@@ -71,6 +77,7 @@ CONTENT_TYPE_JA = {
 }
 
 RAG_SOURCE_KINDS = {"corporate_public", "private_user_material"}
+_STORE_FAIL = {"success": False, "dominant_content_type": None, "secondary_content_types": []}
 PUBLIC_LEGACY_RAG_SOURCE_KINDS = {"crawl", "schedule", "upload"}
 
 
@@ -91,6 +98,11 @@ def _make_ingest_session_id() -> str:
     return uuid4().hex
 
 
+def make_replayable_ingest_session_id(seed: str, source_url: str) -> str:
+    """Stable session id for ``seed`` (an ingest job) + source, so a retried job rewrites the same session."""
+    return make_source_hash(f"ingest-job:{seed}:{source_url}")
+
+
 def _make_source_hash(source_url: str) -> str:
     return make_source_hash(source_url)
 
@@ -456,13 +468,22 @@ async def store_company_info(
             return False
 
         # Delete existing entries for this company across related collections
-        deletion_errors = []
-        for name in _collection_names_for_backend(backend):
+        async def delete_existing(name: str) -> Optional[str]:
             try:
-                _get_collection(name).delete(where=_company_where(company_id, tenant_key))
+                collection = await run_chroma_io(_get_collection, name)
+                await adelete(collection, where=_company_where(company_id, tenant_key))
             except Exception as e:
                 # Log but continue - deletion failure shouldn't block insert
-                deletion_errors.append(f"{name}: {e}")
+                return f"{name}: {e}"
+            return None
+
+        deletion_errors = [
+            error
+            for error in await asyncio.gather(
+                *(delete_existing(name) for name in _collection_names_for_backend(backend))
+            )
+            if error
+        ]
 
         if deletion_errors:
             logger.warning(
@@ -471,7 +492,7 @@ async def store_company_info(
                 "; ".join(deletion_errors),
             )
 
-        collection = get_company_collection(backend)
+        collection = await run_chroma_io(get_company_collection, backend)
 
         # Prepare documents and metadata
         documents = []
@@ -544,7 +565,8 @@ async def store_company_info(
         valid_docs, valid_metas, valid_ids, valid_embs = zip(*valid_items)
 
         # Add to collection
-        collection.add(
+        await aadd(
+            collection,
             documents=list(valid_docs),
             metadatas=list(valid_metas),
             ids=list(valid_ids),
@@ -555,6 +577,7 @@ async def store_company_info(
             "Stored %d chunks (company_id: %s...)", len(valid_docs), company_id[:8]
         )
         schedule_bm25_update(company_id, tenant_key=tenant_key)
+        invalidate_company_matrix(company_id, tenant_key)
         cache = get_rag_cache()
         if cache:
             await cache.invalidate_company(company_id, tenant_key=tenant_key)
@@ -718,6 +741,7 @@ def delete_company_rag(
                 deleted_any = True
         logger.info("RAG data deleted (company_id: %s...)", company_id[:8])
         _delete_bm25_index(company_id, tenant_key=tenant_key)
+        invalidate_company_matrix(company_id, tenant_key)
         return deleted_any
     except Exception as e:
         logger.error("delete_company_rag error: %s", e, exc_info=True)
@@ -749,6 +773,7 @@ def delete_company_rag_with_receipt(
                 collection.delete(where=_company_where(company_id, tenant_key))
                 deleted["chroma"] += before
         deleted["bm25"] = _delete_bm25_index(company_id, tenant_key=tenant_key)
+        invalidate_company_matrix(company_id, tenant_key)
         chroma_remaining = _count_chroma_records(
             company_id,
             tenant_key=tenant_key,
@@ -788,6 +813,72 @@ def delete_company_rag_with_receipt(
 # ============================================================
 
 
+def _chunk_full_text(
+    raw_text: str,
+    *,
+    raw_format: str,
+    effective_type: str,
+) -> list[dict]:
+    """Chunk one document (HTML-aware when possible). CPU-bound; runs off the event loop."""
+    from app.utils.text_chunker import (
+        JapaneseTextChunker,
+        extract_sections_from_html,
+        chunk_sections_with_metadata,
+        chunk_html_content,
+    )
+
+    chunk_size, chunk_overlap = get_chunk_settings(effective_type)
+    chunks = []
+    if raw_format == "html":
+        sections = extract_sections_from_html(raw_text)
+        if sections:
+            chunks = chunk_sections_with_metadata(
+                sections, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            )
+        if not chunks:
+            chunks = chunk_html_content(
+                raw_text, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            )
+    else:
+        chunker = JapaneseTextChunker(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap
+        )
+        chunks = chunker.chunk_with_metadata(raw_text)
+    return chunks
+
+
+def _annotate_classified_chunks(
+    classified: list[dict],
+    content_type: Optional[str],
+) -> tuple[Optional[str], list[str]]:
+    """Score injection risk on classified chunks; return (dominant, secondary) content types."""
+    secondary_content_types: set[str] = set()
+    for chunk in classified:
+        meta = chunk.get("metadata") or {}
+        risk = assess_rag_injection_risk(str(chunk.get("text") or ""))
+        meta["injection_risk_level"] = risk.level
+        meta["injection_risk_reasons"] = ",".join(risk.reasons[:5])
+        meta["quarantine"] = risk.quarantine
+        ct = meta.get("content_type") or content_type or "corporate_site"
+        meta["content_type"] = ct
+        for secondary in meta.get("secondary_content_types") or []:
+            if isinstance(secondary, str):
+                secondary_content_types.add(secondary)
+
+    # Determine dominant content_type by chunk count (majority vote)
+    content_type_counts: dict[str, int] = {}
+    for chunk in classified:
+        meta = chunk.get("metadata") or {}
+        ct = meta.get("content_type") or content_type or "corporate_site"
+        content_type_counts[ct] = content_type_counts.get(ct, 0) + 1
+    dominant_content_type = (
+        max(content_type_counts, key=content_type_counts.get)
+        if content_type_counts
+        else None
+    )
+    return dominant_content_type, sorted(secondary_content_types)
+
+
 async def store_full_text_content(
     company_id: str,
     company_name: str,
@@ -809,7 +900,12 @@ async def store_full_text_content(
     """
     Store full text content from a web page in vector database.
 
-    This chunks the text and stores it alongside structured data.
+    This chunks the text and stores it alongside structured data. The document
+    goes through the staged ingest pipeline (``app.rag.ingest_pipeline``): when
+    the caller has opened one for this company (a crawl does), it joins that
+    pipeline so embedding batches are shared and the BM25 refresh / cache
+    invalidation run once when the pipeline closes; otherwise a one-document
+    pipeline is used.
 
     Args:
         company_id: Unique company identifier
@@ -826,18 +922,11 @@ async def store_full_text_content(
             - "dominant_content_type" (str | None): Majority content_type from classified chunks
             - "secondary_content_types" (list[str]): Observed secondary types across chunks
     """
-    from app.utils.text_chunker import (
-        JapaneseTextChunker,
-        extract_sections_from_html,
-        chunk_sections_with_metadata,
-        chunk_html_content,
-    )
-
-    _fail = {"success": False, "dominant_content_type": None, "secondary_content_types": []}
+    from app.rag.ingest_pipeline import CompanyIngestPipeline, IngestDocument, get_active_ingest_pipeline
 
     if content_type and content_type not in CONTENT_TYPES:
         logger.warning("Invalid content_type: %s", content_type)
-        return _fail
+        return dict(_STORE_FAIL)
 
     try:
         raw_format = (raw_format or "text").lower()
@@ -846,7 +935,7 @@ async def store_full_text_content(
         backend = _resolve_write_backend(backend)
         if backend is None:
             logger.error("No embedding backend available for store_full_text_content")
-            return _fail
+            return dict(_STORE_FAIL)
         source_metadata = validate_rag_source_metadata(
             source_kind=source_kind,
             tenant_key=tenant_key,
@@ -857,247 +946,261 @@ async def store_full_text_content(
             retention_until=retention_until,
             provider_policy=provider_policy,
         )
-        effective_type = content_type or content_channel or "corporate_site"
-        chunk_size, chunk_overlap = get_chunk_settings(effective_type)
-
-        # Chunk the content (HTML-aware when possible)
-        chunks = []
-        if raw_format == "html":
-            sections = extract_sections_from_html(raw_text)
-            if sections:
-                chunks = chunk_sections_with_metadata(
-                    sections, chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                )
-            if not chunks:
-                chunks = chunk_html_content(
-                    raw_text, chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                )
-        else:
-            chunker = JapaneseTextChunker(
-                chunk_size=chunk_size, chunk_overlap=chunk_overlap
-            )
-            chunks = chunker.chunk_with_metadata(raw_text)
-
-        if not chunks:
-            logger.warning("No chunks generated (company_id: %s...)", company_id[:8])
-            return _fail
-
-        # Add content_type and timestamp to each chunk's metadata
-        now = datetime.utcnow().isoformat()
-        for chunk in chunks:
-            if "metadata" not in chunk or chunk["metadata"] is None:
-                chunk["metadata"] = {}
-            chunk["metadata"]["source_url"] = source_url
-            chunk["metadata"]["content_type"] = content_type
-            chunk["metadata"]["fetched_at"] = now
-            chunk["metadata"].update(source_metadata)
-
-        # Classify chunks (rule + LLM fallback)
-        classified = await classify_chunks(
-            chunks, source_channel=content_channel, fallback_type=content_type
-        )
-
-        secondary_content_types: set[str] = set()
-        for chunk in classified:
-            meta = chunk.get("metadata") or {}
-            risk = assess_rag_injection_risk(str(chunk.get("text") or ""))
-            meta["injection_risk_level"] = risk.level
-            meta["injection_risk_reasons"] = ",".join(risk.reasons[:5])
-            meta["quarantine"] = risk.quarantine
-            ct = meta.get("content_type") or content_type or "corporate_site"
-            meta["content_type"] = ct
-            for secondary in meta.get("secondary_content_types") or []:
-                if isinstance(secondary, str):
-                    secondary_content_types.add(secondary)
-
-        # Determine dominant content_type by chunk count (majority vote)
-        content_type_counts: dict[str, int] = {}
-        for chunk in classified:
-            meta = chunk.get("metadata") or {}
-            ct = meta.get("content_type") or content_type or "corporate_site"
-            content_type_counts[ct] = content_type_counts.get(ct, 0) + 1
-        dominant_content_type = (
-            max(content_type_counts, key=content_type_counts.get)
-            if content_type_counts
-            else None
-        )
-
-        success = await _store_content_by_source_url(
+        document = IngestDocument(
             company_id=company_id,
             company_name=company_name,
-            content_chunks=classified,
+            raw_text=raw_text,
             source_url=source_url,
-            backend=backend,
             tenant_key=tenant_key,
+            backend=backend,
+            raw_format=raw_format,
+            content_type=content_type,
+            content_channel=content_channel,
+            source_metadata=source_metadata,
         )
 
-        if success:
-            schedule_bm25_update(company_id, tenant_key=tenant_key)
-            cache = get_rag_cache()
-            if cache:
-                await cache.invalidate_company(company_id, tenant_key=tenant_key)
-
-        return {
-            "success": success,
-            "dominant_content_type": dominant_content_type,
-            "secondary_content_types": sorted(secondary_content_types),
-        }
+        pipeline = get_active_ingest_pipeline(company_id, tenant_key)
+        if pipeline is not None:
+            return await pipeline.submit(document)
+        async with CompanyIngestPipeline(company_id=company_id, tenant_key=tenant_key) as pipeline:
+            return await pipeline.submit(document)
 
     except Exception as e:
         logger.error("store_full_text_content error: %s", e, exc_info=True)
-        return _fail
+        return dict(_STORE_FAIL)
 
 
-async def _store_content_by_source_url(
+@dataclass
+class _SourceRecords:
+    """Chroma-ready records for one source URL (one ingest session)."""
+
+    source_url: str
+    ingest_session_id: str
+    documents: list[str]
+    contextual_documents: list[str]
+    metadatas: list[dict]
+    ids: list[str]
+    replayable: bool = False
+    # Skip the base collection and store only the contextual shadow (see CompanyIngestPipeline).
+    contextual_only: bool = False
+
+
+def _prepare_source_records(
     company_id: str,
     company_name: str,
     content_chunks: list[dict],
     source_url: str,
     backend: EmbeddingBackend,
     tenant_key: str,
-) -> bool:
+    ingest_session_id: Optional[str] = None,
+    contextual_only: bool = False,
+) -> Optional[_SourceRecords]:
     """
-    Store content chunks for a single source URL.
+    Sanitize chunks and build documents / metadata / ids; None when nothing is storable.
 
-    New chunks are added first, then older chunks for the same company_id +
-    source_url are removed. This preserves the previous successful RAG data
-    when re-ingest fails midway.
+    A caller-supplied ``ingest_session_id`` (see ``make_replayable_ingest_session_id``)
+    marks the records replayable: leftovers of an interrupted attempt with the
+    same session are cleared before they are written again.
+    """
+    replayable = ingest_session_id is not None
+    ingest_session_id = ingest_session_id or _make_ingest_session_id()
+    documents = []
+    contextual_documents = []
+    metadatas = []
+    ids = []
+    summarizer = MetadataDocumentSummarizer()
+    content_type = "corporate_site"
+
+    for idx, chunk in enumerate(content_chunks):
+        text = sanitize_rag_context(str(chunk.get("text", "")))
+        if not text or len(text.strip()) < 10:
+            continue
 
-    Args:
-        company_id: Company identifier
-        company_name: Company name
-        content_chunks: List of content chunks
-        source_url: Source URL
+        content_type = (
+            (chunk.get("metadata") or {}).get("content_type")
+            or "corporate_site"
+        )
+        doc_id = _make_source_document_id(
+            tenant_key=tenant_key,
+            company_id=company_id,
+            source_url=source_url,
+            content_type=content_type,
+            chunk_index=idx,
+            ingest_session_id=ingest_session_id,
+        )
 
-    Returns:
-        True if successful
-    """
-    ingest_session_id = _make_ingest_session_id()
-    try:
-        collection = get_company_collection(backend)
+        metadata = {
+            "company_id": company_id,
+            "company_name": company_name,
+            "source_url": source_url,
+            "chunk_type": chunk.get("type", "full_text"),
+            "content_type": content_type,
+            "chunk_index": idx,
+            "ingest_session_id": ingest_session_id,
+            "embedding_provider": backend.provider,
+            "embedding_model": backend.model,
+        }
+        metadata["tenant_key"] = tenant_key
 
-        # Prepare documents
-        documents = []
-        contextual_documents = []
-        metadatas = []
-        ids = []
-        summarizer = MetadataDocumentSummarizer()
+        # Add any additional metadata from the chunk
+        if chunk.get("metadata"):
+            for key, value in chunk["metadata"].items():
+                if isinstance(value, (str, int, float, bool)):
+                    metadata[key] = value
 
-        for idx, chunk in enumerate(content_chunks):
-            text = sanitize_rag_context(str(chunk.get("text", "")))
-            if not text or len(text.strip()) < 10:
-                continue
+        contextual_prefix = str(metadata.get("contextual_prefix") or "").strip()
+        if not contextual_prefix:
+            contextual_prefix = summarizer.summarize(text, meta=metadata)
+            metadata["contextual_prefix"] = contextual_prefix
 
-            content_type = (
-                (chunk.get("metadata") or {}).get("content_type")
-                or "corporate_site"
-            )
-            doc_id = _make_source_document_id(
-                tenant_key=tenant_key,
-                company_id=company_id,
-                source_url=source_url,
-                content_type=content_type,
-                chunk_index=idx,
-                ingest_session_id=ingest_session_id,
-            )
+        documents.append(text)
+        contextual_documents.append(str(chunk.get("embedding_text") or f"{contextual_prefix}\n\n{text}").strip())
+        metadatas.append(metadata)
+        ids.append(doc_id)
 
-            metadata = {
-                "company_id": company_id,
-                "company_name": company_name,
-                "source_url": source_url,
-                "chunk_type": chunk.get("type", "full_text"),
-                "content_type": content_type,
-                "chunk_index": idx,
-                "ingest_session_id": ingest_session_id,
-                "embedding_provider": backend.provider,
-                "embedding_model": backend.model,
-            }
-            metadata["tenant_key"] = tenant_key
+    if not documents:
+        ct_ja = CONTENT_TYPE_JA.get(content_type, content_type)
+        logger.warning(
+            "No valid chunks for %s (company_id: %s...)", ct_ja, company_id[:8]
+        )
+        return None
+
+    return _SourceRecords(
+        source_url=source_url,
+        ingest_session_id=ingest_session_id,
+        documents=documents,
+        contextual_documents=contextual_documents,
+        metadatas=metadatas,
+        ids=ids,
+        replayable=replayable,
+        contextual_only=contextual_only,
+    )
 
-            # Add any additional metadata from the chunk
-            if chunk.get("metadata"):
-                for key, value in chunk["metadata"].items():
-                    if isinstance(value, (str, int, float, bool)):
-                        metadata[key] = value
 
-            contextual_prefix = str(metadata.get("contextual_prefix") or "").strip()
-            if not contextual_prefix:
-                contextual_prefix = summarizer.summarize(text, meta=metadata)
-                metadata["contextual_prefix"] = contextual_prefix
+async def _embed_source_records(
+    batch: list[_SourceRecords],
+    backend: EmbeddingBackend,
+) -> list[tuple[Optional[list], Optional[list]]]:
+    """
+    Embed several sources, raw and contextual text, with one ``generate_embeddings_batch`` call.
 
-            documents.append(text)
-            contextual_documents.append(str(chunk.get("embedding_text") or f"{contextual_prefix}\n\n{text}").strip())
-            metadatas.append(metadata)
-            ids.append(doc_id)
+    Returns per-source ``(embeddings, contextual_embeddings)``. The contextual
+    list is None unless contextual dual-write is enabled or the source is
+    ``contextual_only``; the raw list is None for ``contextual_only`` sources.
+    """
+    texts: list[str] = []
+    spans: list[tuple[Optional[tuple[int, int]], Optional[tuple[int, int]]]] = []
+    for records in batch:
+        raw_span = contextual_span = None
+        if not records.contextual_only:
+            raw_span = (len(texts), len(texts) + len(records.documents))
+            texts.extend(records.documents)
+        if records.contextual_only or settings.contextual_retrieval_dual_write:
+            contextual_span = (len(texts), len(texts) + len(records.contextual_documents))
+            texts.extend(records.contextual_documents)
+        spans.append((raw_span, contextual_span))
+
+    has_raw = any(raw_span for raw_span, _ in spans)
+    if any(contextual_span for _, contextual_span in spans):
+        embeddings = await generate_embeddings_batch(
+            texts,
+            backend=backend,
+            cache_variant="dual_write" if has_raw else "contextual",
+        )
+    else:
+        embeddings = await generate_embeddings_batch(texts, backend=backend)
 
-        if not documents:
-            ct_ja = CONTENT_TYPE_JA.get(content_type, content_type)
-            logger.warning(
-                "No valid chunks for %s (company_id: %s...)", ct_ja, company_id[:8]
-            )
-            return False
+    return [
+        tuple(None if span is None else list(embeddings[span[0]:span[1]]) for span in source_spans)
+        for source_spans in spans
+    ]
 
-        # Generate embeddings
-        embeddings = await generate_embeddings_batch(documents, backend=backend)
 
-        # Filter out failed embeddings
-        valid_items = [
-            (doc, contextual_doc, meta, doc_id, emb)
-            for doc, contextual_doc, meta, doc_id, emb in zip(
-                documents,
-                contextual_documents,
-                metadatas,
-                ids,
-                embeddings,
-            )
-            if emb is not None
-        ]
+async def _write_source_records(
+    records: _SourceRecords,
+    embeddings: Optional[list],
+    contextual_embeddings: Optional[list],
+    *,
+    company_id: str,
+    backend: EmbeddingBackend,
+    tenant_key: str,
+) -> bool:
+    """
+    Add embedded records for one source URL, then drop its older ingest sessions.
 
-        if not valid_items:
-            logger.error("Embedding generation failed (company_id: %s...)", company_id[:8])
-            return False
+    New chunks are added first (base and contextual collections concurrently),
+    then older chunks for the same company_id + source_url are removed. On
+    failure the partially added session is removed, so the previous successful
+    RAG data survives.
+    """
+    source_url = records.source_url
 
-        valid_docs, valid_contextual_docs, valid_metas, valid_ids, valid_embs = zip(*valid_items)
+    def embedded(vectors: Optional[list], documents: list[str]) -> list[tuple]:
+        if vectors is None:
+            return []
+        return [
+            (doc, meta, doc_id, emb)
+            for doc, meta, doc_id, emb in zip(documents, records.metadatas, records.ids, vectors)
+            if emb is not None
+        ]
 
-        # Add to collection
-        collection.add(
-            documents=list(valid_docs),
-            metadatas=list(valid_metas),
-            ids=list(valid_ids),
-            embeddings=list(valid_embs),
-        )
+    try:
+        # Filter out failed embeddings
+        base_items = embedded(embeddings, records.documents)
+        contextual_items = embedded(contextual_embeddings, records.contextual_documents)
+        if records.contextual_only:
+            if not contextual_items:
+                logger.error("Embedding generation failed (company_id: %s...)", company_id[:8])
+                return False
+        else:
+            if not base_items:
+                logger.error("Embedding generation failed (company_id: %s...)", company_id[:8])
+                return False
+            # The contextual shadow only mirrors chunks that made it into the base collection.
+            base_ids = {doc_id for _, _, doc_id, _ in base_items}
+            contextual_items = [item for item in contextual_items if item[2] in base_ids]
+
+        if records.replayable:
+            await run_chroma_io(
+                _delete_current_ingest_session_records,
+                company_id=company_id,
+                source_url=source_url,
+                backend=backend,
+                ingest_session_id=records.ingest_session_id,
+                tenant_key=tenant_key,
+            )
 
-        if settings.contextual_retrieval_dual_write:
-            contextual_embeddings = await generate_embeddings_batch(list(valid_contextual_docs), backend=backend)
-            contextual_items = [
-                (doc, meta, doc_id, emb)
-                for doc, meta, doc_id, emb in zip(
-                    valid_contextual_docs,
-                    valid_metas,
-                    valid_ids,
-                    contextual_embeddings,
-                )
-                if emb is not None
-            ]
-            if contextual_items:
-                ctx_docs, ctx_metas, ctx_ids, ctx_embs = zip(*contextual_items)
-                get_company_contextual_collection(backend).add(
-                    documents=list(ctx_docs),
-                    metadatas=list(ctx_metas),
-                    ids=list(ctx_ids),
-                    embeddings=list(ctx_embs),
-                )
+        async def add(get_collection: Callable[[EmbeddingBackend], chromadb.Collection], items: list[tuple]) -> None:
+            docs, metas, ids, embs = zip(*items)
+            await aadd(
+                await run_chroma_io(get_collection, backend),
+                documents=list(docs),
+                metadatas=list(metas),
+                ids=list(ids),
+                embeddings=list(embs),
+            )
 
-        deleted_old = _delete_source_records_for_backends(
+        writes = []
+        if base_items:
+            writes.append(add(get_company_collection, base_items))
+        if contextual_items:
+            writes.append(add(get_company_contextual_collection, contextual_items))
+        # Wait for both adds before cleanup so a failed one never races the other.
+        errors = [error for error in await asyncio.gather(*writes, return_exceptions=True) if error]
+        if errors:
+            raise errors[0]
+
+        deleted_old = await run_chroma_io(
+            _delete_source_records_for_backends,
             company_id=company_id,
             source_url=source_url,
             backend=backend,
-            current_ingest_session_id=ingest_session_id,
+            current_ingest_session_id=records.ingest_session_id,
             tenant_key=tenant_key,
         )
         logger.info(
             "URL-level update complete: %d chunks stored / %d old chunks deleted (company_id: %s...)",
-            len(valid_docs),
+            len(base_items or contextual_items),
             deleted_old,
             company_id[:8],
         )
@@ -1106,11 +1209,12 @@ async def _store_content_by_source_url(
 
     except Exception as e:
         try:
-            cleanup_deleted = _delete_current_ingest_session_records(
+            cleanup_deleted = await run_chroma_io(
+                _delete_current_ingest_session_records,
                 company_id=company_id,
                 source_url=source_url,
                 backend=backend,
-                ingest_session_id=ingest_session_id,
+                ingest_session_id=records.ingest_session_id,
                 tenant_key=tenant_key,
             )
             if cleanup_deleted:
@@ -1121,8 +1225,183 @@ async def _store_content_by_source_url(
                 )
         except Exception:
             pass
+        logger.error("_write_source_records error: %s", e, exc_info=True)
+        return False
+
+
+async def _store_content_by_source_url(
+    company_id: str,
+    company_name: str,
+    content_chunks: list[dict],
+    source_url: str,
+    backend: EmbeddingBackend,
+    tenant_key: str,
+) -> bool:
+    """
+    Store content chunks for a single source URL.
+
+    New chunks are added first, then older chunks for the same company_id +
+    source_url are removed. This preserves the previous successful RAG data
+    when re-ingest fails midway.
+
+    Args:
+        company_id: Company identifier
+        company_name: Company name
+        content_chunks: List of content chunks
+        source_url: Source URL
+
+    Returns:
+        True if successful
+    """
+    try:
+        records = _prepare_source_records(
+            company_id, company_name, content_chunks, source_url, backend, tenant_key
+        )
+        if records is None:
+            return False
+        [(embeddings, contextual_embeddings)] = await _embed_source_records([records], backend)
+    except Exception as e:
         logger.error("_store_content_by_source_url error: %s", e, exc_info=True)
         return False
+    return await _write_source_records(
+        records,
+        embeddings,
+        contextual_embeddings,
+        company_id=company_id,
+        backend=backend,
+        tenant_key=tenant_key,
+    )
+
+
+def _parse_secondary_types(meta: dict) -> list[str]:
+    secondary = meta.get("secondary_content_types") or []
+    if isinstance(secondary, str):
+        return [s.strip() for s in secondary.split(",") if s.strip()]
+    return [s for s in secondary if isinstance(s, str)]
+
+
+def _matches_type_filter(meta: dict, content_type_set: set[str]) -> bool:
+    if not content_type_set:
+        return True
+    primary = meta.get("content_type") or meta.get("chunk_type") or ""
+    if primary in content_type_set:
+        return True
+    return any(s in content_type_set for s in _parse_secondary_types(meta))
+
+
+def _build_context(doc, meta, distance, doc_id, embedding, backend_obj, coll_name) -> dict:
+    return {
+        "text": doc,
+        "metadata": meta,
+        "distance": distance,
+        "id": doc_id,
+        "embedding": embedding,
+        "embedding_provider": backend_obj.provider,
+        "embedding_model": backend_obj.model,
+        "collection": coll_name,
+    }
+
+
+def _rank_contexts(all_contexts: list[dict], n_results: int) -> list[dict]:
+    """Dedupe contexts across collections (closest wins) and sort by distance."""
+    if not all_contexts:
+        return []
+
+    def distance_score(ctx: dict) -> float:
+        return (
+            ctx.get("distance") if ctx.get("distance") is not None else float("inf")
+        )
+
+    deduped: dict[tuple, dict] = {}
+    for ctx in all_contexts:
+        key = _context_dedupe_key(ctx)
+        existing = deduped.get(key)
+        if existing is None or distance_score(ctx) < distance_score(existing):
+            deduped[key] = ctx
+
+    ordered = sorted(deduped.values(), key=distance_score)
+    return ordered[:n_results]
+
+
+def _matrix_search_contexts(
+    matrix,
+    query_embeddings: list[list[float]],
+    fetch_n: int,
+    content_type_set: set[str],
+    include_embeddings: bool,
+    backend: EmbeddingBackend,
+) -> list[list[dict]]:
+    """Answer every query against a company matrix with one matrix multiply."""
+    # Rows span every collection of the backend; Chroma returns fetch_n per collection.
+    collections = max(1, len(set(matrix.collections)))
+    hits = matrix.search(
+        query_embeddings,
+        fetch_n * collections,
+        row_mask=matrix.row_mask(content_type_set),
+    )
+    return [
+        [
+            _build_context(
+                matrix.documents[row],
+                matrix.metadatas[row],
+                distance,
+                matrix.ids[row],
+                matrix.vectors[row].astype(float).tolist() if include_embeddings else None,
+                backend,
+                matrix.collections[row],
+            )
+            for row, distance in query_hits
+        ]
+        for query_hits in hits
+    ]
+
+
+async def search_company_context_multi(
+    company_id: str,
+    query_embeddings: list[Optional[list[float]]],
+    n_results: int = 5,
+    content_types: Optional[list[str]] = None,
+    backends: Optional[list[EmbeddingBackend]] = None,
+    include_embeddings: bool = False,
+    *,
+    tenant_key: str,
+) -> Optional[list[list[dict]]]:
+    """
+    Search several query embeddings at once with the in-memory company matrix.
+
+    Returns None when the matrix engine is disabled or unavailable for any
+    backend, so callers fall back to ``search_company_context_by_type``.
+    """
+    search_backends = _resolve_read_backends(backends)
+    if not search_backends or not settings.rag_vector_matrix_enabled:
+        return None
+    content_type_set = set(content_types) if content_types else set()
+    fetch_n = n_results * 3 if content_type_set else n_results
+    valid = [i for i, emb in enumerate(query_embeddings) if emb is not None]
+    per_query: list[list[dict]] = [[] for _ in query_embeddings]
+
+    for backend in search_backends:
+        matrix = await get_company_matrix(company_id, tenant_key, backend)
+        if matrix is None:
+            return None
+        if not valid:
+            continue
+        try:
+            contexts = _matrix_search_contexts(
+                matrix,
+                [query_embeddings[i] for i in valid],
+                fetch_n,
+                content_type_set,
+                include_embeddings,
+                backend,
+            )
+        except ValueError as e:
+            logger.warning("Matrix search failed, falling back to Chroma: %s", e)
+            return None
+        for i, query_contexts in zip(valid, contexts):
+            per_query[i].extend(query_contexts)
+
+    return [_rank_contexts(contexts, n_results) for contexts in per_query]
 
 
 async def search_company_context_by_type(
@@ -1165,95 +1444,84 @@ async def search_company_context_by_type(
         fetch_n = n_results * 3 if content_type_set else n_results
         where_clause = _company_where(company_id, tenant_key)
 
-        all_contexts: list[dict] = []
-
-        def _parse_secondary_types(meta: dict) -> list[str]:
-            secondary = meta.get("secondary_content_types") or []
-            if isinstance(secondary, str):
-                return [s.strip() for s in secondary.split(",") if s.strip()]
-            return [s for s in secondary if isinstance(s, str)]
-
-        def _matches_type_filter(meta: dict) -> bool:
-            if not content_type_set:
-                return True
-            primary = meta.get("content_type") or meta.get("chunk_type") or ""
-            if primary in content_type_set:
-                return True
-            return any(s in content_type_set for s in _parse_secondary_types(meta))
-
-        def _build_context(doc, meta, distance, doc_id, embedding, backend_obj, coll_name):
-            return {
-                "text": doc,
-                "metadata": meta,
-                "distance": distance,
-                "id": doc_id,
-                "embedding": embedding,
-                "embedding_provider": backend_obj.provider,
-                "embedding_model": backend_obj.model,
-                "collection": coll_name,
-            }
+        async def query_collection(
+            backend: EmbeddingBackend, name: str, query_embedding: list[float]
+        ) -> list[dict]:
+            include = ["documents", "metadatas", "distances"]
+            if include_embeddings:
+                include.append("embeddings")
+            try:
+                collection = await run_chroma_io(_get_collection, name)
+                with trace_span("chroma_query", collection=name):
+                    results = await aquery(
+                        collection,
+                        query_embeddings=[query_embedding],
+                        where=where_clause,
+                        n_results=fetch_n,
+                        include=include,
+                    )
+            except Exception as e:
+                logger.warning("Collection query failed: %s", e)
+                return []
+
+            contexts: list[dict] = []
+            if results["documents"] and results["documents"][0]:
+                for idx, doc in enumerate(results["documents"][0]):
+                    meta = results["metadatas"][0][idx] if results["metadatas"] else {}
+                    if not _matches_type_filter(meta, content_type_set):
+                        continue
+                    if is_rag_chunk_quarantined(meta):
+                        continue
+                    embedding = None
+                    if include_embeddings and results.get("embeddings"):
+                        try:
+                            embedding = results["embeddings"][0][idx]
+                        except Exception:
+                            embedding = None
+                    distance = results["distances"][0][idx] if results["distances"] else None
+                    doc_id = results["ids"][0][idx] if results["ids"] else None
+                    contexts.append(
+                        _build_context(doc, meta, distance, doc_id, embedding, backend, name)
+                    )
+            return contexts
 
-        for backend in search_backends:
+        async def search_backend(backend: EmbeddingBackend) -> list[dict]:
             if precomputed_query_embedding is not None:
                 query_embedding = precomputed_query_embedding
             else:
                 query_embedding = await generate_embedding(query, backend=backend)
             if query_embedding is None:
-                continue
-
-            for name in _collection_names_for_backend(backend):
-                collection = _get_collection(name)
-                include = ["documents", "metadatas", "distances"]
-                if include_embeddings:
-                    include.append("embeddings")
+                return []
 
+            matrix = await get_company_matrix(company_id, tenant_key, backend)
+            if matrix is not None:
                 try:
-                    results = collection.query(
-                        query_embeddings=[query_embedding],
-                        where=where_clause,
-                        n_results=fetch_n,
-                        include=include,
-                    )
-                except Exception as e:
-                    logger.warning("Collection query failed: %s", e)
-                    continue
-
-                if results["documents"] and results["documents"][0]:
-                    for idx, doc in enumerate(results["documents"][0]):
-                        meta = results["metadatas"][0][idx] if results["metadatas"] else {}
-                        if not _matches_type_filter(meta):
-                            continue
-                        if is_rag_chunk_quarantined(meta):
-                            continue
-                        embedding = None
-                        if include_embeddings and results.get("embeddings"):
-                            try:
-                                embedding = results["embeddings"][0][idx]
-                            except Exception:
-                                embedding = None
-                        distance = results["distances"][0][idx] if results["distances"] else None
-                        doc_id = results["ids"][0][idx] if results["ids"] else None
-                        all_contexts.append(
-                            _build_context(doc, meta, distance, doc_id, embedding, backend, name)
-                        )
-
-        if not all_contexts:
-            return []
-
-        def distance_score(ctx: dict) -> float:
-            return (
-                ctx.get("distance") if ctx.get("distance") is not None else float("inf")
+                    with trace_span("matrix_search"):
+                        return _matrix_search_contexts(
+                            matrix,
+                            [query_embedding],
+                            fetch_n,
+                            content_type_set,
+                            include_embeddings,
+                            backend,
+                        )[0]
+                except ValueError as e:
+                    logger.warning("Matrix search failed, falling back to Chroma: %s", e)
+
+            # Base and contextual collections are queried concurrently on the Chroma I/O pool.
+            per_collection = await asyncio.gather(
+                *(
+                    query_collection(backend, name, query_embedding)
+                    for name in _collection_names_for_backend(backend)
+                )
             )
+            return [context for contexts in per_collection for context in contexts]
 
-        deduped: dict[tuple, dict] = {}
-        for ctx in all_contexts:
-            key = _context_dedupe_key(ctx)
-            existing = deduped.get(key)
-            if existing is None or distance_score(ctx) < distance_score(existing):
-                deduped[key] = ctx
+        per_backend = await asyncio.gather(*(search_backend(b) for b in search_backends))
+        all_contexts = [context for contexts in per_backend for context in contexts]
 
-        ordered = sorted(deduped.values(), key=distance_score)
-        return ordered[:n_results]
+        record_candidates("dense", len(all_contexts))
+        return _rank_contexts(all_contexts, n_results)
 
     except Exception as e:
         logger.error("search_company_context_by_type error: %s", e, exc_info=True)
@@ -1397,7 +1665,16 @@ def delete_company_rag_by_type(
         logger.info(
             "RAG data deleted by type %s (company_id: %s...)", ct_ja, company_id[:8]
         )
-        schedule_bm25_update(company_id, tenant_key=tenant_key)
+        invalidate_company_matrix(company_id, tenant_key)
+        from app.rag.bm25_refresh import remove_bm25_documents
+
+        _run_bm25_refresh(
+            remove_bm25_documents,
+            company_id,
+            tenant_key,
+            metadata_field="content_type",
+            values=[content_type],
+        )
         return deleted_any
     except Exception as e:
         logger.error("delete_company_rag_by_type error: %s", e, exc_info=True)
@@ -1468,7 +1745,10 @@ def delete_company_rag_by_urls(
             result["total_deleted"],
             company_id[:8],
         )
-        update_bm25_index(company_id, tenant_key=tenant_key)
+        invalidate_company_matrix(company_id, tenant_key)
+        from app.rag.bm25_refresh import remove_bm25_sources
+
+        remove_bm25_sources(company_id, tenant_key, source_urls)
         residual_chroma = 0
         for url in source_urls:
             residual_chroma += _count_chroma_records(
@@ -1510,18 +1790,32 @@ def delete_company_rag_by_urls(
 # ============================================================
 
 
-def schedule_bm25_update(company_id: str, tenant_key: str) -> None:
-    """Schedule BM25 index update in the background (fire-and-forget).
+def _run_bm25_refresh(func, *args, **kwargs) -> None:
+    """Run a BM25 refresh in the background (fire-and-forget).
 
-    If no event loop is running, falls back to synchronous update.
+    If no event loop is running, falls back to a synchronous update.
     """
-    import asyncio
-
     try:
         loop = asyncio.get_running_loop()
-        loop.create_task(asyncio.to_thread(update_bm25_index, company_id, tenant_key))
+        loop.create_task(asyncio.to_thread(func, *args, **kwargs))
     except RuntimeError:
-        update_bm25_index(company_id, tenant_key)
+        func(*args, **kwargs)
+
+
+def schedule_bm25_update(
+    company_id: str,
+    tenant_key: str,
+    source_urls: Optional[list[str]] = None,
+) -> None:
+    """Schedule BM25 index update in the background (fire-and-forget).
+
+    With ``source_urls`` only those sources are re-read and patched into the
+    index; without them the whole company index is rebuilt.
+    """
+    if source_urls:
+        _run_bm25_refresh(refresh_bm25_sources, company_id, tenant_key, source_urls)
+    else:
+        _run_bm25_refresh(update_bm25_index, company_id, tenant_key)
 
 
 def update_bm25_index(company_id: str, tenant_key: str) -> bool:
@@ -1532,6 +1826,14 @@ def update_bm25_index(company_id: str, tenant_key: str) -> bool:
     return _impl(company_id, tenant_key)
 
 
+def refresh_bm25_sources(company_id: str, tenant_key: str, source_urls: list[str]) -> bool:
+    """Compatibility wrapper for the per-source BM25 delta refresh."""
+
+    from app.rag.bm25_refresh import refresh_bm25_sources as _impl
+
+    return _impl(company_id, tenant_key, source_urls)
+
+
 async def hybrid_search_company_context(
     company_id: str,
     query: str,
@@ -1573,6 +1875,7 @@ async def hybrid_search_company_context_enhanced(
     short_circuit: bool = True,
     *,
     tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
 ) -> list[dict]:
     """Compatibility wrapper for enhanced hybrid retrieval orchestration."""
     from app.rag.retrieval import hybrid_search_company_context_enhanced as _impl
@@ -1591,6 +1894,7 @@ async def hybrid_search_company_context_enhanced(
         priority_source_urls=priority_source_urls,
         short_circuit=short_circuit,
         tenant_key=tenant_key,
+        budget=budget,
     )
 
 
@@ -1601,6 +1905,7 @@ async def get_enhanced_context_for_review(
     search_options: Optional[dict] = None,
     *,
     tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
 ) -> str:
     """Compatibility wrapper for enhanced review-context retrieval."""
     from app.rag.retrieval import get_enhanced_context_for_review as _impl
@@ -1611,6 +1916,7 @@ async def get_enhanced_context_for_review(
         max_context_length=max_context_length,
         search_options=search_options,
         tenant_key=tenant_key,
+        budget=budget,
     )
 
 
@@ -1621,6 +1927,7 @@ async def get_enhanced_context_for_review_with_sources(
     search_options: Optional[dict] = None,
     *,
     tenant_key: str,
+    budget: Optional[RetrievalBudget] = None,
 ) -> tuple[str, list[dict]]:
     """Compatibility wrapper for enhanced review-context retrieval with sources."""
     from app.rag.retrieval import get_enhanced_context_for_review_with_sources as _impl
@@ -1631,6 +1938,7 @@ async def get_enhanced_context_for_review_with_sources(
         max_context_length=max_context_length,
         search_options=search_options,
         tenant_key=tenant_key,
+        budget=budget,
     )
 
 
@@ -1660,30 +1968,38 @@ async def get_context_for_source_urls_with_sources(
     url_order = {url: index for index, url in enumerate(ordered_urls)}
     deduped_chunks: dict[tuple, dict] = {}
 
-    for backend in get_configured_backends():
-        for url in ordered_urls:
-            for name in _collection_names_for_backend(backend):
-                collection = _get_collection(name)
-                results = collection.get(
-                    where=_company_where(company_id, tenant_key, {"source_url": url}),
-                    include=["documents", "metadatas"],
-                )
-                documents = results.get("documents") or []
-                metadatas = results.get("metadatas") or []
-                ids = results.get("ids") or []
-                for doc, metadata, doc_id in zip(documents, metadatas, ids):
-                    text = _clean_direct_context_text(str(doc or ""))
-                    if not text:
-                        continue
-                    meta = metadata or {}
-                    context = {
-                        "id": doc_id,
-                        "text": text,
-                        "metadata": meta,
-                    }
-                    dedupe_key = _context_dedupe_key(context)
-                    if dedupe_key not in deduped_chunks:
-                        deduped_chunks[dedupe_key] = context
+    async def fetch(name: str, url: str) -> dict:
+        collection = await run_chroma_io(_get_collection, name)
+        return await aget(
+            collection,
+            where=_company_where(company_id, tenant_key, {"source_url": url}),
+            include=["documents", "metadatas"],
+        )
+
+    # Every (url, collection) read runs concurrently; results are merged in request order.
+    lookups = [
+        (name, url)
+        for backend in get_configured_backends()
+        for url in ordered_urls
+        for name in _collection_names_for_backend(backend)
+    ]
+    for results in await asyncio.gather(*(fetch(name, url) for name, url in lookups)):
+        documents = results.get("documents") or []
+        metadatas = results.get("metadatas") or []
+        ids = results.get("ids") or []
+        for doc, metadata, doc_id in zip(documents, metadatas, ids):
+            text = _clean_direct_context_text(str(doc or ""))
+            if not text:
+                continue
+            meta = metadata or {}
+            context = {
+                "id": doc_id,
+                "text": text,
+                "metadata": meta,
+            }
+            dedupe_key = _context_dedupe_key(context)
+            if dedupe_key not in deduped_chunks:
+                deduped_chunks[dedupe_key] = context
 
     if not deduped_chunks:
         return "", []
@@ -17,6 +17,7 @@ from app.utils.firecrawl import FirecrawlScrapeResult  # noqa: F401
 from app.config import settings
 from app.utils.secure_logger import get_logger
 from app.utils.embeddings import resolve_embedding_backend  # noqa: F401
+from app.rag.chroma_io import run_chroma_io
 from app.rag.vector_store import store_full_text_content  # noqa: F401
 from app.utils.web_search import (
     hybrid_web_search,  # noqa: F401
@@ -53,6 +54,8 @@ from app.routers.company_info_models import (
     GapAnalysisResponse,
     CrawlCorporateRequest,
     CrawlCorporateResponse,
+    IngestJobAcceptedResponse,
+    IngestJobStatusResponse,
     UploadCorporatePdfResponse,
     EstimateCorporatePdfResponse,
     CrawlCorporateEstimateResponse,
@@ -66,6 +69,12 @@ from app.routers import company_info_pdf as _company_info_pdf
 from app.services.company_info import build_rag_source as _rag_service
 from app.services.company_info import extract_deadlines as _deadline_service
 from app.services.company_info import fetch_schedule as _schedule_service
+from app.services.company_info.ingest_jobs import (
+    JOB_KIND_CRAWL,
+    JOB_KIND_PDF,
+    enqueue_ingest_job,
+    get_ingest_job_queue,
+)
 
 # ===== Re-exports from extracted modules =====
 # These symbols must remain importable from ``company_info`` because tests,
@@ -267,7 +276,7 @@ async def get_rag_status(
     """Check if a company has RAG data."""
     _assert_principal_owns_company(principal, company_id)
     tenant_key = require_tenant_key(principal)
-    return _get_rag_status_impl(company_id, tenant_key=tenant_key)
+    return await run_chroma_io(_get_rag_status_impl, company_id, tenant_key=tenant_key)
 
 
 @router.get(
@@ -282,7 +291,9 @@ async def get_detailed_rag_status(
     """Get detailed RAG status for a company."""
     _assert_principal_owns_company(principal, company_id)
     tenant_key = require_tenant_key(principal)
-    return _get_detailed_rag_status_impl(company_id, tenant_key=tenant_key)
+    return await run_chroma_io(
+        _get_detailed_rag_status_impl, company_id, tenant_key=tenant_key
+    )
 
 
 @router.post("/rag/gap-analysis", response_model=GapAnalysisResponse)
@@ -372,6 +383,20 @@ async def estimate_corporate_pdf_upload(
     )
 
 
+def _resolve_pdf_source_kind(
+    source_kind: object,
+    private_material_consent: object,
+    consent_reference: object,
+) -> tuple[str, Optional[str]]:
+    source_kind_value = source_kind if isinstance(source_kind, str) else "corporate_public"
+    consent_reference_value = consent_reference if isinstance(consent_reference, str) else None
+    if source_kind_value == "private_user_material" and (
+        not bool(private_material_consent) or not (consent_reference_value or "").strip()
+    ):
+        raise HTTPException(status_code=400, detail="私的資料の取り込みには明示的な同意が必要です。")
+    return source_kind_value, consent_reference_value
+
+
 @router.post("/rag/upload-pdf", response_model=UploadCorporatePdfResponse)
 @limiter.limit("60/minute")
 async def upload_corporate_pdf(
@@ -385,6 +410,7 @@ async def upload_corporate_pdf(
     source_kind: str = Form("corporate_public"),
     private_material_consent: bool = Form(False),
     consent_reference: Optional[str] = Form(None),
+    contextual_only: bool = Form(False),
     file: UploadFile = File(...),
     principal: CareerPrincipal = Depends(require_career_principal("company")),
 ):
@@ -392,12 +418,9 @@ async def upload_corporate_pdf(
     _assert_principal_owns_company(principal, company_id)
     filename = file.filename or "document.pdf"
     validate_pdf_upload_metadata(filename, file.content_type)
-    source_kind_value = source_kind if isinstance(source_kind, str) else "corporate_public"
-    consent_reference_value = consent_reference if isinstance(consent_reference, str) else None
-    if source_kind_value == "private_user_material" and (
-        not bool(private_material_consent) or not (consent_reference_value or "").strip()
-    ):
-        raise HTTPException(status_code=400, detail="私的資料の取り込みには明示的な同意が必要です。")
+    source_kind_value, consent_reference_value = _resolve_pdf_source_kind(
+        source_kind, private_material_consent, consent_reference
+    )
     pdf_bytes = await read_pdf_upload_bytes(file, request)
 
     return await _upload_pdf_impl(
@@ -412,6 +435,7 @@ async def upload_corporate_pdf(
         tenant_key=require_tenant_key(principal),
         source_kind=source_kind_value,
         consent_reference=consent_reference_value,
+        contextual_only=contextual_only,
     )
 
 
@@ -440,6 +464,100 @@ async def crawl_corporate_pages(
     return await _crawl_impl(payload, tenant_key=tenant_key)
 
 
+@router.post("/rag/jobs/crawl-corporate", response_model=IngestJobAcceptedResponse, status_code=202)
+@limiter.limit("60/minute")
+async def enqueue_crawl_corporate_job(
+    payload: CrawlCorporateRequest,
+    request: Request,
+    principal: CareerPrincipal = Depends(require_career_principal("company")),
+):
+    """Queue a corporate crawl as a background ingest job; poll ``/rag/jobs/{job_id}``."""
+    _assert_principal_owns_company(principal, payload.company_id)
+    tenant_key = require_tenant_key(principal)
+    job = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=tenant_key,
+        company_id=payload.company_id,
+        payload=payload.model_dump(),
+        urls=list(payload.urls),
+    )
+    return IngestJobAcceptedResponse(job_id=job.job_id, kind=job.kind, status=job.status)
+
+
+@router.post("/rag/jobs/upload-pdf", response_model=IngestJobAcceptedResponse, status_code=202)
+@limiter.limit("60/minute")
+async def enqueue_upload_pdf_job(
+    request: Request,
+    company_id: str = Form(...),
+    company_name: str = Form(...),
+    source_url: str = Form(...),
+    content_type: Optional[str] = Form(None),
+    content_channel: Optional[str] = Form(None),
+    billing_plan: str = Form("free"),
+    source_kind: str = Form("corporate_public"),
+    private_material_consent: bool = Form(False),
+    consent_reference: Optional[str] = Form(None),
+    contextual_only: bool = Form(False),
+    file: UploadFile = File(...),
+    principal: CareerPrincipal = Depends(require_career_principal("company")),
+):
+    """Queue a PDF upload (OCR + embedding) as a background ingest job."""
+    _assert_principal_owns_company(principal, company_id)
+    filename = file.filename or "document.pdf"
+    validate_pdf_upload_metadata(filename, file.content_type)
+    source_kind_value, consent_reference_value = _resolve_pdf_source_kind(
+        source_kind, private_material_consent, consent_reference
+    )
+    pdf_bytes = await read_pdf_upload_bytes(file, request)
+    job = await enqueue_ingest_job(
+        JOB_KIND_PDF,
+        tenant_key=require_tenant_key(principal),
+        company_id=company_id,
+        payload={
+            "company_id": company_id,
+            "company_name": company_name,
+            "source_url": source_url,
+            "content_type": content_type,
+            "content_channel": content_channel,
+            "billing_plan": billing_plan,
+            "filename": filename,
+            "source_kind": source_kind_value,
+            "consent_reference": consent_reference_value,
+            "contextual_only": contextual_only,
+        },
+        urls=[source_url],
+        blob=pdf_bytes,
+    )
+    return IngestJobAcceptedResponse(job_id=job.job_id, kind=job.kind, status=job.status)
+
+
+@router.get("/rag/jobs/{job_id}", response_model=IngestJobStatusResponse)
+@limiter.limit("120/minute")
+async def get_ingest_job_status(
+    job_id: str,
+    request: Request,
+    principal: CareerPrincipal = Depends(require_career_principal("company")),
+):
+    """Status, per-URL progress and (once finished) the result of an ingest job."""
+    job = await get_ingest_job_queue().get(job_id)
+    if job is None or job.tenant_key != require_tenant_key(principal):
+        raise HTTPException(status_code=404, detail="job not found")
+    _assert_principal_owns_company(principal, job.company_id)
+    return IngestJobStatusResponse(
+        job_id=job.job_id,
+        kind=job.kind,
+        status=job.status,
+        company_id=job.company_id,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        progress=[{"url": url, **entry} for url, entry in job.progress.items()],
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
 @router.post("/search-corporate-pages")
 @limiter.limit("60/minute")
 async def search_corporate_pages(
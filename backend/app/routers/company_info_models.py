@@ -205,6 +205,7 @@ class CrawlCorporateRequest(BaseModel):
     content_channel: Optional[str] = None
     content_type: Optional[str] = None
     billing_plan: Optional[str] = None
+    contextual_only: bool = False
 
 
 class CrawlCorporateResponse(BaseModel):
@@ -216,6 +217,27 @@ class CrawlCorporateResponse(BaseModel):
     url_content_types: dict[str, str] = {}
     page_routing_summaries: dict[str, dict[str, object]] = {}
     source_results: list[dict[str, object]] = []
+    crawl_telemetry: dict[str, object] = {}
+
+
+class IngestJobAcceptedResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+
+
+class IngestJobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    company_id: str
+    attempts: int
+    max_attempts: int
+    progress: list[dict[str, object]] = []
+    result: dict[str, object] | None = None
+    error: str | None = None
+    created_at: float
+    updated_at: float
 
 
 class UploadCorporatePdfResponse(BaseModel):
@@ -41,6 +41,9 @@ from app.utils.llm_prompt_safety import (
     sanitize_es_content,
     sanitize_prompt_input,
 )
+from app.rag.budget import retrieval_budget_from_settings
+from app.rag.chroma_io import run_chroma_io
+from app.rag.trace import consume_retrieval_trace, reset_retrieval_trace, start_retrieval_trace
 from app.rag.vector_store import (
     get_enhanced_context_for_review_with_sources,
     has_company_rag,
@@ -730,6 +733,7 @@ async def _generate_review_progress(
     if cancellation_token is not None:
         review_runner_kwargs["cancellation_token"] = cancellation_token
     set_request_llm_call_budget(FEATURE_LLM_CALL_BUDGETS.get("es_review"))
+    start_retrieval_trace()
     if "llm_provider" not in review_runner_kwargs or "llm_model" not in review_runner_kwargs:
         requested_model = request.llm_model.strip() if request.llm_model else None
         llm_provider, llm_model = resolve_feature_model_metadata(
@@ -850,6 +854,7 @@ async def _generate_review_progress(
         # Step 2: RAG fetch (if company_id)
         rag_context = ""
         rag_sources: list[dict] = []
+        rag_degraded_stages: list[str] = []
         company_rag_available = False
         context_length = get_dynamic_context_length(request.content)
         retrieval_query = request.retrieval_query or request.content
@@ -879,13 +884,15 @@ async def _generate_review_progress(
             )
             last_stream_activity = time.monotonic()
 
-            company_rag_available = has_company_rag(
+            company_rag_available = await run_chroma_io(
+                has_company_rag,
                 request.company_id,
                 tenant_key=tenant_key,
             )
 
             if company_rag_available:
                 min_context_length = max(0, settings.rag_min_context_chars)
+                rag_budget = retrieval_budget_from_settings()
                 rag_context, rag_sources = (
                     await get_enhanced_context_for_review_with_sources(
                         company_id=request.company_id,
@@ -893,8 +900,11 @@ async def _generate_review_progress(
                         max_context_length=context_length,
                         search_options=template_rag_profile,
                         tenant_key=tenant_key,
+                        budget=rag_budget,
                     )
                 )
+                if rag_budget is not None:
+                    rag_degraded_stages = list(rag_budget.degraded)
                 is_rag_available, rag_reason = _evaluate_template_rag_availability(
                     rag_context=rag_context,
                     rag_sources=rag_sources,
@@ -1067,6 +1077,8 @@ async def _generate_review_progress(
                 await review_task
             raise
 
+        if rag_degraded_stages and result.review_meta is not None:
+            result.review_meta.rag_degraded_stages = rag_degraded_stages
         result_payload = result.model_dump()
         final_rewrite_text = result.rewrites[0] if result.rewrites else ""
         explanation_text: str | None = None
@@ -1128,9 +1140,13 @@ async def _generate_review_progress(
             "billable": bool(result.rewrites),
             "schema_version": 1,
         }
+        internal_telemetry = consume_request_llm_cost_summary("es_review")
+        retrieval_trace = consume_retrieval_trace()
+        if retrieval_trace:
+            internal_telemetry = {**(internal_telemetry or {}), "retrieval_trace": retrieval_trace}
         yield _sse_event("complete", {
             "result": result_payload,
-            "internal_telemetry": consume_request_llm_cost_summary("es_review"),
+            "internal_telemetry": internal_telemetry,
         })
         last_stream_activity = time.monotonic()
 
@@ -1141,6 +1157,7 @@ async def _generate_review_progress(
         })
     finally:
         reset_request_llm_call_budget()
+        reset_retrieval_trace()
 
 
 def _build_review_streaming_response(
@@ -1172,7 +1189,7 @@ async def review_es_stream(
 
     Events:
     - progress: {"type": "progress", "step": "...", "progress": 0-100, "label": "..."}
-    - complete: {"type": "complete", "result": {..., "billing_outcome": {...}}, "internal_telemetry": {...}}
+    - complete: {"type": "complete", "result": {..., "billing_outcome": {...}}, "internal_telemetry": {..., "retrieval_trace": {...}}}
     - error: {"type": "error", "message": "..."}
     """
     request = payload
@@ -1269,7 +1286,8 @@ async def get_company_review_status(
             status_code=403,
             detail="career principal company_id mismatch",
         )
-    return evaluate_company_review_status(
+    return await run_chroma_io(
+        evaluate_company_review_status,
         company_id,
         tenant_key=require_tenant_key(principal),
     )
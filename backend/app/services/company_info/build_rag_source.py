@@ -2,11 +2,10 @@
 
 from __future__ import annotations
 
-import asyncio
 from dataclasses import dataclass
 import time
 from types import ModuleType
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 from urllib.parse import urlparse
 
 from fastapi import HTTPException
@@ -14,6 +13,10 @@ from fastapi import HTTPException
 from app.utils.cache import get_rag_cache
 from app.utils.content_types import CONTENT_TYPES
 from app.utils.secure_logger import get_logger
+from app.rag.chroma_io import run_chroma_io
+from app.rag.ingest_pipeline import CompanyIngestPipeline
+from app.rag.telemetry import record_ingest_stage
+from app.services.company_info.crawl_scheduler import CrawlScheduler, summarize_outcomes
 from app.rag.vector_store import (
     delete_company_rag_by_type,
     delete_company_rag_by_urls,
@@ -312,7 +315,9 @@ async def get_rag_context_impl(
 ) -> RagContextResponse:
     request = payload
     try:
-        rag_exists = has_company_rag(request.company_id, tenant_key=tenant_key)
+        rag_exists = await run_chroma_io(
+            has_company_rag, request.company_id, tenant_key=tenant_key
+        )
 
         if not rag_exists:
             return RagContextResponse(
@@ -415,8 +420,11 @@ async def analyze_rag_gap_impl(
 async def delete_rag_impl(company_id: str, *, tenant_key: str) -> dict:
     cache = get_rag_cache()
     if cache:
-        await cache.invalidate_company(company_id, tenant_key=tenant_key)
-    receipt = delete_company_rag_with_receipt(company_id, tenant_key=tenant_key)
+        # Full deletion must not leave cached excerpts behind until TTL.
+        await cache.invalidate_company(company_id, tenant_key=tenant_key, hard=True)
+    receipt = await run_chroma_io(
+        delete_company_rag_with_receipt, company_id, tenant_key=tenant_key
+    )
     return {
         "success": receipt.complete,
         "company_id": company_id,
@@ -440,7 +448,9 @@ async def delete_rag_by_type_impl(
             detail=f"Invalid content_type: {content_type}. Valid types: {CONTENT_TYPES}",
         )
 
-    success = delete_company_rag_by_type(company_id, content_type, tenant_key=tenant_key)
+    success = await run_chroma_io(
+        delete_company_rag_by_type, company_id, content_type, tenant_key=tenant_key
+    )
     cache = get_rag_cache()
     if cache:
         await cache.invalidate_company(company_id, tenant_key=tenant_key)
@@ -464,7 +474,8 @@ async def delete_rag_by_urls_impl(
         )
 
     try:
-        result = delete_company_rag_by_urls(
+        result = await run_chroma_io(
+            delete_company_rag_by_urls,
             company_id,
             request.urls,
             tenant_key=tenant_key,
@@ -544,6 +555,8 @@ async def upload_corporate_pdf_impl(
     tenant_key: str,
     source_kind: str = "corporate_public",
     consent_reference: str | None = None,
+    ingest_session_seed: str | None = None,
+    contextual_only: bool = False,
 ) -> UploadCorporatePdfResponse:
     runtime = _require_rag_runtime()
     resolve_embedding_backend = runtime.resolve_embedding_backend
@@ -583,14 +596,15 @@ async def upload_corporate_pdf_impl(
             ],
         )
 
-    routing = await _extract_text_from_pdf_with_page_routing(
-        pdf_bytes=pdf_bytes,
-        filename=filename,
-        billing_plan=plan,
-        content_type=content_type,
-        source_kind=source_kind,
-        feature="company_info",
-    )
+    with record_ingest_stage("extract"):
+        routing = await _extract_text_from_pdf_with_page_routing(
+            pdf_bytes=pdf_bytes,
+            filename=filename,
+            billing_plan=plan,
+            content_type=content_type,
+            source_kind=source_kind,
+            feature="company_info",
+        )
 
     extracted_text = str(routing["text"] or "")
     extraction_method = str(routing["extraction_method"])
@@ -647,20 +661,26 @@ async def upload_corporate_pdf_impl(
         else "corporate_general"
     )
 
-    result = await store_full_text_content(
+    async with CompanyIngestPipeline(
         company_id=company_id,
-        company_name=company_name,
-        raw_text=extracted_text,
-        source_url=source_url,
-        content_type=content_type,
-        content_channel=channel,
-        backend=backend,
-        raw_format="text",
         tenant_key=tenant_key,
-        source_kind=source_kind,
-        source_id=source_url,
-        consent_reference=consent_reference,
-    )
+        session_seed=ingest_session_seed,
+        contextual_only=contextual_only,
+    ):
+        result = await store_full_text_content(
+            company_id=company_id,
+            company_name=company_name,
+            raw_text=extracted_text,
+            source_url=source_url,
+            content_type=content_type,
+            content_channel=channel,
+            backend=backend,
+            raw_format="text",
+            tenant_key=tenant_key,
+            source_kind=source_kind,
+            source_id=source_url,
+            consent_reference=consent_reference,
+        )
 
     if not result["success"]:
         _pdf_ingest_telemetry_line(
@@ -753,17 +773,19 @@ async def _process_crawl_source(
     runtime = _require_rag_runtime()
     store_full_text_content = runtime.store_full_text_content
 
-    payload = await runtime.fetch_page_content(url)
+    with record_ingest_stage("fetch"):
+        payload = await runtime.fetch_page_content(url)
 
     if _looks_like_pdf_payload(url, payload):
-        routing = await _extract_text_from_pdf_with_page_routing(
-            pdf_bytes=payload,
-            filename=urlparse(url).path.split("/")[-1] or "document.pdf",
-            billing_plan=billing_plan,
-            content_type=content_type,
-            source_kind="crawl",
-            feature="company_info",
-        )
+        with record_ingest_stage("extract"):
+            routing = await _extract_text_from_pdf_with_page_routing(
+                pdf_bytes=payload,
+                filename=urlparse(url).path.split("/")[-1] or "document.pdf",
+                billing_plan=billing_plan,
+                content_type=content_type,
+                source_kind="crawl",
+                feature="company_info",
+            )
         page_routing_summary = dict(routing["page_routing_summary"])
         text = str(routing["text"] or "").strip()
         if len(text) < 100:
@@ -830,7 +852,8 @@ async def _process_crawl_source(
             "chunks_stored": 0,
         }
 
-    text = extract_text_from_html(payload)
+    with record_ingest_stage("extract"):
+        text = extract_text_from_html(payload)
     if not text or len(text) < 100 or _is_garbled_text(text):
         return {
             "success": False,
@@ -1024,7 +1047,17 @@ async def crawl_corporate_pages_impl(
     payload: CrawlCorporateRequest,
     *,
     tenant_key: str,
+    ingest_session_seed: Optional[str] = None,
+    on_source_progress: Optional[Callable[[str, str, dict[str, object]], Awaitable[None]]] = None,
 ) -> CrawlCorporateResponse:
+    """
+    Crawl ``payload.urls`` and store them in company RAG.
+
+    ``ingest_session_seed`` and ``on_source_progress`` are set by the background
+    ingest job runner: the seed makes each URL's ingest session replayable on
+    retry and the callback receives ``(url, status, source_result)`` as URLs
+    start and finish.
+    """
     runtime = _require_rag_runtime()
     resolve_embedding_backend = runtime.resolve_embedding_backend
 
@@ -1058,7 +1091,9 @@ async def crawl_corporate_pages_impl(
             source_results=[],
         )
 
-    for url in request.urls:
+    async def crawl_one(url: str) -> dict[str, Any]:
+        if on_source_progress is not None:
+            await on_source_progress(url, "running", {})
         try:
             source_result = await _process_crawl_source(
                 company_id=request.company_id,
@@ -1071,6 +1106,38 @@ async def crawl_corporate_pages_impl(
                 store_result=True,
                 tenant_key=tenant_key,
             )
+        except Exception as exc:
+            if on_source_progress is not None:
+                await on_source_progress(url, "failed", {"error": str(getattr(exc, "detail", exc))[:100]})
+            raise
+        if on_source_progress is not None:
+            await on_source_progress(
+                url,
+                "completed" if source_result.get("success") else "failed",
+                source_result,
+            )
+        return source_result
+
+    # URL は並行に処理し、同一ホストへの間隔はホスト単位のトークンバケットで守る。
+    # 保存は共有 ingest パイプラインに流し、BM25 更新とキャッシュ無効化はクロール末尾で 1 回だけ行う。
+    scheduler = CrawlScheduler()
+    crawl_started = time.perf_counter()
+    async with CompanyIngestPipeline(
+        company_id=request.company_id,
+        tenant_key=tenant_key,
+        session_seed=ingest_session_seed,
+        contextual_only=request.contextual_only,
+    ):
+        outcomes = await scheduler.run(list(request.urls), crawl_one)
+    crawl_telemetry = summarize_outcomes(outcomes, (time.perf_counter() - crawl_started) * 1000)
+    crawl_telemetry["max_concurrency"] = scheduler.max_concurrency
+
+    for outcome in outcomes:
+        url = outcome.url
+        try:
+            if outcome.error is not None:
+                raise outcome.error
+            source_result = outcome.result
 
             if not source_result["success"]:
                 errors.append(f"{url}: {source_result['error']}")
@@ -1095,8 +1162,6 @@ async def crawl_corporate_pages_impl(
                 **source_result,
             })
 
-            await asyncio.sleep(1)
-
         except HTTPException as e:
             errors.append(f"{url}: {e.detail}")
             source_results.append({
@@ -1133,4 +1198,5 @@ async def crawl_corporate_pages_impl(
         url_content_types=url_content_types,
         page_routing_summaries=page_routing_summaries,
         source_results=source_results,
+        crawl_telemetry=crawl_telemetry,
     )
@@ -0,0 +1,541 @@
+"""Background ingest jobs for corporate crawl and PDF upload.
+
+OCR and embedding of a large IR PDF, or a crawl of many pages, can outlive
+proxy timeouts when run inside the HTTP request. The job endpoints enqueue an
+``IngestJob`` and return its id; ``IngestJobWorkerPool`` (started with the app,
+``INGEST_JOB_WORKERS``) runs the existing crawl / upload impls and records
+per-URL progress on the job, which clients poll via ``GET /rag/jobs/{job_id}``.
+
+Queue: Redis when ``REDIS_URL`` is configured, otherwise an in-process
+stand-in with the same interface (tests, local dev). Both keep one FIFO per
+tenant and serve tenants round-robin, so a bulk import by one user only takes
+one turn per rotation instead of starving everyone queued behind it.
+
+Retries: a failed attempt is re-queued up to ``INGEST_JOB_MAX_ATTEMPTS``. The
+job id seeds each source's ``ingest_session_id``, so a retried URL replaces the
+partial writes of the previous attempt; URLs already completed are skipped.
+
+Leases: popping a job takes a lease (``INGEST_JOB_LEASE_SECONDS``) that the
+worker extends with a heartbeat while the job runs. A job cancelled by shutdown
+is put back on the queue; a job whose worker died (crash, OOM) keeps an
+expired lease, and the pool's reaper (run at startup and periodically) puts it
+back as a new attempt.
+
+On Redis every key the queue scripts touch is passed in ``KEYS`` and shares the
+``{ingest_queue}`` hash tag, so the scripts also run on Redis Cluster.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+try:
+    import redis.asyncio as redis_asyncio
+except Exception:  # pragma: no cover - redis lib missing in minimal envs
+    redis_asyncio = None
+
+from app.config import settings
+from app.services.company_info import build_rag_source as _rag_service
+from app.utils.redis_keys import redis_key
+from app.utils.secure_logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_KIND_CRAWL = "crawl_corporate"
+JOB_KIND_PDF = "upload_pdf"
+TERMINAL_STATUSES = {"completed", "failed"}
+
+ProgressCallback = Callable[[str, str, dict[str, object]], Awaitable[None]]
+
+
+@dataclass
+class IngestJob:
+    job_id: str
+    kind: str
+    tenant_key: str
+    company_id: str
+    payload: dict[str, Any]
+    status: str = "queued"
+    attempts: int = 0
+    max_attempts: int = 3
+    progress: dict[str, dict[str, Any]] = field(default_factory=dict)
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "IngestJob":
+        return cls(**json.loads(raw))
+
+
+class InMemoryIngestJobQueue:
+    """Process-local queue with per-tenant FIFOs served round-robin."""
+
+    def __init__(self) -> None:
+        self._jobs: dict[str, str] = {}
+        self._blobs: dict[str, bytes] = {}
+        self._queues: dict[str, deque[str]] = {}
+        self._ring: deque[str] = deque()
+        self._leases: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def save(self, job: IngestJob) -> None:
+        job.updated_at = time.time()
+        self._jobs[job.job_id] = job.to_json()
+
+    async def get(self, job_id: str) -> Optional[IngestJob]:
+        raw = self._jobs.get(job_id)
+        return IngestJob.from_json(raw) if raw else None
+
+    async def put_blob(self, job_id: str, blob: bytes) -> None:
+        self._blobs[job_id] = blob
+
+    async def get_blob(self, job_id: str) -> Optional[bytes]:
+        return self._blobs.get(job_id)
+
+    async def delete_blob(self, job_id: str) -> None:
+        self._blobs.pop(job_id, None)
+
+    async def push(self, job: IngestJob) -> None:
+        async with self._lock:
+            self._leases.pop(job.job_id, None)
+            queue = self._queues.get(job.tenant_key)
+            if queue is None:
+                queue = self._queues[job.tenant_key] = deque()
+                self._ring.append(job.tenant_key)
+            queue.append(job.job_id)
+
+    async def pop(self) -> Optional[str]:
+        async with self._lock:
+            if not self._ring:
+                return None
+            tenant_key = self._ring.popleft()
+            queue = self._queues[tenant_key]
+            job_id = queue.popleft()
+            if queue:
+                self._ring.append(tenant_key)
+            else:
+                del self._queues[tenant_key]
+            self._leases[job_id] = _lease_deadline()
+            return job_id
+
+    async def extend_lease(self, job_id: str) -> bool:
+        if job_id not in self._leases:
+            return False
+        self._leases[job_id] = _lease_deadline()
+        return True
+
+    async def release(self, job_id: str) -> None:
+        self._leases.pop(job_id, None)
+
+    async def claim_expired(self, now: float) -> list[str]:
+        expired = [job_id for job_id, deadline in self._leases.items() if deadline <= now]
+        for job_id in expired:
+            del self._leases[job_id]
+        return expired
+
+
+def _lease_deadline() -> float:
+    return time.time() + max(1, settings.ingest_job_lease_seconds)
+
+
+# Tenants with queued jobs sit in a ring list; a tenant is in the ring iff its queue is non-empty.
+# KEYS: ring, tenant queue, leases / ARGV: tenant, job_id
+_PUSH_SCRIPT = """
+redis.call('ZREM', KEYS[3], ARGV[2])
+redis.call('RPUSH', KEYS[2], ARGV[2])
+if redis.call('LLEN', KEYS[2]) == 1 then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return 1
+"""
+
+# Pops from the tenant the caller just rotated to the tail of the ring, and leases the job.
+# KEYS: ring, tenant queue, leases / ARGV: tenant, lease deadline
+_POP_SCRIPT = """
+local job_id = redis.call('LPOP', KEYS[2])
+if redis.call('LLEN', KEYS[2]) == 0 then
+    redis.call('LREM', KEYS[1], 0, ARGV[1])
+end
+if job_id then
+    redis.call('ZADD', KEYS[3], ARGV[2], job_id)
+end
+return job_id
+"""
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class RedisIngestJobQueue:
+    """Redis-backed queue shared by every API process (same interface as the in-memory one)."""
+
+    def __init__(self, client: Any) -> None:
+        self._redis = client
+        self._ttl = max(60, settings.ingest_job_ttl_seconds)
+
+    def _job_key(self, job_id: str) -> str:
+        return redis_key("ingest", "job", job_id)
+
+    def _blob_key(self, job_id: str) -> str:
+        return redis_key("ingest", "blob", job_id)
+
+    def _ring_key(self) -> str:
+        return redis_key("{ingest_queue}", "tenants")
+
+    def _queue_key(self, tenant_key: str) -> str:
+        return redis_key("{ingest_queue}", "queue", tenant_key)
+
+    def _lease_key(self) -> str:
+        return redis_key("{ingest_queue}", "leases")
+
+    async def save(self, job: IngestJob) -> None:
+        job.updated_at = time.time()
+        await self._redis.set(self._job_key(job.job_id), job.to_json(), ex=self._ttl)
+
+    async def get(self, job_id: str) -> Optional[IngestJob]:
+        raw = await self._redis.get(self._job_key(job_id))
+        return IngestJob.from_json(raw) if raw else None
+
+    async def put_blob(self, job_id: str, blob: bytes) -> None:
+        await self._redis.set(self._blob_key(job_id), blob, ex=self._ttl)
+
+    async def get_blob(self, job_id: str) -> Optional[bytes]:
+        return await self._redis.get(self._blob_key(job_id))
+
+    async def delete_blob(self, job_id: str) -> None:
+        await self._redis.delete(self._blob_key(job_id))
+
+    async def push(self, job: IngestJob) -> None:
+        await self._redis.eval(
+            _PUSH_SCRIPT,
+            3,
+            self._ring_key(),
+            self._queue_key(job.tenant_key),
+            self._lease_key(),
+            job.tenant_key,
+            job.job_id,
+        )
+
+    async def pop(self) -> Optional[str]:
+        # Each pass rotates one tenant to the tail; a tenant drained by another worker
+        # in between is simply skipped, so the loop is bounded by the ring length.
+        for _ in range(await self._redis.llen(self._ring_key()) + 1):
+            tenant = await self._redis.lmove(self._ring_key(), self._ring_key(), "LEFT", "RIGHT")
+            if tenant is None:
+                return None
+            tenant_key = _decode(tenant)
+            job_id = await self._redis.eval(
+                _POP_SCRIPT,
+                3,
+                self._ring_key(),
+                self._queue_key(tenant_key),
+                self._lease_key(),
+                tenant_key,
+                _lease_deadline(),
+            )
+            if job_id:
+                return _decode(job_id)
+        return None
+
+    async def extend_lease(self, job_id: str) -> bool:
+        return bool(await self._redis.zadd(self._lease_key(), {job_id: _lease_deadline()}, xx=True, ch=True))
+
+    async def release(self, job_id: str) -> None:
+        await self._redis.zrem(self._lease_key(), job_id)
+
+    async def claim_expired(self, now: float) -> list[str]:
+        claimed = []
+        for raw in await self._redis.zrangebyscore(self._lease_key(), "-inf", now):
+            job_id = _decode(raw)
+            # ZREM succeeds for exactly one reaper across processes.
+            if await self._redis.zrem(self._lease_key(), job_id):
+                claimed.append(job_id)
+        return claimed
+
+
+_queue: Optional[InMemoryIngestJobQueue | RedisIngestJobQueue] = None
+
+
+def get_ingest_job_queue() -> InMemoryIngestJobQueue | RedisIngestJobQueue:
+    global _queue
+    if _queue is None:
+        if redis_asyncio is not None and settings.redis_url:
+            _queue = RedisIngestJobQueue(redis_asyncio.from_url(settings.redis_url))
+        else:
+            if settings.is_deployed:
+                logger.warning("[取込ジョブ] REDIS_URL 未設定のためプロセス内キューで実行します")
+            _queue = InMemoryIngestJobQueue()
+    return _queue
+
+
+def _reset_ingest_job_queue_for_tests(
+    queue: Optional[InMemoryIngestJobQueue | RedisIngestJobQueue] = None,
+) -> None:
+    global _queue
+    _queue = queue
+
+
+async def enqueue_ingest_job(
+    kind: str,
+    *,
+    tenant_key: str,
+    company_id: str,
+    payload: dict[str, Any],
+    urls: list[str],
+    blob: Optional[bytes] = None,
+) -> IngestJob:
+    """Persist a new job (and its binary payload) and queue it for the worker pool."""
+    queue = get_ingest_job_queue()
+    job = IngestJob(
+        job_id=uuid4().hex,
+        kind=kind,
+        tenant_key=tenant_key,
+        company_id=company_id,
+        payload=payload,
+        max_attempts=max(1, settings.ingest_job_max_attempts),
+        progress={url: {"status": "queued"} for url in urls},
+    )
+    if blob is not None:
+        await queue.put_blob(job.job_id, blob)
+    await queue.save(job)
+    await queue.push(job)
+    return job
+
+
+async def _run_crawl_job(job: IngestJob, report: ProgressCallback) -> dict[str, Any]:
+    request = _rag_service.CrawlCorporateRequest(**job.payload)
+    done = [
+        url for url in request.urls
+        if job.progress.get(url, {}).get("status") == "completed"
+    ]
+    remaining = [url for url in request.urls if url not in done]
+    response = await _rag_service.crawl_corporate_pages_impl(
+        request.model_copy(update={"urls": remaining}),
+        tenant_key=job.tenant_key,
+        ingest_session_seed=job.job_id,
+        on_source_progress=report,
+    )
+    result = response.model_dump()
+    # URLs completed by an earlier attempt keep their stored data and result.
+    previous = [dict(job.progress[url].get("result") or {"url": url}) for url in done]
+    result["source_results"] = previous + list(result["source_results"])
+    result["pages_crawled"] += sum(int(item.get("pages_crawled") or 0) for item in previous)
+    result["chunks_stored"] += sum(int(item.get("chunks_stored") or 0) for item in previous)
+    result["success"] = result["pages_crawled"] > 0
+    return result
+
+
+async def _run_pdf_job(job: IngestJob, report: ProgressCallback) -> dict[str, Any]:
+    pdf_bytes = await get_ingest_job_queue().get_blob(job.job_id)
+    if pdf_bytes is None:
+        raise HTTPException(status_code=410, detail="PDF payload expired")
+    source_url = str(job.payload["source_url"])
+    await report(source_url, "running", {})
+    response = await _rag_service.upload_corporate_pdf_impl(
+        **job.payload,
+        pdf_bytes=pdf_bytes,
+        tenant_key=job.tenant_key,
+        ingest_session_seed=job.job_id,
+    )
+    await report(source_url, "completed" if response.success else "failed", response.model_dump())
+    return response.model_dump()
+
+
+JOB_HANDLERS: dict[str, Callable[[IngestJob, ProgressCallback], Awaitable[dict[str, Any]]]] = {
+    JOB_KIND_CRAWL: _run_crawl_job,
+    JOB_KIND_PDF: _run_pdf_job,
+}
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    # Request errors (bad channel, expired payload) fail the same way on every attempt.
+    return not (isinstance(exc, HTTPException) and 400 <= exc.status_code < 500)
+
+
+def _reset_unfinished_progress(job: IngestJob) -> None:
+    for entry in job.progress.values():
+        if entry.get("status") != "completed":
+            entry["status"] = "queued"
+
+
+async def _finish(queue: InMemoryIngestJobQueue | RedisIngestJobQueue, job: IngestJob) -> IngestJob:
+    await queue.save(job)
+    await queue.release(job.job_id)
+    await queue.delete_blob(job.job_id)
+    return job
+
+
+async def _heartbeat(
+    queue: InMemoryIngestJobQueue | RedisIngestJobQueue,
+    job_id: str,
+    handler: asyncio.Task,
+) -> None:
+    """Keep extending the lease of ``job_id``; cancel ``handler`` and return once the lease is lost."""
+    interval = max(1, settings.ingest_job_lease_seconds) / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if not await queue.extend_lease(job_id):
+                logger.warning("[取込ジョブ] lease lost while running, cancelling (job_id: %s)", job_id)
+                handler.cancel()
+                return
+        except Exception as exc:
+            logger.warning("[取込ジョブ] lease heartbeat failed: %s", exc)
+
+
+async def process_ingest_job(job_id: str) -> Optional[IngestJob]:
+    """Run one attempt of ``job_id`` (leased by ``pop``); re-queue it on a retryable failure."""
+    queue = get_ingest_job_queue()
+    job = await queue.get(job_id)
+    if job is None or job.status in TERMINAL_STATUSES:
+        await queue.release(job_id)
+        return job
+    job.status = "running"
+    job.attempts += 1
+    job.error = None
+    await queue.save(job)
+
+    async def report(url: str, status: str, detail: dict[str, object]) -> None:
+        entry: dict[str, Any] = {"status": status}
+        if status == "completed":
+            entry["result"] = {"url": url, **detail}
+        elif detail.get("error"):
+            entry["error"] = str(detail["error"])[:200]
+        job.progress[url] = entry
+        await queue.save(job)
+
+    handler = asyncio.create_task(JOB_HANDLERS[job.kind](job, report))
+    heartbeat = asyncio.create_task(_heartbeat(queue, job_id, handler))
+    try:
+        job.result = await handler
+        job.status = "completed"
+    except asyncio.CancelledError:
+        if heartbeat.done() and not heartbeat.cancelled() and not asyncio.current_task().cancelling():
+            # The reaper already re-queued the job (possibly to another worker): leave it alone.
+            logger.warning("[取込ジョブ] attempt abandoned after losing the lease (job_id: %s)", job_id)
+            return job
+        # Shutdown is not the job's fault: hand it back without using up an attempt.
+        logger.warning("[取込ジョブ] cancelled while running, re-queued (job_id: %s)", job_id)
+        job.status = "queued"
+        job.attempts -= 1
+        _reset_unfinished_progress(job)
+        await queue.save(job)
+        await queue.push(job)
+        raise
+    except Exception as exc:
+        job.error = str(getattr(exc, "detail", exc))[:200]
+        if _is_retryable(exc) and job.attempts < job.max_attempts:
+            logger.warning("[取込ジョブ] attempt %d failed, retrying: %s", job.attempts, job.error)
+            job.status = "queued"
+            _reset_unfinished_progress(job)
+            await queue.save(job)
+            await queue.push(job)
+            return job
+        logger.error("[取込ジョブ] failed after %d attempts: %s", job.attempts, job.error)
+        job.status = "failed"
+    finally:
+        heartbeat.cancel()
+
+    return await _finish(queue, job)
+
+
+async def requeue_expired_ingest_jobs(now: Optional[float] = None) -> list[str]:
+    """Put jobs whose lease expired (worker crash / OOM) back on the queue as a new attempt."""
+    queue = get_ingest_job_queue()
+    requeued = []
+    for job_id in await queue.claim_expired(time.time() if now is None else now):
+        job = await queue.get(job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            continue
+        job.error = "worker lost while running"
+        if job.attempts >= job.max_attempts:
+            logger.error("[取込ジョブ] lease expired after %d attempts (job_id: %s)", job.attempts, job_id)
+            job.status = "failed"
+            await _finish(queue, job)
+            continue
+        logger.warning("[取込ジョブ] lease expired, re-queued (job_id: %s)", job_id)
+        job.status = "queued"
+        _reset_unfinished_progress(job)
+        await queue.save(job)
+        await queue.push(job)
+        requeued.append(job_id)
+    return requeued
+
+
+class IngestJobWorkerPool:
+    """``workers`` asyncio tasks pulling jobs from the queue, plus a reaper for expired leases."""
+
+    def __init__(self, workers: int, *, poll_interval: float = 0.5):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"ingest-job-worker-{index}")
+            for index in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._reap(), name="ingest-job-reaper"))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job_id = await get_ingest_job_queue().pop()
+            except Exception as exc:
+                logger.warning("[取込ジョブ] dequeue failed: %s", exc)
+                job_id = None
+            if job_id is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                await process_ingest_job(job_id)
+            except Exception as exc:
+                logger.error("[取込ジョブ] worker error: %s", exc, exc_info=True)
+
+    async def _reap(self) -> None:
+        # The first pass runs at startup and recovers jobs orphaned by a previous process.
+        while True:
+            try:
+                await requeue_expired_ingest_jobs()
+            except Exception as exc:
+                logger.warning("[取込ジョブ] lease recovery failed: %s", exc)
+            await asyncio.sleep(max(1, settings.ingest_job_lease_seconds) / 2)
+
+
+_worker_pool: Optional[IngestJobWorkerPool] = None
+
+
+def start_ingest_job_workers() -> None:
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = IngestJobWorkerPool(settings.ingest_job_workers)
+    _worker_pool.start()
+
+
+async def stop_ingest_job_workers() -> None:
+    global _worker_pool
+    if _worker_pool is not None:
+        await _worker_pool.stop()
+        _worker_pool = None
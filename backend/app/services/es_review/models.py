@@ -255,6 +255,7 @@ class ReviewMeta(BaseModel):
     unfinished_tail_detected: bool = False
     retrieval_profile_name: Optional[str] = None
     priority_source_match_count: int = 0
+    rag_degraded_stages: list[str] = Field(default_factory=list)
     ai_smell_tier: int = 0
     hallucination_tier: int = 0
     validation_profile_name: str = "strict"
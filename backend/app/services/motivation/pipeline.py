@@ -16,6 +16,7 @@ from app.prompts.motivation_prompts import MOTIVATION_EVALUATION_PROMPT
 from app.utils.llm import call_llm_with_error
 from app.utils.llm_prompt_safety import sanitize_prompt_input
 from app.utils.secure_logger import get_logger
+from app.rag.budget import retrieval_budget_from_settings
 from app.rag.vector_store import get_enhanced_context_for_review_with_sources
 from app.services.motivation.context import (
     CONVERSATION_MODE_DEEPDIVE,
@@ -124,12 +125,16 @@ async def _get_company_context(
         if not query:
             query = _build_adaptive_rag_query(scores, query)
         query = _augment_rag_query_with_role(query, role_hint)
+        budget = retrieval_budget_from_settings()
         context, sources = await get_enhanced_context_for_review_with_sources(
             company_id=company_id,
             es_content=query,
             max_context_length=2000,
             tenant_key=tenant_key,
+            budget=budget,
         )
+        if budget is not None and budget.degraded:
+            logger.info(f"[Motivation] RAG stages degraded by latency budget: {budget.degraded}")
         return context, sources
     except Exception as e:
         logger.error(f"[Motivation] RAG context error: {e}")
@@ -3,17 +3,28 @@ BM25 Index Store Module
 
 Provides BM25 (keyword) search indexing with persistence.
 Used for hybrid search combining with semantic search.
+
+On-disk format (version 2, ``<tenant_key>__<company_id>.bm25``): a single
+binary file with a small JSON header followed by 8-byte aligned sections
+(vocabulary, document ids, token-id arrays, the precomputed bm25s sparse
+score matrix and a separate text/metadata store). The file is opened with
+``mmap`` so a cold load only parses the header; documents are decoded on
+demand. Version 1 JSON files are still readable and can be converted with
+``migrate_legacy_json_indexes``.
 """
 
 import json
+import mmap
 import os
 import re
+import struct
 import tempfile
 import time
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 from dataclasses import dataclass, field
 
+import numpy as np
 from cachetools import LRUCache
 
 from app.utils.secure_logger import get_logger
@@ -34,9 +45,18 @@ from app.utils.japanese_tokenizer import tokenize_with_domain_expansion
 # BM25 index persistence directory
 BM25_PERSIST_DIR = Path(__file__).parent.parent.parent / "data" / "bm25"
 
-# Current JSON format version for schema validation
+# Legacy JSON format version (read + migrate only)
 BM25_FORMAT_VERSION = 1
 
+# Current binary format version
+BM25_BINARY_FORMAT_VERSION = 2
+BM25_BINARY_MAGIC = b"CCBM25\x00\x00"
+BM25_BINARY_SUFFIX = ".bm25"
+
+_HEADER_LEN = struct.Struct("<I")
+_SECTION_ALIGN = 8
+_SEPARATOR = b"\x00"
+
 _BM25_STORAGE_KEY_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,127}$")
 
 
@@ -60,6 +80,32 @@ def _index_file_stem(company_id: str, tenant_key: str) -> str:
     return f"{safe_tenant_key}__{safe_company_id}"
 
 
+def _binary_path(stem: str) -> Path:
+    return BM25_PERSIST_DIR / f"{stem}{BM25_BINARY_SUFFIX}"
+
+
+def _json_path(stem: str) -> Path:
+    return BM25_PERSIST_DIR / f"{stem}.json"
+
+
+def _persisted_path(company_id: str, tenant_key: str) -> Optional[Path]:
+    """Return the file an index would be loaded from (binary preferred)."""
+    stem = _index_file_stem(company_id, tenant_key)
+    for path in (_binary_path(stem), _json_path(stem)):
+        if path.exists():
+            return path
+    return None
+
+
+def _persisted_mtime_ns(path: Optional[Path]) -> Optional[int]:
+    if path is None:
+        return None
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
 def _cache_key(company_id: str, tenant_key: str) -> str:
     """Build the LRU cache key."""
     safe_tenant_key = _validate_storage_key(tenant_key, name="tenant_key")
@@ -67,6 +113,15 @@ def _cache_key(company_id: str, tenant_key: str) -> str:
     return f"{safe_tenant_key}__{safe_company_id}"
 
 
+def _move_corrupted(path: Path) -> None:
+    corrupted_path = path.with_suffix(f"{path.suffix}.corrupted.{int(time.time())}")
+    try:
+        path.rename(corrupted_path)
+        logger.warning("Moved corrupted BM25 file to: %s", corrupted_path)
+    except Exception as rename_error:
+        logger.warning("Could not move corrupted BM25 file: %s", rename_error)
+
+
 @dataclass
 class BM25Document:
     """A document in the BM25 index."""
@@ -77,6 +132,122 @@ class BM25Document:
     metadata: dict = field(default_factory=dict)
 
 
+class _MappedIndexFile:
+    """Read-only, memory-mapped view of a version 2 BM25 file."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic_len = len(BM25_BINARY_MAGIC)
+            if self._mm[:magic_len] != BM25_BINARY_MAGIC:
+                raise ValueError("not a BM25 binary index")
+            (header_len,) = _HEADER_LEN.unpack_from(self._mm, magic_len)
+            header_start = magic_len + _HEADER_LEN.size
+            self.header: dict = json.loads(
+                self._mm[header_start:header_start + header_len].decode("utf-8")
+            )
+            if self.header.get("version") != BM25_BINARY_FORMAT_VERSION:
+                raise ValueError(f"unsupported BM25 binary version {self.header.get('version')}")
+            self.num_docs = int(self.header["num_docs"])
+            self._sections: dict[str, dict] = self.header["sections"]
+            self._data_start = _align(header_start + header_len)
+        except Exception:
+            self._mm.close()
+            raise
+        self._terms: Optional[list[str]] = None
+        self._doc_ids: Optional[list[str]] = None
+
+    def has(self, name: str) -> bool:
+        return name in self._sections
+
+    def array(self, name: str) -> np.ndarray:
+        section = self._sections[name]
+        return np.frombuffer(
+            self._mm,
+            dtype=np.dtype(section["dtype"]),
+            count=int(section["count"]),
+            offset=self._data_start + int(section["offset"]),
+        )
+
+    def _blob(self, name: str) -> bytes:
+        section = self._sections[name]
+        start = self._data_start + int(section["offset"])
+        return self._mm[start:start + int(section["count"])]
+
+    def _split(self, name: str) -> list[str]:
+        blob = self._blob(name)
+        if not blob:
+            return []
+        return blob.decode("utf-8").split(_SEPARATOR.decode())
+
+    @property
+    def terms(self) -> list[str]:
+        if self._terms is None:
+            self._terms = self._split("vocab")
+        return self._terms
+
+    @property
+    def doc_ids(self) -> list[str]:
+        if self._doc_ids is None:
+            self._doc_ids = self._split("doc_ids")
+        return self._doc_ids
+
+    def token_ids(self, position: int) -> np.ndarray:
+        offsets = self.array("token_offsets")
+        return self.array("token_ids")[offsets[position]:offsets[position + 1]]
+
+    def record(self, position: int) -> tuple[str, dict]:
+        offsets = self.array("docstore_offsets")
+        section = self._sections["docstore"]
+        base = self._data_start + int(section["offset"])
+        start = base + int(offsets[position])
+        end = base + int(offsets[position + 1])
+        payload = json.loads(self._mm[start:end].decode("utf-8"))
+        return payload.get("text", ""), payload.get("metadata") or {}
+
+    def document(self, position: int) -> BM25Document:
+        text, metadata = self.record(position)
+        terms = self.terms
+        return BM25Document(
+            doc_id=self.doc_ids[position],
+            text=text,
+            tokens=[terms[token_id] for token_id in self.token_ids(position).tolist()],
+            metadata=metadata,
+        )
+
+
+def _align(offset: int) -> int:
+    return offset + (-offset) % _SECTION_ALIGN
+
+
+def _write_binary_index(path: Path, header: dict, sections: list[tuple[str, bytes, str, int]]) -> None:
+    """Write header + aligned sections to ``path`` (caller handles atomicity).
+
+    Section offsets are relative to the aligned end of the header.
+    """
+    layout: dict[str, dict] = {}
+    cursor = 0
+    for name, payload, dtype, count in sections:
+        cursor = _align(cursor)
+        layout[name] = {"offset": cursor, "dtype": dtype, "count": count}
+        cursor += len(payload)
+    header_bytes = json.dumps({**header, "sections": layout}, ensure_ascii=False).encode("utf-8")
+    data_start = _align(len(BM25_BINARY_MAGIC) + _HEADER_LEN.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(BM25_BINARY_MAGIC)
+        f.write(_HEADER_LEN.pack(len(header_bytes)))
+        f.write(header_bytes)
+        for name, payload, _dtype, _count in sections:
+            padding = data_start + layout[name]["offset"] - f.tell()
+            if padding:
+                f.write(b"\x00" * padding)
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
 class BM25Index:
     """
     BM25 index for a single company.
@@ -95,10 +266,110 @@ class BM25Index:
         """
         self.company_id = _validate_storage_key(company_id, name="company_id")
         self.tenant_key = _validate_storage_key(tenant_key, name="tenant_key")
-        self.documents: list[BM25Document] = []
+        self._documents: list[BM25Document] = []
         self._bm25: Optional["bm25s.BM25"] = None
+        # Stable term -> id mapping and per-document token ids (parallel to
+        # ``documents``). Kept incrementally so that rebuilding the BM25
+        # matrix after a delta never re-tokenizes unchanged documents.
+        self._vocab: dict[str, int] = {}
+        self._token_id_lists: list[list[int]] = []
+        self._doc_positions: Optional[dict[str, int]] = None
+        # Memory-mapped file backing this index until the first mutation
+        self._mapped: Optional[_MappedIndexFile] = None
+        # mtime of the persisted file this instance mirrors (None = unsaved)
+        self.persisted_mtime_ns: Optional[int] = None
+
+    # ---- lazy materialization of a memory-mapped index ----
+
+    def _materialize(self) -> None:
+        """Decode every document from the mapped file into Python objects."""
+        mapped = self._mapped
+        if mapped is None:
+            return
+        terms = mapped.terms
+        self._vocab = {term: token_id for token_id, term in enumerate(terms)}
+        offsets = mapped.array("token_offsets")
+        flat_ids = mapped.array("token_ids").tolist()
+        self._token_id_lists = [
+            flat_ids[offsets[position]:offsets[position + 1]]
+            for position in range(mapped.num_docs)
+        ]
+        self._documents = []
+        for position in range(mapped.num_docs):
+            text, metadata = mapped.record(position)
+            self._documents.append(
+                BM25Document(
+                    doc_id=mapped.doc_ids[position],
+                    text=text,
+                    tokens=[terms[token_id] for token_id in self._token_id_lists[position]],
+                    metadata=metadata,
+                )
+            )
+        self._mapped = None
+        self._bm25 = None
 
-    def add_document(self, doc_id: str, text: str, metadata: Optional[dict] = None):
+    @property
+    def documents(self) -> list[BM25Document]:
+        self._materialize()
+        return self._documents
+
+    @documents.setter
+    def documents(self, value: list[BM25Document]) -> None:
+        self._mapped = None
+        self._documents = value
+
+    @property
+    def _doc_token_ids(self) -> list[list[int]]:
+        self._materialize()
+        return self._token_id_lists
+
+    @_doc_token_ids.setter
+    def _doc_token_ids(self, value: list[list[int]]) -> None:
+        self._token_id_lists = value
+
+    @property
+    def doc_count(self) -> int:
+        """Number of indexed documents (does not materialize a mapped index)."""
+        if self._mapped is not None:
+            return self._mapped.num_docs
+        return len(self._documents)
+
+    def _doc_id_at(self, position: int) -> str:
+        if self._mapped is not None:
+            return self._mapped.doc_ids[position]
+        return self._documents[position].doc_id
+
+    # ---- mutation ----
+
+    def _token_ids_for(self, tokens: list[str]) -> list[int]:
+        vocab = self._vocab
+        ids = []
+        for token in tokens:
+            token_id = vocab.get(token)
+            if token_id is None:
+                token_id = len(vocab)
+                vocab[token] = token_id
+            ids.append(token_id)
+        return ids
+
+    def _append_document(self, doc: BM25Document) -> None:
+        self._materialize()
+        self._documents.append(doc)
+        self._token_id_lists.append(self._token_ids_for(doc.tokens))
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        # BM25 matrix is rebuilt lazily on next search
+        self._bm25 = None
+        self._doc_positions = None
+
+    def add_document(
+        self,
+        doc_id: str,
+        text: str,
+        metadata: Optional[dict] = None,
+        tokens: Optional[list[str]] = None,
+    ):
         """
         Add a document to the index.
 
@@ -106,42 +377,167 @@ class BM25Index:
             doc_id: Unique document identifier
             text: Document text
             metadata: Optional metadata
+            tokens: Pre-computed tokens for ``text`` (skips tokenization)
         """
-        tokens = tokenize_with_domain_expansion(text)
+        if tokens is None:
+            tokens = tokenize_with_domain_expansion(text)
         if not tokens:
             return
 
         doc = BM25Document(
-            doc_id=doc_id, text=text, tokens=tokens, metadata=metadata or {}
+            doc_id=doc_id, text=text, tokens=list(tokens), metadata=metadata or {}
         )
-        self.documents.append(doc)
-        # Invalidate BM25 index (will be rebuilt on next search)
-        self._bm25 = None
+        self._append_document(doc)
 
-    def add_documents(self, docs: list[dict]):
+    def add_documents(
+        self,
+        docs: list[dict],
+        token_cache: Optional[dict[str, list[str]]] = None,
+    ):
         """
         Add multiple documents to the index.
 
         Args:
             docs: List of dicts with 'id', 'text', and optional 'metadata'
+            token_cache: Optional text -> tokens mapping; documents whose text
+                is found here are not re-tokenized.
         """
         for doc in docs:
+            tokens = token_cache.get(doc["text"]) if token_cache else None
             self.add_document(
-                doc_id=doc["id"], text=doc["text"], metadata=doc.get("metadata", {})
+                doc_id=doc["id"],
+                text=doc["text"],
+                metadata=doc.get("metadata", {}),
+                tokens=tokens,
             )
 
+    def tokens_by_text(self) -> dict[str, list[str]]:
+        """Return a text -> tokens mapping of the indexed documents."""
+        return {doc.text: doc.tokens for doc in self.documents}
+
+    def remove_documents(
+        self,
+        doc_ids: Optional[Iterable[str]] = None,
+        *,
+        metadata_field: Optional[str] = None,
+        values: Optional[Iterable[str]] = None,
+    ) -> list[BM25Document]:
+        """
+        Remove documents by id or by a metadata field value.
+
+        Args:
+            doc_ids: Document ids to remove
+            metadata_field: Metadata key to match (e.g. ``source_url`` or
+                ``ingest_session_id``)
+            values: Values of ``metadata_field`` to remove
+
+        Returns:
+            The removed documents
+        """
+        id_set = set(doc_ids or [])
+        value_set = set(values or []) if metadata_field else set()
+        if not id_set and not value_set:
+            return []
+
+        def _matches(doc: BM25Document) -> bool:
+            if doc.doc_id in id_set:
+                return True
+            if value_set and isinstance(doc.metadata, dict):
+                return doc.metadata.get(metadata_field) in value_set
+            return False
+
+        kept_docs: list[BM25Document] = []
+        kept_ids: list[list[int]] = []
+        removed: list[BM25Document] = []
+        for doc, token_ids in zip(self.documents, self._doc_token_ids):
+            if _matches(doc):
+                removed.append(doc)
+            else:
+                kept_docs.append(doc)
+                kept_ids.append(token_ids)
+        if removed:
+            self.documents = kept_docs
+            self._doc_token_ids = kept_ids
+            self._invalidate()
+        return removed
+
+    def replace_source(self, source_url: str, docs: list[dict]) -> tuple[int, int]:
+        """
+        Replace every document of one ``source_url`` with ``docs``.
+
+        Chunks whose text is unchanged reuse their previous tokens, so a
+        re-ingest only tokenizes chunks that actually changed.
+
+        Returns:
+            (added, removed) document counts
+        """
+        removed = self.remove_documents(metadata_field="source_url", values=[source_url])
+        before = len(self.documents)
+        self.add_documents(docs, token_cache={doc.text: doc.tokens for doc in removed})
+        return len(self.documents) - before, len(removed)
+
+    def copy(self) -> "BM25Index":
+        """Return a shallow copy that can be mutated without affecting readers."""
+        clone = type(self)(self.company_id, tenant_key=self.tenant_key)
+        if self._mapped is not None:
+            # The mapped file is read-only; the clone materializes on first write.
+            clone._mapped = self._mapped
+        else:
+            clone._documents = list(self._documents)
+            clone._token_id_lists = list(self._token_id_lists)
+            clone._vocab = dict(self._vocab)
+        clone.persisted_mtime_ns = self.persisted_mtime_ns
+        return clone
+
+    def _compact_vocab(self) -> None:
+        """Drop terms no longer referenced by any document and renumber ids."""
+        token_id_lists = self._doc_token_ids
+        if not self._vocab:
+            return
+        used = sorted({token_id for ids in token_id_lists for token_id in ids})
+        if len(used) == len(self._vocab):
+            return
+        remap = {old: new for new, old in enumerate(used)}
+        terms_by_id = {token_id: term for term, token_id in self._vocab.items()}
+        self._vocab = {terms_by_id[old]: new for old, new in remap.items()}
+        self._token_id_lists = [[remap[token_id] for token_id in ids] for ids in token_id_lists]
+        self._bm25 = None
+
+    # ---- search ----
+
     def _build_index(self):
         """Build the BM25 index from documents."""
         if not HAS_BM25:
             return
 
-        if not self.documents:
+        if self.doc_count == 0:
             self._bm25 = None
             return
 
-        corpus = [doc.tokens for doc in self.documents]
+        mapped = self._mapped
+        if mapped is not None and mapped.has("score_data"):
+            # Reuse the persisted score matrix as-is (mirrors bm25s.BM25.load).
+            vocab_dict = {term: token_id for token_id, term in enumerate(mapped.terms)}
+            vocab_dict.setdefault("", len(vocab_dict))
+            bm25 = bm25s.BM25(**mapped.header.get("bm25_params", {}))
+            bm25.vocab_dict = vocab_dict
+            bm25.unique_token_ids_set = set(vocab_dict.values())
+            bm25.nonoccurrence_array = None
+            bm25.scores = {
+                "data": mapped.array("score_data"),
+                "indices": mapped.array("score_indices"),
+                "indptr": mapped.array("score_indptr"),
+                "num_docs": mapped.num_docs,
+            }
+            self._bm25 = bm25
+            return
+
+        # Index from cached token ids; bm25s mutates the vocab, so pass a copy.
         self._bm25 = bm25s.BM25()
-        self._bm25.index(corpus)
+        self._bm25.index(
+            (self._doc_token_ids, dict(self._vocab)),
+            show_progress=False,
+        )
 
     def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
         """
@@ -154,7 +550,7 @@ class BM25Index:
         Returns:
             List of (doc_id, score) tuples sorted by score descending
         """
-        if not HAS_BM25 or not self.documents:
+        if not HAS_BM25 or self.doc_count == 0:
             return []
 
         if self._bm25 is None:
@@ -169,7 +565,7 @@ class BM25Index:
             return []
 
         # Limit k to corpus size to avoid bm25s ValueError
-        k = min(k, len(self.documents))
+        k = min(k, self.doc_count)
         if k == 0:
             return []
 
@@ -193,7 +589,7 @@ class BM25Index:
             if doc_idx is None:
                 continue
             try:
-                doc_id = self.documents[int(doc_idx)].doc_id
+                doc_id = self._doc_id_at(int(doc_idx))
             except Exception:
                 continue
             try:
@@ -206,55 +602,122 @@ class BM25Index:
 
     def get_document(self, doc_id: str) -> Optional[BM25Document]:
         """Get a document by ID."""
-        for doc in self.documents:
-            if doc.doc_id == doc_id:
-                return doc
-        return None
+        if self._doc_positions is None:
+            if self._mapped is not None:
+                doc_ids = self._mapped.doc_ids
+            else:
+                doc_ids = [doc.doc_id for doc in self._documents]
+            positions: dict[str, int] = {}
+            for position, value in enumerate(doc_ids):
+                positions.setdefault(value, position)
+            self._doc_positions = positions
+        position = self._doc_positions.get(doc_id)
+        if position is None:
+            return None
+        if self._mapped is not None:
+            return self._mapped.document(position)
+        return self._documents[position]
 
     def clear(self):
         """Clear all documents from the index."""
         self.documents = []
-        self._bm25 = None
+        self._doc_token_ids = []
+        self._vocab = {}
+        self._invalidate()
+
+    # ---- persistence ----
+
+    def _binary_sections(self) -> tuple[dict, list[tuple[str, bytes, str, int]]]:
+        self._compact_vocab()
+        documents = self.documents
+        token_id_lists = self._doc_token_ids
+        terms = [""] * len(self._vocab)
+        for term, token_id in self._vocab.items():
+            terms[token_id] = term
+
+        lengths = np.fromiter((len(ids) for ids in token_id_lists), dtype=np.int64, count=len(token_id_lists))
+        token_offsets = np.zeros(len(token_id_lists) + 1, dtype="<i8")
+        np.cumsum(lengths, out=token_offsets[1:])
+        token_ids = np.fromiter(
+            (token_id for ids in token_id_lists for token_id in ids),
+            dtype="<i4",
+            count=int(token_offsets[-1]),
+        )
+
+        records = [
+            json.dumps({"text": doc.text, "metadata": doc.metadata}, ensure_ascii=False).encode("utf-8")
+            for doc in documents
+        ]
+        docstore_offsets = np.zeros(len(records) + 1, dtype="<i8")
+        np.cumsum([len(record) for record in records], out=docstore_offsets[1:])
+
+        vocab_blob = _SEPARATOR.join(term.encode("utf-8") for term in terms)
+        doc_ids_blob = _SEPARATOR.join(doc.doc_id.encode("utf-8") for doc in documents)
+        docstore_blob = b"".join(records)
+
+        sections: list[tuple[str, bytes, str, int]] = [
+            ("vocab", vocab_blob, "|u1", len(vocab_blob)),
+            ("doc_ids", doc_ids_blob, "|u1", len(doc_ids_blob)),
+            ("token_ids", token_ids.tobytes(), "<i4", len(token_ids)),
+            ("token_offsets", token_offsets.tobytes(), "<i8", len(token_offsets)),
+            ("docstore", docstore_blob, "|u1", len(docstore_blob)),
+            ("docstore_offsets", docstore_offsets.tobytes(), "<i8", len(docstore_offsets)),
+        ]
+        header = {
+            "version": BM25_BINARY_FORMAT_VERSION,
+            "company_id": self.company_id,
+            "tenant_key": self.tenant_key,
+            "num_docs": len(documents),
+        }
+
+        if HAS_BM25 and documents:
+            if self._bm25 is None:
+                self._build_index()
+            scores = self._bm25.scores
+            for name, key, dtype in (
+                ("score_data", "data", "<f4"),
+                ("score_indices", "indices", "<i4"),
+                ("score_indptr", "indptr", "<i8"),
+            ):
+                values = np.ascontiguousarray(scores[key], dtype=dtype)
+                sections.append((name, values.tobytes(), dtype, len(values)))
+            header["bm25_params"] = {
+                "k1": self._bm25.k1,
+                "b": self._bm25.b,
+                "method": self._bm25.method,
+            }
+        return header, sections
 
     def save(self):
-        """Save the index to disk using JSON format."""
+        """Save the index to disk using the binary format."""
         BM25_PERSIST_DIR.mkdir(parents=True, exist_ok=True)
         stem = _index_file_stem(self.company_id, self.tenant_key)
-        json_path = BM25_PERSIST_DIR / f"{stem}.json"
+        binary_path = _binary_path(stem)
 
-        data = {
-            "version": BM25_FORMAT_VERSION,
-            "company_id": self.company_id,
-            "documents": [
-                {
-                    "doc_id": doc.doc_id,
-                    "text": doc.text,
-                    "tokens": doc.tokens,
-                    "metadata": doc.metadata,
-                }
-                for doc in self.documents
-            ],
-        }
+        header, sections = self._binary_sections()
 
         tmp_path: Optional[str] = None
         with tempfile.NamedTemporaryFile(
-            "w",
-            encoding="utf-8",
+            "wb",
             dir=BM25_PERSIST_DIR,
             prefix=f".{stem}.",
-            suffix=".json.tmp",
+            suffix=f"{BM25_BINARY_SUFFIX}.tmp",
             delete=False,
         ) as f:
             tmp_path = f.name
-            json.dump(data, f, ensure_ascii=False)
-            f.flush()
-            os.fsync(f.fileno())
         try:
-            os.replace(tmp_path, json_path)
+            _write_binary_index(Path(tmp_path), header, sections)
+            os.replace(tmp_path, binary_path)
         except Exception:
             if tmp_path and os.path.exists(tmp_path):
                 os.unlink(tmp_path)
             raise
+        self.persisted_mtime_ns = _persisted_mtime_ns(binary_path)
+
+        # The binary file supersedes any legacy JSON copy.
+        legacy_path = _json_path(stem)
+        if legacy_path.exists():
+            legacy_path.unlink()
 
         logger.info(
             "Saved BM25 index for %s (%d docs)",
@@ -262,13 +725,50 @@ class BM25Index:
             len(self.documents),
         )
 
+    @classmethod
+    def _load_binary(cls, path: Path, company_id: str, tenant_key: str) -> "BM25Index":
+        mapped = _MappedIndexFile(path)
+        if mapped.header.get("company_id") != company_id or mapped.header.get("tenant_key") != tenant_key:
+            raise ValueError("BM25 index owner mismatch")
+        index = cls(company_id, tenant_key=tenant_key)
+        index._mapped = mapped
+        index._documents = []
+        return index
+
+    @classmethod
+    def _load_json(cls, path: Path, company_id: str, tenant_key: str) -> Optional["BM25Index"]:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        # Validate schema version
+        version = data.get("version", 0)
+        if version != BM25_FORMAT_VERSION:
+            logger.warning(
+                "Unsupported BM25 index version %s for %s",
+                version,
+                company_id,
+            )
+            return None
+
+        index = cls(company_id, tenant_key=tenant_key)
+        for doc_data in data.get("documents", []):
+            doc = BM25Document(
+                doc_id=doc_data["doc_id"],
+                text=doc_data["text"],
+                tokens=doc_data["tokens"],
+                metadata=doc_data.get("metadata", {}),
+            )
+            index._append_document(doc)
+        return index
+
     @classmethod
     def load(cls, company_id: str, tenant_key: str) -> Optional["BM25Index"]:
         """
         Load an index from disk.
 
-        Tries JSON format only. Company-only legacy paths and pickle indexes are
-        intentionally not read because tenant strict storage is the boundary.
+        Reads the binary format, falling back to version 1 JSON. Company-only
+        legacy paths and pickle indexes are intentionally not read because
+        tenant strict storage is the boundary.
 
         Args:
             company_id: Company identifier
@@ -278,52 +778,26 @@ class BM25Index:
             BM25Index if found, None otherwise
         """
         stem = _index_file_stem(company_id, tenant_key)
-        json_path = BM25_PERSIST_DIR / f"{stem}.json"
+        binary_path = _binary_path(stem)
+        json_path = _json_path(stem)
 
-        # Try JSON first (new secure format)
-        if json_path.exists():
+        for path, loader in ((binary_path, cls._load_binary), (json_path, cls._load_json)):
+            if not path.exists():
+                continue
             try:
-                with open(json_path, encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # Validate schema version
-                version = data.get("version", 0)
-                if version != BM25_FORMAT_VERSION:
-                    logger.warning(
-                        "Unsupported BM25 index version %s for %s",
-                        version,
-                        company_id,
-                    )
+                index = loader(path, company_id, tenant_key)
+                if index is None:
                     return None
-
-                index = cls(company_id, tenant_key=tenant_key)
-                for doc_data in data.get("documents", []):
-                    doc = BM25Document(
-                        doc_id=doc_data["doc_id"],
-                        text=doc_data["text"],
-                        tokens=doc_data["tokens"],
-                        metadata=doc_data.get("metadata", {}),
-                    )
-                    index.documents.append(doc)
-
+                index.persisted_mtime_ns = _persisted_mtime_ns(path)
                 logger.info(
                     "Loaded BM25 index for %s (%d docs)",
                     company_id,
-                    len(index.documents),
+                    index.doc_count,
                 )
                 return index
-
             except Exception as e:
-                logger.error("Error loading BM25 JSON index for %s: %s", company_id, e)
-                # Move corrupted file
-                corrupted_path = json_path.with_suffix(
-                    f".json.corrupted.{int(time.time())}"
-                )
-                try:
-                    json_path.rename(corrupted_path)
-                    logger.warning("Moved corrupted BM25 file to: %s", corrupted_path)
-                except Exception as rename_error:
-                    logger.warning("Could not move corrupted BM25 file: %s", rename_error)
+                logger.error("Error loading BM25 index %s for %s: %s", path.name, company_id, e)
+                _move_corrupted(path)
                 return None
 
         return None
@@ -342,11 +816,11 @@ class BM25Index:
         """
         deleted = False
         stem = _index_file_stem(company_id, tenant_key)
-        json_path = BM25_PERSIST_DIR / f"{stem}.json"
 
-        if json_path.exists():
-            json_path.unlink()
-            deleted = True
+        for path in (_binary_path(stem), _json_path(stem)):
+            if path.exists():
+                path.unlink()
+                deleted = True
 
         if deleted:
             logger.info("Deleted BM25 index for %s", company_id)
@@ -355,9 +829,60 @@ class BM25Index:
     @classmethod
     def exists(cls, company_id: str, tenant_key: str) -> bool:
         """Check if an index exists on disk."""
-        stem = _index_file_stem(company_id, tenant_key)
-        json_path = BM25_PERSIST_DIR / f"{stem}.json"
-        return json_path.exists()
+        return _persisted_path(company_id, tenant_key) is not None
+
+
+def read_persisted_index(path: Path) -> Optional[BM25Index]:
+    """
+    Read an index file by path (binary or version 1 JSON) without caching.
+
+    Intended for offline tooling such as eval corpus generation. The owner is
+    taken from the ``<tenant_key>__<company_id>`` file stem.
+    """
+    path = Path(path)
+    tenant_key, sep, company_id = path.stem.partition("__")
+    if not sep:
+        return None
+    if path.suffix == BM25_BINARY_SUFFIX:
+        return BM25Index._load_binary(path, company_id, tenant_key)
+    if path.suffix == ".json":
+        return BM25Index._load_json(path, company_id, tenant_key)
+    return None
+
+
+def migrate_legacy_json_indexes(*, keep_legacy: bool = False) -> dict[str, int]:
+    """
+    Convert tenant-scoped version 1 JSON indexes in ``BM25_PERSIST_DIR`` to
+    the binary format.
+
+    Company-only JSON files are skipped (they are never read). The JSON file
+    is removed after a successful conversion unless ``keep_legacy`` is set.
+
+    Returns:
+        Counts of ``migrated``, ``skipped`` and ``failed`` files
+    """
+    counts = {"migrated": 0, "skipped": 0, "failed": 0}
+    if not BM25_PERSIST_DIR.exists():
+        return counts
+    for json_file in sorted(BM25_PERSIST_DIR.glob("*.json")):
+        tenant_key, sep, company_id = json_file.stem.partition("__")
+        if not sep:
+            counts["skipped"] += 1
+            continue
+        try:
+            index = BM25Index._load_json(json_file, company_id, tenant_key)
+            if index is None:
+                counts["skipped"] += 1
+                continue
+            legacy_bytes = json_file.read_bytes() if keep_legacy else None
+            index.save()
+            if legacy_bytes is not None:
+                json_file.write_bytes(legacy_bytes)
+            counts["migrated"] += 1
+        except Exception as e:
+            logger.error("BM25 migration failed for %s: %s", json_file.name, e)
+            counts["failed"] += 1
+    return counts
 
 
 # LRU cache for performance with bounded memory usage
@@ -390,6 +915,33 @@ def get_or_create_index(company_id: str, tenant_key: str) -> BM25Index:
     return index
 
 
+def load_index_for_update(company_id: str, tenant_key: str) -> BM25Index:
+    """
+    Get a private, mutable copy of the latest persisted index.
+
+    The cached instance is reused when it still mirrors the file on disk
+    (another worker may have rewritten it); otherwise the file is reloaded.
+    The returned copy can be mutated and saved without disturbing concurrent
+    searches on the cached instance. Publish it with ``publish_index``.
+    """
+    key = _cache_key(company_id, tenant_key)
+    disk_mtime = _persisted_mtime_ns(_persisted_path(company_id, tenant_key))
+
+    cached = _index_cache.get(key)
+    if cached is not None and cached.persisted_mtime_ns == disk_mtime:
+        return cached.copy()
+
+    index = BM25Index.load(company_id, tenant_key=tenant_key)
+    if index is None:
+        index = BM25Index(company_id, tenant_key=tenant_key)
+    return index
+
+
+def publish_index(index: BM25Index) -> None:
+    """Replace the cached index for the company with ``index``."""
+    _index_cache[_cache_key(index.company_id, index.tenant_key)] = index
+
+
 def clear_index_cache(company_id: Optional[str] = None, tenant_key: Optional[str] = None):
     """
     Clear the index cache.
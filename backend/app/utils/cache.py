@@ -5,7 +5,6 @@ Cache utilities for RAG context and ES review results.
 from __future__ import annotations
 
 import hashlib
-import json
 from functools import lru_cache
 from typing import Any, Optional
 
@@ -15,6 +14,7 @@ except Exception:
     redis = None  # type: ignore
 
 from app.config import settings
+from app.utils.cache_codec import CacheCodec, get_cache_codec
 from app.utils.redis_keys import redis_key, redis_pattern
 from app.utils.secure_logger import get_logger
 
@@ -27,18 +27,37 @@ def build_cache_key(*parts: str) -> str:
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
 class BaseCache:
-    """Base cache wrapper with JSON helpers."""
+    """Base cache wrapper with codec-backed value helpers (JSON-compatible values)."""
 
-    def __init__(self, redis_url: str):
+    # Keys per MGET / pipeline round trip.
+    BATCH_SIZE = 500
+
+    def __init__(self, redis_url: str, codec: Optional[CacheCodec] = None):
         self._enabled = bool(redis and redis_url)
-        self._redis = (
-            redis.from_url(redis_url, decode_responses=True) if self._enabled else None
-        )
+        # Raw bytes: values may be msgpack / zstd frames (see cache_codec).
+        self._redis = redis.from_url(redis_url) if self._enabled else None
+        self._codec = codec or get_cache_codec()
 
     def enabled(self) -> bool:
         return self._enabled and self._redis is not None
 
+    def _decode(self, value: Any) -> Optional[Any]:
+        if not value:
+            return None
+        try:
+            return self._codec.decode(value)
+        except Exception:
+            return None
+
     async def get_json(self, key: str) -> Optional[Any]:
         if not self.enabled():
             return None
@@ -47,21 +66,44 @@ class BaseCache:
         except Exception as e:
             logger.warning("Cache get failed: %s", e)
             return None
-        if not value:
-            return None
-        try:
-            return json.loads(value)
-        except Exception:
-            return None
+        return self._decode(value)
 
     async def set_json(self, key: str, value: Any, ttl: int) -> None:
         if not self.enabled():
             return
         try:
-            await self._redis.setex(key, ttl, json.dumps(value, ensure_ascii=False))
+            await self._redis.setex(key, ttl, self._codec.encode(value))
         except Exception as e:
             logger.warning("Cache set failed: %s", e)
 
+    async def mget_json(self, keys: list[str]) -> list[Optional[Any]]:
+        """Values for ``keys`` (None for misses) in one MGET per batch."""
+        if not self.enabled() or not keys:
+            return [None] * len(keys)
+        values: list[Optional[Any]] = []
+        try:
+            for start in range(0, len(keys), self.BATCH_SIZE):
+                raw = await self._redis.mget(keys[start : start + self.BATCH_SIZE])
+                values.extend(self._decode(value) for value in raw)
+        except Exception as e:
+            logger.warning("Cache mget failed: %s", e)
+            return [None] * len(keys)
+        return values
+
+    async def set_many_json(self, items: dict[str, Any], ttl: int) -> None:
+        """SETEX every item through a non-transactional pipeline."""
+        if not self.enabled() or not items:
+            return
+        entries = list(items.items())
+        try:
+            for start in range(0, len(entries), self.BATCH_SIZE):
+                pipe = self._redis.pipeline(transaction=False)
+                for key, value in entries[start : start + self.BATCH_SIZE]:
+                    pipe.setex(key, ttl, self._codec.encode(value))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Cache pipelined set failed: %s", e)
+
     async def delete_pattern(self, pattern: str) -> None:
         if not self.enabled():
             return
@@ -71,17 +113,93 @@ class BaseCache:
         except Exception as e:
             logger.warning("Cache delete failed: %s", e)
 
+    async def acquire_lock(self, key: str, token: str, ttl: int) -> Optional[bool]:
+        """SET NX EX lease. Returns None when Redis is unavailable."""
+        if not self.enabled():
+            return None
+        try:
+            return bool(await self._redis.set(key, token, nx=True, ex=max(1, ttl)))
+        except Exception as e:
+            logger.warning("Cache lock failed: %s", e)
+            return None
+
+    async def lock_exists(self, key: str) -> Optional[bool]:
+        if not self.enabled():
+            return None
+        try:
+            return bool(await self._redis.exists(key))
+        except Exception as e:
+            logger.warning("Cache lock check failed: %s", e)
+            return None
+
+    async def release_lock(self, key: str, token: str) -> None:
+        """Delete the lease only if it is still ours (it may have expired)."""
+        if not self.enabled():
+            return
+        try:
+            await self._redis.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            logger.warning("Cache unlock failed: %s", e)
+
 
 class RAGCache(BaseCache):
-    """Cache for RAG context results."""
+    """
+    Cache for RAG context results.
+
+    Keys embed a per-(tenant, company) generation counter, so invalidation is
+    a single ``INCR``: entries of older generations are no longer addressed and
+    age out by TTL. ``invalidate_company(..., hard=True)`` additionally deletes
+    them for callers that must not leave data behind (privacy deletion).
+    """
+
+    # Must outlive every entry TTL so a reset counter never revives old keys.
+    GENERATION_TTL_SECONDS = 30 * 24 * 3600
+
+    def _generation_key(self, company_id: str, tenant_key: str) -> str:
+        return redis_key("rag", "context-gen", tenant_key, company_id)
+
+    async def _generation(self, company_id: str, tenant_key: str) -> Optional[str]:
+        """Current generation, or None when Redis is unavailable."""
+        if not self.enabled():
+            return None
+        try:
+            value = await self._redis.get(self._generation_key(company_id, tenant_key))
+        except Exception as e:
+            logger.warning("Cache generation get failed: %s", e)
+            return None
+        if isinstance(value, bytes):
+            value = value.decode("ascii")
+        return str(value or "0")
 
     def _context_key(
         self,
         company_id: str,
         query_hash: str,
         tenant_key: str,
+        generation: str = "0",
+    ) -> str:
+        return redis_key(
+            "rag", "context", tenant_key, company_id, f"g{generation}", query_hash
+        )
+
+    def _semantic_index_key(
+        self,
+        company_id: str,
+        scope: str,
+        tenant_key: str,
+        generation: str = "0",
+    ) -> str:
+        return redis_key(
+            "rag", "context", tenant_key, company_id, f"g{generation}", "semantic", scope
+        )
+
+    def context_lock_key(
+        self,
+        company_id: str,
+        query_hash: str,
+        tenant_key: str,
     ) -> str:
-        return redis_key("rag", "context", tenant_key, company_id, query_hash)
+        return redis_key("rag", "context-lock", tenant_key, company_id, query_hash)
 
     async def get_context(
         self,
@@ -89,8 +207,11 @@ class RAGCache(BaseCache):
         query_hash: str,
         tenant_key: str,
     ) -> Optional[dict]:
+        generation = await self._generation(company_id, tenant_key)
+        if generation is None:
+            return None
         return await self.get_json(
-            self._context_key(company_id, query_hash, tenant_key)
+            self._context_key(company_id, query_hash, tenant_key, generation)
         )
 
     async def set_context(
@@ -102,21 +223,74 @@ class RAGCache(BaseCache):
         tenant_key: str,
         ttl: int = 43200,
     ) -> None:
+        generation = await self._generation(company_id, tenant_key)
+        if generation is None:
+            return
         await self.set_json(
-            self._context_key(company_id, query_hash, tenant_key),
+            self._context_key(company_id, query_hash, tenant_key, generation),
             context,
             ttl,
         )
 
-    async def invalidate_company(
+    async def get_semantic_index(
+        self,
+        company_id: str,
+        scope: str,
+        tenant_key: str,
+    ) -> Optional[Any]:
+        generation = await self._generation(company_id, tenant_key)
+        if generation is None:
+            return None
+        return await self.get_json(
+            self._semantic_index_key(company_id, scope, tenant_key, generation)
+        )
+
+    async def set_semantic_index(
         self,
         company_id: str,
+        scope: str,
+        entries: list[dict],
+        *,
         tenant_key: str,
+        ttl: int = 43200,
     ) -> None:
-        await self.delete_pattern(
-            redis_pattern("rag", "context", tenant_key, company_id, "*")
+        generation = await self._generation(company_id, tenant_key)
+        if generation is None:
+            return
+        await self.set_json(
+            self._semantic_index_key(company_id, scope, tenant_key, generation),
+            entries,
+            ttl,
         )
 
+    async def invalidate_company(
+        self,
+        company_id: str,
+        tenant_key: str,
+        *,
+        hard: bool = False,
+    ) -> None:
+        """
+        Invalidate every cached context of a company in O(1).
+
+        Args:
+            hard: Also SCAN + DELETE the existing entries (privacy deletion)
+        """
+        if not self.enabled():
+            return
+        bumped = False
+        try:
+            key = self._generation_key(company_id, tenant_key)
+            await self._redis.incr(key)
+            await self._redis.expire(key, self.GENERATION_TTL_SECONDS)
+            bumped = True
+        except Exception as e:
+            logger.warning("Cache generation bump failed: %s", e)
+        if hard or not bumped:
+            await self.delete_pattern(
+                redis_pattern("rag", "context", tenant_key, company_id, "*")
+            )
+
 
 class ESReviewCache(BaseCache):
     """Cache for ES review results."""
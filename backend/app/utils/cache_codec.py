@@ -0,0 +1,159 @@
+"""
+Value codecs for the Redis cache layer.
+
+``CacheCodec`` turns cache values into bytes and back. JSON codecs (stdlib
+``json`` / ``orjson``) write plain UTF-8 JSON, which every worker can read,
+including ones still on the legacy ``json.dumps`` format. ``msgpack`` and
+zstd-compressed values are written as frames::
+
+    MAGIC (2 bytes) | codec id (1 byte) | flags (1 byte) | payload
+
+Decoding dispatches on the frame header, so values written under a different
+``CACHE_CODEC`` / ``CACHE_COMPRESSION`` setting remain readable as long as the
+library is installed (otherwise they decode as a miss).
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore
+
+try:
+    import msgpack
+except Exception:
+    msgpack = None  # type: ignore
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None  # type: ignore
+
+from app.config import settings
+from app.utils.secure_logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_CODECS = ("json", "orjson", "msgpack")
+CACHE_COMPRESSIONS = ("none", "zstd")
+
+FRAME_MAGIC = b"\xcc\x01"
+_CODEC_IDS = {"json": b"j", "msgpack": b"m"}
+_FLAG_ZSTD = 0x01
+
+
+class CacheDecodeError(ValueError):
+    """Stored bytes could not be decoded with the available libraries."""
+
+
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(payload: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+class CacheCodec:
+    """
+    Serialize cache values.
+
+    Args:
+        name: ``json`` / ``orjson`` / ``msgpack``
+        compression: ``none`` / ``zstd``
+        compress_min_bytes: Only payloads at least this large are compressed
+        compress_level: zstd level
+    """
+
+    def __init__(
+        self,
+        name: str = "json",
+        *,
+        compression: str = "none",
+        compress_min_bytes: int = 1024,
+        compress_level: int = 3,
+    ):
+        self.name = name if name in CACHE_CODECS else "json"
+        self.compression = compression if compression in CACHE_COMPRESSIONS else "none"
+        self._compress_min_bytes = max(0, compress_min_bytes)
+        self._compressor = None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+        if self.compression == "zstd":
+            if zstandard is None:
+                logger.warning("[キャッシュ] zstandard 未インストールのため圧縮なしで保存します")
+                self.compression = "none"
+            else:
+                self._compressor = zstandard.ZstdCompressor(level=compress_level)
+
+    def encode(self, value: Any) -> bytes:
+        if self.name == "msgpack":
+            codec_id = _CODEC_IDS["msgpack"]
+            payload = msgpack.packb(value, use_bin_type=True)
+        else:
+            codec_id = _CODEC_IDS["json"]
+            payload = (
+                _json_dumps(value)
+                if self.name == "orjson"
+                else json.dumps(value, ensure_ascii=False).encode("utf-8")
+            )
+
+        flags = 0
+        if self._compressor is not None and len(payload) >= self._compress_min_bytes:
+            payload = self._compressor.compress(payload)
+            flags |= _FLAG_ZSTD
+        if codec_id == _CODEC_IDS["json"] and not flags:
+            return payload  # plain JSON stays readable by every worker
+        return FRAME_MAGIC + codec_id + bytes([flags]) + payload
+
+    def decode(self, data: bytes | str) -> Any:
+        if isinstance(data, str):
+            return _json_loads(data)
+        if not data.startswith(FRAME_MAGIC):
+            return _json_loads(data)
+
+        codec_id = data[2:3]
+        flags = data[3]
+        payload = data[4:]
+        if flags & _FLAG_ZSTD:
+            if self._decompressor is None:
+                raise CacheDecodeError("zstd frame but zstandard is not installed")
+            payload = self._decompressor.decompress(payload)
+        if codec_id == _CODEC_IDS["msgpack"]:
+            if msgpack is None:
+                raise CacheDecodeError("msgpack frame but msgpack is not installed")
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if codec_id == _CODEC_IDS["json"]:
+            return _json_loads(payload)
+        raise CacheDecodeError(f"unknown codec id {codec_id!r}")
+
+
+def resolve_codec_name(name: Optional[str] = None) -> str:
+    """Configured codec, falling back to ``json`` when its library is missing."""
+    requested = (name or settings.cache_codec or "json").strip().lower()
+    if requested not in CACHE_CODECS:
+        logger.warning("[キャッシュ] 不明な CACHE_CODEC=%s、json を使用します", requested)
+        return "json"
+    if requested == "orjson" and orjson is None:
+        return "json"
+    if requested == "msgpack" and msgpack is None:
+        logger.warning("[キャッシュ] msgpack 未インストールのため json を使用します")
+        return "json"
+    return requested
+
+
+@lru_cache()
+def get_cache_codec() -> CacheCodec:
+    return CacheCodec(
+        resolve_codec_name(),
+        compression=(settings.cache_compression or "none").strip().lower(),
+        compress_min_bytes=settings.cache_compress_min_bytes,
+    )
@@ -2,15 +2,50 @@
 Embeddings Utility Module
 
 Provides text embedding generation using OpenAI embeddings.
+
+Document embeddings are cached by (model, hash of the outbound text) in a
+local SQLite file with size-based eviction, optionally backed by a shared
+Redis tier, so re-ingesting unchanged chunks does not call the API again.
+Query embeddings use a process-local LRU (plus the same optional Redis tier)
+keyed by (model, normalized query), and every query variant of one retrieval
+is embedded in a single API call.
+
+Document cache misses are split into token batches that are sent concurrently
+(``EMBEDDING_MAX_CONCURRENCY``) behind a process-wide TPM/RPM limiter
+(``EMBEDDING_TPM_LIMIT`` / ``EMBEDDING_RPM_LIMIT``). Both the concurrency cap and
+the limiter are shared by every caller in the process. A batch rejected as bad
+input (HTTP 400) is split in half and retried, so one bad input costs
+O(log n) extra requests instead of one request per item; rate-limit, connection
+and 5xx errors retry the whole batch with exponential backoff instead.
 """
 
+import asyncio
+import base64
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional, Literal
 
 import openai
 
 from app.config import settings
 from app.privacy.outbound_policy import prepare_outbound_text
+from app.rag.telemetry import (
+    rag_embedding_api_requests,
+    rag_embedding_cache_requests,
+    rag_embedding_rate_limit_wait,
+)
+from app.rag.trace import record_cache
+from app.utils.cache import BaseCache
+from app.utils.redis_keys import redis_key
 from app.utils.secure_logger import get_logger
 
 logger = get_logger(__name__)
@@ -22,10 +57,20 @@ EMBEDDING_DIMENSION = 1536  # For text-embedding-3-small
 # Batch processing limits for OpenAI API
 OPENAI_BATCH_TOKEN_LIMIT = 250_000  # OpenAI max is 300K, use 250K for safety
 ESTIMATED_TOKENS_PER_CHAR_JP = 2.5  # Japanese text: ~2-3 tokens per character
+# Smallest batch worth splitting off for concurrent dispatch (about one full chunk).
+EMBEDDING_MIN_CONCURRENT_BATCH_TOKENS = 20_000
+# Transient failures retried as a whole batch, on top of the OpenAI client's own retries.
+EMBEDDING_TRANSIENT_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+EMBEDDING_TRANSIENT_RETRIES = 3
+EMBEDDING_RETRY_BASE_DELAY_SECONDS = 2.0
 
 # OpenAI client singleton for connection pooling
 _openai_embedding_client: Optional[openai.AsyncOpenAI] = None
 
+EMBEDDING_CACHE_DEFAULT_PATH = Path(__file__).parent.parent.parent / "data" / "embedding_cache.sqlite3"
+# Evict down to this fraction of the size limit so eviction is not run on every write.
+EMBEDDING_CACHE_EVICT_TARGET_RATIO = 0.9
+
 
 @dataclass(frozen=True)
 class EmbeddingBackend:
@@ -75,6 +120,385 @@ def resolve_embedding_backend() -> Optional[EmbeddingBackend]:
     return backends[0] if backends else None
 
 
+def embedding_cache_key(model: str, text: str) -> str:
+    """Content hash identifying an embedding of ``text`` produced by ``model``."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def _pack_vector(vector: list[float]) -> bytes:
+    # OpenAI returns float32 values, so float32 storage is lossless.
+    return array("f", vector).tobytes()
+
+
+def _unpack_vector(blob: bytes) -> list[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: local SQLite (size bounded, LRU) + optional Redis.
+
+    Only hashes and vectors are stored; the source text never leaves the
+    process. Every failure is fail-open and treated as a miss.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_bytes: int,
+        redis_url: str = "",
+        redis_ttl: int = 60 * 60 * 24 * 30,
+    ):
+        self._path = path
+        self._max_bytes = max(0, max_bytes)
+        self._redis_ttl = redis_ttl
+        self._redis = BaseCache(redis_url) if redis_url else None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._local_disabled = False
+        self._stored_bytes = 0
+
+    # ---- local SQLite tier -------------------------------------------------
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._local_disabled:
+            return self._conn
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_access ON embeddings(last_access)"
+            )
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+            self._stored_bytes = int(row[0])
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning("[埋め込み] ローカルキャッシュを無効化: %s", e)
+            self._local_disabled = True
+        return self._conn
+
+    def _local_get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return found
+            try:
+                # Stay well under SQLITE_MAX_VARIABLE_NUMBER.
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        chunk,
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[key] = _unpack_vector(blob)
+                if found:
+                    now = time.time()
+                    conn.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key in found],
+                    )
+                    conn.commit()
+            except sqlite3.Error as e:
+                logger.warning("[埋め込み] ローカルキャッシュ読込失敗: %s", e)
+        return found
+
+    def _local_set_many(self, vectors: dict[str, list[float]]) -> None:
+        if not vectors:
+            return
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            now = time.time()
+            rows = [(key, _pack_vector(vector)) for key, vector in vectors.items()]
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access)"
+                    " VALUES (?, ?, ?, ?)",
+                    [(key, blob, len(key) + len(blob), now) for key, blob in rows],
+                )
+                conn.commit()
+                self._stored_bytes += sum(len(key) + len(blob) for key, blob in rows)
+                if self._stored_bytes > self._max_bytes:
+                    self._evict(conn)
+            except sqlite3.Error as e:
+                logger.warning("[埋め込み] ローカルキャッシュ書込失敗: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Other workers share the file, so re-read the real size before evicting.
+        total = int(conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0])
+        target = int(self._max_bytes * EMBEDDING_CACHE_EVICT_TARGET_RATIO)
+        if total <= self._max_bytes:
+            self._stored_bytes = total
+            return
+        to_free = total - target
+        victims: list[str] = []
+        for key, size in conn.execute("SELECT key, size FROM embeddings ORDER BY last_access"):
+            victims.append(key)
+            to_free -= size
+            if to_free <= 0:
+                break
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in victims])
+        conn.commit()
+        self._stored_bytes = int(
+            conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+        )
+        logger.info(
+            "[埋め込み] キャッシュ evict: %d件 (残り %.1f MB)",
+            len(victims),
+            self._stored_bytes / (1024 * 1024),
+        )
+
+    # ---- shared Redis tier -------------------------------------------------
+
+    def _redis_enabled(self) -> bool:
+        return self._redis is not None and self._redis.enabled()
+
+    def _redis_key(self, key: str) -> str:
+        return redis_key("cache", "embedding", key)
+
+    async def _redis_get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        if not self._redis_enabled() or not keys:
+            return {}
+        values = await self._redis.mget_json([self._redis_key(key) for key in keys])
+        found: dict[str, list[float]] = {}
+        for key, value in zip(keys, values):
+            if not isinstance(value, str):
+                continue
+            try:
+                found[key] = _unpack_vector(base64.b64decode(value))
+            except (ValueError, TypeError):
+                continue
+        return found
+
+    async def _redis_set_many(self, vectors: dict[str, list[float]]) -> None:
+        if not self._redis_enabled() or not vectors:
+            return
+        await self._redis.set_many_json(
+            {
+                self._redis_key(key): base64.b64encode(_pack_vector(vector)).decode("ascii")
+                for key, vector in vectors.items()
+            },
+            self._redis_ttl,
+        )
+
+    # ---- public API ----------------------------------------------------------
+
+    async def get_many(self, keys: list[str], *, variant: str = "document") -> dict[str, list[float]]:
+        """Return cached vectors for ``keys``; local hits first, then Redis."""
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return {}
+        found = await asyncio.to_thread(self._local_get_many, unique_keys)
+        if found:
+            rag_embedding_cache_requests.labels(tier="local", result="hit", variant=variant).inc(len(found))
+
+        remaining = [key for key in unique_keys if key not in found]
+        if remaining and self._redis_enabled():
+            shared = await self._redis_get_many(remaining)
+            if shared:
+                rag_embedding_cache_requests.labels(tier="redis", result="hit", variant=variant).inc(len(shared))
+                # Backfill the local tier so the next lookup stays in-process.
+                await asyncio.to_thread(self._local_set_many, shared)
+                found.update(shared)
+
+        misses = len(unique_keys) - len(found)
+        if misses:
+            rag_embedding_cache_requests.labels(tier="all", result="miss", variant=variant).inc(misses)
+        return found
+
+    async def set_many(self, vectors: dict[str, list[float]]) -> None:
+        if not vectors:
+            return
+        await asyncio.to_thread(self._local_set_many, vectors)
+        await self._redis_set_many(vectors)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@lru_cache()
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    if not settings.embedding_cache_enabled:
+        return None
+    path = Path(settings.embedding_cache_path) if settings.embedding_cache_path else EMBEDDING_CACHE_DEFAULT_PATH
+    return EmbeddingCache(
+        path,
+        max_bytes=settings.embedding_cache_max_mb * 1024 * 1024,
+        redis_url=settings.redis_url,
+        redis_ttl=settings.embedding_cache_redis_ttl_seconds,
+    )
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for embedding and cache lookup (NFKC + whitespace)."""
+    return " ".join(unicodedata.normalize("NFKC", query or "").split())
+
+
+class QueryEmbeddingCache:
+    """Process-local LRU for query embeddings with an optional Redis tier."""
+
+    def __init__(self, max_entries: int, *, redis_url: str = "", redis_ttl: int = 60 * 60 * 24 * 7):
+        self._max_entries = max(0, max_entries)
+        self._entries: OrderedDict[str, list[float]] = OrderedDict()
+        self._redis = BaseCache(redis_url) if redis_url else None
+        self._redis_ttl = redis_ttl
+
+    def _redis_key(self, key: str) -> str:
+        return redis_key("cache", "query-embedding", key)
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        for key in keys:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                found[key] = vector
+        if found:
+            rag_embedding_cache_requests.labels(tier="memory", result="hit", variant="query").inc(len(found))
+
+        remaining = [key for key in keys if key not in found]
+        if remaining and self._redis is not None and self._redis.enabled():
+            values = await self._redis.mget_json([self._redis_key(key) for key in remaining])
+            shared = 0
+            for key, value in zip(remaining, values):
+                if not isinstance(value, str):
+                    continue
+                try:
+                    vector = _unpack_vector(base64.b64decode(value))
+                except (ValueError, TypeError):
+                    continue
+                self._remember(key, vector)
+                found[key] = vector
+                shared += 1
+            if shared:
+                rag_embedding_cache_requests.labels(tier="redis", result="hit", variant="query").inc(shared)
+
+        misses = len(keys) - len(found)
+        if misses:
+            rag_embedding_cache_requests.labels(tier="all", result="miss", variant="query").inc(misses)
+        return found
+
+    async def set_many(self, vectors: dict[str, list[float]]) -> None:
+        for key, vector in vectors.items():
+            self._remember(key, vector)
+        if self._redis is None or not self._redis.enabled():
+            return
+        await self._redis.set_many_json(
+            {
+                self._redis_key(key): base64.b64encode(_pack_vector(vector)).decode("ascii")
+                for key, vector in vectors.items()
+            },
+            self._redis_ttl,
+        )
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+@lru_cache()
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(
+        settings.query_embedding_cache_size,
+        redis_url=settings.redis_url,
+        redis_ttl=settings.query_embedding_cache_redis_ttl_seconds,
+    )
+
+
+class EmbeddingRateLimiter:
+    """
+    Client-side TPM/RPM token bucket shared by every embedding request of the process.
+
+    Each bucket holds one minute of budget and refills continuously. A request
+    reserves its tokens immediately (the bucket may go negative) and then
+    sleeps off the deficit, so waiters are served in arrival order without a
+    lock. A limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        requests_per_minute: int,
+        *,
+        clock=time.monotonic,
+    ):
+        self.tokens_per_minute = max(0, tokens_per_minute)
+        self.requests_per_minute = max(0, requests_per_minute)
+        self._clock = clock
+        self._tokens = float(self.tokens_per_minute)
+        self._requests = float(self.requests_per_minute)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+
+    def reserve(self, tokens: int) -> float:
+        """Take budget for one request of ``tokens`` and return the seconds to wait before sending it."""
+        self._refill()
+        delay = 0.0
+        if self.tokens_per_minute:
+            # A request larger than the whole budget only has to wait for a full bucket.
+            self._tokens -= min(tokens, self.tokens_per_minute)
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens * 60 / self.tokens_per_minute)
+        if self.requests_per_minute:
+            self._requests -= 1
+            if self._requests < 0:
+                delay = max(delay, -self._requests * 60 / self.requests_per_minute)
+        return delay
+
+    async def acquire(self, tokens: int) -> float:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        rag_embedding_rate_limit_wait.observe(delay)
+        return delay
+
+
+@lru_cache()
+def get_embedding_rate_limiter() -> EmbeddingRateLimiter:
+    return EmbeddingRateLimiter(settings.embedding_tpm_limit, settings.embedding_rpm_limit)
+
+
+@lru_cache()
+def get_embedding_semaphore() -> asyncio.Semaphore:
+    """Process-wide cap on in-flight embedding requests, shared by concurrent ingests."""
+    return asyncio.Semaphore(max(1, settings.embedding_max_concurrency))
+
+
+def _estimate_batch_tokens(batch: list[tuple[int, str]], max_len: int) -> int:
+    return sum(int(min(len(text), max_len) * ESTIMATED_TOKENS_PER_CHAR_JP) for _, text in batch)
+
+
 def _split_into_token_batches(
     valid_texts: list[tuple[int, str]],
     max_len: int,
@@ -119,13 +543,87 @@ def _split_into_token_batches(
     return batches
 
 
+async def generate_query_embeddings(
+    queries: list[str],
+    backend: Optional[EmbeddingBackend] = None,
+) -> list[Optional[list[float]]]:
+    """
+    Embed all query variants of one retrieval with at most one API call.
+
+    Queries are deduplicated by their normalized form, which is also the query
+    embedding cache key; the remaining misses are sent in a single batched
+    request. The API receives the first original text seen for each key, so
+    query vectors match document vectors embedded from unnormalized text.
+
+    Args:
+        queries: Search queries (original, expansions, HyDE passage)
+        backend: Explicit backend selection (optional)
+
+    Returns:
+        Embedding per input query (None for empty queries or on failure)
+    """
+    results: list[Optional[list[float]]] = [None] * len(queries)
+    normalized = [normalize_query(q) for q in queries]
+    if not any(normalized):
+        return results
+
+    backend = backend or resolve_embedding_backend()
+    if backend is None:
+        logger.error("[埋め込み] 利用可能な埋め込みバックエンドなし（OPENAI_API_KEY未設定）")
+        return results
+
+    keys = [embedding_cache_key(backend.model, q) if q else "" for q in normalized]
+    unique_keys = list(dict.fromkeys(k for k in keys if k))
+    cache = get_query_embedding_cache()
+    found = await cache.get_many(unique_keys)
+    for key in unique_keys:
+        record_cache("query_embedding", key in found)
+
+    pending = {
+        key: queries[keys.index(key)]
+        for key in unique_keys
+        if key not in found
+    }
+    if pending:
+        max_len = settings.embedding_max_input_chars
+        try:
+            client = get_openai_embedding_client()
+            response = await client.embeddings.create(
+                model=backend.model,
+                input=[
+                    prepare_outbound_text(
+                        text,
+                        purpose="embedding",
+                        sensitivity="private_material",
+                        retention="indexed",
+                        provider_policy="explicit_consent_required",
+                        max_chars=max_len,
+                    ).text
+                    for text in pending.values()
+                ],
+            )
+            fresh = {
+                key: item.embedding
+                for key, item in zip(pending, response.data)
+            }
+            found.update(fresh)
+            await cache.set_many(fresh)
+        except Exception as e:
+            logger.error("[埋め込み] OpenAI クエリ埋め込み失敗: %s", e)
+
+    for idx, key in enumerate(keys):
+        if key:
+            results[idx] = found.get(key)
+    return results
+
+
 async def generate_embedding(
     text: str,
     backend: Optional[EmbeddingBackend] = None,
     allow_fallback: Optional[bool] = None,  # Kept for API compatibility, ignored
 ) -> Optional[list[float]]:
     """
-    Generate embedding for text using OpenAI.
+    Generate a query embedding for text using OpenAI (cached).
 
     Args:
         text: Text to embed
@@ -137,46 +635,27 @@ async def generate_embedding(
     """
     if not text or not text.strip():
         return None
-
-    backend = backend or resolve_embedding_backend()
-    if backend is None:
-        logger.error("[埋め込み] 利用可能な埋め込みバックエンドなし（OPENAI_API_KEY未設定）")
-        return None
-
-    max_len = settings.embedding_max_input_chars
-    outbound = prepare_outbound_text(
-        text,
-        purpose="embedding",
-        sensitivity="private_material",
-        retention="indexed",
-        provider_policy="explicit_consent_required",
-        max_chars=max_len,
-    )
-
-    try:
-        client = get_openai_embedding_client()
-        response = await client.embeddings.create(
-            model=backend.model,
-            input=outbound.text,
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        logger.error("[埋め込み] OpenAI 埋め込み失敗: %s", e)
-        return None
+    return (await generate_query_embeddings([text], backend=backend))[0]
 
 
 async def generate_embeddings_batch(
     texts: list[str],
     backend: Optional[EmbeddingBackend] = None,
     allow_fallback: Optional[bool] = None,  # Kept for API compatibility, ignored
+    *,
+    cache_variant: str = "document",
 ) -> list[Optional[list[float]]]:
     """
     Generate embeddings for multiple texts using OpenAI.
 
+    Texts already embedded with the same model are served from the embedding
+    cache; only misses are sent to the API.
+
     Args:
         texts: List of texts to embed
         backend: Explicit backend selection (optional)
         allow_fallback: Deprecated parameter, kept for API compatibility
+        cache_variant: Metrics label for the cache lookup (e.g. "document", "contextual")
 
     Returns:
         List of embedding vectors
@@ -196,62 +675,127 @@ async def generate_embeddings_batch(
 
     max_len = settings.embedding_max_input_chars
 
-    client = get_openai_embedding_client()
+    # Hash exactly what would be sent so redaction changes invalidate entries.
+    outbound_texts = [
+        (
+            i,
+            prepare_outbound_text(
+                t,
+                purpose="embedding",
+                sensitivity="private_material",
+                retention="indexed",
+                provider_policy="explicit_consent_required",
+                max_chars=max_len,
+            ).text,
+        )
+        for i, t in valid_texts
+    ]
+    keys = {i: embedding_cache_key(backend.model, t) for i, t in outbound_texts}
+
+    results: list[Optional[list[float]]] = [None] * len(texts)
 
-    # Split into batches to avoid token limit (300K max, using 250K for safety)
-    batches = _split_into_token_batches(valid_texts, max_len)
+    cache = get_embedding_cache()
+    cached: dict[str, list[float]] = {}
+    if cache is not None:
+        cached = await cache.get_many(list(keys.values()), variant=cache_variant)
+        for i, _ in outbound_texts:
+            results[i] = cached.get(keys[i])
+
+    # Embed each distinct miss once, even if it repeats within the request.
+    pending: list[tuple[int, str]] = []
+    pending_keys: set[str] = set()
+    for i, t in outbound_texts:
+        key = keys[i]
+        if key in cached or key in pending_keys:
+            continue
+        pending_keys.add(key)
+        pending.append((i, t))
+    if not pending:
+        return results
+
+    client = get_openai_embedding_client()
+    limiter = get_embedding_rate_limiter()
+    semaphore = get_embedding_semaphore()
+
+    # Split into batches to avoid token limit (300K max, using 250K for safety),
+    # and small enough that large documents spread over the concurrent slots.
+    total_tokens = _estimate_batch_tokens(pending, max_len)
+    token_limit = min(
+        OPENAI_BATCH_TOKEN_LIMIT,
+        max(
+            EMBEDDING_MIN_CONCURRENT_BATCH_TOKENS,
+            math.ceil(total_tokens / max(1, settings.embedding_max_concurrency)),
+        ),
+    )
+    batches = _split_into_token_batches(pending, max_len, token_limit)
     if len(batches) > 1:
         logger.info(
             "[埋め込み] batch split: texts=%d batches=%d",
-            len(valid_texts),
+            len(pending),
             len(batches),
         )
 
-    results: list[Optional[list[float]]] = [None] * len(texts)
+    fresh: dict[str, list[float]] = {}
 
-    for batch in batches:
+    async def embed_batch(batch: list[tuple[int, str]], attempt: int = 0) -> None:
         try:
-            response = await client.embeddings.create(
-                model=backend.model,
-                input=[
-                    prepare_outbound_text(
-                        t,
-                        purpose="embedding",
-                        sensitivity="private_material",
-                        retention="indexed",
-                        provider_policy="explicit_consent_required",
-                        max_chars=max_len,
-                    ).text
-                    for _, t in batch
-                ],
-            )
-            for embedding_item, (orig_idx, _) in zip(response.data, batch):
-                results[orig_idx] = embedding_item.embedding
-        except Exception as e:
-            logger.error("[埋め込み] OpenAI バッチ埋め込み失敗: %s", e)
+            async with semaphore:
+                await limiter.acquire(_estimate_batch_tokens(batch, max_len))
+                response = await client.embeddings.create(
+                    model=backend.model,
+                    input=[t for _, t in batch],
+                )
+        except openai.BadRequestError as e:
+            if len(batch) == 1:
+                rag_embedding_api_requests.labels(result="failed").inc()
+                logger.error(
+                    "[埋め込み] 個別埋め込み失敗 index=%d: %s",
+                    batch[0][0],
+                    e,
+                )
+                return
+            rag_embedding_api_requests.labels(result="split").inc()
             logger.warning(
-                "[埋め込み] バッチ失敗のため個別リトライにフォールバック (%d件)",
+                "[埋め込み] バッチ失敗のため二分割して再試行 (%d件): %s",
                 len(batch),
+                e,
             )
-            for orig_idx, text in batch:
-                try:
-                    response = await client.embeddings.create(
-                        model=backend.model,
-                        input=prepare_outbound_text(
-                            text,
-                            purpose="embedding",
-                            sensitivity="private_material",
-                            retention="indexed",
-                            provider_policy="explicit_consent_required",
-                            max_chars=max_len,
-                        ).text,
-                    )
-                    results[orig_idx] = response.data[0].embedding
-                except Exception as item_error:
-                    logger.error(
-                        "[埋め込み] 個別埋め込み失敗 index=%d: %s",
-                        orig_idx,
-                        item_error,
-                    )
+            middle = len(batch) // 2
+            await asyncio.gather(embed_batch(batch[:middle]), embed_batch(batch[middle:]))
+            return
+        except EMBEDDING_TRANSIENT_ERRORS as e:
+            if attempt < EMBEDDING_TRANSIENT_RETRIES:
+                delay = EMBEDDING_RETRY_BASE_DELAY_SECONDS * 2**attempt
+                rag_embedding_api_requests.labels(result="retry").inc()
+                logger.warning(
+                    "[埋め込み] 一時的な失敗のため %.1f 秒後にバッチ全体を再試行 (%d件, %d回目): %s",
+                    delay,
+                    len(batch),
+                    attempt + 1,
+                    e,
+                )
+                # Back off outside the semaphore so other batches keep the slot.
+                await asyncio.sleep(delay)
+                await embed_batch(batch, attempt + 1)
+                return
+            rag_embedding_api_requests.labels(result="failed").inc()
+            logger.error("[埋め込み] バッチ埋め込み失敗（再試行上限） (%d件): %s", len(batch), e)
+            return
+        except Exception as e:
+            rag_embedding_api_requests.labels(result="failed").inc()
+            logger.error("[埋め込み] バッチ埋め込み失敗 (%d件): %s", len(batch), e)
+            return
+        rag_embedding_api_requests.labels(result="ok").inc()
+        for embedding_item, (orig_idx, _) in zip(response.data, batch):
+            fresh[keys[orig_idx]] = embedding_item.embedding
+
+    await asyncio.gather(*(embed_batch(batch) for batch in batches))
+
+    for i, _ in outbound_texts:
+        if results[i] is None:
+            results[i] = fresh.get(keys[i])
+
+    if cache is not None and fresh:
+        await cache.set_many(fresh)
 
     return results
@@ -259,12 +259,13 @@ async def analyze_company_rag_gap(
     tenant_key: str,
 ) -> GapAnalysisResult:
     """Full gap analysis for HTTP endpoint and internal use."""
+    from app.rag.chroma_io import run_chroma_io
     from app.rag.vector_store import (
         get_company_rag_status,
         hybrid_search_company_context_enhanced,
     )
 
-    rag_status = get_company_rag_status(company_id, tenant_key=tenant_key)
+    rag_status = await run_chroma_io(get_company_rag_status, company_id, tenant_key=tenant_key)
     chunk_counts: dict[str, int] = {}
     for ct in CONTENT_TYPES:
         chunk_counts[ct] = rag_status.get(f"{ct}_chunks", 0)
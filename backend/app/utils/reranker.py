@@ -5,12 +5,23 @@ Provides fast, accurate reranking using cross-encoder models.
 Replaces LLM-based reranking for improved latency and reduced cost.
 """
 
+import asyncio
 import logging
 import os
 import hashlib
+import threading
+from pathlib import Path
 from typing import Optional
 
 from app.config import settings
+from app.rag.telemetry import rag_rerank_cascade_pairs
+from app.utils.reranker_cache import (
+    RERANK_TEXT_MAX_CHARS,
+    ScoreKey,
+    get_rerank_score_cache,
+    rerank_score_key,
+)
+from app.utils.reranker_executor import RerankerExecutor
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +64,41 @@ DEFAULT_CROSS_ENCODER_MODEL = "hotchpotch/japanese-reranker-base-v2"
 # - "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1" (previous: multilingual, machine-translated training data)
 
 RERANKER_VARIANTS = {"base", "tuned", "ab"}
+RERANKER_BACKENDS = {"torch", "onnx", "onnx-int8"}
+
+
+def resolve_reranker_backend() -> str:
+    """Resolve the inference backend from settings (unknown values fall back to torch)."""
+    backend = settings.reranker_backend.strip().lower()
+    return backend if backend in RERANKER_BACKENDS else "torch"
+
+
+def resolve_onnx_dir(model_name: str) -> Path:
+    """Directory holding the ONNX export for ``model_name``."""
+    from app.utils.reranker_onnx import onnx_model_dir
+
+    configured = settings.reranker_onnx_dir.strip()
+    return onnx_model_dir(model_name, Path(configured) if configured else None)
+
+
+def _load_onnx_model(model_name: str, backend: str):
+    """Load an exported ONNX cross-encoder, or None if it is unavailable."""
+    try:
+        from app.utils.reranker_onnx import ONNX_MODEL_FILES, OnnxCrossEncoder
+
+        model = OnnxCrossEncoder(
+            resolve_onnx_dir(model_name),
+            model_file=ONNX_MODEL_FILES[backend],
+            intra_op_threads=settings.reranker_onnx_threads,
+        )
+        logger.info(f"Loaded ONNX cross-encoder ({backend}): {model.model_path}")
+        return model
+    except Exception as e:
+        logger.warning(
+            f"ONNX reranker ({backend}) unavailable for {model_name}, "
+            f"falling back to torch: {e}"
+        )
+        return None
 
 
 class CrossEncoderReranker:
@@ -63,12 +109,15 @@ class CrossEncoderReranker:
     and rerank results based on relevance scores.
 
     Attributes:
-        model: CrossEncoder model instance
+        model: CrossEncoder (or OnnxCrossEncoder) model instance
         model_name: Name of the loaded model
+        backend: Inference backend actually in use (torch / onnx / onnx-int8)
     """
 
-    _instance: Optional["CrossEncoderReranker"] = None
-    _model_name: Optional[str] = None
+    backend: str = "torch"
+
+    _instances: dict[str, "CrossEncoderReranker"] = {}
+    _instances_lock = threading.Lock()
 
     def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER_MODEL):
         """
@@ -79,6 +128,14 @@ class CrossEncoderReranker:
         """
         self.model_name = model_name
         self.model: Optional["CrossEncoder"] = None
+        self.backend = "torch"
+
+        requested_backend = resolve_reranker_backend()
+        if requested_backend != "torch":
+            self.model = _load_onnx_model(model_name, requested_backend)
+            if self.model is not None:
+                self.backend = requested_backend
+                return
 
         if _ensure_cross_encoder_imported():
             try:
@@ -89,23 +146,31 @@ class CrossEncoderReranker:
                 self.model = None
         else:
             logger.warning("CrossEncoder not available - reranking disabled")
+
     @classmethod
     def get_instance(
         cls, model_name: str = DEFAULT_CROSS_ENCODER_MODEL
     ) -> "CrossEncoderReranker":
         """
-        Get or create singleton instance.
+        Get or create the shared instance for a model.
+
+        One instance is kept per model name, so base/tuned A/B routing does
+        not reload models on every switch.
 
         Args:
-            model_name: Model to use (only applied on first call)
+            model_name: Model to use
 
         Returns:
             CrossEncoderReranker instance
         """
-        if cls._instance is None or cls._model_name != model_name:
-            cls._instance = cls(model_name)
-            cls._model_name = model_name
-        return cls._instance
+        instance = cls._instances.get(model_name)
+        if instance is None:
+            with cls._instances_lock:
+                instance = cls._instances.get(model_name)
+                if instance is None:
+                    instance = cls(model_name)
+                    cls._instances[model_name] = instance
+        return instance
 
     def is_available(self) -> bool:
         """Check if reranker is available."""
@@ -119,6 +184,7 @@ class CrossEncoderReranker:
         text_key: str = "text",
         min_score: Optional[float] = None,
         sort: bool = True,
+        cascade_top_n: Optional[int] = None,
     ) -> list[dict]:
         """
         Rerank search results using cross-encoder scores.
@@ -132,6 +198,9 @@ class CrossEncoderReranker:
             sort: Whether to sort results by rerank_score (default True).
                   Set to False when the caller needs to preserve original order
                   and map scores back by index.
+            cascade_top_n: Cascade head size. The prefilter model scores all
+                  candidates and only the top ``cascade_top_n`` are rescored by
+                  this model. None follows RERANKER_CASCADE_*, 0 disables.
 
         Returns:
             Reranked results with 'rerank_score' field added
@@ -143,60 +212,233 @@ class CrossEncoderReranker:
             logger.warning("Cross-encoder not available, returning original order")
             return results[:top_k]
 
-        try:
-            # Prepare query-document pairs
-            pairs = []
-            valid_indices = []
-            for i, result in enumerate(results):
-                text = result.get(text_key, "")
-                if text:
-                    # Truncate long texts to avoid OOM
-                    pairs.append((query, text[:512]))
-                    valid_indices.append(i)
-
-            if not pairs:
-                return results[:top_k]
-
-            # Get cross-encoder scores
-            scores = self.model.predict(pairs)
+        pairs, valid_indices = self._prepare_pairs(query, results, text_key)
+        if not pairs:
+            return results[:top_k]
 
-            # Add scores to results
-            for idx, score in zip(valid_indices, scores):
-                results[idx]["rerank_score"] = float(score)
-
-            # Handle results without scores (no text)
-            for i, result in enumerate(results):
-                if "rerank_score" not in result:
-                    result["rerank_score"] = -float("inf")
-
-            # Sort by rerank score (unless caller wants original order)
-            if sort:
-                reranked = sorted(
-                    results,
-                    key=lambda x: x.get("rerank_score", -float("inf")),
-                    reverse=True,
-                )
+        try:
+            # Get cross-encoder scores (cached pairs skip the model)
+            plan = self._cascade_plan(cascade_top_n, len(pairs))
+            if plan is None:
+                scores = self._score_with_cache(pairs)
             else:
-                reranked = results
+                prefilter, head_size = plan
+                coarse = prefilter._score_with_cache(pairs)
+                head = _top_indices(coarse, head_size)
+                fine = self._score_with_cache([pairs[i] for i in head])
+                scores = _merge_cascade(results, valid_indices, coarse, head, fine)
+            return self._apply_scores(
+                results, valid_indices, scores, top_k, min_score, sort
+            )
+        except Exception as e:
+            logger.error(f"Reranking failed: {e}")
+            return results[:top_k]
 
-            # Apply minimum score filter if specified
-            if min_score is not None:
-                reranked = [
-                    r for r in reranked if r.get("rerank_score", 0) >= min_score
-                ]
+    async def arerank(
+        self,
+        query: str,
+        results: list[dict],
+        top_k: int = 10,
+        text_key: str = "text",
+        min_score: Optional[float] = None,
+        sort: bool = True,
+        cascade_top_n: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Async variant of :meth:`rerank` for use inside the event loop.
+
+        Inference runs on the shared reranker executor thread, where pairs
+        from concurrent requests are micro-batched into one ``predict`` call.
+        Arguments and return value are the same as :meth:`rerank`.
+        """
+        if not results:
+            return results
+
+        if not self.model:
+            logger.warning("Cross-encoder not available, returning original order")
+            return results[:top_k]
 
-            return reranked[:top_k]
+        pairs, valid_indices = self._prepare_pairs(query, results, text_key)
+        if not pairs:
+            return results[:top_k]
 
+        try:
+            plan = await self._acascade_plan(cascade_top_n, len(pairs))
+            if plan is None:
+                scores = await self._ascore_with_cache(pairs)
+            else:
+                prefilter, head_size = plan
+                coarse = await prefilter._ascore_with_cache(pairs)
+                head = _top_indices(coarse, head_size)
+                fine = await self._ascore_with_cache([pairs[i] for i in head])
+                scores = _merge_cascade(results, valid_indices, coarse, head, fine)
+            return self._apply_scores(
+                results, valid_indices, scores, top_k, min_score, sort
+            )
         except Exception as e:
             logger.error(f"Reranking failed: {e}")
             return results[:top_k]
 
-    def score_pairs(self, pairs: list[tuple[str, str]]) -> list[float]:
+    def _cascade_target(self, cascade_top_n: Optional[int], n_pairs: int) -> Optional[tuple[str, int]]:
+        """(prefilter model name, head size) when the cascade applies, else None."""
+        if cascade_top_n is None:
+            cascade_top_n = (
+                settings.reranker_cascade_top_n
+                if settings.reranker_cascade_enabled
+                else 0
+            )
+        if cascade_top_n <= 0 or n_pairs <= cascade_top_n:
+            return None
+        prefilter_name = settings.reranker_cascade_prefilter_model.strip()
+        if not prefilter_name or prefilter_name == self.model_name:
+            return None
+        return prefilter_name, cascade_top_n
+
+    def _cascade_plan(
+        self, cascade_top_n: Optional[int], n_pairs: int
+    ) -> Optional[tuple["CrossEncoderReranker", int]]:
+        """(prefilter reranker, head size) when the cascade applies, else None."""
+        target = self._cascade_target(cascade_top_n, n_pairs)
+        if target is None:
+            return None
+        prefilter = CrossEncoderReranker.get_instance(target[0])
+        if not prefilter.is_available():
+            return None
+        return prefilter, target[1]
+
+    async def _acascade_plan(
+        self, cascade_top_n: Optional[int], n_pairs: int
+    ) -> Optional[tuple["CrossEncoderReranker", int]]:
+        """:meth:`_cascade_plan` that loads a not-yet-loaded prefilter model off the event loop."""
+        target = self._cascade_target(cascade_top_n, n_pairs)
+        if target is None:
+            return None
+        prefilter = CrossEncoderReranker._instances.get(target[0])
+        if prefilter is None:
+            prefilter = await asyncio.to_thread(CrossEncoderReranker.get_instance, target[0])
+        if not prefilter.is_available():
+            return None
+        return prefilter, target[1]
+
+    @staticmethod
+    def _prepare_pairs(
+        query: str, results: list[dict], text_key: str
+    ) -> tuple[list[tuple[str, str]], list[int]]:
+        """Build (query, text) pairs for results that have text."""
+        pairs = []
+        valid_indices = []
+        for i, result in enumerate(results):
+            text = result.get(text_key, "")
+            if text:
+                # Truncate long texts to avoid OOM
+                pairs.append((query, text[:RERANK_TEXT_MAX_CHARS]))
+                valid_indices.append(i)
+        return pairs, valid_indices
+
+    @property
+    def score_cache_model(self) -> str:
+        """Model identifier used in score cache keys (quantized scores differ slightly)."""
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}#{self.backend}"
+
+    def _cache_keys(self, pairs: list[tuple[str, str]]) -> list[ScoreKey]:
+        return [rerank_score_key(self.score_cache_model, query, text) for query, text in pairs]
+
+    @staticmethod
+    def _missing_pairs(
+        keys: list[ScoreKey],
+        pairs: list[tuple[str, str]],
+        found: dict[ScoreKey, float],
+    ) -> dict[ScoreKey, tuple[str, str]]:
+        """Unique pairs that still need model scores, keyed by cache key."""
+        missing: dict[ScoreKey, tuple[str, str]] = {}
+        for key, pair in zip(keys, pairs):
+            if key not in found and key not in missing:
+                missing[key] = pair
+        return missing
+
+    def _score_with_cache(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """Score pairs on this thread, sending only uncached pairs to the model."""
+        cache = get_rerank_score_cache()
+        if cache is None:
+            return [float(s) for s in self.model.predict(pairs)]
+
+        keys = self._cache_keys(pairs)
+        found = cache.get_local(keys)
+        missing = self._missing_pairs(keys, pairs, found)
+        if missing:
+            scores = self.model.predict(list(missing.values()))
+            fresh = {key: float(score) for key, score in zip(missing, scores)}
+            cache.set_local(fresh)
+            found.update(fresh)
+        return [found[key] for key in keys]
+
+    async def _ascore_with_cache(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """Async variant of :meth:`_score_with_cache` using the executor and Redis tier."""
+        executor = get_reranker_executor()
+        cache = get_rerank_score_cache()
+        if cache is None:
+            return await executor.score(self.model_name, pairs)
+
+        keys = self._cache_keys(pairs)
+        found = await cache.get_many(keys)
+        missing = self._missing_pairs(keys, pairs, found)
+        if missing:
+            scores = await executor.score(self.model_name, list(missing.values()))
+            fresh = dict(zip(missing, scores))
+            await cache.set_many(fresh)
+            found.update(fresh)
+        return [found[key] for key in keys]
+
+    @staticmethod
+    def _apply_scores(
+        results: list[dict],
+        valid_indices: list[int],
+        scores,
+        top_k: int,
+        min_score: Optional[float],
+        sort: bool,
+    ) -> list[dict]:
+        """Attach rerank_score, then sort / filter / truncate."""
+        # Add scores to results
+        for idx, score in zip(valid_indices, scores):
+            results[idx]["rerank_score"] = float(score)
+
+        # Handle results without scores (no text)
+        for result in results:
+            if "rerank_score" not in result:
+                result["rerank_score"] = -float("inf")
+
+        # Sort by rerank score (unless caller wants original order)
+        if sort:
+            reranked = sorted(
+                results,
+                key=lambda x: x.get("rerank_score", -float("inf")),
+                reverse=True,
+            )
+        else:
+            reranked = results
+
+        # Apply minimum score filter if specified
+        if min_score is not None:
+            reranked = [
+                r for r in reranked if r.get("rerank_score", 0) >= min_score
+            ]
+
+        return reranked[:top_k]
+
+    def score_pairs(
+        self, pairs: list[tuple[str, str]], *, use_cache: bool = True
+    ) -> list[float]:
         """
         Score query-document pairs directly.
 
         Args:
             pairs: List of (query, document) tuples
+            use_cache: Reuse cached scores for previously seen pairs. Cached
+                scoring truncates documents like :meth:`rerank` does, since
+                the cache key covers only the first 512 characters.
 
         Returns:
             List of relevance scores
@@ -205,6 +447,10 @@ class CrossEncoderReranker:
             return [0.0] * len(pairs)
 
         try:
+            if use_cache:
+                return self._score_with_cache(
+                    [(q, d[:RERANK_TEXT_MAX_CHARS]) for q, d in pairs]
+                )
             scores = self.model.predict(pairs)
             return [float(s) for s in scores]
         except Exception as e:
@@ -212,6 +458,76 @@ class CrossEncoderReranker:
             return [0.0] * len(pairs)
 
 
+def _top_indices(scores: list[float], n: int) -> list[int]:
+    """Indices of the ``n`` highest scores (ties keep input order)."""
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:n]
+
+
+def merge_cascade_scores(
+    coarse: list[float], head: list[int], fine: list[float]
+) -> list[float]:
+    """
+    Merge prefilter and head scores onto the head model's scale.
+
+    Head items take their head-model score. Tail items keep their prefilter
+    order but are shifted below the lowest head score, so sorting, top-k and
+    ``min_score`` behave as if the head model had ranked everything.
+    """
+    merged = list(coarse)
+    for index, score in zip(head, fine):
+        merged[index] = float(score)
+    head_set = set(head)
+    tail = [i for i in range(len(coarse)) if i not in head_set]
+    if not tail or not fine:
+        return merged
+    floor = min(float(score) for score in fine)
+    tail_max = max(coarse[i] for i in tail)
+    if tail_max >= floor:
+        shift = tail_max - floor + 1e-6
+        for i in tail:
+            merged[i] = coarse[i] - shift
+    return merged
+
+
+def _merge_cascade(
+    results: list[dict],
+    valid_indices: list[int],
+    coarse: list[float],
+    head: list[int],
+    fine: list[float],
+) -> list[float]:
+    """Merge cascade scores and record which stage scored each result."""
+    head_set = set(head)
+    for position, idx in enumerate(valid_indices):
+        results[idx]["rerank_prefilter_score"] = float(coarse[position])
+        results[idx]["rerank_stage"] = "head" if position in head_set else "prefilter"
+    rag_rerank_cascade_pairs.labels(stage="prefilter").inc(len(coarse))
+    rag_rerank_cascade_pairs.labels(stage="head").inc(len(head))
+    return merge_cascade_scores(coarse, head, fine)
+
+
+_executor: Optional[RerankerExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _resolve_executor_model(model_name: str):
+    return CrossEncoderReranker.get_instance(model_name).model
+
+
+def get_reranker_executor() -> RerankerExecutor:
+    """Shared micro-batching executor for cross-encoder inference."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = RerankerExecutor(
+                    _resolve_executor_model,
+                    window_ms=settings.reranker_batch_window_ms,
+                    max_batch_pairs=settings.reranker_max_batch_pairs,
+                )
+    return _executor
+
+
 def _stable_bucket(value: str) -> float:
     """Return deterministic bucket [0,1) from an arbitrary key."""
     key = (value or "").strip().lower()
@@ -255,16 +571,17 @@ def check_reranker_health() -> dict:
     Run a health check on the cross-encoder reranker.
 
     Returns:
-        dict with keys: available, model_name, test_score, error
+        dict with keys: available, model_name, backend, test_score, error
     """
     result = {
         "available": False,
         "model_name": DEFAULT_CROSS_ENCODER_MODEL,
+        "backend": resolve_reranker_backend(),
         "test_score": None,
         "error": None,
     }
 
-    if not _ensure_cross_encoder_imported():
+    if result["backend"] == "torch" and not _ensure_cross_encoder_imported():
         result["error"] = "sentence-transformers not installed"
         logger.error(
             "Reranker health check FAILED: sentence-transformers not installed. "
@@ -274,6 +591,7 @@ def check_reranker_health() -> dict:
 
     try:
         reranker = CrossEncoderReranker.get_instance()
+        result["backend"] = reranker.backend
         if not reranker.is_available():
             result["error"] = "Cross-encoder model failed to load"
             logger.error("Reranker health check FAILED: model not loaded")
@@ -282,7 +600,7 @@ def check_reranker_health() -> dict:
         # Quick sanity test with a known-good pair
         # A matching query-document pair should score well above 0.5
         test_pairs = [("テスト用クエリ", "テスト用クエリに関する公式ページ")]
-        scores = reranker.score_pairs(test_pairs)
+        scores = reranker.score_pairs(test_pairs, use_cache=False)
         test_score = scores[0] if scores else 0.0
         result["test_score"] = test_score
 
@@ -297,7 +615,7 @@ def check_reranker_health() -> dict:
             result["available"] = True
             logger.info(
                 f"Reranker health check PASSED: model={reranker.model_name}, "
-                f"test_score={test_score:.4f}"
+                f"backend={reranker.backend}, test_score={test_score:.4f}"
             )
     except Exception as e:
         result["error"] = str(e)
@@ -312,23 +630,28 @@ async def rerank_with_cross_encoder(
     results: list[dict],
     top_k: int = 10,
     model_name: str = DEFAULT_CROSS_ENCODER_MODEL,
+    cascade_top_n: Optional[int] = None,
 ) -> list[dict]:
     """
     Rerank results using cross-encoder (async wrapper).
 
-    This is a drop-in replacement for LLM-based reranking.
+    This is a drop-in replacement for LLM-based reranking. Inference runs on
+    the reranker executor thread so the event loop is never blocked.
 
     Args:
         query: Search query
         results: Search results with 'text' field
         top_k: Number of results to return
         model_name: Cross-encoder model to use
+        cascade_top_n: Cascade head size (None follows settings, 0 disables)
 
     Returns:
         Reranked results
     """
     reranker = CrossEncoderReranker.get_instance(model_name)
-    return reranker.rerank(query, results, top_k=top_k)
+    return await reranker.arerank(
+        query, results, top_k=top_k, cascade_top_n=cascade_top_n
+    )
 
 
 def get_reranker(model_name: str = DEFAULT_CROSS_ENCODER_MODEL) -> CrossEncoderReranker:
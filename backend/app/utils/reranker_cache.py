@@ -0,0 +1,143 @@
+"""
+Reranker Score Cache
+
+Cross-encoder scores are a pure function of (model, query, passage), and the
+same pairs are rescored repeatedly (conversation turns, ES review retries,
+repeated web searches for a company). Scores are kept in a process-local LRU
+with an optional Redis tier, keyed by model name plus hashes of the query and
+the truncated passage, so only unseen pairs reach the model.
+
+The synchronous scoring paths use the in-process tier only; the async paths
+also consult and backfill Redis.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from app.config import settings
+from app.rag.telemetry import rag_rerank_cache_requests
+from app.utils.cache import BaseCache
+from app.utils.redis_keys import redis_key
+
+# Passages are truncated to this many characters before scoring.
+RERANK_TEXT_MAX_CHARS = 512
+
+ScoreKey = tuple[str, str, str]
+
+
+def _sha(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def rerank_score_key(model_name: str, query: str, text: str) -> ScoreKey:
+    """Cache key for one (query, passage) pair scored by ``model_name``."""
+    return (model_name, _sha(query), _sha(text[:RERANK_TEXT_MAX_CHARS]))
+
+
+def _record_lookups(
+    keys: list[ScoreKey],
+    memory_hits: dict[ScoreKey, float],
+    redis_hits: dict[ScoreKey, float],
+) -> None:
+    for key in keys:
+        if key in memory_hits:
+            tier, result = "memory", "hit"
+        elif key in redis_hits:
+            tier, result = "redis", "hit"
+        else:
+            tier, result = "all", "miss"
+        rag_rerank_cache_requests.labels(tier=tier, result=result, model=key[0]).inc()
+
+
+class RerankScoreCache:
+    """Process-local LRU of rerank scores with an optional Redis tier."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        *,
+        redis_url: str = "",
+        redis_ttl: int = 60 * 60 * 24,
+    ):
+        self._max_entries = max(0, max_entries)
+        self._entries: OrderedDict[ScoreKey, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = BaseCache(redis_url) if redis_url and redis_ttl > 0 else None
+        self._redis_ttl = redis_ttl
+
+    @staticmethod
+    def _redis_key(key: ScoreKey) -> str:
+        return redis_key("cache", "rerank-score", *key)
+
+    def _redis_enabled(self) -> bool:
+        return self._redis is not None and self._redis.enabled()
+
+    def _lookup_memory(self, keys: list[ScoreKey]) -> dict[ScoreKey, float]:
+        found: dict[ScoreKey, float] = {}
+        with self._lock:
+            for key in keys:
+                score = self._entries.get(key)
+                if score is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = score
+        return found
+
+    def get_local(self, keys: list[ScoreKey]) -> dict[ScoreKey, float]:
+        """Lookup in the in-process tier only (safe from any thread)."""
+        found = self._lookup_memory(keys)
+        _record_lookups(keys, found, {})
+        return found
+
+    def set_local(self, scores: dict[ScoreKey, float]) -> None:
+        if self._max_entries <= 0:
+            return
+        with self._lock:
+            for key, score in scores.items():
+                self._entries[key] = score
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_many(self, keys: list[ScoreKey]) -> dict[ScoreKey, float]:
+        """Lookup in memory, then Redis for the rest (hits are backfilled locally)."""
+        found = self._lookup_memory(keys)
+        remaining = [key for key in keys if key not in found]
+        shared: dict[ScoreKey, float] = {}
+        if remaining and self._redis_enabled():
+            values = await self._redis.mget_json([self._redis_key(key) for key in remaining])
+            for key, value in zip(remaining, values):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    shared[key] = float(value)
+            self.set_local(shared)
+
+        _record_lookups(keys, found, shared)
+        found.update(shared)
+        return found
+
+    async def set_many(self, scores: dict[ScoreKey, float]) -> None:
+        self.set_local(scores)
+        if not scores or not self._redis_enabled():
+            return
+        await self._redis.set_many_json(
+            {self._redis_key(key): score for key, score in scores.items()},
+            self._redis_ttl,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache()
+def get_rerank_score_cache() -> Optional[RerankScoreCache]:
+    """Shared score cache, or None when both tiers are disabled."""
+    if settings.reranker_score_cache_size <= 0 and not settings.redis_url:
+        return None
+    return RerankScoreCache(
+        settings.reranker_score_cache_size,
+        redis_url=settings.redis_url,
+        redis_ttl=settings.reranker_score_cache_redis_ttl_seconds,
+    )
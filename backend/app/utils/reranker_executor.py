@@ -0,0 +1,154 @@
+"""
+Reranker Inference Executor
+
+Runs cross-encoder inference on a dedicated worker thread so the event loop
+never blocks on ``CrossEncoder.predict``. Pairs submitted by concurrent
+requests within a short window are merged, sorted by length (less padding)
+and scored as one batch; each caller gets its own slice of the scores back.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Sequence
+
+from app.rag.telemetry import (
+    rag_rerank_batch_size,
+    rag_rerank_duration,
+    rag_rerank_queue_depth,
+)
+
+logger = logging.getLogger(__name__)
+
+ModelResolver = Callable[[str], Any]
+
+
+@dataclass
+class _ScoreRequest:
+    model_name: str
+    pairs: list[tuple[str, str]]
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+
+
+def _resolve_future(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _deliver(request: _ScoreRequest, result: Any = None, error: Optional[BaseException] = None) -> None:
+    try:
+        request.loop.call_soon_threadsafe(_resolve_future, request.future, result, error)
+    except RuntimeError:
+        # The caller's event loop has already been closed.
+        pass
+
+
+class RerankerExecutor:
+    """
+    Single-thread micro-batching inference worker.
+
+    Args:
+        resolve_model: Returns the loaded model (with ``predict``) for a model name.
+            Called only on the worker thread, so models are owned by it.
+        window_ms: How long to wait for more requests after the first one.
+        max_batch_pairs: Stop collecting once a batch reaches this many pairs.
+    """
+
+    def __init__(
+        self,
+        resolve_model: ModelResolver,
+        *,
+        window_ms: float = 4.0,
+        max_batch_pairs: int = 128,
+    ):
+        self._resolve_model = resolve_model
+        self._window = max(0.0, window_ms) / 1000.0
+        self._max_batch_pairs = max(1, max_batch_pairs)
+        self._queue: "queue.Queue[_ScoreRequest]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="reranker-executor", daemon=True
+                )
+                self._thread.start()
+
+    async def score(self, model_name: str, pairs: Sequence[tuple[str, str]]) -> list[float]:
+        """Score ``pairs`` with ``model_name``; raises if inference fails."""
+        if not pairs:
+            return []
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        request = _ScoreRequest(model_name, list(pairs), loop, loop.create_future())
+        self._queue.put(request)
+        rag_rerank_queue_depth.set(self._queue.qsize())
+        return await request.future
+
+    def _collect(self, first: _ScoreRequest) -> list[_ScoreRequest]:
+        batch = [first]
+        total = len(first.pairs)
+        deadline = time.monotonic() + self._window
+        while total < self._max_batch_pairs:
+            remaining = deadline - time.monotonic()
+            try:
+                request = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            batch.append(request)
+            total += len(request.pairs)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            batch = self._collect(first)
+            rag_rerank_queue_depth.set(self._queue.qsize())
+            by_model: dict[str, list[_ScoreRequest]] = {}
+            for request in batch:
+                by_model.setdefault(request.model_name, []).append(request)
+            for model_name, requests in by_model.items():
+                self._run_batch(model_name, requests)
+
+    def _run_batch(self, model_name: str, requests: list[_ScoreRequest]) -> None:
+        pairs = [pair for request in requests for pair in request.pairs]
+        try:
+            model = self._resolve_model(model_name)
+            if model is None:
+                raise RuntimeError(f"reranker model not available: {model_name}")
+            # Length-sorted batches pad less inside the tokenizer.
+            order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+            started = time.perf_counter()
+            sorted_scores = model.predict([pairs[i] for i in order])
+            rag_rerank_duration.labels(model=model_name).observe(time.perf_counter() - started)
+            rag_rerank_batch_size.labels(model=model_name).observe(len(pairs))
+            scores = [0.0] * len(pairs)
+            for position, index in enumerate(order):
+                scores[index] = float(sorted_scores[position])
+        except Exception as e:
+            logger.error(f"Reranker batch failed ({len(pairs)} pairs): {e}")
+            for request in requests:
+                _deliver(request, error=e)
+            return
+
+        offset = 0
+        for request in requests:
+            size = len(request.pairs)
+            _deliver(request, scores[offset:offset + size])
+            offset += size
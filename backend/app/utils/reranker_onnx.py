@@ -0,0 +1,110 @@
+"""
+ONNX Runtime Cross-Encoder Backend
+
+CPU inference for cross-encoder rerankers exported by
+``scripts/export_reranker_onnx.py``. The export directory holds the
+tokenizer, the model config, an fp32 graph (``model.onnx``) and a dynamically
+int8-quantized graph (``model.int8.onnx``).
+
+``OnnxCrossEncoder.predict`` mirrors ``sentence_transformers.CrossEncoder.predict``
+for single-label rerankers (sigmoid over the logit), so it can be swapped in
+behind ``CrossEncoderReranker`` without changing score thresholds.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_DIR = Path(__file__).parent.parent.parent / "data" / "reranker_onnx"
+
+ONNX_MODEL_FILES = {
+    "onnx": "model.onnx",
+    "onnx-int8": "model.int8.onnx",
+}
+
+
+def onnx_model_dir(model_name: str, root: Optional[Path] = None) -> Path:
+    """Export directory for ``model_name`` under ``root`` (one subdirectory per model)."""
+    slug = model_name.strip().strip("/").replace("/", "__") or "model"
+    return (root or ONNX_DIR) / slug
+
+
+def _sigmoid(values: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-values))
+
+
+class OnnxCrossEncoder:
+    """
+    Single-label cross-encoder running on ONNX Runtime's CPU provider.
+
+    Args:
+        model_dir: Export directory (tokenizer + config + ONNX graphs)
+        model_file: Graph file inside ``model_dir``
+        batch_size: Pairs per ``session.run`` call
+        max_length: Token truncation length (tokenizer default when None)
+        intra_op_threads: ORT intra-op threads (ORT default when 0)
+    """
+
+    def __init__(
+        self,
+        model_dir: Path,
+        *,
+        model_file: str = ONNX_MODEL_FILES["onnx-int8"],
+        batch_size: int = 32,
+        max_length: Optional[int] = None,
+        intra_op_threads: int = 0,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoTokenizer
+
+        model_path = Path(model_dir) / model_file
+        if not model_path.exists():
+            raise FileNotFoundError(f"ONNX reranker not found: {model_path}")
+
+        config = AutoConfig.from_pretrained(model_dir)
+        if getattr(config, "num_labels", 1) != 1:
+            raise ValueError(
+                f"ONNX reranker expects a single-label model, got num_labels={config.num_labels}"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.model_path = model_path
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self._input_names = [i.name for i in self.session.get_inputs()]
+
+    def predict(self, pairs: Sequence[tuple[str, str]]) -> np.ndarray:
+        """Relevance scores in [0, 1] for (query, document) pairs."""
+        scores: list[np.ndarray] = []
+        for start in range(0, len(pairs), self.batch_size):
+            batch = pairs[start:start + self.batch_size]
+            encoded = self.tokenizer(
+                [query for query, _ in batch],
+                [doc for _, doc in batch],
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feeds = {
+                name: np.asarray(encoded[name], dtype=np.int64)
+                for name in self._input_names
+                if name in encoded
+            }
+            logits = np.asarray(self.session.run(None, feeds)[0], dtype=np.float32)
+            scores.append(_sigmoid(logits.reshape(len(batch), -1)[:, 0]))
+        if not scores:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(scores)
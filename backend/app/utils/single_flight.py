@@ -0,0 +1,123 @@
+"""
+Single-flight request coalescing.
+
+``SingleFlight`` collapses concurrent calls for the same key inside one
+process: the first caller (leader) runs the computation, later callers await
+its result. ``redis_single_flight`` extends this across workers with a short
+Redis lease (``SET NX EX``): the lease holder computes and writes the shared
+cache, other workers poll that cache until the result appears, the lease
+disappears (holder failed, so they compete again) or the wait budget runs out
+(they compute themselves). Redis errors always fall back to computing locally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from app.rag.telemetry import rag_singleflight_requests
+from app.utils.cache import BaseCache
+from app.utils.secure_logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The leader was cancelled; followers must compute on their own."""
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Avoid "exception was never retrieved" warnings when nobody followed.
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight(Generic[T]):
+    """In-process coalescing of concurrent calls by key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def inflight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        existing = self._inflight.get(key)
+        if existing is not None:
+            rag_singleflight_requests.labels(name=self.name, scope="local", role="follower").inc()
+            try:
+                return await asyncio.shield(existing)
+            except _LeaderCancelled:
+                return await fn()
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        rag_singleflight_requests.labels(name=self.name, scope="local", role="leader").inc()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+
+async def redis_single_flight(
+    cache: BaseCache,
+    lock_key: str,
+    compute: Callable[[], Awaitable[T]],
+    *,
+    read_cached: Callable[[], Awaitable[Optional[T]]],
+    name: str,
+    lease_seconds: int = 30,
+    wait_seconds: float = 20.0,
+    poll_seconds: float = 0.1,
+) -> T:
+    """
+    Cross-worker single-flight built on a Redis lease.
+
+    ``compute`` must publish its result where ``read_cached`` can see it
+    (e.g. write the shared cache) before returning.
+    """
+    deadline = time.monotonic() + max(0.0, wait_seconds)
+    while True:
+        token = secrets.token_urlsafe(12)
+        acquired = await cache.acquire_lock(lock_key, token, lease_seconds)
+        if acquired is None:
+            rag_singleflight_requests.labels(name=name, scope="redis", role="unavailable").inc()
+            return await compute()
+        if acquired:
+            rag_singleflight_requests.labels(name=name, scope="redis", role="leader").inc()
+            try:
+                return await compute()
+            finally:
+                await cache.release_lock(lock_key, token)
+
+        # Another worker holds the lease: wait for it to publish the result.
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_seconds)
+            cached = await read_cached()
+            if cached is not None:
+                rag_singleflight_requests.labels(name=name, scope="redis", role="follower").inc()
+                return cached
+            if not await cache.lock_exists(lock_key):
+                # Lease released without a result (holder failed): compete again.
+                break
+
+        if time.monotonic() >= deadline:
+            rag_singleflight_requests.labels(name=name, scope="redis", role="timeout").inc()
+            logger.info("[single-flight] %s のロック待機がタイムアウトしたためローカルで計算します", name)
+            return await compute()
@@ -0,0 +1,206 @@
+"""
+Two-level cache with stale-while-revalidate.
+
+An in-process LRU (O(1) get/set/evict, per-entry TTL) sits in front of a
+shared Redis tier accessed through ``BaseCache``. Entries carry their creation
+time, so every worker agrees on freshness:
+
+- younger than ``ttl_seconds``: fresh, returned as-is
+- within the following ``stale_seconds``: stale, returned immediately while a
+  single background task recomputes it
+- older: treated as a miss
+
+Values must be JSON-compatible (they are stored in Redis through the cache codec).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from app.utils.cache import BaseCache
+from app.utils.redis_keys import redis_key
+from app.utils.secure_logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# (tier, result) callback; tier is memory / redis / all, result is hit / stale / miss.
+LookupObserver = Callable[[str, str], None]
+
+
+@dataclass
+class CacheLookup(Generic[T]):
+    value: T
+    stale: bool
+
+
+class LRUTTLCache(Generic[T]):
+    """Bounded in-process LRU whose entries remember when they were created."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max(0, max_entries)
+        self._entries: OrderedDict[str, tuple[float, T]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[tuple[float, T]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: T, created_at: Optional[float] = None) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = (time.time() if created_at is None else created_at, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TieredCache(Generic[T]):
+    """
+    In-process LRU + Redis cache with stale-while-revalidate.
+
+    Args:
+        namespace: Redis key namespace (``cc:<env>:cache:<namespace>:<key>``)
+        max_entries: In-process LRU capacity
+        ttl_seconds: Freshness window
+        stale_seconds: Extra window during which stale values are served
+        redis_url: Shared tier; empty disables it
+        on_lookup: Optional metrics hook called with (tier, result)
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        max_entries: int,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+        redis_url: str = "",
+        on_lookup: Optional[LookupObserver] = None,
+    ):
+        self.namespace = namespace
+        self._local: LRUTTLCache[T] = LRUTTLCache(max_entries)
+        self._ttl = max(0.0, ttl_seconds)
+        self._stale = max(0.0, stale_seconds)
+        self._redis = BaseCache(redis_url) if redis_url else None
+        self._on_lookup = on_lookup
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+    def _redis_key(self, key: str) -> str:
+        return redis_key("cache", self.namespace, key)
+
+    def _redis_enabled(self) -> bool:
+        return self._redis is not None and self._redis.enabled()
+
+    def _observe(self, tier: str, result: str) -> None:
+        if self._on_lookup is not None:
+            self._on_lookup(tier, result)
+
+    def _classify(self, created_at: float) -> Optional[bool]:
+        """False = fresh, True = stale, None = expired."""
+        age = time.time() - created_at
+        if age < self._ttl:
+            return False
+        if age < self._ttl + self._stale:
+            return True
+        return None
+
+    async def get(self, key: str) -> Optional[CacheLookup[T]]:
+        entry = self._local.get(key)
+        if entry is not None:
+            stale = self._classify(entry[0])
+            if stale is not None:
+                self._observe("memory", "stale" if stale else "hit")
+                return CacheLookup(entry[1], stale)
+            self._local.pop(key)
+
+        if self._redis_enabled():
+            payload = await self._redis.get_json(self._redis_key(key))
+            if isinstance(payload, dict) and "v" in payload:
+                created_at = float(payload.get("t") or 0.0)
+                stale = self._classify(created_at)
+                if stale is not None:
+                    self._local.set(key, payload["v"], created_at)
+                    self._observe("redis", "stale" if stale else "hit")
+                    return CacheLookup(payload["v"], stale)
+
+        self._observe("all", "miss")
+        return None
+
+    async def set(self, key: str, value: T) -> None:
+        created_at = time.time()
+        self._local.set(key, value, created_at)
+        if self._redis_enabled():
+            ttl = max(1, int(self._ttl + self._stale))
+            await self._redis.set_json(
+                self._redis_key(key), {"v": value, "t": created_at}, ttl
+            )
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[T]]],
+        *,
+        should_cache: Callable[[T], bool] = bool,
+    ) -> Optional[T]:
+        """
+        Cached value for ``key``, computing it on a miss.
+
+        Stale values are returned immediately and refreshed in the background
+        (at most one refresh per key per process). Results failing
+        ``should_cache`` (empty by default) are returned but not stored.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            if cached.stale:
+                self._schedule_refresh(key, compute, should_cache)
+            return cached.value
+
+        value = await compute()
+        if value is not None and should_cache(value):
+            await self.set(key, value)
+        return value
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Optional[T]]],
+        should_cache: Callable[[T], bool],
+    ) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                value = await compute()
+                if value is not None and should_cache(value):
+                    await self.set(key, value)
+            except Exception as e:
+                logger.warning("[キャッシュ] %s のバックグラウンド更新に失敗: %s", self.namespace, e)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    async def drain(self) -> None:
+        """Wait for in-flight background refreshes (tests / shutdown)."""
+        while self._refreshing:
+            await asyncio.gather(*list(self._refreshing.values()), return_exceptions=True)
+
+    def clear_local(self) -> None:
+        self._local.clear()
@@ -616,11 +616,12 @@ async def search_with_rrf_fusion(
 # =============================================================================
 
 
-def rerank_web_results(
+async def rerank_web_results(
     query: str,
     results: list[WebSearchResult],
     top_k: int = 20,
     routing_key: str | None = None,
+    cascade_top_n: int | None = None,
 ) -> list[WebSearchResult]:
     """
     Rerank web search results using CrossEncoderReranker.
@@ -630,6 +631,7 @@ def rerank_web_results(
         results: Web search results to rerank
         top_k: Number of results to rerank and return
         routing_key: Deterministic key for base/tuned A/B routing
+        cascade_top_n: Prefilter cascade head size (None follows settings, 0 disables)
 
     Returns:
         Reranked results with rerank_score field set
@@ -653,12 +655,13 @@ def rerank_web_results(
         docs = [{"text": f"{r.title} {r.snippet}"[:512]} for r in results[:top_k]]
 
         # Rerank with sort=False to preserve index alignment with results
-        reranked = reranker.rerank(
+        reranked = await reranker.arerank(
             query=query,
             results=docs,
             top_k=top_k,
             text_key="text",
             sort=False,
+            cascade_top_n=cascade_top_n,
         )
 
         # Map scores back to WebSearchResult objects (index-aligned)
@@ -1781,7 +1784,7 @@ async def hybrid_web_search(
     if graduation_year:
         rerank_query += f" {graduation_year}"
 
-    results = rerank_web_results(
+    results = await rerank_web_results(
         query=rerank_query,
         results=results,
         top_k=WEB_SEARCH_RERANK_TOP_K,
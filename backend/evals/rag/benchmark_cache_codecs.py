@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Compare Redis cache value codecs on RAG context payloads.
+
+Builds ``{"context", "sources"}`` payloads shaped like the ones
+``retrieval.py`` caches for ES review (formatted Japanese context blocks plus
+up to five source entries), then reports encode / decode time and stored bytes
+for every available codec × compression combination. ``json`` without
+compression is the legacy ``json.dumps(ensure_ascii=False)`` baseline.
+
+Context blocks come from the tenant-aware BM25 corpus of each golden company
+when it is available locally; otherwise the golden queries of the company are
+used as chunk text, which keeps the payload mostly Japanese.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.utils import cache_codec
+from app.utils.cache_codec import CACHE_CODECS, CACHE_COMPRESSIONS, CacheCodec
+from evals.rag.seed_eval_corpus import (
+    DEFAULT_BM25_DIR,
+    DEFAULT_GOLDEN_PATH,
+    load_jsonl,
+    prepare_seed_companies,
+)
+
+CONTEXT_SIZES = (2000, 4000, 8000)  # get_dynamic_context_length range
+
+
+def _company_chunks(items: list[dict[str, Any]], bm25_dir: Path) -> dict[str, list[dict]]:
+    chunks: dict[str, list[dict]] = {}
+    try:
+        companies = prepare_seed_companies(items, bm25_dir=bm25_dir)
+    except Exception:
+        companies = []
+    for company in companies:
+        chunks[company.company_id] = [dict(chunk) for chunk in company.chunks]
+
+    queries: dict[str, list[str]] = defaultdict(list)
+    for item in items:
+        queries[item["company_id"]].append(str(item["query"]))
+    for company_id, texts in queries.items():
+        if chunks.get(company_id):
+            continue
+        chunks[company_id] = [
+            {
+                "text": "。".join(texts[index:] + texts[:index]),
+                "metadata": {
+                    "source_url": f"https://example.co.jp/{company_id}/{index % 5}",
+                    "chunk_type": "general",
+                    "content_type": "corporate_site",
+                    "heading": texts[index][:40],
+                },
+            }
+            for index in range(len(texts))
+        ]
+    return chunks
+
+
+def build_payload(chunks: list[dict], max_context_length: int) -> dict[str, Any]:
+    """``{"context", "sources"}`` in the format of the hybrid review formatter."""
+    parts: list[str] = []
+    sources: list[dict[str, Any]] = []
+    total = 0
+    index = 0
+    while total < max_context_length and chunks and index < len(chunks) * 4:
+        chunk = chunks[index % len(chunks)]
+        index += 1
+        metadata = chunk.get("metadata") or {}
+        source_url = str(metadata.get("source_url") or "")
+        source_id = next((s["source_id"] for s in sources if s["source_url"] == source_url), "")
+        if source_url and not source_id and len(sources) < 5:
+            source_id = f"S{len(sources) + 1}"
+            sources.append(
+                {
+                    "source_id": source_id,
+                    "source_url": source_url,
+                    "content_type": str(metadata.get("content_type") or "corporate_site"),
+                    "content_type_label": "企業HP",
+                    "chunk_type": str(metadata.get("chunk_type") or "general"),
+                    "title": str(metadata.get("heading_path") or metadata.get("heading") or ""),
+                    "domain": source_url.split("/")[2] if "//" in source_url else "",
+                    "excerpt": str(chunk.get("text") or "")[:150],
+                }
+            )
+        heading = metadata.get("heading_path") or metadata.get("heading")
+        heading_line = f"見出し: {heading}\n" if heading else ""
+        block = f"【企業情報】（企業HP）[{source_id}]\n{heading_line}{chunk.get('text') or ''}"
+        block = block[: max(0, max_context_length - total)]
+        parts.append(block)
+        total += len(block) + 2
+    return {"context": "\n\n".join(parts), "sources": sources}
+
+
+def build_payloads(golden_path: Path, bm25_dir: Path) -> list[dict[str, Any]]:
+    items = load_jsonl(golden_path)
+    chunks = _company_chunks(items, bm25_dir)
+    return [
+        build_payload(company_chunks, size)
+        for company_id, company_chunks in sorted(chunks.items())
+        for size in CONTEXT_SIZES
+        if company_chunks
+    ]
+
+
+def available_variants() -> list[tuple[str, str]]:
+    variants = []
+    for name in CACHE_CODECS:
+        if name == "orjson" and cache_codec.orjson is None:
+            continue
+        if name == "msgpack" and cache_codec.msgpack is None:
+            continue
+        for compression in CACHE_COMPRESSIONS:
+            if compression == "zstd" and cache_codec.zstandard is None:
+                continue
+            variants.append((name, compression))
+    return variants
+
+
+def measure(
+    codec: CacheCodec,
+    payloads: list[dict[str, Any]],
+    repeats: int,
+) -> dict[str, float]:
+    encoded = [codec.encode(payload) for payload in payloads]
+    for payload, data in zip(payloads, encoded):
+        if codec.decode(data) != payload:
+            raise AssertionError(f"{codec.name}/{codec.compression} does not round-trip")
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for payload in payloads:
+            codec.encode(payload)
+    encode_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for data in encoded:
+            codec.decode(data)
+    decode_s = time.perf_counter() - started
+
+    calls = max(1, repeats * len(payloads))
+    sizes = [len(data) for data in encoded]
+    return {
+        "encode_us": encode_s / calls * 1e6,
+        "decode_us": decode_s / calls * 1e6,
+        "mean_bytes": statistics.fmean(sizes) if sizes else 0.0,
+        "total_bytes": float(sum(sizes)),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark Redis cache codecs on RAG payloads")
+    parser.add_argument("--golden", default=str(DEFAULT_GOLDEN_PATH), help="Golden set JSONL")
+    parser.add_argument("--bm25-dir", default=str(DEFAULT_BM25_DIR), help="BM25 corpus directory")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--compress-min-bytes", type=int, default=1024)
+    parser.add_argument("--output", default="", help="Write the JSON report here")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    payloads = build_payloads(Path(args.golden), Path(args.bm25_dir))
+    if not payloads:
+        print("no payloads built from the golden set", file=sys.stderr)
+        return 1
+
+    results: dict[str, dict[str, float]] = {}
+    for name, compression in available_variants():
+        codec = CacheCodec(
+            name, compression=compression, compress_min_bytes=args.compress_min_bytes
+        )
+        results[f"{name}+{compression}"] = measure(codec, payloads, args.repeats)
+
+    baseline = results.get("json+none", {}).get("total_bytes") or 0.0
+    for summary in results.values():
+        summary["bytes_vs_json"] = summary["total_bytes"] / baseline if baseline else 0.0
+
+    report = {
+        "payloads": len(payloads),
+        "mean_context_chars": statistics.fmean(len(p["context"]) for p in payloads),
+        "repeats": args.repeats,
+        "codecs": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
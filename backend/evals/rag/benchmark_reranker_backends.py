@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Compare reranker inference backends on the RAG golden set.
+
+Scores (golden query, passage) pairs with PyTorch fp32 and the ONNX exports
+(fp32 / dynamic int8) written by ``scripts/export_reranker_onnx.py``, then
+reports throughput (pairs/sec), peak RSS and score parity against PyTorch.
+
+Each backend runs in its own subprocess so RSS reflects only that backend.
+Passages come from the tenant-aware BM25 corpus of each golden company when it
+is available locally; otherwise the other golden queries of the same company
+are used as passages, which still exercises matching and non-matching pairs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Sequence
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from evals.rag.seed_eval_corpus import (
+    DEFAULT_BM25_DIR,
+    DEFAULT_GOLDEN_PATH,
+    load_jsonl,
+    prepare_seed_companies,
+)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Acceptance thresholds vs PyTorch fp32 (scores are sigmoid outputs in [0, 1]).
+PARITY_THRESHOLDS: dict[str, dict[str, float]] = {
+    "onnx": {"max_abs_diff": 1e-3, "mean_spearman": 0.999, "top1_agreement": 1.0},
+    "onnx-int8": {"max_abs_diff": 0.08, "mean_spearman": 0.95, "top1_agreement": 0.9},
+}
+
+PASSAGE_MAX_CHARS = 512
+
+GoldenPair = tuple[str, str, str]  # (query_id, query, passage)
+
+
+def _company_passages(
+    golden_items: list[dict[str, Any]],
+    bm25_dir: Path,
+    passages_per_query: int,
+) -> dict[str, list[str]]:
+    passages: dict[str, list[str]] = {}
+    try:
+        companies = prepare_seed_companies(golden_items, bm25_dir=bm25_dir)
+    except Exception:
+        companies = []
+    for company in companies:
+        texts = [str(chunk.get("text") or "")[:PASSAGE_MAX_CHARS] for chunk in company.chunks]
+        passages[company.company_id] = [text for text in texts if text][: passages_per_query * 4]
+    return passages
+
+
+def build_golden_pairs(
+    golden_path: Path = DEFAULT_GOLDEN_PATH,
+    *,
+    bm25_dir: Path = DEFAULT_BM25_DIR,
+    passages_per_query: int = 8,
+) -> list[GoldenPair]:
+    """Deterministic (query_id, query, passage) pairs for every golden query."""
+    items = load_jsonl(golden_path)
+    corpus = _company_passages(items, bm25_dir, passages_per_query)
+
+    queries_by_company: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for item in items:
+        queries_by_company[item["company_id"]].append(item)
+
+    pairs: list[GoldenPair] = []
+    for item in items:
+        company_id = item["company_id"]
+        candidates = corpus.get(company_id)
+        if not candidates:
+            candidates = [
+                other["query"]
+                for other in queries_by_company[company_id]
+                if other["query_id"] != item["query_id"]
+            ]
+        if not candidates:
+            continue
+        # Rotate by query position so each query sees a different passage window.
+        offset = sum(map(ord, item["query_id"])) % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        for passage in rotated[:passages_per_query]:
+            pairs.append((item["query_id"], item["query"], passage))
+    return pairs
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    if len(a) < 2:
+        return 1.0
+    rank_a = np.argsort(np.argsort(a, kind="stable"), kind="stable").astype(np.float64)
+    rank_b = np.argsort(np.argsort(b, kind="stable"), kind="stable").astype(np.float64)
+    if rank_a.std() == 0 or rank_b.std() == 0:
+        return 1.0 if np.array_equal(rank_a, rank_b) else 0.0
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def parity_report(
+    query_ids: Sequence[str],
+    reference: Sequence[float],
+    candidate: Sequence[float],
+) -> dict[str, float]:
+    """Score deltas plus per-query rank agreement of ``candidate`` vs ``reference``."""
+    ref = np.asarray(reference, dtype=np.float64)
+    cand = np.asarray(candidate, dtype=np.float64)
+    if ref.shape != cand.shape:
+        raise ValueError(f"score length mismatch: {ref.shape} vs {cand.shape}")
+    diff = np.abs(ref - cand)
+
+    groups: dict[str, list[int]] = defaultdict(list)
+    for index, query_id in enumerate(query_ids):
+        groups[query_id].append(index)
+    spearman = []
+    top1 = []
+    for indices in groups.values():
+        idx = np.asarray(indices)
+        spearman.append(_spearman(ref[idx], cand[idx]))
+        top1.append(float(np.argmax(ref[idx]) == np.argmax(cand[idx])))
+
+    return {
+        "pairs": int(len(ref)),
+        "queries": len(groups),
+        "max_abs_diff": float(diff.max()) if diff.size else 0.0,
+        "mean_abs_diff": float(diff.mean()) if diff.size else 0.0,
+        "mean_spearman": float(np.mean(spearman)) if spearman else 1.0,
+        "top1_agreement": float(np.mean(top1)) if top1 else 1.0,
+    }
+
+
+def parity_failures(backend: str, report: dict[str, float]) -> list[str]:
+    thresholds = PARITY_THRESHOLDS.get(backend, {})
+    failures = []
+    if report["max_abs_diff"] > thresholds.get("max_abs_diff", float("inf")):
+        failures.append(f"max_abs_diff={report['max_abs_diff']:.4f}")
+    for key in ("mean_spearman", "top1_agreement"):
+        if report[key] < thresholds.get(key, 0.0):
+            failures.append(f"{key}={report[key]:.4f}")
+    return failures
+
+
+def load_backend_model(backend: str, model_name: str, onnx_root: Path | None = None):
+    """Model object with ``predict(pairs)`` for ``backend``."""
+    if backend == "torch":
+        from sentence_transformers import CrossEncoder
+
+        return CrossEncoder(model_name)
+    from app.utils.reranker_onnx import ONNX_MODEL_FILES, OnnxCrossEncoder, onnx_model_dir
+
+    return OnnxCrossEncoder(
+        onnx_model_dir(model_name, onnx_root), model_file=ONNX_MODEL_FILES[backend]
+    )
+
+
+def _rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def run_worker(args: argparse.Namespace) -> dict[str, Any]:
+    pairs = build_golden_pairs(
+        Path(args.golden), bm25_dir=Path(args.bm25_dir), passages_per_query=args.passages_per_query
+    )
+    rss_before = _rss_mb()
+    model = load_backend_model(
+        args.worker, args.model, Path(args.onnx_root) if args.onnx_root else None
+    )
+    rss_loaded = _rss_mb()
+    inputs = [(query, passage) for _, query, passage in pairs]
+
+    scores = [float(s) for s in model.predict(inputs)]  # warm-up and parity scores
+    started = time.perf_counter()
+    for _ in range(args.repeats):
+        model.predict(inputs)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "backend": args.worker,
+        "pairs": len(inputs),
+        "pairs_per_sec": len(inputs) * args.repeats / elapsed if elapsed > 0 else 0.0,
+        "rss_model_mb": rss_loaded - rss_before,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "query_ids": [query_id for query_id, _, _ in pairs],
+        "scores": scores,
+    }
+
+
+def _run_backend(backend: str, args: argparse.Namespace) -> dict[str, Any]:
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        backend,
+        "--model",
+        args.model,
+        "--golden",
+        str(args.golden),
+        "--bm25-dir",
+        str(args.bm25_dir),
+        "--passages-per-query",
+        str(args.passages_per_query),
+        "--repeats",
+        str(args.repeats),
+    ]
+    if args.onnx_root:
+        cmd += ["--onnx-root", str(args.onnx_root)]
+    completed = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"backend": backend, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark reranker backends (torch / onnx / onnx-int8)")
+    parser.add_argument("--model", default="", help="Model name (default: RERANKER_BASE_MODEL)")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma-separated backends")
+    parser.add_argument("--golden", default=str(DEFAULT_GOLDEN_PATH), help="Golden set JSONL")
+    parser.add_argument("--bm25-dir", default=str(DEFAULT_BM25_DIR), help="BM25 corpus directory")
+    parser.add_argument("--onnx-root", default="", help="ONNX export root (default: data/reranker_onnx)")
+    parser.add_argument("--passages-per-query", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default="", help="Write the JSON report here")
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if not args.model:
+        from app.utils.reranker import resolve_reranker_model_name
+
+        args.model = resolve_reranker_model_name("base")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(run_worker(args), ensure_ascii=False))
+        return 0
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip() in BACKENDS]
+    runs = {backend: _run_backend(backend, args) for backend in backends}
+
+    report: dict[str, Any] = {"model": args.model, "backends": {}}
+    reference = runs.get("torch")
+    failed = False
+    for backend, run in runs.items():
+        summary = {k: v for k, v in run.items() if k not in {"scores", "query_ids"}}
+        if backend != "torch" and reference and "scores" in reference and "scores" in run:
+            parity = parity_report(reference["query_ids"], reference["scores"], run["scores"])
+            failures = parity_failures(backend, parity)
+            summary["parity_vs_torch"] = parity
+            summary["parity_failures"] = failures
+            failed = failed or bool(failures)
+        report["backends"][backend] = summary
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
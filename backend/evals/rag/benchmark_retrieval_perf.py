@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""Offline latency / memory benchmark for ``dense_hybrid_search``.
+
+Generates a deterministic synthetic Japanese corpus (default 1k / 10k / 100k
+chunks), seeds a temporary Chroma store and BM25 index with it, then drives
+``dense_hybrid_search`` over a fixed query set and reports per-stage p50 / p95
+(from the ``record_stage_duration`` stages), end-to-end latency and RSS.
+
+Nothing leaves the process: embeddings come from ``HashEmbeddingClient`` (a
+hashed character-bigram projection served through the OpenAI client slot),
+query expansion / HyDE are template stubs and the cross-encoder is replaced by
+a token-overlap scorer unless ``--rerank model`` is given.
+
+Each corpus size runs in its own subprocess so RSS reflects only that size.
+The JSON report is key-sorted and carries a corpus fingerprint so CI can diff
+it between commits; ``--baseline`` exits non-zero on p95 regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_DIMENSION = 256
+BENCH_MODEL = "bench-hash-v1"
+COMPANY_ID = "bench-company"
+TENANT_KEY = "bench-tenant"
+SEED_BATCH_SIZE = 2_000
+
+_GRAM_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+COMPANY_NAMES = ("サンプル商事", "テスト電機", "ベンチ製薬", "架空銀行", "模擬システムズ")
+CONTENT_TYPES = (
+    "new_grad_recruitment",
+    "midcareer_recruitment",
+    "corporate_site",
+    "ir_materials",
+    "ceo_message",
+    "employee_interviews",
+    "press_release",
+    "csr_sustainability",
+    "midterm_plan",
+)
+TOPICS = (
+    "新卒採用", "募集要項", "選考フロー", "エントリーシート", "インターンシップ",
+    "初任給", "福利厚生", "研修制度", "配属", "キャリアパス",
+    "中期経営計画", "売上高", "営業利益", "海外事業", "デジタル戦略",
+    "企業理念", "社長メッセージ", "社員インタビュー", "働き方改革", "サステナビリティ",
+)
+PHRASES = (
+    "{company}の{topic}について、{year}年度は{number}名規模で実施する。",
+    "{topic}では若手社員が{number}件のプロジェクトを担当している。",
+    "{company}は{topic}を重視し、{year}年までに体制を強化する方針だ。",
+    "応募者は{topic}に関する説明会へ{number}回参加できる。",
+    "{topic}の詳細は採用サイトで{year}年{month}月に公開された。",
+    "当社の{topic}は{number}%の社員が満足していると回答した。",
+    "{company}では{topic}と{other}を組み合わせた取り組みを進めている。",
+    "{year}年度の{topic}は前年比{number}%増となった。",
+)
+QUESTIONS = (
+    "{company}の{topic}について教えてください",
+    "{topic}と{other}の関係を知りたい",
+    "{company}で{topic}はどのように進められていますか",
+    "{year}年度の{topic}の状況は",
+)
+
+
+class HashEmbeddingClient:
+    """Deterministic stand-in for ``openai.AsyncOpenAI`` embeddings.
+
+    Each text becomes a signed hashed bag of character bigrams, L2-normalised,
+    so texts sharing vocabulary are close without any network call.
+    """
+
+    def __init__(self, dimension: int = DEFAULT_DIMENSION):
+        self.dimension = dimension
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    def embed(self, text: str) -> list[float]:
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        if codes.size < 2:
+            codes = np.concatenate([codes, np.zeros(2 - codes.size, dtype=np.uint64)])
+        hashed = (codes[:-1] * np.uint64(0x10001) + codes[1:]) * _GRAM_MULTIPLIER
+        buckets = ((hashed >> np.uint64(32)) % np.uint64(self.dimension)).astype(np.int64)
+        signs = ((hashed >> np.uint64(31)) & np.uint64(1)).astype(np.float64) * 2.0 - 1.0
+        vector = np.bincount(buckets, weights=signs, minlength=self.dimension)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        return vector.astype(np.float32).tolist()
+
+    async def _create(self, *, model: str, input: str | list[str]) -> SimpleNamespace:
+        texts = [input] if isinstance(input, str) else list(input)
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=self.embed(text)) for text in texts]
+        )
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        company=rng.choice(COMPANY_NAMES),
+        topic=rng.choice(TOPICS),
+        other=rng.choice(TOPICS),
+        year=rng.randint(2018, 2026),
+        month=rng.randint(1, 12),
+        number=rng.randint(3, 500),
+    )
+
+
+def synthetic_chunks(size: int, *, seed: int = 0) -> list[dict[str, Any]]:
+    """``size`` deterministic Japanese chunks of 4–8 sentences each."""
+    rng = random.Random(f"chunks:{seed}")
+    chunks = []
+    for index in range(size):
+        content_type = CONTENT_TYPES[index % len(CONTENT_TYPES)]
+        text = "".join(_fill(rng.choice(PHRASES), rng) for _ in range(rng.randint(4, 8)))
+        chunks.append(
+            {
+                "id": f"{TENANT_KEY}_{COMPANY_ID}_{index}",
+                "text": text,
+                "metadata": {
+                    "company_id": COMPANY_ID,
+                    "company_name": COMPANY_NAMES[0],
+                    "tenant_key": TENANT_KEY,
+                    "source_url": f"https://example.com/{content_type}/{index // 20}",
+                    "chunk_type": content_type,
+                    "content_type": content_type,
+                    "chunk_index": index,
+                    "embedding_provider": "openai",
+                    "embedding_model": BENCH_MODEL,
+                    "injection_risk_level": "none",
+                    "injection_risk_reasons": "",
+                    "quarantine": False,
+                },
+            }
+        )
+    return chunks
+
+
+def synthetic_queries(count: int, *, seed: int = 0) -> list[str]:
+    """``count`` distinct queries, so every one misses the query caches."""
+    rng = random.Random(f"queries:{seed}")
+    queries: list[str] = []
+    seen: set[str] = set()
+    while len(queries) < count:
+        query = _fill(rng.choice(QUESTIONS), rng)
+        if query not in seen:
+            seen.add(query)
+            queries.append(query)
+    return queries
+
+
+def corpus_fingerprint(chunks: list[dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk["text"].encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+async def _stub_expand(query: str, max_queries: int, keywords: Optional[list[str]]) -> list[str]:
+    terms = keywords or [query]
+    return [f"{term} {suffix}" for term, suffix in zip(terms, ("採用", "制度", "実績"))][:max_queries]
+
+
+async def _stub_hyde(query: str) -> str:
+    return f"{query}。{query}については採用サイトと統合報告書で詳しく説明されている。"
+
+
+async def _stub_rerank(
+    query: str,
+    results: list[dict],
+    top_k: int = 10,
+    model_name: str = "",
+    cascade_top_n: Optional[int] = None,
+) -> list[dict]:
+    query_grams = {query[i : i + 2] for i in range(len(query) - 1)}
+    for item in results:
+        text = str(item.get("text") or "")
+        grams = {text[i : i + 2] for i in range(len(text) - 1)}
+        item["rerank_score"] = len(query_grams & grams) / max(1, len(query_grams))
+    return sorted(results, key=lambda item: item["rerank_score"], reverse=True)[:top_k]
+
+
+@contextmanager
+def bench_environment(
+    workdir: Path,
+    *,
+    dimension: int = DEFAULT_DIMENSION,
+    rerank: str = "stub",
+    llm_latency_ms: float = 0.0,
+    vector_matrix: bool = False,
+) -> Iterator[tuple[Any, dict[str, list[float]]]]:
+    """Point storage at ``workdir`` and stub every network dependency.
+
+    Yields ``(backend, durations)`` where ``durations`` collects raw seconds per
+    retrieval stage. Module state is restored on exit.
+    """
+    from app.config import settings
+    from app.rag import hybrid_search, telemetry, vector_store
+    from app.utils import bm25_store, embeddings, reranker
+
+    durations: dict[str, list[float]] = defaultdict(list)
+    record = telemetry.record_stage_duration
+
+    @contextmanager
+    def timed_stage(stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            with record(stage):
+                yield
+        finally:
+            durations[stage].append(time.perf_counter() - started)
+
+    async def expand(query: str, max_queries: int, keywords: Optional[list[str]]) -> list[str]:
+        if llm_latency_ms:
+            await asyncio.sleep(llm_latency_ms / 1000)
+        return await _stub_expand(query, max_queries, keywords)
+
+    async def hyde(query: str) -> str:
+        if llm_latency_ms:
+            await asyncio.sleep(llm_latency_ms / 1000)
+        return await _stub_hyde(query)
+
+    patches: list[tuple[Any, str, Any]] = [
+        (vector_store, "CHROMA_PERSIST_DIR", workdir / "chroma"),
+        (vector_store, "_chroma_client", None),
+        (bm25_store, "BM25_PERSIST_DIR", workdir / "bm25"),
+        (embeddings, "_openai_embedding_client", HashEmbeddingClient(dimension)),
+        (hybrid_search, "record_stage_duration", timed_stage),
+        (hybrid_search, "_expand_queries_uncached", expand),
+        (hybrid_search, "_generate_hypothetical_document_uncached", hyde),
+        (settings, "rag_vector_matrix_enabled", vector_matrix),
+    ]
+    if rerank == "stub":
+        patches.append((reranker, "rerank_with_cross_encoder", _stub_rerank))
+
+    saved = [(target, name, getattr(target, name)) for target, name, _ in patches]
+    for target, name, value in patches:
+        setattr(target, name, value)
+    try:
+        backend = embeddings.EmbeddingBackend(
+            provider="openai", model=BENCH_MODEL, dimension=dimension
+        )
+        yield backend, durations
+    finally:
+        for target, name, value in reversed(saved):
+            setattr(target, name, value)
+        bm25_store.clear_index_cache(COMPANY_ID, tenant_key=TENANT_KEY)
+
+
+def seed_corpus(chunks: list[dict[str, Any]], backend: Any) -> None:
+    """Write ``chunks`` to the Chroma collection for ``backend`` and to BM25."""
+    from app.rag.vector_store import get_company_collection
+    from app.utils.bm25_store import BM25Index, publish_index
+    from app.utils.embeddings import get_openai_embedding_client
+
+    client = get_openai_embedding_client()
+    collection = get_company_collection(backend)
+    for start in range(0, len(chunks), SEED_BATCH_SIZE):
+        batch = chunks[start : start + SEED_BATCH_SIZE]
+        collection.add(
+            ids=[chunk["id"] for chunk in batch],
+            documents=[chunk["text"] for chunk in batch],
+            metadatas=[chunk["metadata"] for chunk in batch],
+            embeddings=[client.embed(chunk["text"]) for chunk in batch],
+        )
+
+    index = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    index.add_documents(chunks)
+    index.save()
+    publish_index(index)
+
+
+def _percentile_ms(values: list[float], q: float) -> float:
+    return round(float(np.percentile(values, q)) * 1000, 3) if values else 0.0
+
+
+def summarize_durations(durations: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    return {
+        stage: {
+            "count": len(values),
+            "p50_ms": _percentile_ms(values, 50),
+            "p95_ms": _percentile_ms(values, 95),
+        }
+        for stage, values in sorted(durations.items())
+    }
+
+
+async def run_queries(
+    queries: list[str],
+    backend: Any,
+    durations: dict[str, list[float]],
+    *,
+    short_circuit: bool = False,
+    rerank: bool = True,
+) -> list[int]:
+    """Run every query through ``dense_hybrid_search``; returns result counts."""
+    from app.rag.hybrid_search import dense_hybrid_search
+
+    counts = []
+    for query in queries:
+        started = time.perf_counter()
+        results = await dense_hybrid_search(
+            company_id=COMPANY_ID,
+            query=query,
+            n_results=10,
+            backends=[backend],
+            rerank=rerank,
+            short_circuit=short_circuit,
+            tenant_key=TENANT_KEY,
+            speculative=False,
+        )
+        durations["total"].append(time.perf_counter() - started)
+        counts.append(len(results))
+    return counts
+
+
+def _rss_mb() -> float:
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def run_size(size: int, args: argparse.Namespace) -> dict[str, Any]:
+    """Seed ``size`` chunks into a temp store and benchmark the query set."""
+    chunks = synthetic_chunks(size, seed=args.seed)
+    queries = synthetic_queries(args.queries, seed=args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="rag-perf-"))
+    try:
+        with bench_environment(
+            workdir,
+            dimension=args.dimension,
+            rerank=args.rerank,
+            llm_latency_ms=args.llm_latency_ms,
+            vector_matrix=args.vector_matrix,
+        ) as (backend, durations):
+            rss_before = _rss_mb()
+            started = time.perf_counter()
+            seed_corpus(chunks, backend)
+            seed_seconds = time.perf_counter() - started
+            rss_seeded = _rss_mb()
+
+            async def _run() -> list[int]:
+                warmup = synthetic_queries(args.warmup, seed=args.seed + 1)
+                await run_queries(warmup, backend, defaultdict(list), rerank=args.rerank != "off")
+                durations.clear()
+                return await run_queries(
+                    queries,
+                    backend,
+                    durations,
+                    short_circuit=args.short_circuit,
+                    rerank=args.rerank != "off",
+                )
+
+            counts = asyncio.run(_run())
+            return {
+                "chunks": size,
+                "corpus_sha256": corpus_fingerprint(chunks),
+                "queries": len(queries),
+                "empty_results": sum(1 for count in counts if count == 0),
+                "seed_seconds": round(seed_seconds, 3),
+                "rss_seeded_mb": round(rss_seeded - rss_before, 1),
+                "rss_mb": round(_rss_mb(), 1),
+                "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                "stages": summarize_durations(durations),
+            }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    *,
+    max_regression: float = 0.25,
+    min_delta_ms: float = 1.0,
+) -> list[str]:
+    """p95 regressions of ``current`` vs ``baseline`` for sizes / stages in both."""
+    failures = []
+    for size, run in current.get("sizes", {}).items():
+        base_run = baseline.get("sizes", {}).get(size)
+        if not base_run or "stages" not in run or "stages" not in base_run:
+            continue
+        for stage, stats in run["stages"].items():
+            base_stats = base_run["stages"].get(stage)
+            if not base_stats:
+                continue
+            before, after = base_stats["p95_ms"], stats["p95_ms"]
+            if after - before > min_delta_ms and after > before * (1 + max_regression):
+                failures.append(f"{size}/{stage}: p95 {before:.1f}ms -> {after:.1f}ms")
+    return failures
+
+
+def _run_size_subprocess(size: int, args: argparse.Namespace) -> dict[str, Any]:
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        str(size),
+        "--queries",
+        str(args.queries),
+        "--warmup",
+        str(args.warmup),
+        "--dimension",
+        str(args.dimension),
+        "--rerank",
+        args.rerank,
+        "--llm-latency-ms",
+        str(args.llm_latency_ms),
+        "--seed",
+        str(args.seed),
+    ]
+    if args.short_circuit:
+        cmd.append("--short-circuit")
+    if args.vector_matrix:
+        cmd.append("--vector-matrix")
+    completed = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"chunks": size, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark dense_hybrid_search on synthetic corpora")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated corpus sizes (chunks)",
+    )
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--dimension", type=int, default=DEFAULT_DIMENSION)
+    parser.add_argument("--rerank", choices=("stub", "model", "off"), default="stub")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated expansion / HyDE latency")
+    parser.add_argument("--short-circuit", action="store_true", help="Allow the first-pass short circuit")
+    parser.add_argument("--vector-matrix", action="store_true", help="Enable RAG_VECTOR_MATRIX_ENABLED")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="", help="Write the JSON report here")
+    parser.add_argument("--baseline", default="", help="Previous report; exit 1 on p95 regressions")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(run_size(args.worker, args), ensure_ascii=False, sort_keys=True))
+        return 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report: dict[str, Any] = {
+        "config": {
+            "dimension": args.dimension,
+            "llm_latency_ms": args.llm_latency_ms,
+            "queries": args.queries,
+            "rerank": args.rerank,
+            "seed": args.seed,
+            "short_circuit": args.short_circuit,
+            "vector_matrix": args.vector_matrix,
+        },
+        "sizes": {str(size): _run_size_subprocess(size, args) for size in sizes},
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+    failed = any("error" in run for run in report["sizes"].values())
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_reports(baseline, report, max_regression=args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
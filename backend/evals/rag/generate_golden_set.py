@@ -92,6 +92,22 @@ def _parse_tenant_scoped_filename(path: Path) -> tuple[str, str] | None:
     return match.group("tenant_key"), match.group("company_id")
 
 
+def _load_binary_bm25(path: Path) -> dict[str, Any] | None:
+    from app.utils.bm25_store import BM25_BINARY_FORMAT_VERSION, read_persisted_index
+
+    try:
+        index = read_persisted_index(path)
+    except (ValueError, OSError):
+        return None
+    if index is None:
+        return None
+    return {
+        "version": BM25_BINARY_FORMAT_VERSION,
+        "company_id": index.company_id,
+        "documents": [{"metadata": doc.metadata} for doc in index.documents],
+    }
+
+
 def load_bm25_files(
     bm25_dir: Path = DEFAULT_BM25_DIR,
     *,
@@ -99,15 +115,23 @@ def load_bm25_files(
     min_content_types: int = MIN_CONTENT_TYPES,
 ) -> dict[str, dict[str, Any]]:
     companies: dict[str, dict[str, Any]] = {}
-    for path in sorted(bm25_dir.glob("*.json")):
+    paths = sorted([*bm25_dir.glob("*.json"), *bm25_dir.glob("*.bm25")])
+    for path in paths:
         parsed_name = _parse_tenant_scoped_filename(path)
         if parsed_name is None:
             continue
         tenant_key, path_company_id = parsed_name
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            continue
+        if path.suffix == ".bm25":
+            data = _load_binary_bm25(path)
+            if data is None:
+                continue
+        else:
+            if path.with_suffix(".bm25") in paths:
+                continue
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (json.JSONDecodeError, OSError):
+                continue
 
         company_id = data.get("company_id")
         docs = data.get("documents") or []
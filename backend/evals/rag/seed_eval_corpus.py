@@ -207,14 +207,23 @@ def prepare_seed_companies(
 
 
 def _assert_saved_bm25(company: SeedCompany) -> None:
-    from app.utils.bm25_store import BM25_PERSIST_DIR
+    from app.utils.bm25_store import BM25_BINARY_SUFFIX, BM25_PERSIST_DIR, read_persisted_index
+
+    stem = f"{company.tenant_key}__{company.company_id}"
+    binary_path = BM25_PERSIST_DIR / f"{stem}{BM25_BINARY_SUFFIX}"
+    path = BM25_PERSIST_DIR / f"{stem}.json"
+    if binary_path.exists():
+        path = binary_path
+        index = read_persisted_index(binary_path)
+        documents = [
+            {"metadata": doc.metadata} for doc in (index.documents if index is not None else [])
+        ]
+    elif path.exists():
+        payload = _load_bm25_payload(path, company.company_id)
+        documents = payload.get("documents") or []
+    else:
+        raise SeedCorpusError(f"BM25 output was not written: {binary_path}")
 
-    path = BM25_PERSIST_DIR / f"{company.tenant_key}__{company.company_id}.json"
-    if not path.exists():
-        raise SeedCorpusError(f"BM25 output was not written: {path}")
-
-    payload = _load_bm25_payload(path, company.company_id)
-    documents = payload.get("documents") or []
     if len(documents) != len(company.chunks):
         raise SeedCorpusError(
             f"BM25 output doc count mismatch for {company.company_id}: "
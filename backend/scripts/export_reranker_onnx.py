@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Export the cross-encoder reranker to ONNX and quantize it to dynamic int8.
+
+Writes ``model.onnx`` (fp32), ``model.int8.onnx`` (dynamic int8 weights), the
+tokenizer and the model config into ``<output-root>/<model slug>/``, which is
+where ``RERANKER_BACKEND=onnx|onnx-int8`` looks for them.
+
+Requires torch, transformers and onnxruntime (export-time only).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.utils.reranker import resolve_reranker_model_name
+from app.utils.reranker_onnx import ONNX_DIR, ONNX_MODEL_FILES, onnx_model_dir
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--model",
+        default="",
+        help="HuggingFace model name or local path (default: RERANKER_BASE_MODEL)",
+    )
+    parser.add_argument(
+        "--output-root",
+        type=Path,
+        default=ONNX_DIR,
+        help="Root directory; the export goes to <output-root>/<model slug>/",
+    )
+    parser.add_argument("--opset", type=int, default=17, help="ONNX opset version")
+    parser.add_argument(
+        "--skip-quantize",
+        action="store_true",
+        help="Only write the fp32 graph",
+    )
+    return parser.parse_args()
+
+
+def export_fp32(model_name: str, output_dir: Path, opset: int) -> Path:
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(
+        ["テスト用クエリ"], ["テスト用クエリに関する公式ページ"], return_tensors="pt"
+    )
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    fp32_path = output_dir / ONNX_MODEL_FILES["onnx"]
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(output_dir)
+    model.config.save_pretrained(output_dir)
+    return fp32_path
+
+
+def quantize_int8(fp32_path: Path) -> Path:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = fp32_path.with_name(ONNX_MODEL_FILES["onnx-int8"])
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def main() -> int:
+    args = parse_args()
+    model_name = args.model.strip() or resolve_reranker_model_name("base")
+    output_dir = onnx_model_dir(model_name, args.output_root)
+
+    fp32_path = export_fp32(model_name, output_dir, args.opset)
+    print(f"model={model_name} fp32={fp32_path} size_mb={fp32_path.stat().st_size / 1e6:.1f}")
+    if not args.skip_quantize:
+        int8_path = quantize_int8(fp32_path)
+        print(f"model={model_name} int8={int8_path} size_mb={int8_path.stat().st_size / 1e6:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""One-shot migration of version 1 BM25 JSON indexes to the binary format."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from app.utils import bm25_store
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--bm25-dir",
+        type=Path,
+        default=bm25_store.BM25_PERSIST_DIR,
+        help="Directory holding <tenant_key>__<company_id>.json indexes",
+    )
+    parser.add_argument(
+        "--keep-legacy",
+        action="store_true",
+        help="Keep the JSON files after conversion (default: remove them)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    bm25_store.BM25_PERSIST_DIR = args.bm25_dir
+    counts = bm25_store.migrate_legacy_json_indexes(keep_legacy=args.keep_legacy)
+    print(
+        f"bm25_dir={args.bm25_dir} migrated={counts['migrated']} "
+        f"skipped={counts['skipped']} failed={counts['failed']}"
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.rag import chroma_io, vector_store
+from app.rag.chroma_io import ChromaIOPool
+from app.utils.embeddings import EmbeddingBackend
+
+BACKEND = EmbeddingBackend(provider="openai", model="test", dimension=3)
+
+
+class SlowCollection:
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+
+    def query(self, **_kwargs: object) -> dict:
+        time.sleep(self.delay)
+        return {
+            "documents": [[f"{self.name} の採用情報"]],
+            "metadatas": [[{"content_type": "corporate_site", "source_url": f"https://example.com/{self.name}"}]],
+            "distances": [[0.1]],
+            "ids": [[f"{self.name}-1"]],
+        }
+
+
+@pytest.mark.asyncio
+async def test_collection_queries_run_concurrently_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    collections = {name: SlowCollection(name, 0.2) for name in ("base", "contextual")}
+
+    async def no_matrix(*_args: object) -> None:
+        return None
+
+    monkeypatch.setattr(vector_store, "_collection_names_for_backend", lambda _backend: list(collections))
+    monkeypatch.setattr(vector_store, "_get_collection", lambda name, metadata=None: collections[name])
+    monkeypatch.setattr(vector_store, "get_company_matrix", no_matrix)
+    monkeypatch.setattr(chroma_io, "_pool", ChromaIOPool(4))
+
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    results = await vector_store.search_company_context_by_type(
+        company_id="company-1",
+        query="採用情報",
+        n_results=5,
+        backends=[BACKEND],
+        precomputed_query_embedding=[0.1, 0.2, 0.3],
+        tenant_key="tenant-1",
+    )
+    elapsed = time.perf_counter() - started
+    ticking.cancel()
+
+    assert {item["id"] for item in results} == {"base-1", "contextual-1"}
+    assert elapsed < 0.35
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_pool_reports_saturation_and_skips_cancelled_queued_calls() -> None:
+    pool = ChromaIOPool(1)
+    release = threading.Event()
+    ran: list[str] = []
+
+    def blocking(label: str) -> str:
+        ran.append(label)
+        release.wait(2)
+        return label
+
+    first = asyncio.create_task(pool.run(blocking, "first"))
+    queued = asyncio.create_task(pool.run(blocking, "queued"))
+    await asyncio.sleep(0.05)
+
+    assert pool.stats() == {"workers": 1, "active": 1, "waiting": 1}
+
+    queued.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await first == "first"
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    await asyncio.sleep(0.05)
+
+    assert ran == ["first"]
+    assert pool.stats() == {"workers": 1, "active": 0, "waiting": 0}
+    pool.shutdown()
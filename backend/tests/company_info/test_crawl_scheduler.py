@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import company_info
+from app.routers.company_info_models import CrawlCorporateRequest
+from app.services.company_info import build_rag_source
+from app.services.company_info.crawl_scheduler import CrawlScheduler
+
+
+@pytest.mark.asyncio
+async def test_same_host_is_spaced_while_other_hosts_run_concurrently() -> None:
+    scheduler = CrawlScheduler(max_concurrency=4, per_host_rps=10.0, per_host_burst=1)
+    started_at: dict[str, float] = {}
+    origin = time.perf_counter()
+
+    async def worker(url: str) -> str:
+        started_at[url] = time.perf_counter() - origin
+        await asyncio.sleep(0.05)
+        return url
+
+    urls = [
+        "https://a.example.com/1",
+        "https://a.example.com/2",
+        "https://a.example.com/3",
+        "https://b.example.com/1",
+        "https://c.example.com/1",
+    ]
+    outcomes = await scheduler.run(urls, worker)
+
+    assert [outcome.url for outcome in outcomes] == urls
+    assert [outcome.result for outcome in outcomes] == urls
+    assert started_at["https://a.example.com/2"] - started_at["https://a.example.com/1"] >= 0.09
+    assert started_at["https://a.example.com/3"] - started_at["https://a.example.com/2"] >= 0.09
+    assert max(started_at[url] for url in urls if "a.example" not in url) < 0.05
+    assert outcomes[2].politeness_wait_ms >= 150
+
+
+@pytest.mark.asyncio
+async def test_global_cap_limits_in_flight_urls() -> None:
+    scheduler = CrawlScheduler(max_concurrency=2, per_host_rps=0, per_host_burst=1)
+    in_flight = 0
+    peak = 0
+
+    async def worker(url: str) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+
+    outcomes = await scheduler.run([f"https://host{i}.example.com/" for i in range(6)], worker)
+
+    assert peak == 2
+    assert max(outcome.queue_wait_ms for outcome in outcomes) >= 30
+
+
+@pytest.mark.asyncio
+async def test_crawl_keeps_input_order_and_per_url_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(company_info, "resolve_embedding_backend", lambda: object())
+
+    async def fake_process(*, url: str, **_kwargs: object) -> dict:
+        if url.endswith("/slow"):
+            await asyncio.sleep(0.05)
+        if url.endswith("/http-error"):
+            raise HTTPException(status_code=502, detail="upstream failed")
+        if url.endswith("/boom"):
+            raise RuntimeError("boom")
+        return {"success": True, "pages_crawled": 1, "chunks_stored": 3}
+
+    monkeypatch.setattr(build_rag_source, "_process_crawl_source", fake_process)
+    urls = [
+        "https://a.example.com/slow",
+        "https://b.example.com/http-error",
+        "https://c.example.com/fast",
+        "https://d.example.com/boom",
+    ]
+
+    response = await build_rag_source.crawl_corporate_pages_impl(
+        CrawlCorporateRequest(company_id="company-1", company_name="テスト株式会社", urls=urls),
+        tenant_key="a" * 32,
+    )
+
+    assert [item["url"] for item in response.source_results] == urls
+    assert [item["status"] for item in response.source_results] == [
+        "completed",
+        "failed",
+        "completed",
+        "failed",
+    ]
+    assert response.errors == [
+        "https://b.example.com/http-error: upstream failed",
+        "https://d.example.com/boom: boom",
+    ]
+    assert response.pages_crawled == 2
+    assert response.chunks_stored == 6
+    assert response.crawl_telemetry["urls"] == 4
+    assert len(response.crawl_telemetry["per_url"]) == 4
@@ -0,0 +1,216 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import embeddings
+from app.utils.embeddings import (
+    EmbeddingBackend,
+    EmbeddingCache,
+    embedding_cache_key,
+    generate_embeddings_batch,
+)
+
+
+class RecordingEmbeddingsAPI:
+    def __init__(self) -> None:
+        self.calls: list[list[str]] = []
+
+    async def create(self, *, model: str, input):
+        batch = input if isinstance(input, list) else [input]
+        self.calls.append(batch)
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(text)), 0.5, -0.25]) for text in batch]
+        )
+
+
+@pytest.fixture
+def fake_client(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    client = SimpleNamespace(embeddings=RecordingEmbeddingsAPI())
+    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def local_cache(tmp_path, monkeypatch: pytest.MonkeyPatch) -> EmbeddingCache:
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite3", max_bytes=1024 * 1024)
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: cache)
+    yield cache
+    cache.close()
+
+
+BACKEND = EmbeddingBackend(provider="openai", model="test-embedding-model", dimension=3)
+
+
+@pytest.mark.asyncio
+async def test_reingest_only_embeds_changed_chunks(fake_client, local_cache) -> None:
+    first = await generate_embeddings_batch(["採用情報", "事業内容"], backend=BACKEND)
+    second = await generate_embeddings_batch(["採用情報", "事業内容の更新", "  "], backend=BACKEND)
+
+    assert fake_client.embeddings.calls == [["採用情報", "事業内容"], ["事業内容の更新"]]
+    assert second[0] == first[0]
+    assert second[1] == [7.0, 0.5, -0.25]
+    assert second[2] is None
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_are_embedded_once(fake_client, local_cache) -> None:
+    result = await generate_embeddings_batch(["同じ本文", "同じ本文"], backend=BACKEND)
+
+    assert fake_client.embeddings.calls == [["同じ本文"]]
+    assert result[0] == result[1] == [4.0, 0.5, -0.25]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_scoped_by_model_and_shared_by_variants(fake_client, local_cache) -> None:
+    other = EmbeddingBackend(provider="openai", model="other-model", dimension=3)
+
+    await generate_embeddings_batch(["本文"], backend=BACKEND)
+    await generate_embeddings_batch(["本文"], backend=BACKEND, cache_variant="contextual")
+    await generate_embeddings_batch(["本文"], backend=other)
+
+    assert fake_client.embeddings.calls == [["本文"], ["本文"]]
+
+
+@pytest.mark.asyncio
+async def test_local_tier_evicts_least_recently_used(tmp_path) -> None:
+    vector = [0.1] * 64
+    entry_size = len(embedding_cache_key("m", "x")) + 64 * 4
+    cache = EmbeddingCache(tmp_path / "small.sqlite3", max_bytes=entry_size * 3)
+    keys = [embedding_cache_key("m", f"text-{i}") for i in range(3)]
+    try:
+        await cache.set_many({key: vector for key in keys})
+        # Touch the oldest entry so the second one becomes the eviction victim.
+        assert keys[0] in await cache.get_many([keys[0]])
+        await cache.set_many({embedding_cache_key("m", "text-3"): vector})
+
+        remaining = await cache.get_many(keys)
+    finally:
+        cache.close()
+
+    assert keys[0] in remaining
+    assert keys[1] not in remaining
+
+
+@pytest.mark.asyncio
+async def test_redis_hits_backfill_local_tier(tmp_path) -> None:
+    class FakeRedisTier:
+        def __init__(self) -> None:
+            self.store: dict[str, object] = {}
+
+        def enabled(self) -> bool:
+            return True
+
+        async def get_json(self, key: str):
+            return self.store.get(key)
+
+        async def set_json(self, key: str, value, ttl: int) -> None:
+            self.store[key] = value
+
+        async def mget_json(self, keys: list[str]):
+            return [self.store.get(key) for key in keys]
+
+        async def set_many_json(self, items: dict, ttl: int) -> None:
+            self.store.update(items)
+
+    shared = FakeRedisTier()
+    writer = EmbeddingCache(tmp_path / "writer.sqlite3", max_bytes=1024 * 1024)
+    reader = EmbeddingCache(tmp_path / "reader.sqlite3", max_bytes=1024 * 1024)
+    writer._redis = shared
+    reader._redis = shared
+    key = embedding_cache_key("m", "共有")
+    try:
+        await writer.set_many({key: [0.25, -1.0]})
+        assert await reader.get_many([key]) == {key: [0.25, -1.0]}
+
+        shared.store.clear()
+        assert await reader.get_many([key]) == {key: [0.25, -1.0]}
+    finally:
+        writer.close()
+        reader.close()
+
+
+@pytest.fixture
+def query_cache(monkeypatch: pytest.MonkeyPatch) -> embeddings.QueryEmbeddingCache:
+    cache = embeddings.QueryEmbeddingCache(2)
+    monkeypatch.setattr(embeddings, "get_query_embedding_cache", lambda: cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_query_variants_are_embedded_in_one_call(fake_client, query_cache) -> None:
+    result = await embeddings.generate_query_embeddings(
+        ["選考 フロー", "選考　フロー ", "", "HyDE passage"],
+        backend=BACKEND,
+    )
+
+    # Full-width space / trailing whitespace normalize to the same query.
+    assert fake_client.embeddings.calls == [["選考 フロー", "HyDE passage"]]
+    assert result[0] == result[1] == [6.0, 0.5, -0.25]
+    assert result[2] is None
+    assert result[3] == [12.0, 0.5, -0.25]
+
+
+@pytest.mark.asyncio
+async def test_query_normalization_only_affects_the_cache_key(fake_client, query_cache) -> None:
+    passage = "ＩＲ資料の要点\n中期経営計画の数値目標"
+    await embeddings.generate_query_embeddings([passage, "IR資料の要点 中期経営計画の数値目標"], backend=BACKEND)
+
+    # Both normalize to one key, but the API sees the first original text unchanged.
+    assert fake_client.embeddings.calls == [[passage]]
+
+
+@pytest.mark.asyncio
+async def test_repeated_queries_hit_process_lru(fake_client, query_cache) -> None:
+    await embeddings.generate_embedding("面接回数", backend=BACKEND)
+    await embeddings.generate_embedding(" 面接回数", backend=BACKEND)
+    await embeddings.generate_query_embeddings(["a", "b"], backend=BACKEND)
+    await embeddings.generate_embedding("面接回数", backend=BACKEND)
+
+    # The LRU holds two entries, so the first query was evicted by "a"/"b".
+    assert fake_client.embeddings.calls == [["面接回数"], ["a", "b"], ["面接回数"]]
+
+
+@pytest.mark.asyncio
+async def test_dense_search_embeds_expanded_queries_once(monkeypatch, query_cache) -> None:
+    from app.rag import hybrid_search
+
+    embed_calls: list[list[str]] = []
+    precomputed: dict[str, object] = {}
+
+    async def fake_query_embeddings(queries, backend=None):
+        embed_calls.append(list(queries))
+        return [[float(i), 1.0, 0.0] for i, _ in enumerate(queries)]
+
+    async def fake_semantic_search(**kwargs):
+        precomputed[kwargs["query"]] = kwargs.get("precomputed_query_embedding")
+        return [
+            {
+                "id": f"doc-{len(precomputed)}",
+                "text": "本文",
+                "boosted_score": 0.42,
+                "metadata": {"content_type": "corporate_site"},
+            }
+        ]
+
+    async def fake_expand(*_args, **_kwargs):
+        return ["応募締切 募集要項", "エントリー 期限"]
+
+    monkeypatch.setattr(hybrid_search, "generate_query_embeddings", fake_query_embeddings)
+    monkeypatch.setattr(hybrid_search, "semantic_search", fake_semantic_search)
+    monkeypatch.setattr(hybrid_search, "expand_queries_with_llm", fake_expand)
+
+    await hybrid_search.dense_hybrid_search(
+        company_id="company-1",
+        query="応募締切と募集要項を確認したい",
+        n_results=3,
+        backends=[BACKEND],
+        use_hyde=False,
+        rerank=False,
+        use_mmr=False,
+        use_bm25=False,
+        tenant_key="tenant-1",
+    )
+
+    assert embed_calls == [["応募締切 募集要項", "エントリー 期限"]]
+    assert precomputed["応募締切 募集要項"] == [0.0, 1.0, 0.0]
+    assert precomputed["エントリー 期限"] == [1.0, 1.0, 0.0]
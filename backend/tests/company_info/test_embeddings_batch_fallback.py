@@ -1,48 +1,162 @@
+import asyncio
 from types import SimpleNamespace
 
+import httpx
+import openai
 import pytest
 
-from app.utils.embeddings import EmbeddingBackend, generate_embeddings_batch
+from app.utils.embeddings import EmbeddingBackend, EmbeddingRateLimiter, generate_embeddings_batch
 from app.utils import embeddings
 
 
+def _api_error(error_cls: type[openai.APIStatusError], status_code: int) -> openai.APIStatusError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return error_cls("simulated failure", response=httpx.Response(status_code, request=request), body=None)
+
+
 class FakeEmbeddingsAPI:
-    def __init__(self) -> None:
-        self.batch_calls: list[list[str]] = []
-        self.single_calls: list[str] = []
+    def __init__(
+        self,
+        poisoned: set[str] | None = None,
+        delay: float = 0.0,
+        failures: list[Exception] | None = None,
+    ) -> None:
+        self.calls: list[list[str]] = []
+        self.poisoned = poisoned or set()
+        self.delay = delay
+        self.failures = list(failures or [])
+        self.in_flight = 0
+        self.max_in_flight = 0
 
     async def create(self, *, model: str, input):
-        if isinstance(input, list):
-            self.batch_calls.append(input)
-            raise RuntimeError("simulated batch failure")
-
-        self.single_calls.append(input)
-        return SimpleNamespace(data=[SimpleNamespace(embedding=[0.1, 0.2, 0.3])])
+        self.calls.append(list(input))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.failures:
+            raise self.failures.pop(0)
+        if self.poisoned.intersection(input):
+            raise _api_error(openai.BadRequestError, 400)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 0.0, 0.0]) for text in input])
 
 
 class FakeClient:
-    def __init__(self) -> None:
-        self.embeddings = FakeEmbeddingsAPI()
+    def __init__(self, api: FakeEmbeddingsAPI) -> None:
+        self.embeddings = api
+
+
+BACKEND = EmbeddingBackend(provider="openai", model="test-embedding-model", dimension=3)
+
+
+@pytest.fixture
+def no_rate_limit(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(embeddings, "get_embedding_cache", lambda: None)
+    monkeypatch.setattr(embeddings, "get_embedding_rate_limiter", lambda: EmbeddingRateLimiter(0, 0))
+    monkeypatch.setattr(embeddings, "EMBEDDING_RETRY_BASE_DELAY_SECONDS", 0.0)
+    embeddings.get_embedding_semaphore.cache_clear()
+    yield
+    embeddings.get_embedding_semaphore.cache_clear()
 
 
 @pytest.mark.asyncio
-async def test_generate_embeddings_batch_falls_back_to_single_requests(
+async def test_failed_batch_is_bisected_until_the_bad_input_is_isolated(
     monkeypatch: pytest.MonkeyPatch,
+    no_rate_limit: None,
 ) -> None:
-    fake_client = FakeClient()
-    backend = EmbeddingBackend(provider="openai", model="test-embedding-model", dimension=3)
+    api = FakeEmbeddingsAPI(poisoned={"chunk-2"})
+    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: FakeClient(api))
+    texts = [f"chunk-{index}" for index in range(8)] + ["   "]
+
+    result = await generate_embeddings_batch(texts, backend=BACKEND)
 
-    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: fake_client)
+    assert result[2] is None
+    assert result[-1] is None
+    assert all(vector == [7.0, 0.0, 0.0] for index, vector in enumerate(result[:-1]) if index != 2)
+    # 1 full batch + 2 halves + 2 quarters + 2 singles instead of one request per item.
+    assert len(api.calls) == 7
+    assert ["chunk-2"] in api.calls
 
-    result = await generate_embeddings_batch(
-        ["first chunk", "second chunk", "   "],
-        backend=backend,
+
+@pytest.mark.asyncio
+async def test_transient_failures_retry_the_whole_batch_without_splitting(
+    monkeypatch: pytest.MonkeyPatch,
+    no_rate_limit: None,
+) -> None:
+    api = FakeEmbeddingsAPI(
+        failures=[_api_error(openai.RateLimitError, 429), _api_error(openai.InternalServerError, 503)]
     )
+    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: FakeClient(api))
+    texts = [f"chunk-{index}" for index in range(8)]
+
+    result = await generate_embeddings_batch(texts, backend=BACKEND)
+
+    assert all(vector == [7.0, 0.0, 0.0] for vector in result)
+    assert api.calls == [texts, texts, texts]
+
+
+@pytest.mark.asyncio
+async def test_batch_is_given_up_after_the_transient_retry_budget(
+    monkeypatch: pytest.MonkeyPatch,
+    no_rate_limit: None,
+) -> None:
+    failures = [_api_error(openai.RateLimitError, 429) for _ in range(embeddings.EMBEDDING_TRANSIENT_RETRIES + 1)]
+    api = FakeEmbeddingsAPI(failures=failures)
+    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: FakeClient(api))
+
+    result = await generate_embeddings_batch(["chunk-0", "chunk-1"], backend=BACKEND)
+
+    assert result == [None, None]
+    assert len(api.calls) == embeddings.EMBEDDING_TRANSIENT_RETRIES + 1
+    assert all(call == ["chunk-0", "chunk-1"] for call in api.calls)
+
+
+@pytest.mark.asyncio
+async def test_batches_are_dispatched_concurrently_up_to_the_cap(
+    monkeypatch: pytest.MonkeyPatch,
+    no_rate_limit: None,
+) -> None:
+    api = FakeEmbeddingsAPI(delay=0.02)
+    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: FakeClient(api))
+    monkeypatch.setattr(embeddings.settings, "embedding_max_concurrency", 2)
+    # ~20K estimated tokens each: 600K in total is spread as 250K / 250K / 100K batches.
+    texts = [f"{index:02d}" + "本" * 7998 for index in range(30)]
+
+    result = await generate_embeddings_batch(texts, backend=BACKEND)
+
+    assert all(vector is not None for vector in result)
+    assert [len(call) for call in api.calls] == [12, 12, 6]
+    assert api.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_is_shared_across_concurrent_calls(
+    monkeypatch: pytest.MonkeyPatch,
+    no_rate_limit: None,
+) -> None:
+    api = FakeEmbeddingsAPI(delay=0.02)
+    monkeypatch.setattr(embeddings, "get_openai_embedding_client", lambda: FakeClient(api))
+    monkeypatch.setattr(embeddings.settings, "embedding_max_concurrency", 2)
+    documents = [[f"{doc}-{index:02d}" + "本" * 7998 for index in range(30)] for doc in range(3)]
+
+    results = await asyncio.gather(*(generate_embeddings_batch(texts, backend=BACKEND) for texts in documents))
+
+    assert all(vector is not None for result in results for vector in result)
+    assert len(api.calls) == 9
+    assert api.max_in_flight == 2
+
+
+def test_rate_limiter_delays_requests_beyond_the_per_minute_budget() -> None:
+    now = [0.0]
+    limiter = EmbeddingRateLimiter(60_000, 600, clock=lambda: now[0])
 
-    assert result == [
-        [0.1, 0.2, 0.3],
-        [0.1, 0.2, 0.3],
-        None,
-    ]
-    assert fake_client.embeddings.batch_calls == [["first chunk", "second chunk"]]
-    assert fake_client.embeddings.single_calls == ["first chunk", "second chunk"]
+    assert limiter.reserve(40_000) == 0
+    # 20K tokens left; the next 30K need 10K more at 1K tokens/second.
+    assert limiter.reserve(30_000) == pytest.approx(10.0)
+    now[0] = 30.0
+    # 30s refilled 30K of the 10K deficit.
+    assert limiter.reserve(20_000) == 0
+    # Oversized requests wait for a full bucket at most.
+    assert limiter.reserve(500_000) == pytest.approx(60.0)
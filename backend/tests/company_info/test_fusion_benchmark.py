@@ -0,0 +1,176 @@
+"""Parity and micro-benchmark tests for the NumPy fusion module.
+
+The reference functions below are the original pure-Python implementations
+from ``hybrid_search`` and are kept to pin behaviour and measure the speedup.
+"""
+
+import math
+import random
+import time
+
+import pytest
+
+from app.rag import fusion
+from app.rag.hybrid_search import _apply_mmr, _merge_semantic_and_keyword, rrf_merge_results
+
+DIM = 1536
+MMR_K = 10
+
+
+def _reference_cosine(a, b):
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = norm_a = norm_b = 0.0
+    for x, y in zip(a, b):
+        dot += x * y
+        norm_a += x * x
+        norm_b += y * y
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (math.sqrt(norm_a) * math.sqrt(norm_b))
+
+
+def _reference_mmr(candidates, query_embedding, k, lambda_mult):
+    selected = []
+    remaining = candidates.copy()
+    while remaining and len(selected) < k:
+        best_idx = None
+        best_score = -1e9
+        for idx, item in enumerate(remaining):
+            emb = item["embedding"]
+            sim_to_query = _reference_cosine(query_embedding, emb)
+            sim_to_selected = 0.0
+            if selected:
+                sim_to_selected = max(_reference_cosine(emb, sel["embedding"]) for sel in selected)
+            score = lambda_mult * sim_to_query - (1 - lambda_mult) * sim_to_selected
+            if score > best_score:
+                best_score = score
+                best_idx = idx
+        selected.append(remaining.pop(best_idx))
+    return selected
+
+
+def _reference_rrf(results_by_query, k=60):
+    scores, best_items = {}, {}
+    for results in results_by_query:
+        for rank, item in enumerate(results):
+            doc_id = item.get("id")
+            if not doc_id:
+                continue
+            scores[doc_id] = scores.get(doc_id, 0) + 1 / (k + rank + 1)
+            best_items.setdefault(doc_id, item)
+    merged = [dict(best_items[doc_id], rrf_score=score) for doc_id, score in scores.items()]
+    merged.sort(key=lambda x: x.get("rrf_score", 0), reverse=True)
+    return merged
+
+
+def _reference_normalize(score_map):
+    if not score_map:
+        return {}
+    max_score = max(score_map.values()) or 0.0
+    if max_score <= 0:
+        return {k: 0.0 for k in score_map}
+    return {k: v / max_score for k, v in score_map.items()}
+
+
+def _reference_weighted(semantic_results, keyword_results, semantic_weight, keyword_weight):
+    semantic_scores = {}
+    for item in semantic_results:
+        score = item.get("rrf_score")
+        if score is None:
+            distance = item.get("distance")
+            score = 1 / (distance + 1e-6) if isinstance(distance, (int, float)) else 0.0
+        semantic_scores[item["id"]] = float(score)
+    keyword_scores = {item["id"]: float(item.get("bm25_score", 0.0)) for item in keyword_results}
+    semantic_norm = _reference_normalize(semantic_scores)
+    keyword_norm = _reference_normalize(keyword_scores)
+    merged, seen = [], set()
+    for item in semantic_results + keyword_results:
+        if item["id"] in seen:
+            continue
+        seen.add(item["id"])
+        s = semantic_norm.get(item["id"], 0.0)
+        kw = keyword_norm.get(item["id"], 0.0)
+        merged.append(dict(item, semantic_score=s, keyword_score=kw, hybrid_score=semantic_weight * s + keyword_weight * kw))
+    merged.sort(key=lambda x: x.get("hybrid_score", 0), reverse=True)
+    return merged
+
+
+def _candidates(n: int, seed: int) -> tuple[list[dict], list[float]]:
+    rng = random.Random(seed)
+    # Clustered vectors so MMR actually has redundancy to trade off.
+    centers = [[rng.gauss(0, 1) for _ in range(DIM)] for _ in range(4)]
+    candidates = []
+    for i in range(n):
+        center = centers[i % len(centers)]
+        candidates.append({
+            "id": f"doc-{i}",
+            "text": f"chunk {i}",
+            "distance": rng.random(),
+            "embedding": [c + rng.gauss(0, 0.5) for c in center],
+        })
+    query = [rng.gauss(0, 1) for _ in range(DIM)]
+    return candidates, query
+
+
+def _best_of(func, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@pytest.mark.parametrize("fetch_k", [20, 50, 100])
+def test_mmr_parity(fetch_k: int) -> None:
+    candidates, query = _candidates(fetch_k, seed=fetch_k)
+
+    expected = [item["id"] for item in _reference_mmr(candidates, query, MMR_K, 0.5)]
+    actual = [item["id"] for item in _apply_mmr(candidates, query, MMR_K, 0.5)]
+    assert actual == expected
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("fetch_k", [20, 50, 100])
+def test_mmr_speedup(fetch_k: int) -> None:
+    candidates, query = _candidates(fetch_k, seed=fetch_k)
+
+    reference_time = _best_of(lambda: _reference_mmr(candidates, query, MMR_K, 0.5))
+    numpy_time = _best_of(lambda: _apply_mmr(candidates, query, MMR_K, 0.5))
+    ratio = reference_time / numpy_time
+    # Measured at ~70-100x locally; the bound only has to catch a regression
+    # back to pure-Python loops, not to hold on a noisy shared CI runner.
+    assert ratio >= (2.0 if fetch_k >= 100 else 1.0), f"fetch_k={fetch_k}: {ratio:.1f}x"
+
+
+@pytest.mark.parametrize("fetch_k", [20, 50, 100])
+def test_rrf_and_weighted_fusion_parity(fetch_k: int) -> None:
+    rng = random.Random(fetch_k)
+    pool = [{"id": f"doc-{i}", "text": f"chunk {i}", "distance": rng.random()} for i in range(fetch_k * 2)]
+    results_by_query = [rng.sample(pool, fetch_k) for _ in range(4)]
+    keyword = [
+        {"id": item["id"], "text": item["text"], "bm25_score": rng.random() * 10}
+        for item in rng.sample(pool, fetch_k)
+    ]
+
+    fused = rrf_merge_results(results_by_query, k=70)
+    assert fused == _reference_rrf(results_by_query, k=70)
+    assert _merge_semantic_and_keyword(fused, keyword, 0.6, 0.4) == _reference_weighted(fused, keyword, 0.6, 0.4)
+    # Distance-only semantic scores (no RRF) take the same fallback path.
+    assert _merge_semantic_and_keyword(pool[:fetch_k], keyword, 0.7, 0.3) == _reference_weighted(
+        pool[:fetch_k], keyword, 0.7, 0.3
+    )
+
+
+def test_mmr_handles_zero_vectors_and_small_k() -> None:
+    candidates = [
+        {"id": "a", "embedding": [0.0, 0.0]},
+        {"id": "b", "embedding": [1.0, 0.0]},
+        {"id": "c", "embedding": [0.9, 0.1]},
+    ]
+
+    assert [c["id"] for c in fusion.apply_mmr(candidates, [1.0, 0.0], 5, 0.5)] == [
+        c["id"] for c in _reference_mmr(candidates, [1.0, 0.0], 5, 0.5)
+    ]
+    assert fusion.apply_mmr(candidates, [1.0, 0.0], 0, 0.5) == []
@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 from app.rag import hybrid_search
@@ -115,3 +117,93 @@ async def test_dense_search_default_rescue_runs_only_one_llm_strategy(
     assert result
     assert events == ["expansion"]
     assert "hypothetical passage" not in semantic_queries
+
+
+def _speculative_search_fakes(
+    monkeypatch: pytest.MonkeyPatch, score: float
+) -> dict[str, list[str]]:
+    calls: dict[str, list[str]] = {"expansion": [], "hyde": [], "cancelled": []}
+    types = ["new_grad_recruitment", "employee_interviews", "ceo_message"]
+
+    async def fake_semantic_search(**kwargs: object) -> list[dict]:
+        await asyncio.sleep(0.01)  # let the speculative tasks start
+        return [
+            {
+                "id": f"doc-{index}",
+                "document": f"{kwargs['query']} result",
+                "boosted_score": score,
+                "metadata": {"content_type": content_type},
+            }
+            for index, content_type in enumerate(types)
+        ]
+
+    async def fake_expand(*_args: object, **_kwargs: object) -> list[str]:
+        calls["expansion"].append("start")
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            calls["cancelled"].append("expansion")
+            raise
+        return ["応募締切 募集要項"]
+
+    async def fake_hyde(*_args: object, **_kwargs: object) -> str:
+        calls["hyde"].append("start")
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            calls["cancelled"].append("hyde")
+            raise
+        return "hypothetical passage"
+
+    async def fake_query_embeddings(queries: list[str], **_kwargs: object):
+        return [[0.1, 0.2, 0.3] for _ in queries]
+
+    monkeypatch.setattr(hybrid_search.settings, "rag_speculative_retrieval_enabled", True)
+    monkeypatch.setattr(hybrid_search, "semantic_search", fake_semantic_search)
+    monkeypatch.setattr(hybrid_search, "generate_query_embeddings", fake_query_embeddings)
+    monkeypatch.setattr(hybrid_search, "expand_queries_with_llm", fake_expand)
+    monkeypatch.setattr(hybrid_search, "generate_hypothetical_document", fake_hyde)
+    return calls
+
+
+async def _speculative_search() -> list[dict]:
+    return await hybrid_search.dense_hybrid_search(
+        company_id="company-1",
+        query="応募締切と募集要項を確認したい",
+        n_results=3,
+        backends=[EmbeddingBackend(provider="openai", model="test", dimension=3)],
+        rerank=False,
+        use_mmr=False,
+        use_bm25=False,
+        tenant_key="tenant-1",
+        speculative=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_speculative_llm_calls_are_cancelled_on_short_circuit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls = _speculative_search_fakes(monkeypatch, score=0.95)
+
+    result = await _speculative_search()
+    await asyncio.sleep(0)  # deliver the cancellations
+
+    assert len(result) == 3
+    assert calls["expansion"] == ["start"]
+    assert sorted(calls["cancelled"]) == ["expansion", "hyde"]
+
+
+@pytest.mark.asyncio
+async def test_speculative_rescue_reuses_the_running_expansion(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls = _speculative_search_fakes(monkeypatch, score=0.42)
+
+    result = await _speculative_search()
+    await asyncio.sleep(0)
+
+    assert result
+    # Started once before the first pass; fact lookup keeps expansion and drops HyDE.
+    assert calls["expansion"] == ["start"]
+    assert calls["cancelled"] == ["hyde"]
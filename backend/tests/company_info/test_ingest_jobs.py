@@ -0,0 +1,284 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+from app.routers import company_info
+from app.routers.company_info_models import UploadCorporatePdfResponse
+from app.services.company_info import build_rag_source, ingest_jobs
+from app.services.company_info.ingest_jobs import (
+    JOB_KIND_CRAWL,
+    JOB_KIND_PDF,
+    InMemoryIngestJobQueue,
+    RedisIngestJobQueue,
+    enqueue_ingest_job,
+    process_ingest_job,
+    requeue_expired_ingest_jobs,
+)
+
+TENANT_A = "a" * 32
+TENANT_B = "b" * 32
+
+
+@pytest.fixture(autouse=True, params=["memory", "redis"])
+def job_queue(request: pytest.FixtureRequest):
+    if request.param == "redis":
+        queue = RedisIngestJobQueue(fakeredis.FakeAsyncRedis())
+    else:
+        queue = InMemoryIngestJobQueue()
+    ingest_jobs._reset_ingest_job_queue_for_tests(queue)
+    yield queue
+    ingest_jobs._reset_ingest_job_queue_for_tests()
+
+
+def _crawl_payload(urls: list[str]) -> dict:
+    return {"company_id": "company-1", "company_name": "テスト株式会社", "urls": urls}
+
+
+@pytest.mark.asyncio
+async def test_tenants_are_served_round_robin(job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue) -> None:
+    bulk = [
+        await enqueue_ingest_job(
+            JOB_KIND_CRAWL,
+            tenant_key=TENANT_A,
+            company_id=f"company-{index}",
+            payload=_crawl_payload([f"https://a.example.com/{index}"]),
+            urls=[f"https://a.example.com/{index}"],
+        )
+        for index in range(3)
+    ]
+    single = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=TENANT_B,
+        company_id="company-b",
+        payload=_crawl_payload(["https://b.example.com/"]),
+        urls=["https://b.example.com/"],
+    )
+
+    order = [await job_queue.pop() for _ in range(5)]
+
+    assert order == [bulk[0].job_id, single.job_id, bulk[1].job_id, bulk[2].job_id, None]
+
+
+@pytest.mark.asyncio
+async def test_crawl_job_records_progress_and_skips_completed_urls_on_retry(
+    monkeypatch: pytest.MonkeyPatch,
+    job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue,
+) -> None:
+    monkeypatch.setattr(company_info, "resolve_embedding_backend", lambda: object())
+    processed: list[str] = []
+
+    async def fake_process(*, url: str, **_kwargs: object) -> dict:
+        processed.append(url)
+        if url.endswith("/broken"):
+            return {"success": False, "error": "本文なし", "pages_crawled": 0, "chunks_stored": 0}
+        return {"success": True, "pages_crawled": 1, "chunks_stored": 2}
+
+    monkeypatch.setattr(build_rag_source, "_process_crawl_source", fake_process)
+    urls = ["https://example.com/done", "https://example.com/new", "https://example.com/broken"]
+    job = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=TENANT_A,
+        company_id="company-1",
+        payload=_crawl_payload(urls),
+        urls=urls,
+    )
+    # A previous attempt already stored the first URL.
+    job.attempts = 1
+    job.progress[urls[0]] = {
+        "status": "completed",
+        "result": {"url": urls[0], "status": "completed", "pages_crawled": 1, "chunks_stored": 5},
+    }
+    await job_queue.save(job)
+
+    finished = await process_ingest_job(job.job_id)
+
+    assert processed == urls[1:]
+    assert finished.status == "completed"
+    assert finished.attempts == 2
+    assert [finished.progress[url]["status"] for url in urls] == ["completed", "completed", "failed"]
+    assert finished.progress[urls[2]]["error"] == "本文なし"
+    assert [item["url"] for item in finished.result["source_results"]] == urls
+    assert finished.result["pages_crawled"] == 2
+    assert finished.result["chunks_stored"] == 7
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_is_requeued_with_the_same_session_seed(
+    monkeypatch: pytest.MonkeyPatch,
+    job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue,
+) -> None:
+    seeds: list[str] = []
+
+    async def flaky_upload(**kwargs: object) -> UploadCorporatePdfResponse:
+        seeds.append(str(kwargs["ingest_session_seed"]))
+        assert kwargs["pdf_bytes"] == b"%PDF-1.4 test"
+        if len(seeds) == 1:
+            raise RuntimeError("embedding provider timeout")
+        return UploadCorporatePdfResponse(
+            success=True,
+            company_id="company-1",
+            source_url="https://example.com/ir.pdf",
+            chunks_stored=12,
+            extracted_chars=4000,
+            extraction_method="local",
+        )
+
+    monkeypatch.setattr(build_rag_source, "upload_corporate_pdf_impl", flaky_upload)
+    job = await enqueue_ingest_job(
+        JOB_KIND_PDF,
+        tenant_key=TENANT_A,
+        company_id="company-1",
+        payload={
+            "company_id": "company-1",
+            "company_name": "テスト株式会社",
+            "source_url": "https://example.com/ir.pdf",
+            "content_type": "ir_materials",
+            "content_channel": None,
+            "billing_plan": "free",
+            "filename": "ir.pdf",
+            "source_kind": "corporate_public",
+            "consent_reference": None,
+        },
+        urls=["https://example.com/ir.pdf"],
+        blob=b"%PDF-1.4 test",
+    )
+
+    retried = await process_ingest_job(await job_queue.pop())
+    assert retried.status == "queued"
+    assert retried.error == "embedding provider timeout"
+
+    finished = await process_ingest_job(await job_queue.pop())
+
+    assert finished.status == "completed"
+    assert finished.attempts == 2
+    assert seeds == [job.job_id, job.job_id]
+    assert finished.progress["https://example.com/ir.pdf"]["status"] == "completed"
+    assert await job_queue.get_blob(job.job_id) is None
+
+
+@pytest.mark.asyncio
+async def test_request_errors_are_not_retried(job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue) -> None:
+    job = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=TENANT_A,
+        company_id="company-1",
+        payload={**_crawl_payload(["https://example.com/"]), "content_channel": "unknown"},
+        urls=["https://example.com/"],
+    )
+
+    finished = await process_ingest_job(await job_queue.pop())
+
+    assert finished.job_id == job.job_id
+    assert finished.status == "failed"
+    assert finished.attempts == 1
+    assert "Invalid content_channel" in finished.error
+    assert await job_queue.pop() is None
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_is_requeued_without_using_an_attempt(
+    monkeypatch: pytest.MonkeyPatch,
+    job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue,
+) -> None:
+    started = asyncio.Event()
+
+    async def hanging_crawl(*_args: object, **_kwargs: object) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(build_rag_source, "crawl_corporate_pages_impl", hanging_crawl)
+    job = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=TENANT_A,
+        company_id="company-1",
+        payload=_crawl_payload(["https://example.com/"]),
+        urls=["https://example.com/"],
+    )
+    task = asyncio.create_task(process_ingest_job(await job_queue.pop()))
+    await started.wait()
+    assert (await job_queue.get(job.job_id)).status == "running"
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    requeued = await job_queue.get(job.job_id)
+    assert requeued.status == "queued"
+    assert requeued.attempts == 0
+    # The lease was handed back with the job, so the reaper does not queue it twice.
+    assert await requeue_expired_ingest_jobs(now=time.time() + 3600) == []
+    assert await job_queue.pop() == job.job_id
+    assert await job_queue.pop() is None
+
+
+@pytest.mark.asyncio
+async def test_attempt_is_cancelled_without_a_second_push_when_its_lease_is_lost(
+    monkeypatch: pytest.MonkeyPatch,
+    job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue,
+) -> None:
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def hanging_crawl(*_args: object, **_kwargs: object) -> None:
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(build_rag_source, "crawl_corporate_pages_impl", hanging_crawl)
+    monkeypatch.setattr(ingest_jobs.settings, "ingest_job_lease_seconds", 1)
+    job = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=TENANT_A,
+        company_id="company-1",
+        payload=_crawl_payload(["https://example.com/"]),
+        urls=["https://example.com/"],
+    )
+    task = asyncio.create_task(process_ingest_job(await job_queue.pop()))
+    await started.wait()
+
+    # The worker stalled past its lease and the reaper handed the job out again.
+    assert await requeue_expired_ingest_jobs(now=time.time() + 3600) == [job.job_id]
+    await asyncio.wait_for(task, timeout=5)
+
+    assert cancelled.is_set()
+    requeued = await job_queue.get(job.job_id)
+    assert requeued.status == "queued"
+    assert requeued.attempts == 1
+    assert await job_queue.pop() == job.job_id
+    assert await job_queue.pop() is None
+
+
+@pytest.mark.asyncio
+async def test_job_of_a_lost_worker_is_requeued_when_its_lease_expires(
+    job_queue: InMemoryIngestJobQueue | RedisIngestJobQueue,
+) -> None:
+    job = await enqueue_ingest_job(
+        JOB_KIND_CRAWL,
+        tenant_key=TENANT_A,
+        company_id="company-1",
+        payload=_crawl_payload(["https://example.com/"]),
+        urls=["https://example.com/"],
+    )
+    # The worker marked the job running, then the process died.
+    assert await job_queue.pop() == job.job_id
+    job.status, job.attempts = "running", 1
+    job.progress["https://example.com/"] = {"status": "running"}
+    await job_queue.save(job)
+
+    assert await requeue_expired_ingest_jobs() == []
+    assert await requeue_expired_ingest_jobs(now=time.time() + 3600) == [job.job_id]
+
+    recovered = await job_queue.get(job.job_id)
+    assert recovered.status == "queued"
+    assert recovered.progress["https://example.com/"]["status"] == "queued"
+    assert await job_queue.pop() == job.job_id
+    # A second expiry after the last attempt fails the job instead of looping forever.
+    recovered.status, recovered.attempts = "running", recovered.max_attempts
+    await job_queue.save(recovered)
+    assert await requeue_expired_ingest_jobs(now=time.time() + 3600) == []
+    assert (await job_queue.get(job.job_id)).status == "failed"
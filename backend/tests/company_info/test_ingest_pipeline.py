@@ -0,0 +1,234 @@
+import asyncio
+
+import pytest
+
+from app.rag import ingest_pipeline, vector_store
+from app.rag.ingest_pipeline import CompanyIngestPipeline, run_staged
+from app.utils.embeddings import EmbeddingBackend
+
+TENANT_KEY = "a" * 32
+BACKEND = EmbeddingBackend(provider="openai", model="test-embedding-model", dimension=3)
+
+
+class FakeCollection:
+    def __init__(self) -> None:
+        self.records: dict[str, dict] = {}
+
+    def add(self, *, documents, metadatas, ids, embeddings) -> None:
+        for doc, metadata, doc_id in zip(documents, metadatas, ids):
+            self.records[doc_id] = {"document": doc, "metadata": metadata}
+
+    def get(self, where=None, include=None, limit=None):
+        matches = [(doc_id, record) for doc_id, record in self.records.items() if _matches(record["metadata"], where)]
+        return {
+            "ids": [doc_id for doc_id, _ in matches],
+            "metadatas": [record["metadata"] for _, record in matches],
+        }
+
+    def delete(self, *, ids=None, where=None) -> None:
+        for doc_id in ids or []:
+            self.records.pop(doc_id, None)
+
+
+def _matches(metadata: dict, where) -> bool:
+    if not where:
+        return True
+    if "$and" in where:
+        return all(_matches(metadata, clause) for clause in where["$and"])
+    return all(metadata.get(key) == value for key, value in where.items())
+
+
+@pytest.fixture
+def fake_store(monkeypatch: pytest.MonkeyPatch) -> dict:
+    collection = FakeCollection()
+    calls: dict = {"embed": [], "bm25": [], "invalidated": 0}
+
+    async def fake_embed(documents, backend=None, cache_variant="document"):
+        calls["embed"].append(len(documents))
+        calls.setdefault("variants", []).append(cache_variant)
+        await asyncio.sleep(0.05)
+        return [[0.1, 0.2, 0.3] for _ in documents]
+
+    async def fake_classify(chunks, **_kwargs):
+        return chunks
+
+    class FakeCache:
+        async def invalidate_company(self, *_args, **_kwargs) -> None:
+            calls["invalidated"] += 1
+
+    monkeypatch.setattr(vector_store, "_get_collection", lambda *_args, **_kwargs: collection)
+    monkeypatch.setattr(vector_store, "get_company_collection", lambda *_args, **_kwargs: collection)
+    monkeypatch.setattr(vector_store, "_resolve_write_backend", lambda *_args, **_kwargs: BACKEND)
+    monkeypatch.setattr(vector_store, "generate_embeddings_batch", fake_embed)
+    monkeypatch.setattr(vector_store, "classify_chunks", fake_classify)
+    monkeypatch.setattr(
+        vector_store,
+        "schedule_bm25_update",
+        lambda company_id, tenant_key, source_urls=None: calls["bm25"].append(sorted(source_urls or [])),
+    )
+    monkeypatch.setattr(vector_store, "get_rag_cache", lambda: FakeCache())
+    calls["collection"] = collection
+    return calls
+
+
+async def _store(url: str, text: str) -> dict:
+    return await vector_store.store_full_text_content(
+        company_id="company-1",
+        company_name="テスト株式会社",
+        raw_text=text,
+        source_url=url,
+        content_type="corporate_site",
+        backend=BACKEND,
+        raw_format="text",
+        tenant_key=TENANT_KEY,
+    )
+
+
+@pytest.mark.asyncio
+async def test_documents_share_embedding_batches_and_refresh_once(fake_store: dict) -> None:
+    urls = [f"https://example.com/{index}" for index in range(4)]
+
+    async with CompanyIngestPipeline(company_id="company-1", tenant_key=TENANT_KEY) as pipeline:
+        results = await asyncio.gather(
+            *(_store(url, f"ページ{index}の事業内容と採用情報です。" * 60) for index, url in enumerate(urls))
+        )
+
+    assert all(result["success"] for result in results)
+    assert len(fake_store["embed"]) < len(urls)
+    assert max(pipeline.embed_batches) > 1
+    assert fake_store["bm25"] == [sorted(urls)]
+    assert fake_store["invalidated"] == 1
+    stored_urls = {record["metadata"]["source_url"] for record in fake_store["collection"].records.values()}
+    assert stored_urls == set(urls)
+
+
+@pytest.mark.asyncio
+async def test_failed_document_does_not_block_the_rest(fake_store: dict) -> None:
+    async with CompanyIngestPipeline(company_id="company-1", tenant_key=TENANT_KEY):
+        empty, stored = await asyncio.gather(
+            _store("https://example.com/empty", ""),
+            _store("https://example.com/ok", "会社概要と中期経営計画の本文です。" * 60),
+        )
+
+    assert empty["success"] is False
+    assert stored["success"] is True
+    assert stored["dominant_content_type"] == "corporate_site"
+    assert fake_store["bm25"] == [["https://example.com/ok"]]
+
+
+@pytest.mark.asyncio
+async def test_documents_are_classified_concurrently(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_store: dict,
+) -> None:
+    in_flight = {"now": 0, "max": 0}
+
+    async def slow_classify(chunks, **_kwargs):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        return chunks
+
+    monkeypatch.setattr(vector_store, "classify_chunks", slow_classify)
+    urls = [f"https://example.com/{index}" for index in range(3)]
+
+    async with CompanyIngestPipeline(company_id="company-1", tenant_key=TENANT_KEY, classify_workers=3):
+        results = await asyncio.gather(
+            *(_store(url, f"ページ{index}の事業内容と採用情報です。" * 60) for index, url in enumerate(urls))
+        )
+
+    assert all(result["success"] for result in results)
+    assert in_flight["max"] == 3
+    # The sentinel reached embed / store only after every classify worker finished.
+    assert fake_store["bm25"] == [sorted(urls)]
+
+
+@pytest.mark.asyncio
+async def test_standalone_store_runs_a_one_document_pipeline(fake_store: dict) -> None:
+    result = await _store("https://example.com/solo", "単独で保存する本文です。" * 60)
+
+    assert result["success"] is True
+    assert fake_store["bm25"] == [["https://example.com/solo"]]
+    assert ingest_pipeline.get_active_ingest_pipeline("company-1", TENANT_KEY) is None
+
+
+@pytest.mark.asyncio
+async def test_session_seed_replaces_leftovers_of_an_interrupted_attempt(fake_store: dict) -> None:
+    url = "https://example.com/ir"
+
+    # First attempt stored a long page, then the job died before reporting success.
+    async with CompanyIngestPipeline(company_id="company-1", tenant_key=TENANT_KEY, session_seed="job-1"):
+        await _store(url, "旧版の長い本文です。" * 300)
+    async with CompanyIngestPipeline(company_id="company-1", tenant_key=TENANT_KEY, session_seed="job-1"):
+        result = await _store(url, "再試行時の本文です。" * 60)
+
+    records = fake_store["collection"].records.values()
+    assert result["success"] is True
+    assert {record["metadata"]["ingest_session_id"] for record in records} == {
+        vector_store.make_replayable_ingest_session_id("job-1", url)
+    }
+    assert all("再試行時の本文です。" in record["document"] for record in records)
+
+
+@pytest.mark.asyncio
+async def test_dual_write_embeds_both_variants_in_one_call(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_store: dict,
+) -> None:
+    contextual = FakeCollection()
+    monkeypatch.setattr(vector_store, "get_company_contextual_collection", lambda *_args, **_kwargs: contextual)
+    monkeypatch.setattr(vector_store.settings, "contextual_retrieval_dual_write", True)
+
+    result = await _store("https://example.com/dual", "事業内容と中期経営計画の説明です。" * 60)
+
+    base = fake_store["collection"].records
+    assert result["success"] is True
+    assert fake_store["variants"] == ["dual_write"]
+    assert fake_store["embed"] == [len(base) * 2]
+    assert set(contextual.records) == set(base)
+    assert all(
+        contextual.records[doc_id]["document"].endswith(record["document"])
+        for doc_id, record in base.items()
+    )
+
+
+@pytest.mark.asyncio
+async def test_contextual_only_skips_the_base_collection(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_store: dict,
+) -> None:
+    contextual = FakeCollection()
+    monkeypatch.setattr(vector_store, "get_company_contextual_collection", lambda *_args, **_kwargs: contextual)
+    monkeypatch.setattr(ingest_pipeline.settings, "contextual_retrieval_enabled", True)
+    monkeypatch.setattr(ingest_pipeline.settings, "contextual_retrieval_dual_write", True)
+    monkeypatch.setattr(vector_store, "get_company_collection", lambda *_args, **_kwargs: pytest.fail("base write"))
+
+    async with CompanyIngestPipeline(company_id="company-1", tenant_key=TENANT_KEY, contextual_only=True):
+        result = await _store("https://example.com/ctx", "採用情報と福利厚生の説明です。" * 60)
+
+    assert result["success"] is True
+    assert fake_store["variants"] == ["contextual"]
+    assert fake_store["embed"] == [len(contextual.records)]
+    assert contextual.records
+
+
+@pytest.mark.asyncio
+async def test_run_staged_overlaps_stages_and_keeps_order() -> None:
+    events: list[tuple[str, int]] = []
+
+    async def first(value: int) -> int:
+        events.append(("first", value))
+        await asyncio.sleep(0.02)
+        return value
+
+    async def second(value: int) -> int:
+        await asyncio.sleep(0.02)
+        events.append(("second_done", value))
+        return value * 10
+
+    results = await run_staged([1, 2, 3], [("embed", first), ("store", second)])
+
+    assert results == [10, 20, 30]
+    # Item 2 entered the first stage while item 1 was still in the second stage.
+    assert events.index(("first", 2)) < events.index(("second_done", 1))
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from app.utils import reranker as reranker_module
+from app.utils.reranker import CrossEncoderReranker, merge_cascade_scores
+from app.utils.reranker_executor import RerankerExecutor
+
+PREFILTER = "test/xsmall"
+
+
+class _ScoringModel:
+    """Scores by a fixed per-document table and records every pair it sees."""
+
+    def __init__(self, table: dict[str, float]) -> None:
+        self.table = table
+        self.seen: list[str] = []
+
+    def predict(self, pairs):
+        self.seen.extend(doc for _, doc in pairs)
+        return [self.table[doc] for _, doc in pairs]
+
+
+def _reranker(name: str, model: _ScoringModel) -> CrossEncoderReranker:
+    reranker = CrossEncoderReranker.__new__(CrossEncoderReranker)
+    reranker.model_name = name
+    reranker.model = model
+    return reranker
+
+
+DOCS = ["d0", "d1", "d2", "d3", "d4", "d5"]
+COARSE = {"d0": 0.2, "d1": 0.9, "d2": 0.1, "d3": 0.7, "d4": 0.8, "d5": 0.3}
+FINE = {"d1": 0.4, "d3": 0.95, "d4": 0.6}
+
+
+@pytest.fixture
+def cascade(monkeypatch: pytest.MonkeyPatch):
+    prefilter_model = _ScoringModel(COARSE)
+    head_model = _ScoringModel(FINE)
+    models = {PREFILTER: prefilter_model, "test/base": head_model}
+    instances = {name: _reranker(name, model) for name, model in models.items()}
+
+    monkeypatch.setattr(reranker_module, "get_rerank_score_cache", lambda: None)
+    monkeypatch.setattr(reranker_module.settings, "reranker_cascade_enabled", True)
+    monkeypatch.setattr(reranker_module.settings, "reranker_cascade_top_n", 3)
+    monkeypatch.setattr(reranker_module.settings, "reranker_cascade_prefilter_model", PREFILTER)
+    monkeypatch.setattr(CrossEncoderReranker, "_instances", instances)
+    monkeypatch.setattr(
+        reranker_module,
+        "_executor",
+        RerankerExecutor(lambda name: models[name], window_ms=0),
+    )
+    return instances["test/base"], prefilter_model, head_model
+
+
+def _results() -> list[dict]:
+    return [{"text": doc} for doc in DOCS]
+
+
+def test_merge_keeps_head_scale_and_tail_order() -> None:
+    coarse = [0.2, 0.9, 0.1, 0.7, 0.8]
+    merged = merge_cascade_scores(coarse, [1, 4, 3], [0.4, 0.6, 0.95])
+
+    assert merged[1] == 0.4 and merged[4] == 0.6 and merged[3] == 0.95
+    tail = [merged[0], merged[2]]
+    assert max(tail) < 0.4
+    assert tail[0] > tail[1]
+
+
+def test_merge_leaves_tail_untouched_when_already_below_head() -> None:
+    assert merge_cascade_scores([0.1, 0.9, 0.2], [1], [0.5]) == [0.1, 0.5, 0.2]
+
+
+def test_sync_cascade_rescoring_only_head(cascade) -> None:
+    reranker, prefilter_model, head_model = cascade
+
+    reranked = reranker.rerank("q", _results(), top_k=6)
+
+    assert prefilter_model.seen == DOCS
+    assert sorted(head_model.seen) == ["d1", "d3", "d4"]
+    assert [item["text"] for item in reranked] == ["d3", "d4", "d1", "d5", "d0", "d2"]
+    assert [item["rerank_stage"] for item in reranked[:3]] == ["head"] * 3
+    assert reranked[0]["rerank_prefilter_score"] == 0.7
+
+
+@pytest.mark.asyncio
+async def test_async_cascade_matches_sync_and_min_score(cascade) -> None:
+    reranker, _, _ = cascade
+
+    expected = reranker.rerank("q", _results(), top_k=6, min_score=0.5)
+    actual = await reranker.arerank("q", _results(), top_k=6, min_score=0.5)
+
+    assert actual == expected
+    assert [item["text"] for item in actual] == ["d3", "d4"]
+
+
+@pytest.mark.asyncio
+async def test_async_cascade_loads_the_prefilter_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+    cascade,
+) -> None:
+    reranker, _, _ = cascade
+    prefilter = CrossEncoderReranker._instances.pop(PREFILTER)
+    loader_threads: list[threading.Thread] = []
+
+    def load(model_name: str = PREFILTER) -> CrossEncoderReranker:
+        loader_threads.append(threading.current_thread())
+        CrossEncoderReranker._instances[model_name] = prefilter
+        return prefilter
+
+    monkeypatch.setattr(CrossEncoderReranker, "get_instance", load)
+
+    reranked = await reranker.arerank("q", _results(), top_k=6)
+    await reranker.arerank("q", _results(), top_k=6)
+
+    assert [item["text"] for item in reranked[:3]] == ["d3", "d4", "d1"]
+    # Loaded once, on a worker thread; later requests reuse the loaded instance.
+    assert len(loader_threads) == 1
+    assert loader_threads[0] is not threading.main_thread()
+
+
+def test_cascade_can_be_disabled_per_call(cascade) -> None:
+    reranker, prefilter_model, head_model = cascade
+    head_model.table = {**COARSE, **FINE}
+
+    reranker.rerank("q", _results(), top_k=6, cascade_top_n=0)
+
+    assert prefilter_model.seen == []
+    assert head_model.seen == DOCS
+
+
+def test_small_candidate_sets_skip_the_prefilter(cascade) -> None:
+    reranker, prefilter_model, _ = cascade
+
+    reranker.rerank("q", [{"text": "d1"}, {"text": "d3"}], top_k=2)
+
+    assert prefilter_model.seen == []
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils import reranker as reranker_module
+from app.utils.reranker import CrossEncoderReranker
+from app.utils.reranker_executor import RerankerExecutor
+
+
+@pytest.fixture(autouse=True)
+def _no_score_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(reranker_module, "get_rerank_score_cache", lambda: None)
+
+
+class _RecordingModel:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls: list[list[tuple[str, str]]] = []
+        self.threads: list[str] = []
+        self.delay = delay
+        self.fail = fail
+
+    def predict(self, pairs):
+        self.calls.append(list(pairs))
+        self.threads.append(threading.current_thread().name)
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("boom")
+        return [float(len(doc)) for _, doc in pairs]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_merged_into_one_batch() -> None:
+    model = _RecordingModel()
+    executor = RerankerExecutor(lambda name: model, window_ms=50, max_batch_pairs=64)
+
+    results = await asyncio.gather(
+        executor.score("m", [("q1", "aaa"), ("q1", "a")]),
+        executor.score("m", [("q2", "aaaaa")]),
+        executor.score("m", [("q3", "aa"), ("q3", "aaaa")]),
+    )
+
+    assert results == [[3.0, 1.0], [5.0], [2.0, 4.0]]
+    assert len(model.calls) == 1
+    # Pairs are length-sorted before inference.
+    assert [doc for _, doc in model.calls[0]] == ["a", "aa", "aaa", "aaaa", "aaaaa"]
+    assert model.threads == ["reranker-executor"]
+
+
+@pytest.mark.asyncio
+async def test_batches_are_split_per_model_and_by_max_pairs() -> None:
+    models = {"a": _RecordingModel(), "b": _RecordingModel()}
+    executor = RerankerExecutor(models.__getitem__, window_ms=50, max_batch_pairs=2)
+
+    results = await asyncio.gather(
+        executor.score("a", [("q", "x")]),
+        executor.score("b", [("q", "yy")]),
+        executor.score("a", [("q", "zzz")]),
+    )
+
+    assert results == [[1.0], [2.0], [3.0]]
+    assert sum(len(call) for call in models["a"].calls) == 2
+    assert len(models["b"].calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_inference_errors_propagate_to_every_caller() -> None:
+    executor = RerankerExecutor(lambda name: _RecordingModel(fail=True), window_ms=20)
+
+    outcomes = await asyncio.gather(
+        executor.score("m", [("q", "a")]),
+        executor.score("m", [("q", "b")]),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+
+@pytest.mark.asyncio
+async def test_event_loop_stays_responsive_during_inference() -> None:
+    executor = RerankerExecutor(lambda name: _RecordingModel(delay=0.2), window_ms=0)
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        await executor.score("m", [("q", "doc")])
+    finally:
+        task.cancel()
+
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_arerank_matches_sync_rerank(monkeypatch: pytest.MonkeyPatch) -> None:
+    model = _RecordingModel()
+    reranker = CrossEncoderReranker.__new__(CrossEncoderReranker)
+    reranker.model_name = "fake-model"
+    reranker.model = model
+    monkeypatch.setattr(
+        reranker_module,
+        "_executor",
+        RerankerExecutor(lambda name: model, window_ms=0),
+    )
+
+    def make_results() -> list[dict]:
+        return [{"text": "aa"}, {"text": ""}, {"text": "aaaa"}, {"text": "a"}]
+
+    expected = reranker.rerank("q", make_results(), top_k=3, min_score=1.5)
+    actual = await reranker.arerank("q", make_results(), top_k=3, min_score=1.5)
+
+    assert actual == expected
+    assert [item["text"] for item in actual] == ["aaaa", "aa"]
+
+
+@pytest.mark.asyncio
+async def test_arerank_returns_original_order_on_failure(monkeypatch: pytest.MonkeyPatch) -> None:
+    reranker = CrossEncoderReranker.__new__(CrossEncoderReranker)
+    reranker.model_name = "fake-model"
+    reranker.model = _RecordingModel()
+    monkeypatch.setattr(
+        reranker_module,
+        "_executor",
+        RerankerExecutor(lambda name: _RecordingModel(fail=True), window_ms=0),
+    )
+
+    results = [{"text": "a"}, {"text": "b"}, {"text": "c"}]
+
+    assert await reranker.arerank("q", results, top_k=2) == results[:2]
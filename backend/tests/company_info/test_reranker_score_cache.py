@@ -0,0 +1,135 @@
+import pytest
+
+from app.utils import reranker as reranker_module
+from app.utils.reranker import CrossEncoderReranker
+from app.utils.reranker_cache import RerankScoreCache, rerank_score_key
+from app.utils.reranker_executor import RerankerExecutor
+
+
+class _RecordingModel:
+    def __init__(self) -> None:
+        self.calls: list[list[tuple[str, str]]] = []
+
+    def predict(self, pairs):
+        self.calls.append(list(pairs))
+        return [float(len(doc)) for _, doc in pairs]
+
+
+class _FakeRedisTier:
+    def __init__(self) -> None:
+        self.store: dict[str, object] = {}
+
+    def enabled(self) -> bool:
+        return True
+
+    async def get_json(self, key: str):
+        return self.store.get(key)
+
+    async def set_json(self, key: str, value, ttl: int) -> None:
+        self.store[key] = value
+
+    async def mget_json(self, keys: list[str]):
+        return [self.store.get(key) for key in keys]
+
+    async def set_many_json(self, items: dict, ttl: int) -> None:
+        self.store.update(items)
+
+
+def _reranker(model_name: str, model: _RecordingModel) -> CrossEncoderReranker:
+    reranker = CrossEncoderReranker.__new__(CrossEncoderReranker)
+    reranker.model_name = model_name
+    reranker.model = model
+    return reranker
+
+
+@pytest.fixture
+def score_cache(monkeypatch: pytest.MonkeyPatch) -> RerankScoreCache:
+    cache = RerankScoreCache(64)
+    monkeypatch.setattr(reranker_module, "get_rerank_score_cache", lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def executor_model(monkeypatch: pytest.MonkeyPatch) -> _RecordingModel:
+    model = _RecordingModel()
+    monkeypatch.setattr(
+        reranker_module, "_executor", RerankerExecutor(lambda name: model, window_ms=0)
+    )
+    return model
+
+
+def test_rerank_only_scores_unseen_pairs(score_cache) -> None:
+    model = _RecordingModel()
+    reranker = _reranker("base", model)
+
+    reranker.rerank("採用", [{"text": "aa"}, {"text": "aaaa"}])
+    reranked = reranker.rerank("採用", [{"text": "aaaa"}, {"text": "aaa"}, {"text": "aa"}])
+
+    assert model.calls == [[("採用", "aa"), ("採用", "aaaa")], [("採用", "aaa")]]
+    assert [item["rerank_score"] for item in reranked] == [4.0, 3.0, 2.0]
+
+
+def test_duplicate_pairs_are_scored_once(score_cache) -> None:
+    model = _RecordingModel()
+
+    scores = _reranker("base", model).score_pairs([("q", "同じ"), ("q", "同じ")])
+
+    assert scores == [2.0, 2.0]
+    assert model.calls == [[("q", "同じ")]]
+
+
+def test_scores_are_scoped_per_model(score_cache) -> None:
+    base_model, tuned_model = _RecordingModel(), _RecordingModel()
+
+    _reranker("base", base_model).score_pairs([("q", "doc")])
+    _reranker("tuned", tuned_model).score_pairs([("q", "doc")])
+    _reranker("base", base_model).score_pairs([("q", "doc")])
+
+    assert len(base_model.calls) == 1
+    assert len(tuned_model.calls) == 1
+
+
+def test_keys_use_truncated_passage() -> None:
+    long_text = "x" * 600
+
+    assert rerank_score_key("m", "q", long_text) == rerank_score_key("m", "q", long_text[:512])
+    assert rerank_score_key("m", "q", "a") != rerank_score_key("m", "q2", "a")
+
+
+def test_local_tier_evicts_least_recently_used() -> None:
+    cache = RerankScoreCache(2)
+    keys = [rerank_score_key("m", "q", f"doc-{i}") for i in range(3)]
+
+    cache.set_local({keys[0]: 0.1, keys[1]: 0.2})
+    assert cache.get_local([keys[0]]) == {keys[0]: 0.1}
+    cache.set_local({keys[2]: 0.3})
+
+    assert cache.get_local(keys) == {keys[0]: 0.1, keys[2]: 0.3}
+
+
+@pytest.mark.asyncio
+async def test_arerank_uses_cache_and_executor_for_misses(score_cache, executor_model) -> None:
+    reranker = _reranker("base", executor_model)
+
+    await reranker.arerank("q", [{"text": "a"}, {"text": "bb"}])
+    reranked = await reranker.arerank("q", [{"text": "bb"}, {"text": "ccc"}])
+
+    assert executor_model.calls == [[("q", "a"), ("q", "bb")], [("q", "ccc")]]
+    assert [item["rerank_score"] for item in reranked] == [3.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_processes(monkeypatch, executor_model) -> None:
+    shared = _FakeRedisTier()
+    writer, reader = RerankScoreCache(8), RerankScoreCache(8)
+    writer._redis = shared
+    reader._redis = shared
+
+    monkeypatch.setattr(reranker_module, "get_rerank_score_cache", lambda: writer)
+    await _reranker("base", executor_model).arerank("q", [{"text": "doc"}])
+    monkeypatch.setattr(reranker_module, "get_rerank_score_cache", lambda: reader)
+    reranked = await _reranker("base", executor_model).arerank("q", [{"text": "doc"}])
+
+    assert len(executor_model.calls) == 1
+    assert reranked[0]["rerank_score"] == 3.0
+    assert reader.get_local([rerank_score_key("base", "q", "doc")])
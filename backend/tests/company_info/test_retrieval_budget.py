@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from prometheus_client import CollectorRegistry, Histogram
+
+from app.rag import budget as budget_module
+from app.rag import hybrid_search, telemetry
+from app.rag.budget import RetrievalBudget
+from app.utils.embeddings import EmbeddingBackend
+
+BACKEND = EmbeddingBackend(provider="openai", model="test", dimension=3)
+
+
+def test_stage_quantile_interpolates_histogram_buckets(monkeypatch: pytest.MonkeyPatch) -> None:
+    histogram = Histogram(
+        "test_stage_duration_seconds",
+        "test",
+        ["stage"],
+        buckets=(0.1, 0.5, 1.0),
+        registry=CollectorRegistry(),
+    )
+    monkeypatch.setattr(telemetry, "rag_retrieval_duration", histogram)
+    for _ in range(90):
+        histogram.labels(stage="expansion").observe(0.05)
+    for _ in range(10):
+        histogram.labels(stage="expansion").observe(0.8)
+
+    p95 = telemetry.stage_duration_quantile("expansion", 0.95)
+
+    assert p95 == pytest.approx(0.75)
+    assert telemetry.stage_duration_quantile("expansion", min_samples=101) is None
+    assert telemetry.stage_duration_quantile("rerank") is None
+
+
+def test_budget_allows_only_stages_whose_p95_fits(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(budget_module, "stage_p95", {"expansion": 2.0, "bm25": 0.1}.get)
+    budget = RetrievalBudget.from_timeout(1.0)
+
+    assert budget.allows("bm25") is True
+    assert budget.allows("expansion") is False
+
+    budget.degrade("expansion")
+    budget.degrade("expansion")
+    assert budget.degraded == ["expansion"]
+
+
+def _patch_search(monkeypatch: pytest.MonkeyPatch, expand) -> list[str]:
+    semantic_queries: list[str] = []
+
+    async def fake_semantic_search(**kwargs: object) -> list[dict]:
+        semantic_queries.append(str(kwargs["query"]))
+        return [
+            {
+                "id": f"doc-{len(semantic_queries)}",
+                "document": "result",
+                "boosted_score": 0.42,
+                "metadata": {"content_type": "corporate_site"},
+            }
+        ]
+
+    async def fake_query_embeddings(queries: list[str], **_kwargs: object):
+        return [[0.1, 0.2, 0.3] for _ in queries]
+
+    monkeypatch.setattr(hybrid_search, "semantic_search", fake_semantic_search)
+    monkeypatch.setattr(hybrid_search, "generate_query_embeddings", fake_query_embeddings)
+    monkeypatch.setattr(hybrid_search, "expand_queries_with_llm", expand)
+    return semantic_queries
+
+
+async def _search(budget: RetrievalBudget) -> list[dict]:
+    return await hybrid_search.dense_hybrid_search(
+        company_id="company-1",
+        query="応募締切と募集要項を確認したい",
+        n_results=3,
+        backends=[BACKEND],
+        expand_queries=True,
+        use_hyde=False,
+        rerank=False,
+        use_mmr=False,
+        use_bm25=False,
+        tenant_key="tenant-1",
+        budget=budget,
+    )
+
+
+@pytest.mark.asyncio
+async def test_expansion_is_skipped_when_its_p95_does_not_fit(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    async def fake_expand(*_args: object, **_kwargs: object) -> list[str]:
+        calls.append("expansion")
+        return ["応募締切 募集要項"]
+
+    semantic_queries = _patch_search(monkeypatch, fake_expand)
+    monkeypatch.setattr(budget_module, "stage_p95", lambda stage: 5.0 if stage == "expansion" else 0.0)
+    budget = RetrievalBudget.from_timeout(1.0)
+
+    result = await _search(budget)
+
+    assert result
+    assert calls == []
+    assert semantic_queries == ["応募締切と募集要項を確認したい"]
+    assert budget.degraded == ["expansion"]
+
+
+@pytest.mark.asyncio
+async def test_slow_expansion_is_cut_at_the_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def slow_expand(*_args: object, **_kwargs: object) -> list[str]:
+        await asyncio.sleep(5)
+        return ["応募締切 募集要項"]
+
+    _patch_search(monkeypatch, slow_expand)
+    monkeypatch.setattr(budget_module, "stage_p95", lambda stage: 0.0)
+    budget = RetrievalBudget.from_timeout(0.05)
+
+    result = await asyncio.wait_for(_search(budget), timeout=2)
+
+    assert result
+    assert budget.degraded == ["expansion"]
+
+
+@pytest.mark.asyncio
+async def test_no_budget_keeps_every_stage(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_expand(*_args: object, **_kwargs: object) -> list[str]:
+        return ["応募締切 募集要項"]
+
+    semantic_queries = _patch_search(monkeypatch, fake_expand)
+
+    result = await hybrid_search.dense_hybrid_search(
+        company_id="company-1",
+        query="応募締切と募集要項を確認したい",
+        n_results=3,
+        backends=[BACKEND],
+        use_hyde=False,
+        rerank=False,
+        use_mmr=False,
+        use_bm25=False,
+        tenant_key="tenant-1",
+    )
+
+    assert result
+    assert "応募締切 募集要項" in semantic_queries
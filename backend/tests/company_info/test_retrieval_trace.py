@@ -0,0 +1,117 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+
+from app.config import settings
+from app.rag import hybrid_search, trace
+from app.rag.budget import RetrievalBudget
+from app.utils.embeddings import EmbeddingBackend
+
+BACKEND = EmbeddingBackend(provider="openai", model="test", dimension=3)
+
+
+@pytest.fixture(autouse=True)
+def _reset_trace():
+    trace.reset_retrieval_trace()
+    yield
+    trace.reset_retrieval_trace()
+
+
+def _patch_search(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def fake_semantic_search(**kwargs: object) -> list[dict]:
+        return [
+            {
+                "id": f"doc-{kwargs['query']}",
+                "document": "result",
+                "boosted_score": 0.2,
+                "metadata": {"content_type": "corporate_site"},
+            }
+        ]
+
+    async def fake_query_embeddings(queries: list[str], **_kwargs: object):
+        return [[0.1, 0.2, 0.3] for _ in queries]
+
+    async def fake_expand(*_args: object, **_kwargs: object) -> list[str]:
+        return ["応募締切 募集要項"]
+
+    monkeypatch.setattr(hybrid_search, "semantic_search", fake_semantic_search)
+    monkeypatch.setattr(hybrid_search, "generate_query_embeddings", fake_query_embeddings)
+    monkeypatch.setattr(hybrid_search, "expand_queries_with_llm", fake_expand)
+
+
+def test_consume_without_trace_returns_none() -> None:
+    trace.record_candidates("dense", 3)
+
+    assert trace.consume_retrieval_trace() is None
+
+
+@pytest.mark.asyncio
+async def test_dense_hybrid_search_fills_request_trace(monkeypatch: pytest.MonkeyPatch) -> None:
+    _patch_search(monkeypatch)
+    trace.start_retrieval_trace()
+    budget = RetrievalBudget.from_timeout(60)
+
+    await hybrid_search.dense_hybrid_search(
+        company_id="company-1",
+        query="応募締切と募集要項を確認したい",
+        n_results=3,
+        backends=[BACKEND],
+        use_hyde=False,
+        rerank=False,
+        use_mmr=False,
+        use_bm25=False,
+        tenant_key="tenant-1",
+        budget=budget,
+    )
+    budget.degrade("rerank")
+    summary = trace.consume_retrieval_trace()
+
+    assert summary is not None
+    assert {"semantic", "expansion", "query_embedding", "fusion"} <= set(summary["stages"])
+    assert summary["stages"]["semantic"]["count"] == 2
+    assert summary["candidates"]["first_pass"] == 1
+    assert summary["candidates"]["query_variants"] == 2
+    assert "rescue:expansion" in summary["decisions"]
+    assert summary["decisions"][-1] == "degraded:rerank"
+    assert trace.get_retrieval_trace() is None
+
+
+@pytest.mark.asyncio
+async def test_trace_is_shared_with_worker_threads() -> None:
+    trace.start_retrieval_trace()
+
+    def keyword_worker() -> None:
+        with trace.trace_span("bm25_search"):
+            trace.record_candidates("bm25", 4)
+        trace.record_cache("query_embedding", True)
+
+    await asyncio.to_thread(keyword_worker)
+    summary = trace.consume_retrieval_trace()
+
+    assert summary["stages"]["bm25_search"]["count"] == 1
+    assert summary["candidates"] == {"bm25": 4}
+    assert summary["cache"] == {"query_embedding": {"hit": 1, "miss": 0}}
+
+
+def test_spans_are_exported_to_opentelemetry_when_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    started: list[tuple[str, dict]] = []
+
+    class FakeTracer:
+        @contextmanager
+        def start_as_current_span(self, name: str, attributes: dict):
+            started.append((name, attributes))
+            yield
+
+    class FakeOtel:
+        @staticmethod
+        def get_tracer(_name: str) -> FakeTracer:
+            return FakeTracer()
+
+    monkeypatch.setattr(trace, "_otel_trace", FakeOtel)
+    monkeypatch.setattr(settings, "rag_trace_otel_enabled", True)
+
+    with trace.trace_span("chroma_query", collection="company_info"):
+        pass
+
+    assert started == [("rag.chroma_query", {"collection": "company_info"})]
@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+from app.rag import vector_matrix, vector_store
+from app.rag.vector_matrix import CompanyVectorMatrix, VectorMatrixCache
+from app.utils.embeddings import EmbeddingBackend
+
+BACKEND = EmbeddingBackend(provider="openai", model="test-embedding-model", dimension=4)
+TENANT_KEY = "tenant-1"
+
+
+def _matrix(vectors: np.ndarray, metadatas: list[dict] | None = None, company_id: str = "company-1") -> CompanyVectorMatrix:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    n = len(vectors)
+    return CompanyVectorMatrix(
+        company_id=company_id,
+        tenant_key=TENANT_KEY,
+        model=BACKEND.model,
+        vectors=vectors,
+        sq_norms=np.einsum("ij,ij->i", vectors, vectors),
+        ids=[f"doc-{i}" for i in range(n)],
+        documents=[f"text-{i}" for i in range(n)],
+        metadatas=metadatas or [{} for _ in range(n)],
+        collections=["company_info"] * n,
+    )
+
+
+def test_matrix_search_matches_brute_force_l2() -> None:
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16)).astype(np.float32)
+    queries = rng.normal(size=(3, 16)).astype(np.float32)
+    matrix = _matrix(vectors)
+
+    hits = matrix.search(queries.tolist(), 5)
+
+    for query, query_hits in zip(queries, hits):
+        expected = np.sum((vectors - query) ** 2, axis=1)
+        assert [row for row, _ in query_hits] == list(np.argsort(expected)[:5])
+        assert [d for _, d in query_hits] == pytest.approx(np.sort(expected)[:5], rel=1e-4)
+
+
+def test_matrix_search_applies_content_type_mask() -> None:
+    vectors = np.eye(4, dtype=np.float32)
+    metadatas = [
+        {"content_type": "ir_materials"},
+        {"content_type": "corporate_site", "secondary_content_types": "ir_materials"},
+        {"content_type": "corporate_site"},
+        {"content_type": "ceo_message"},
+    ]
+    matrix = _matrix(vectors, metadatas)
+
+    hits = matrix.search([[0.0, 0.0, 1.0, 0.0]], 10, row_mask=matrix.row_mask({"ir_materials"}))
+
+    assert sorted(row for row, _ in hits[0]) == [0, 1]
+
+
+def test_cache_evicts_by_size_and_ignores_stale_loads() -> None:
+    first = _matrix(np.ones((4, 4)), company_id="a")
+    second = _matrix(np.ones((4, 4)), company_id="b")
+    cache = VectorMatrixCache(max_bytes=first.nbytes + second.nbytes - 1, ttl_seconds=0)
+
+    assert cache.put(first, cache.generation("a", TENANT_KEY))
+    assert cache.put(second, cache.generation("b", TENANT_KEY))
+    assert cache.get((TENANT_KEY, "a", BACKEND.model)) is None
+    assert cache.get((TENANT_KEY, "b", BACKEND.model)) is second
+
+    generation = cache.generation("a", TENANT_KEY)
+    cache.invalidate("a", TENANT_KEY)
+    # A load that started before the invalidation must not be installed.
+    assert cache.put(first, generation) is False
+
+
+class FakeCollection:
+    def __init__(self, rows: list[tuple[str, list[float], dict]]) -> None:
+        self.rows = rows
+        self.get_calls = 0
+
+    def get(self, where=None, include=None):
+        self.get_calls += 1
+        return {
+            "ids": [row[0] for row in self.rows],
+            "embeddings": [row[1] for row in self.rows],
+            "documents": [f"text {row[0]}" for row in self.rows],
+            "metadatas": [row[2] for row in self.rows],
+        }
+
+    def query(self, **_kwargs):
+        raise AssertionError("matrix engine should not fall back to HNSW")
+
+
+@pytest.fixture
+def matrix_engine(monkeypatch: pytest.MonkeyPatch) -> FakeCollection:
+    collection = FakeCollection([
+        ("doc-a", [1.0, 0.0, 0.0, 0.0], {"company_id": "company-1", "content_type": "corporate_site"}),
+        ("doc-b", [0.0, 1.0, 0.0, 0.0], {"company_id": "company-1", "content_type": "ir_materials"}),
+        ("doc-q", [0.0, 0.0, 1.0, 0.0], {"company_id": "company-1", "quarantine": True}),
+    ])
+    monkeypatch.setattr(vector_store.settings, "rag_vector_matrix_enabled", True)
+    monkeypatch.setattr(vector_store, "_collection_names_for_backend", lambda _backend: ["company_info"])
+    monkeypatch.setattr(vector_store, "_get_collection", lambda _name: collection)
+    monkeypatch.setattr(vector_matrix, "_cache", VectorMatrixCache(1024 * 1024, ttl_seconds=0))
+    return collection
+
+
+@pytest.mark.asyncio
+async def test_multi_query_search_uses_one_matrix_and_respects_invalidation(matrix_engine) -> None:
+    results = await vector_store.search_company_context_multi(
+        company_id="company-1",
+        query_embeddings=[[0.9, 0.1, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]],
+        n_results=2,
+        backends=[BACKEND],
+        tenant_key=TENANT_KEY,
+    )
+
+    assert [ctx["id"] for ctx in results[0]] == ["doc-a", "doc-b"]
+    # Quarantined chunks are never loaded into the matrix.
+    assert "doc-q" not in {ctx["id"] for ctx in results[1]}
+    assert results[0][0]["distance"] == pytest.approx(0.02)
+
+    single = await vector_store.search_company_context_by_type(
+        company_id="company-1",
+        query="IR",
+        n_results=1,
+        content_types=["ir_materials"],
+        backends=[BACKEND],
+        precomputed_query_embedding=[0.9, 0.1, 0.0, 0.0],
+        tenant_key=TENANT_KEY,
+    )
+    assert [ctx["id"] for ctx in single] == ["doc-b"]
+    assert matrix_engine.get_calls == 1
+
+    vector_matrix.invalidate_company_matrix("company-1", TENANT_KEY)
+    await vector_store.search_company_context_multi(
+        company_id="company-1",
+        query_embeddings=[[1.0, 0.0, 0.0, 0.0]],
+        backends=[BACKEND],
+        tenant_key=TENANT_KEY,
+    )
+    assert matrix_engine.get_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_multi_query_search_is_disabled_by_default(monkeypatch) -> None:
+    monkeypatch.setattr(vector_store.settings, "rag_vector_matrix_enabled", False)
+
+    assert await vector_store.search_company_context_multi(
+        company_id="company-1",
+        query_embeddings=[[1.0, 0.0, 0.0, 0.0]],
+        backends=[BACKEND],
+        tenant_key=TENANT_KEY,
+    ) is None
@@ -141,7 +141,7 @@ async def test_contextual_dual_write_uses_embedding_text_for_contextual_collecti
     class DummySettings:
         contextual_retrieval_dual_write: bool = True
 
-    async def fake_generate_embeddings_batch(texts, *, backend):
+    async def fake_generate_embeddings_batch(texts, *, backend, cache_variant="document"):
         return [[float(idx), 0.0, 0.0] for idx, _text in enumerate(texts)]
 
     monkeypatch.setattr(vector_store, "settings", DummySettings())
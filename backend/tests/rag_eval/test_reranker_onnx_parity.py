@@ -0,0 +1,114 @@
+import importlib.util
+
+import numpy as np
+import pytest
+
+from app.utils import reranker as reranker_module
+from app.utils.reranker import CrossEncoderReranker, resolve_onnx_dir, resolve_reranker_model_name
+from app.utils.reranker_onnx import ONNX_MODEL_FILES, OnnxCrossEncoder
+from evals.rag.benchmark_reranker_backends import (
+    build_golden_pairs,
+    load_backend_model,
+    parity_failures,
+    parity_report,
+)
+
+
+def test_golden_pairs_are_deterministic_and_cover_every_query() -> None:
+    first = build_golden_pairs(passages_per_query=4)
+    second = build_golden_pairs(passages_per_query=4)
+
+    assert first == second
+    assert len({query_id for query_id, _, _ in first}) >= 40
+    assert all(query != passage for _, query, passage in first)
+
+
+def test_parity_report_measures_deltas_and_rank_agreement() -> None:
+    query_ids = ["a", "a", "a", "b", "b"]
+    reference = [0.9, 0.5, 0.1, 0.2, 0.8]
+    candidate = [0.88, 0.52, 0.1, 0.85, 0.3]
+
+    report = parity_report(query_ids, reference, candidate)
+
+    assert report["max_abs_diff"] == pytest.approx(0.65)
+    assert report["top1_agreement"] == pytest.approx(0.5)
+    assert report["mean_spearman"] == pytest.approx(0.0)
+    assert parity_failures("onnx-int8", report)
+    assert parity_failures("onnx-int8", parity_report(query_ids, reference, reference)) == []
+
+
+def test_onnx_predict_batches_and_applies_sigmoid() -> None:
+    class FakeTokenizer:
+        def __call__(self, queries, docs, **kwargs):
+            lengths = [len(q) + len(d) for q, d in zip(queries, docs)]
+            return {
+                "input_ids": np.asarray([[n] for n in lengths]),
+                "attention_mask": np.ones((len(lengths), 1)),
+            }
+
+    class FakeSession:
+        def __init__(self) -> None:
+            self.feeds = []
+
+        def run(self, _outputs, feeds):
+            self.feeds.append(feeds)
+            return [feeds["input_ids"].astype(np.float32) - 3.0]
+
+    model = OnnxCrossEncoder.__new__(OnnxCrossEncoder)
+    model.tokenizer = FakeTokenizer()
+    model.session = FakeSession()
+    model.batch_size = 2
+    model.max_length = None
+    model._input_names = ["input_ids", "attention_mask"]
+
+    scores = model.predict([("q", "aa"), ("q", "a"), ("qq", "aaaa")])
+
+    assert len(model.session.feeds) == 2
+    assert all(feed["input_ids"].dtype == np.int64 for feed in model.session.feeds)
+    np.testing.assert_allclose(scores, 1 / (1 + np.exp(-np.array([0.0, -1.0, 3.0]))), rtol=1e-6)
+
+
+def test_missing_onnx_export_falls_back_to_torch(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(reranker_module.settings, "reranker_backend", "onnx-int8")
+    monkeypatch.setattr(reranker_module.settings, "reranker_onnx_dir", str(tmp_path))
+    monkeypatch.setattr(reranker_module, "_ensure_cross_encoder_imported", lambda: False)
+
+    reranker = CrossEncoderReranker("org/model")
+
+    assert resolve_onnx_dir("org/model") == tmp_path / "org__model"
+    assert reranker.backend == "torch"
+    assert reranker.score_cache_model == "org/model"
+
+
+def test_onnx_backend_uses_separate_score_cache_keys(monkeypatch) -> None:
+    monkeypatch.setattr(reranker_module.settings, "reranker_backend", "onnx-int8")
+    monkeypatch.setattr(reranker_module, "_load_onnx_model", lambda name, backend: object())
+
+    reranker = CrossEncoderReranker("org/model")
+
+    assert reranker.backend == "onnx-int8"
+    assert reranker.score_cache_model == "org/model#onnx-int8"
+
+
+def _onnx_export_available(backend: str) -> bool:
+    if importlib.util.find_spec("sentence_transformers") is None:
+        return False
+    model_dir = resolve_onnx_dir(resolve_reranker_model_name("base"))
+    return (model_dir / ONNX_MODEL_FILES[backend]).exists()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_scores_match_pytorch_on_golden_set(backend: str) -> None:
+    if not _onnx_export_available(backend):
+        pytest.skip("requires sentence-transformers and scripts/export_reranker_onnx.py output")
+
+    model_name = resolve_reranker_model_name("base")
+    pairs = build_golden_pairs()
+    inputs = [(query, passage) for _, query, passage in pairs]
+    reference = load_backend_model("torch", model_name).predict(inputs)
+    candidate = load_backend_model(backend, model_name).predict(inputs)
+
+    report = parity_report([query_id for query_id, _, _ in pairs], reference, candidate)
+
+    assert parity_failures(backend, report) == [], report
@@ -0,0 +1,65 @@
+import argparse
+
+import numpy as np
+
+from app.rag import vector_store
+from evals.rag.benchmark_retrieval_perf import (
+    HashEmbeddingClient,
+    compare_reports,
+    corpus_fingerprint,
+    run_size,
+    synthetic_chunks,
+    synthetic_queries,
+)
+
+
+def test_hash_embeddings_are_deterministic_and_lexically_similar() -> None:
+    client = HashEmbeddingClient(dimension=64)
+    first = client.embed("新卒採用の募集要項について")
+
+    assert first == HashEmbeddingClient(dimension=64).embed("新卒採用の募集要項について")
+    assert abs(np.linalg.norm(first) - 1.0) < 1e-5
+    near = np.dot(first, client.embed("新卒採用の募集要項を知りたい"))
+    far = np.dot(first, client.embed("海外事業の営業利益は前年比増"))
+    assert near > far
+
+
+def test_synthetic_corpus_and_queries_are_stable() -> None:
+    chunks = synthetic_chunks(30)
+
+    assert corpus_fingerprint(chunks) == corpus_fingerprint(synthetic_chunks(30))
+    assert corpus_fingerprint(chunks) != corpus_fingerprint(synthetic_chunks(30, seed=1))
+    assert len({chunk["id"] for chunk in chunks}) == 30
+    queries = synthetic_queries(12)
+    assert queries == synthetic_queries(12)
+    assert len(set(queries)) == 12
+
+
+def test_compare_reports_flags_only_meaningful_p95_regressions() -> None:
+    baseline = {"sizes": {"1000": {"stages": {"semantic": {"p95_ms": 10.0}, "bm25": {"p95_ms": 0.1}}}}}
+    current = {"sizes": {"1000": {"stages": {"semantic": {"p95_ms": 14.0}, "bm25": {"p95_ms": 0.5}}}}}
+
+    assert compare_reports(baseline, current) == ["1000/semantic: p95 10.0ms -> 14.0ms"]
+    assert compare_reports(baseline, current, max_regression=0.5) == []
+
+
+def test_run_size_reports_every_stage_and_restores_storage() -> None:
+    persist_dir = vector_store.CHROMA_PERSIST_DIR
+    args = argparse.Namespace(
+        seed=0,
+        queries=3,
+        warmup=1,
+        dimension=32,
+        rerank="stub",
+        llm_latency_ms=0.0,
+        vector_matrix=False,
+        short_circuit=False,
+    )
+
+    report = run_size(60, args)
+
+    assert report["chunks"] == 60
+    assert report["empty_results"] == 0
+    assert report["stages"]["total"]["count"] == 3
+    assert {"semantic", "expansion", "query_embedding", "fusion", "bm25"} <= set(report["stages"])
+    assert vector_store.CHROMA_PERSIST_DIR == persist_dir
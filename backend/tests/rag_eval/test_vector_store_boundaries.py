@@ -69,5 +69,6 @@ async def test_vector_store_enhanced_search_wrapper_delegates(monkeypatch) -> No
             "priority_source_urls": ["https://example.com/recruit"],
             "short_circuit": True,
             "tenant_key": "a" * 32,
+            "budget": None,
         }
     ]
@@ -167,12 +167,13 @@ class TestBM25TenantIsolation:
         index.add_document("doc-a", "テスト用の本文です。")
         index.save()
 
-        saved_path = tmp_bm25_dir / f"{tenant_keys['tenant_a']}__{company_id}.json"
+        saved_path = tmp_bm25_dir / f"{tenant_keys['tenant_a']}__{company_id}.bm25"
         assert saved_path.exists()
 
-        payload = json.loads(saved_path.read_text(encoding="utf-8"))
-        assert payload["company_id"] == company_id
-        assert payload["documents"][0]["doc_id"] == "doc-a"
+        loaded = BM25Index.load(company_id, tenant_key=tenant_keys["tenant_a"])
+        assert loaded is not None
+        assert [doc.doc_id for doc in loaded.documents] == ["doc-a"]
+        assert BM25Index.load(company_id, tenant_key=tenant_keys["tenant_b"]) is None
 
     def test_separate_indices_per_tenant(
         self,
@@ -189,8 +190,8 @@ class TestBM25TenantIsolation:
         index_b.add_document("doc-b", "第二テナントの本文です。")
         index_b.save()
 
-        assert (tmp_bm25_dir / f"{tenant_keys['tenant_a']}__{company_id}.json").exists()
-        assert (tmp_bm25_dir / f"{tenant_keys['tenant_b']}__{company_id}.json").exists()
+        assert (tmp_bm25_dir / f"{tenant_keys['tenant_a']}__{company_id}.bm25").exists()
+        assert (tmp_bm25_dir / f"{tenant_keys['tenant_b']}__{company_id}.bm25").exists()
 
         clear_index_cache()
         loaded_a = get_or_create_index(company_id, tenant_key=tenant_keys["tenant_a"])
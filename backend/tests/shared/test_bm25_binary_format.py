@@ -0,0 +1,141 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import app.utils.bm25_store as bm25_module
+from app.utils.bm25_store import (
+    BM25Index,
+    clear_index_cache,
+    get_or_create_index,
+    migrate_legacy_json_indexes,
+    read_persisted_index,
+)
+
+TENANT_KEY = "a" * 32
+COMPANY_ID = "company-1"
+STEM = f"{TENANT_KEY}__{COMPANY_ID}"
+
+
+@pytest.fixture
+def tmp_bm25_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(bm25_module, "BM25_PERSIST_DIR", tmp_path)
+    monkeypatch.setattr(bm25_module, "HAS_BM25", True)
+    clear_index_cache()
+    yield tmp_path
+    clear_index_cache()
+
+
+def _build_index() -> BM25Index:
+    index = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    index.add_document(
+        "doc-1",
+        "新卒採用の選考フローについて",
+        {"source_url": "https://example.com/a", "content_type": "new_grad_recruitment"},
+    )
+    index.add_document(
+        "doc-2",
+        "中期経営計画と海外事業の成長",
+        {"source_url": "https://example.com/b", "content_type": "midterm_plan"},
+    )
+    index.add_document("doc-3", "選考スケジュールと面接回数", {"source_url": "https://example.com/a"})
+    return index
+
+
+def test_binary_roundtrip_is_lazy_and_search_matches(tmp_bm25_dir):
+    index = _build_index()
+    expected = index.search("選考 面接", k=3)
+    index.save()
+
+    loaded = BM25Index.load(COMPANY_ID, tenant_key=TENANT_KEY)
+
+    assert loaded is not None
+    assert loaded.doc_count == 3
+    assert loaded._mapped is not None
+    assert loaded.search("選考 面接", k=3) == pytest.approx(expected)
+    doc = loaded.get_document("doc-2")
+    assert doc.text == "中期経営計画と海外事業の成長"
+    assert doc.metadata["content_type"] == "midterm_plan"
+    assert doc.tokens == index.get_document("doc-2").tokens
+    # Search and point lookups never decode the full document list.
+    assert loaded._mapped is not None
+
+
+def test_mutating_mapped_index_materializes_and_resaves(tmp_bm25_dir):
+    _build_index().save()
+    loaded = BM25Index.load(COMPANY_ID, tenant_key=TENANT_KEY)
+
+    removed = loaded.remove_documents(metadata_field="source_url", values=["https://example.com/a"])
+    loaded.save()
+
+    assert sorted(doc.doc_id for doc in removed) == ["doc-1", "doc-3"]
+    reloaded = BM25Index.load(COMPANY_ID, tenant_key=TENANT_KEY)
+    assert [doc.doc_id for doc in reloaded.documents] == ["doc-2"]
+    # Vocabulary is compacted to terms still in use.
+    assert len(reloaded._vocab) == len(set(reloaded.documents[0].tokens))
+    assert reloaded.search("海外事業", k=5)[0][0] == "doc-2"
+
+
+def test_binary_file_rejects_other_owner(tmp_bm25_dir):
+    _build_index().save()
+    other_tenant = "b" * 32
+    (tmp_bm25_dir / f"{other_tenant}__{COMPANY_ID}.bm25").write_bytes(
+        (tmp_bm25_dir / f"{STEM}.bm25").read_bytes()
+    )
+
+    assert BM25Index.load(COMPANY_ID, tenant_key=other_tenant) is None
+
+
+def test_corrupted_binary_file_is_moved_aside(tmp_bm25_dir):
+    (tmp_bm25_dir / f"{STEM}.bm25").write_bytes(b"not an index")
+
+    assert BM25Index.load(COMPANY_ID, tenant_key=TENANT_KEY) is None
+    assert not (tmp_bm25_dir / f"{STEM}.bm25").exists()
+    assert list(tmp_bm25_dir.glob(f"{STEM}.bm25.corrupted.*"))
+
+
+def _write_legacy_json(path: Path) -> None:
+    index = _build_index()
+    payload = {
+        "version": 1,
+        "company_id": COMPANY_ID,
+        "documents": [
+            {"doc_id": doc.doc_id, "text": doc.text, "tokens": doc.tokens, "metadata": doc.metadata}
+            for doc in index.documents
+        ],
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+
+def test_legacy_json_is_readable_and_migrated(tmp_bm25_dir):
+    _write_legacy_json(tmp_bm25_dir / f"{STEM}.json")
+    (tmp_bm25_dir / f"{COMPANY_ID}.json").write_text("{}", encoding="utf-8")
+
+    legacy = get_or_create_index(COMPANY_ID, tenant_key=TENANT_KEY)
+    assert [doc.doc_id for doc in legacy.documents] == ["doc-1", "doc-2", "doc-3"]
+
+    counts = migrate_legacy_json_indexes()
+
+    assert counts == {"migrated": 1, "skipped": 1, "failed": 0}
+    assert not (tmp_bm25_dir / f"{STEM}.json").exists()
+    migrated = read_persisted_index(tmp_bm25_dir / f"{STEM}.bm25")
+    assert [doc.doc_id for doc in migrated.documents] == ["doc-1", "doc-2", "doc-3"]
+    assert migrated.search("選考", k=2) == pytest.approx(legacy.search("選考", k=2))
+
+
+def test_migration_can_keep_legacy_json(tmp_bm25_dir):
+    _write_legacy_json(tmp_bm25_dir / f"{STEM}.json")
+
+    counts = migrate_legacy_json_indexes(keep_legacy=True)
+
+    assert counts["migrated"] == 1
+    assert (tmp_bm25_dir / f"{STEM}.json").exists()
+    assert (tmp_bm25_dir / f"{STEM}.bm25").exists()
+
+
+def test_delete_removes_binary_and_legacy_files(tmp_bm25_dir):
+    _build_index().save()
+    _write_legacy_json(tmp_bm25_dir / f"{STEM}.json")
+
+    assert BM25Index.delete(COMPANY_ID, tenant_key=TENANT_KEY) is True
+    assert BM25Index.exists(COMPANY_ID, tenant_key=TENANT_KEY) is False
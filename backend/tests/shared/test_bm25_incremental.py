@@ -0,0 +1,154 @@
+from pathlib import Path
+
+import pytest
+
+import app.utils.bm25_store as bm25_module
+from app.rag import bm25_refresh, vector_store
+from app.utils.bm25_store import BM25Index, clear_index_cache, get_or_create_index
+
+TENANT_KEY = "a" * 32
+COMPANY_ID = "company-1"
+
+
+@pytest.fixture
+def tmp_bm25_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    path = tmp_path / "bm25"
+    monkeypatch.setattr(bm25_module, "BM25_PERSIST_DIR", path)
+    monkeypatch.setattr(bm25_module, "HAS_BM25", True)
+    clear_index_cache()
+    yield path
+    clear_index_cache()
+
+
+@pytest.fixture
+def tokenize_calls(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    calls: list[str] = []
+    original = bm25_module.tokenize_with_domain_expansion
+
+    def _counting(text: str) -> list[str]:
+        calls.append(text)
+        return original(text)
+
+    monkeypatch.setattr(bm25_module, "tokenize_with_domain_expansion", _counting)
+    return calls
+
+
+def _doc(doc_id: str, text: str, source_url: str, session: str = "s1") -> dict:
+    return {
+        "id": doc_id,
+        "text": text,
+        "metadata": {"source_url": source_url, "ingest_session_id": session},
+    }
+
+
+def test_replace_source_only_tokenizes_changed_chunks(tmp_bm25_dir, tokenize_calls):
+    index = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    index.add_documents([
+        _doc("a-0", "新卒採用の選考フローについて", "https://example.com/a"),
+        _doc("a-1", "エントリーシートの締切は六月です", "https://example.com/a"),
+        _doc("b-0", "中期経営計画と海外事業の成長", "https://example.com/b"),
+    ])
+    tokenize_calls.clear()
+
+    added, removed = index.replace_source(
+        "https://example.com/a",
+        [
+            _doc("a-0-new", "新卒採用の選考フローについて", "https://example.com/a", "s2"),
+            _doc("a-1-new", "インターンシップの募集を開始しました", "https://example.com/a", "s2"),
+        ],
+    )
+
+    assert (added, removed) == (2, 2)
+    assert tokenize_calls == ["インターンシップの募集を開始しました"]
+    assert [doc.doc_id for doc in index.documents] == ["b-0", "a-0-new", "a-1-new"]
+    assert index.get_document("a-1") is None
+    assert index.get_document("a-1-new").metadata["ingest_session_id"] == "s2"
+
+
+def test_delta_search_matches_full_rebuild(tmp_bm25_dir):
+    docs = [
+        _doc("a-0", "新卒採用の選考フローについて", "https://example.com/a"),
+        _doc("b-0", "中期経営計画と海外事業の成長", "https://example.com/b"),
+        _doc("c-0", "社員インタビューで語る働き方", "https://example.com/c"),
+    ]
+    incremental = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    incremental.add_documents(docs)
+    incremental.search("選考")
+    incremental.remove_documents(metadata_field="source_url", values=["https://example.com/b"])
+    incremental.add_documents([_doc("d-0", "選考スケジュールと面接回数", "https://example.com/d")])
+
+    rebuilt = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    rebuilt.add_documents([docs[0], docs[2], _doc("d-0", "選考スケジュールと面接回数", "https://example.com/d")])
+
+    assert incremental.search("選考 面接", k=3) == rebuilt.search("選考 面接", k=3)
+
+
+def test_remove_documents_by_ingest_session(tmp_bm25_dir):
+    index = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    index.add_documents([
+        _doc("a-0", "新卒採用の選考フローについて", "https://example.com/a", "old"),
+        _doc("a-0-new", "新卒採用の選考フローについて", "https://example.com/a", "new"),
+    ])
+
+    removed = index.remove_documents(metadata_field="ingest_session_id", values=["old"])
+
+    assert [doc.doc_id for doc in removed] == ["a-0"]
+    assert [doc.doc_id for doc in index.documents] == ["a-0-new"]
+
+
+def test_refresh_bm25_sources_patches_only_requested_urls(tmp_bm25_dir, monkeypatch, tokenize_calls):
+    store = {
+        "https://example.com/a": [("a-0", "新卒採用の選考フローについて")],
+        "https://example.com/b": [("b-0", "中期経営計画と海外事業の成長")],
+    }
+    requested_wheres: list[tuple] = []
+
+    def _fake_fetch(company_id, tenant_key, *extra_where):
+        requested_wheres.append(extra_where)
+        urls = [extra_where[0]["source_url"]] if extra_where else list(store)
+        return [
+            _doc(doc_id, text, url)
+            for url in urls
+            for doc_id, text in store.get(url, [])
+        ]
+
+    monkeypatch.setattr(bm25_refresh, "_fetch_chroma_documents", _fake_fetch)
+
+    assert bm25_refresh.update_bm25_index(COMPANY_ID, TENANT_KEY) is True
+    tokenize_calls.clear()
+    requested_wheres.clear()
+
+    store["https://example.com/a"] = [("a-0-v2", "説明会の日程が追加されました")]
+    assert bm25_refresh.refresh_bm25_sources(COMPANY_ID, TENANT_KEY, ["https://example.com/a"]) is True
+
+    assert requested_wheres == [({"source_url": "https://example.com/a"},)]
+    assert tokenize_calls == ["説明会の日程が追加されました"]
+
+    clear_index_cache()
+    loaded = get_or_create_index(COMPANY_ID, tenant_key=TENANT_KEY)
+    assert sorted(doc.doc_id for doc in loaded.documents) == ["a-0-v2", "b-0"]
+
+
+def test_remove_bm25_sources_deletes_file_when_empty(tmp_bm25_dir):
+    index = BM25Index(COMPANY_ID, tenant_key=TENANT_KEY)
+    index.add_documents([_doc("a-0", "新卒採用の選考フローについて", "https://example.com/a")])
+    index.save()
+
+    removed = bm25_refresh.remove_bm25_sources(COMPANY_ID, TENANT_KEY, ["https://example.com/a"])
+
+    assert removed == 1
+    assert BM25Index.exists(COMPANY_ID, tenant_key=TENANT_KEY) is False
+
+
+def test_schedule_bm25_update_uses_delta_for_source_urls(monkeypatch):
+    calls: list[tuple] = []
+    monkeypatch.setattr(vector_store, "refresh_bm25_sources", lambda *args: calls.append(("delta", *args)))
+    monkeypatch.setattr(vector_store, "update_bm25_index", lambda *args: calls.append(("full", *args)))
+
+    vector_store.schedule_bm25_update(COMPANY_ID, TENANT_KEY, source_urls=["https://example.com/a"])
+    vector_store.schedule_bm25_update(COMPANY_ID, TENANT_KEY)
+
+    assert calls == [
+        ("delta", COMPANY_ID, TENANT_KEY, ["https://example.com/a"]),
+        ("full", COMPANY_ID, TENANT_KEY),
+    ]
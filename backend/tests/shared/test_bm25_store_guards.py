@@ -80,7 +80,7 @@ def test_save_does_not_clobber_stale_fixed_tmp_file(tmp_path, monkeypatch):
     idx.add_document("doc1", "テスト文書です")
     idx.save()
 
-    assert (tmp_path / f"{tenant_key}__{company_id}.json").exists()
+    assert (tmp_path / f"{tenant_key}__{company_id}.bm25").exists()
     assert stale_tmp.read_text(encoding="utf-8") == "stale data"
 
 
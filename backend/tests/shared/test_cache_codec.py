@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from app.utils import cache_codec
+from app.utils.cache import BaseCache
+from app.utils.cache_codec import FRAME_MAGIC, CacheCodec, CacheDecodeError
+
+PAYLOAD = {
+    "context": "【企業情報】（企業HP）[S1]\n見出し: 採用情報\n新卒採用のエントリーは6月から開始します。" * 20,
+    "sources": [{"source_id": "S1", "source_url": "https://example.co.jp/recruit", "score": 0.5}],
+}
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, int, bytes]] = []
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self._ops.append((key, ttl, value))
+
+    async def execute(self) -> list[bool]:
+        self._redis.commands.append(f"pipeline:{len(self._ops)}")
+        for key, _ttl, value in self._ops:
+            self._redis.store[key] = value
+        return [True] * len(self._ops)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.commands: list[str] = []
+
+    async def get(self, key: str):
+        self.commands.append("get")
+        return self.store.get(key)
+
+    async def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self.commands.append("setex")
+        self.store[key] = value
+
+    async def mget(self, keys: list[str]):
+        self.commands.append(f"mget:{len(keys)}")
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        assert transaction is False
+        return FakePipeline(self)
+
+
+def _cache(codec: CacheCodec) -> BaseCache:
+    cache = BaseCache("", codec=codec)
+    cache._enabled = True
+    cache._redis = FakeRedis()
+    return cache
+
+
+@pytest.mark.parametrize("name", ["json", "orjson"])
+def test_json_codecs_write_plain_json(name: str) -> None:
+    data = CacheCodec(name).encode(PAYLOAD)
+
+    assert not data.startswith(FRAME_MAGIC)
+    assert json.loads(data) == PAYLOAD
+
+
+def test_legacy_json_strings_still_decode() -> None:
+    legacy = json.dumps(PAYLOAD, ensure_ascii=False)
+
+    assert CacheCodec("orjson").decode(legacy) == PAYLOAD
+    assert CacheCodec("orjson").decode(legacy.encode("utf-8")) == PAYLOAD
+
+
+@pytest.mark.skipif(cache_codec.msgpack is None, reason="msgpack not installed")
+def test_msgpack_frames_decode_under_any_codec() -> None:
+    data = CacheCodec("msgpack").encode(PAYLOAD)
+
+    assert data.startswith(FRAME_MAGIC)
+    assert CacheCodec("json").decode(data) == PAYLOAD
+
+
+@pytest.mark.skipif(cache_codec.zstandard is None, reason="zstandard not installed")
+def test_zstd_only_applies_above_threshold() -> None:
+    codec = CacheCodec("orjson", compression="zstd", compress_min_bytes=256)
+
+    small = codec.encode({"v": 1})
+    large = codec.encode(PAYLOAD)
+
+    assert not small.startswith(FRAME_MAGIC)
+    assert large.startswith(FRAME_MAGIC)
+    assert len(large) < len(CacheCodec("orjson").encode(PAYLOAD))
+    assert CacheCodec("json").decode(large) == PAYLOAD
+
+
+def test_unknown_frame_raises() -> None:
+    with pytest.raises(CacheDecodeError):
+        CacheCodec("json").decode(FRAME_MAGIC + b"x\x00payload")
+
+
+@pytest.mark.asyncio
+async def test_mget_and_pipelined_set_round_trip() -> None:
+    cache = _cache(CacheCodec("orjson"))
+    cache.BATCH_SIZE = 2
+    items = {f"k{i}": {"i": i, "text": "企業"} for i in range(3)}
+
+    await cache.set_many_json(items, ttl=60)
+    values = await cache.mget_json(["k0", "missing", "k1", "k2"])
+
+    assert values == [items["k0"], None, items["k1"], items["k2"]]
+    assert cache._redis.commands == ["pipeline:2", "pipeline:1", "mget:2", "mget:2"]
+
+
+@pytest.mark.asyncio
+async def test_undecodable_values_are_misses() -> None:
+    cache = _cache(CacheCodec("json"))
+    cache._redis.store["bad"] = b"\xff\xfe not json"
+
+    assert await cache.get_json("bad") is None
+    assert await cache.mget_json(["bad"]) == [None]
@@ -0,0 +1,105 @@
+import fnmatch
+import json
+
+import pytest
+
+from app.utils.cache import RAGCache
+
+
+class FakeRedis:
+    """In-memory stand-in for ``redis.asyncio`` limited to the ops RAGCache uses."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.commands: list[str] = []
+
+    async def get(self, key: str):
+        self.commands.append("get")
+        return self.store.get(key)
+
+    async def setex(self, key: str, ttl: int, value: str) -> None:
+        self.commands.append("setex")
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    async def incr(self, key: str) -> int:
+        self.commands.append("incr")
+        value = int(self.store.get(key) or 0) + 1
+        self.store[key] = str(value)
+        return value
+
+    async def expire(self, key: str, ttl: int) -> bool:
+        self.commands.append("expire")
+        self.ttls[key] = ttl
+        return key in self.store
+
+    async def scan_iter(self, match: str):
+        self.commands.append("scan")
+        for key in list(self.store):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def delete(self, key: str) -> int:
+        self.commands.append("delete")
+        return 1 if self.store.pop(key, None) is not None else 0
+
+
+def _stored_json(cache: RAGCache) -> list:
+    """Cached JSON values (generation counters excluded)."""
+    return [
+        json.loads(value)
+        for value in cache._redis.store.values()
+        if isinstance(value, bytes) and value.startswith((b"{", b"["))
+    ]
+
+
+@pytest.fixture
+def cache() -> RAGCache:
+    instance = RAGCache(redis_url="")
+    instance._enabled = True
+    instance._redis = FakeRedis()
+    return instance
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_a_single_incr(cache: RAGCache) -> None:
+    await cache.set_context("company-1", "hash", {"context": "old"}, tenant_key="tenant-1")
+    cache._redis.commands.clear()
+
+    await cache.invalidate_company("company-1", tenant_key="tenant-1")
+
+    assert cache._redis.commands == ["incr", "expire"]
+    assert await cache.get_context("company-1", "hash", tenant_key="tenant-1") is None
+    # The stale entry is left to expire by TTL.
+    assert {"context": "old"} in _stored_json(cache)
+
+
+@pytest.mark.asyncio
+async def test_new_generation_serves_fresh_entries(cache: RAGCache) -> None:
+    await cache.invalidate_company("company-1", tenant_key="tenant-1")
+    await cache.set_context("company-1", "hash", {"context": "new"}, tenant_key="tenant-1")
+
+    assert await cache.get_context("company-1", "hash", tenant_key="tenant-1") == {"context": "new"}
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_scoped_to_tenant_and_company(cache: RAGCache) -> None:
+    for tenant, company in (("tenant-1", "company-2"), ("tenant-2", "company-1")):
+        await cache.set_context(company, "hash", {"context": "kept"}, tenant_key=tenant)
+
+    await cache.invalidate_company("company-1", tenant_key="tenant-1")
+
+    assert await cache.get_context("company-2", "hash", tenant_key="tenant-1") == {"context": "kept"}
+    assert await cache.get_context("company-1", "hash", tenant_key="tenant-2") == {"context": "kept"}
+
+
+@pytest.mark.asyncio
+async def test_hard_invalidation_deletes_existing_entries(cache: RAGCache) -> None:
+    await cache.set_context("company-1", "hash", {"context": "secret"}, tenant_key="tenant-1")
+    await cache.set_semantic_index("company-1", "scope", [{"k": "hash"}], tenant_key="tenant-1")
+    await cache.set_context("company-2", "hash", {"context": "other"}, tenant_key="tenant-1")
+
+    await cache.invalidate_company("company-1", tenant_key="tenant-1", hard=True)
+
+    assert _stored_json(cache) == [{"context": "other"}]
@@ -0,0 +1,118 @@
+import pytest
+
+from app.rag import retrieval, vector_store
+from app.rag.semantic_cache import SemanticContextIndex
+
+
+class FakeRAGCache:
+    def __init__(self) -> None:
+        self.json: dict[str, object] = {}
+
+    def enabled(self) -> bool:
+        return False  # no cross-worker lease in these tests
+
+    def _context_key(self, company_id: str, query_hash: str, tenant_key: str) -> str:
+        return f"rag:context:{tenant_key}:{company_id}:{query_hash}"
+
+    async def get_semantic_index(self, company_id: str, scope: str, tenant_key: str):
+        return self.json.get(f"rag:context:{tenant_key}:{company_id}:semantic:{scope}")
+
+    async def set_semantic_index(self, company_id, scope, entries, *, tenant_key, ttl=43200):
+        self.json[f"rag:context:{tenant_key}:{company_id}:semantic:{scope}"] = entries
+
+    async def get_context(self, company_id: str, query_hash: str, tenant_key: str):
+        return self.json.get(self._context_key(company_id, query_hash, tenant_key))
+
+    async def set_context(self, company_id, query_hash, context, *, tenant_key, ttl=43200):
+        self.json[self._context_key(company_id, query_hash, tenant_key)] = context
+
+    async def invalidate_company(self, company_id: str, tenant_key: str) -> None:
+        prefix = f"rag:context:{tenant_key}:{company_id}:"
+        self.json = {k: v for k, v in self.json.items() if not k.startswith(prefix)}
+
+
+EMBEDDINGS = {
+    "三井物産の志望動機です。": [1.0, 0.0, 0.0],
+    "三井物産の志望動機です!": [0.99, 0.05, 0.0],
+    "全く別の質問": [0.0, 1.0, 0.0],
+}
+
+
+@pytest.fixture
+def semantic_env(monkeypatch):
+    cache = FakeRAGCache()
+    index = SemanticContextIndex(cache, threshold=0.97, max_entries=4)
+    searches: list[str] = []
+
+    async def fake_embedding(text, backend=None):
+        return EMBEDDINGS.get(text)
+
+    async def fake_search(**kwargs):
+        searches.append(kwargs["query"])
+        return [
+            {
+                "text": f"{kwargs['query']} の根拠",
+                "metadata": {"source_url": "https://example.com", "content_type": "corporate_site"},
+                "hybrid_score": 0.9,
+            }
+        ]
+
+    monkeypatch.setattr(retrieval.settings, "rag_semantic_cache_enabled", True)
+    monkeypatch.setattr(retrieval, "get_rag_cache", lambda: cache)
+    monkeypatch.setattr(retrieval, "get_semantic_context_index", lambda: index)
+    monkeypatch.setattr(retrieval, "generate_embedding", fake_embedding)
+    monkeypatch.setattr(vector_store, "hybrid_search_company_context_enhanced", fake_search)
+    return cache, searches
+
+
+async def _context(text: str, *, company_id: str = "company-1", max_context_length: int = 500):
+    return await retrieval.get_enhanced_context_for_review(
+        company_id, text, max_context_length=max_context_length, tenant_key="tenant-1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_query_reuses_cached_context(semantic_env) -> None:
+    _, searches = semantic_env
+
+    first = await _context("三井物産の志望動機です。")
+    second = await _context("三井物産の志望動機です!")
+
+    assert second == first
+    assert searches == ["三井物産の志望動機です。"]
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_query_and_other_scope_miss(semantic_env) -> None:
+    _, searches = semantic_env
+
+    await _context("三井物産の志望動機です。")
+    await _context("全く別の質問")
+    # Same text family but a different context length is a different scope.
+    await _context("三井物産の志望動機です!", max_context_length=900)
+
+    assert len(searches) == 3
+
+
+@pytest.mark.asyncio
+async def test_company_invalidation_drops_semantic_index(semantic_env) -> None:
+    cache, searches = semantic_env
+
+    await _context("三井物産の志望動機です。")
+    await cache.invalidate_company("company-1", "tenant-1")
+    await _context("三井物産の志望動機です!")
+
+    assert len(searches) == 2
+
+
+@pytest.mark.asyncio
+async def test_index_keeps_most_recent_entries_only() -> None:
+    cache = FakeRAGCache()
+    index = SemanticContextIndex(cache, threshold=0.9, max_entries=2)
+
+    for i, vector in enumerate(([1.0, 0.0], [0.0, 1.0], [1.0, 1.0])):
+        await index.remember("c", "scope", f"key-{i}", vector, tenant_key="t")
+
+    assert await index.lookup("c", "scope", [1.0, 0.0], tenant_key="t") is None
+    assert await index.lookup("c", "scope", [0.0, 2.0], tenant_key="t") == "key-1"
+    assert await index.lookup("c", "scope", [1.0, 1.0], tenant_key="t") == "key-2"
@@ -0,0 +1,227 @@
+import asyncio
+
+import pytest
+
+from app.rag import retrieval
+from app.rag import vector_store
+from app.utils.single_flight import SingleFlight, redis_single_flight
+
+
+class FakeLockCache:
+    """Minimal BaseCache stand-in with SET NX semantics and a context store."""
+
+    def __init__(self) -> None:
+        self.locks: dict[str, str] = {}
+        self.contexts: dict[str, dict] = {}
+
+    def enabled(self) -> bool:
+        return True
+
+    async def acquire_lock(self, key: str, token: str, ttl: int):
+        if key in self.locks:
+            return False
+        self.locks[key] = token
+        return True
+
+    async def lock_exists(self, key: str):
+        return key in self.locks
+
+    async def release_lock(self, key: str, token: str) -> None:
+        if self.locks.get(key) == token:
+            del self.locks[key]
+
+    def context_lock_key(self, company_id: str, query_hash: str, tenant_key: str) -> str:
+        return f"lock:{tenant_key}:{company_id}:{query_hash}"
+
+    async def get_context(self, company_id: str, query_hash: str, tenant_key: str):
+        return self.contexts.get(query_hash)
+
+    async def set_context(self, company_id, query_hash, context, *, tenant_key, ttl=43200):
+        self.contexts[query_hash] = context
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_computation() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    tasks = [asyncio.create_task(flight.do("k", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["value"] * 5
+    assert calls == 1
+    assert not flight.inflight("k")
+
+
+@pytest.mark.asyncio
+async def test_leader_error_reaches_followers_and_next_call_retries() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def failing() -> str:
+        await release.wait()
+        raise RuntimeError("boom")
+
+    tasks = [asyncio.create_task(flight.do("k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+    async def ok() -> str:
+        return "recovered"
+
+    assert await flight.do("k", ok) == "recovered"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_lets_followers_compute() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    started = asyncio.Event()
+
+    async def slow() -> str:
+        started.set()
+        await asyncio.sleep(10)
+        return "never"
+
+    async def fast() -> str:
+        return "follower"
+
+    leader = asyncio.create_task(flight.do("k", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("k", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "follower"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_redis_follower_reads_result_published_by_lease_holder() -> None:
+    cache = FakeLockCache()
+    cache.locks["lock"] = "other-worker"
+    calls = 0
+
+    async def compute() -> dict:
+        nonlocal calls
+        calls += 1
+        return {"context": "local"}
+
+    async def read_cached():
+        return cache.contexts.get("key")
+
+    async def publish_later() -> None:
+        await asyncio.sleep(0.02)
+        cache.contexts["key"] = {"context": "shared"}
+        del cache.locks["lock"]
+
+    publisher = asyncio.create_task(publish_later())
+    result = await redis_single_flight(
+        cache, "lock", compute, read_cached=read_cached, name="test", poll_seconds=0.005
+    )
+    await publisher
+
+    assert result == {"context": "shared"}
+    assert calls == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_follower_computes_after_wait_budget() -> None:
+    cache = FakeLockCache()
+    cache.locks["lock"] = "stuck-worker"
+
+    async def compute() -> dict:
+        return {"context": "local"}
+
+    async def read_cached():
+        return None
+
+    result = await redis_single_flight(
+        cache,
+        "lock",
+        compute,
+        read_cached=read_cached,
+        name="test",
+        wait_seconds=0.03,
+        poll_seconds=0.005,
+    )
+
+    assert result == {"context": "local"}
+    assert cache.locks == {"lock": "stuck-worker"}
+
+
+@pytest.mark.asyncio
+async def test_redis_follower_takes_over_when_holder_releases_without_result() -> None:
+    cache = FakeLockCache()
+    cache.locks["lock"] = "failed-worker"
+
+    async def compute() -> dict:
+        return {"context": "takeover"}
+
+    async def read_cached():
+        return None
+
+    async def holder_fails() -> None:
+        await asyncio.sleep(0.01)
+        del cache.locks["lock"]
+
+    failure = asyncio.create_task(holder_fails())
+    result = await redis_single_flight(
+        cache, "lock", compute, read_cached=read_cached, name="test", poll_seconds=0.005
+    )
+    await failure
+
+    assert result == {"context": "takeover"}
+    assert cache.locks == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_review_context_misses_search_once(monkeypatch) -> None:
+    cache = FakeLockCache()
+    monkeypatch.setattr(retrieval, "get_rag_cache", lambda: cache)
+    release = asyncio.Event()
+    searches = 0
+
+    async def fake_search(**kwargs):
+        nonlocal searches
+        searches += 1
+        await release.wait()
+        return [
+            {
+                "text": "三井物産は総合商社です。",
+                "metadata": {"source_url": "https://example.com", "content_type": "corporate_site"},
+                "hybrid_score": 0.9,
+            }
+        ]
+
+    monkeypatch.setattr(vector_store, "hybrid_search_company_context_enhanced", fake_search)
+
+    tasks = [
+        asyncio.create_task(
+            retrieval.get_enhanced_context_for_review_with_sources(
+                "company-1", "志望動機", max_context_length=500, tenant_key="tenant-1"
+            )
+        )
+        for _ in range(4)
+    ]
+    await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert searches == 1
+    assert len({context for context, _ in results}) == 1
+    # Each caller gets its own copy of the shared sources.
+    assert results[0][1] is not results[1][1]
+    assert len(cache.contexts) == 1
+    assert cache.locks == {}
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+
+from app.rag import hybrid_search
+from app.utils import tiered_cache
+from app.utils.tiered_cache import LRUTTLCache, TieredCache
+
+
+class FakeRedisTier:
+    def __init__(self) -> None:
+        self.store: dict[str, object] = {}
+        self.ttls: dict[str, int] = {}
+
+    def enabled(self) -> bool:
+        return True
+
+    async def get_json(self, key: str):
+        return self.store.get(key)
+
+    async def set_json(self, key: str, value, ttl: int) -> None:
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    fake = Clock()
+    monkeypatch.setattr(tiered_cache.time, "time", fake)
+    return fake
+
+
+def _cache(**kwargs) -> tuple[TieredCache, list[tuple[str, str]]]:
+    lookups: list[tuple[str, str]] = []
+    options = {"max_entries": 8, "ttl_seconds": 10, "stale_seconds": 100}
+    options.update(kwargs)
+    cache = TieredCache("test", on_lookup=lambda tier, result: lookups.append((tier, result)), **options)
+    return cache, lookups
+
+
+def test_lru_evicts_least_recently_used() -> None:
+    cache: LRUTTLCache[str] = LRUTTLCache(2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a")[1] == "1"
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_fresh_hit_skips_compute(clock) -> None:
+    cache, lookups = _cache()
+    calls = 0
+
+    async def compute() -> list[str]:
+        nonlocal calls
+        calls += 1
+        return ["a", "b"]
+
+    assert await cache.get_or_compute("k", compute) == ["a", "b"]
+    clock.now += 5
+    assert await cache.get_or_compute("k", compute) == ["a", "b"]
+
+    assert calls == 1
+    assert lookups == [("all", "miss"), ("memory", "hit")]
+
+
+@pytest.mark.asyncio
+async def test_stale_value_is_served_while_refreshing_once(clock) -> None:
+    cache, lookups = _cache()
+    release = asyncio.Event()
+    calls = 0
+
+    async def compute() -> str:
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            await release.wait()
+        return f"v{calls}"
+
+    await cache.get_or_compute("k", compute)
+    clock.now += 50
+
+    # Both lookups return immediately with the stale value; one refresh runs.
+    assert await cache.get_or_compute("k", compute) == "v1"
+    assert await cache.get_or_compute("k", compute) == "v1"
+    release.set()
+    await cache.drain()
+
+    assert calls == 2
+    assert await cache.get_or_compute("k", compute) == "v2"
+    assert lookups[1:3] == [("memory", "stale"), ("memory", "stale")]
+    assert lookups[-1] == ("memory", "hit")
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_recomputed(clock) -> None:
+    cache, _ = _cache()
+    values = iter(["old", "new"])
+
+    async def compute() -> str:
+        return next(values)
+
+    await cache.get_or_compute("k", compute)
+    clock.now += 200
+
+    assert await cache.get_or_compute("k", compute) == "new"
+
+
+@pytest.mark.asyncio
+async def test_empty_results_are_not_cached(clock) -> None:
+    cache, _ = _cache()
+    calls = 0
+
+    async def compute() -> list[str]:
+        nonlocal calls
+        calls += 1
+        return []
+
+    await cache.get_or_compute("k", compute)
+    await cache.get_or_compute("k", compute)
+
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_and_keeps_creation_time(clock) -> None:
+    shared = FakeRedisTier()
+    writer, _ = _cache()
+    reader, lookups = _cache()
+    writer._redis = shared
+    reader._redis = shared
+
+    await writer.set("k", ["q1"])
+    clock.now += 20
+    found = await reader.get("k")
+
+    assert found is not None and found.value == ["q1"] and found.stale
+    assert lookups == [("redis", "stale")]
+    assert list(shared.ttls.values()) == [110]
+    # Backfilled locally with the original timestamp.
+    assert (await reader.get("k")).stale
+
+
+@pytest.mark.asyncio
+async def test_hot_expansion_query_never_waits_on_llm(monkeypatch, clock) -> None:
+    cache, _ = _cache()
+    monkeypatch.setattr(hybrid_search, "get_expansion_cache", lambda: cache)
+    slow = asyncio.Event()
+    calls = 0
+
+    async def fake_expand(query, max_queries, keywords):
+        nonlocal calls
+        calls += 1
+        if calls > 1:
+            await slow.wait()
+        return [f"{query} 採用", f"{query} 事業"]
+
+    monkeypatch.setattr(hybrid_search, "_expand_queries_uncached", fake_expand)
+
+    assert await hybrid_search.expand_queries_with_llm("三井物産", max_queries=1) == ["三井物産 採用"]
+    clock.now += 50
+    result = await asyncio.wait_for(
+        hybrid_search.expand_queries_with_llm("三井物産", max_queries=2), timeout=0.5
+    )
+
+    assert result == ["三井物産 採用", "三井物産 事業"]
+    slow.set()
+    await cache.drain()
+    assert calls == 2